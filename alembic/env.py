@@ -9,9 +9,12 @@ from database import Base, KPI_DB_URL
 
 from models.user import User
 from models.user_profile import UserProfile
-from models.kpi import EvaluationPeriod, Question, Evaluation, Answer
+from models.kpi import EvaluationPeriod, Question, Evaluation, Answer, EvaluationScore
 from models.notification import Notification
 from models.pdp import DevelopmentPlan, PlanItem
+from models.degree360 import Degree360Aggregate
+from models.competency import CompetencyRollup
+from models.job import Job
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
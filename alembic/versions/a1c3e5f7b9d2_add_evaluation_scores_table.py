@@ -0,0 +1,64 @@
+"""add evaluation_scores table
+
+Revision ID: a1c3e5f7b9d2
+Revises: 4b0ad06ffd48
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1c3e5f7b9d2'
+down_revision: Union[str, None] = '4b0ad06ffd48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('evaluation_scores',
+    sa.Column('evaluation_id', sa.Integer(), nullable=False),
+    sa.Column('period_id', sa.Integer(), nullable=False),
+    sa.Column('evaluated_user_id', sa.Integer(), nullable=False),
+    sa.Column('employee_score', sa.Float(), nullable=True),
+    sa.Column('manager_score', sa.Float(), nullable=True),
+    sa.Column('total_score', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['evaluation_id'], ['evaluations.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['evaluated_user_id'], ['user.id'], ),
+    sa.ForeignKeyConstraint(['period_id'], ['evaluation_periods.id'], ),
+    sa.PrimaryKeyConstraint('evaluation_id')
+    )
+    op.create_index('ix_evaluation_scores_period_user', 'evaluation_scores', ['period_id', 'evaluated_user_id'], unique=False)
+    op.create_index(op.f('ix_evaluation_scores_evaluated_user_id'), 'evaluation_scores', ['evaluated_user_id'], unique=False)
+
+    # Mövcud cavablar üzrə balları bir dəfəlik doldururuq
+    op.execute("""
+        INSERT INTO evaluation_scores
+            (evaluation_id, period_id, evaluated_user_id, employee_score, manager_score, total_score, updated_at)
+        SELECT
+            e.id,
+            e.period_id,
+            e.evaluated_user_id,
+            SUM(CASE WHEN a.author_role = 'employee' THEN a.score * q.weight END)
+                / NULLIF(SUM(CASE WHEN a.author_role = 'employee' THEN q.weight END), 0),
+            SUM(CASE WHEN a.author_role = 'manager' THEN a.score * q.weight END)
+                / NULLIF(SUM(CASE WHEN a.author_role = 'manager' THEN q.weight END), 0),
+            COALESCE(SUM(a.score * q.weight) / NULLIF(SUM(q.weight), 0), 0),
+            CURRENT_TIMESTAMP
+        FROM evaluations e
+        JOIN answers a ON a.evaluation_id = e.id
+        JOIN questions q ON q.id = a.question_id
+        GROUP BY e.id, e.period_id, e.evaluated_user_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_evaluation_scores_evaluated_user_id'), table_name='evaluation_scores')
+    op.drop_index('ix_evaluation_scores_period_user', table_name='evaluation_scores')
+    op.drop_table('evaluation_scores')
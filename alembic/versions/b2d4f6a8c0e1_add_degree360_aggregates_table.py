@@ -0,0 +1,61 @@
+"""add degree360_aggregates table
+
+Revision ID: b2d4f6a8c0e1
+Revises: a1c3e5f7b9d2
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2d4f6a8c0e1'
+down_revision: Union[str, None] = 'a1c3e5f7b9d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # degree360participantrole tipi degree360_participants cədvəli ilə artıq yaradılıb
+    role_enum = postgresql.ENUM('SELF', 'MANAGER', 'PEER', 'SUBORDINATE', 'CUSTOMER',
+                                name='degree360participantrole', create_type=False)
+    op.create_table('degree360_aggregates',
+    sa.Column('session_id', sa.Integer(), nullable=False),
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.Column('role', role_enum, nullable=False),
+    sa.Column('score_sum', sa.Float(), nullable=False),
+    sa.Column('score_count', sa.Integer(), nullable=False),
+    sa.Column('score_sumsq', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['question_id'], ['degree360_questions.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['session_id'], ['degree360_sessions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('session_id', 'question_id', 'role')
+    )
+
+    # Tamamlanmış iştirakçıların mövcud cavablarını bir dəfəlik yığırıq
+    op.execute("""
+        INSERT INTO degree360_aggregates
+            (session_id, question_id, role, score_sum, score_count, score_sumsq, updated_at)
+        SELECT
+            p.session_id,
+            a.question_id,
+            p.role,
+            SUM(a.score),
+            COUNT(a.id),
+            SUM(a.score * a.score),
+            CURRENT_TIMESTAMP
+        FROM degree360_participants p
+        JOIN degree360_answers a ON a.participant_id = p.id
+        WHERE p.status = 'COMPLETED'
+        GROUP BY p.session_id, a.question_id, p.role
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('degree360_aggregates')
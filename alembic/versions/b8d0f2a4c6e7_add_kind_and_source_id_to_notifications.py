@@ -0,0 +1,33 @@
+"""add kind and source_id to notifications
+
+Revision ID: b8d0f2a4c6e7
+Revises: a7c9e1f3b5d6
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d0f2a4c6e7'
+down_revision: Union[str, None] = 'a7c9e1f3b5d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('notifications', sa.Column('kind', sa.String(), nullable=True))
+    op.add_column('notifications', sa.Column('source_id', sa.Integer(), nullable=True))
+    op.create_index('ix_notifications_user_kind_source', 'notifications',
+                    ['user_id', 'kind', 'source_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notifications_user_kind_source', table_name='notifications')
+    op.drop_column('notifications', 'source_id')
+    op.drop_column('notifications', 'kind')
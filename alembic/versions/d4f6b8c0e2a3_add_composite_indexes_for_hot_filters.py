@@ -0,0 +1,41 @@
+"""add composite indexes for hot filters
+
+Revision ID: d4f6b8c0e2a3
+Revises: c3e5a7b9d1f2
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f6b8c0e2a3'
+down_revision: Union[str, None] = 'c3e5a7b9d1f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_evaluations_period_status', 'evaluations', ['period_id', 'status'], unique=False)
+    op.create_index('ix_evaluations_evaluator_status', 'evaluations', ['evaluator_user_id', 'status'], unique=False)
+    op.create_index('ix_evaluations_evaluated_status', 'evaluations', ['evaluated_user_id', 'status'], unique=False)
+    op.create_index('ix_answers_evaluation_author_role', 'answers', ['evaluation_id', 'author_role'], unique=False)
+    op.create_index('ix_degree360_participants_evaluator_status', 'degree360_participants', ['evaluator_user_id', 'status'], unique=False)
+    op.create_index('ix_degree360_participants_session_status', 'degree360_participants', ['session_id', 'status'], unique=False)
+    op.create_index('ix_notifications_user_unread', 'notifications', ['user_id', 'is_read'], unique=False,
+                    postgresql_where=sa.text('is_read = false'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notifications_user_unread', table_name='notifications')
+    op.drop_index('ix_degree360_participants_session_status', table_name='degree360_participants')
+    op.drop_index('ix_degree360_participants_evaluator_status', table_name='degree360_participants')
+    op.drop_index('ix_answers_evaluation_author_role', table_name='answers')
+    op.drop_index('ix_evaluations_evaluated_status', table_name='evaluations')
+    op.drop_index('ix_evaluations_evaluator_status', table_name='evaluations')
+    op.drop_index('ix_evaluations_period_status', table_name='evaluations')
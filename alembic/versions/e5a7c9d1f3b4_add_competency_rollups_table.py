@@ -0,0 +1,80 @@
+"""add competency rollups table
+
+Revision ID: e5a7c9d1f3b4
+Revises: d4f6b8c0e2a3
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a7c9d1f3b4'
+down_revision: Union[str, None] = 'd4f6b8c0e2a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('competency_rollups',
+    sa.Column('period_id', sa.Integer(), nullable=False),
+    sa.Column('department', sa.String(), nullable=False),
+    sa.Column('competency_id', sa.Integer(), nullable=False),
+    sa.Column('score_sum', sa.Float(), nullable=False),
+    sa.Column('score_count', sa.Integer(), nullable=False),
+    sa.Column('score_sumsq', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['competency_id'], ['competencies.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['period_id'], ['evaluation_periods.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('period_id', 'department', 'competency_id')
+    )
+
+    # Yekunlaşdırılmış KPI cavablarını və dövrlə kəsişən, ləğv edilməmiş 360° sessiyalarının
+    # aktiv suallar üzrə cəmlərini bir dəfəlik yığırıq
+    op.execute("""
+        INSERT INTO competency_rollups
+            (period_id, department, competency_id, score_sum, score_count, score_sumsq, updated_at)
+        SELECT period_id, department, competency_id, SUM(s), SUM(c), SUM(sq), CURRENT_TIMESTAMP
+        FROM (
+            SELECT
+                e.period_id AS period_id,
+                COALESCE(up.department, '') AS department,
+                qc.competency_id AS competency_id,
+                SUM(a.score) AS s,
+                COUNT(a.score) AS c,
+                SUM(a.score * a.score) AS sq
+            FROM answers a
+            JOIN evaluations e ON e.id = a.evaluation_id
+            JOIN kpi_question_competency qc ON qc.question_id = a.question_id
+            LEFT JOIN user_profile up ON up.user_id = e.evaluated_user_id
+            WHERE e.status = 'FINALIZED' AND a.score IS NOT NULL
+            GROUP BY e.period_id, COALESCE(up.department, ''), qc.competency_id
+            UNION ALL
+            SELECT
+                p.id,
+                COALESCE(up.department, ''),
+                dqc.competency_id,
+                SUM(g.score_sum),
+                SUM(g.score_count),
+                SUM(g.score_sumsq)
+            FROM degree360_aggregates g
+            JOIN degree360_sessions s ON s.id = g.session_id
+            JOIN degree360_questions dq ON dq.id = g.question_id
+            JOIN degree360_question_competency dqc ON dqc.question_id = g.question_id
+            JOIN evaluation_periods p ON s.start_date <= p.end_date AND s.end_date >= p.start_date
+            LEFT JOIN user_profile up ON up.user_id = s.evaluated_user_id
+            WHERE s.status != 'CANCELLED' AND dq.is_active = TRUE
+            GROUP BY p.id, COALESCE(up.department, ''), dqc.competency_id
+        ) totals
+        GROUP BY period_id, department, competency_id
+        HAVING SUM(c) > 0
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('competency_rollups')
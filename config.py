@@ -1,3 +1,5 @@
+from typing import Tuple
+
 from pydantic_settings import BaseSettings
 
 
@@ -9,6 +11,41 @@ class Settings(BaseSettings):
     PORT_KPI_DB: int
     NAME_KPI_DB: str
 
+    # Bağlantı hovuzu (connection pool) parametrləri
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # Bağlantı gözləmə limiti (saniyə)
+    DB_POOL_RECYCLE: int = 1800  # Bağlantının yenilənmə müddəti (saniyə), -1 - söndürülüb
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 0  # Sorğu icra limiti (millisaniyə), 0 - söndürülüb
+
+    # 360° xatırlatma işi parametrləri
+    REMINDER_360_DAYS_BEFORE_END: int = 3  # Bitmə tarixinə neçə gün qalmış xatırlatma göndərilir
+    REMINDER_360_DEDUP_HOURS: int = 24  # Bu müddət ərzində eyni sessiya üçün təkrar xatırlatma göndərilmir
+    REMINDER_360_INTERVAL_MINUTES: int = 60  # Planlayıcı rejimində işin təkrarlanma intervalı
+
+    SIDEBAR_CACHE_TTL_SECONDS: int = 30  # Yan panel vəziyyətinin (bildirişlər, son tarixlər) keş müddəti
+
+    # 9-Box Grid kateqoriyalarının (aşağı, yuxarı) hədləri
+    TALENT_GRID_PERFORMANCE_THRESHOLDS: Tuple[float, float] = (2.5, 3.5)
+    TALENT_GRID_POTENTIAL_THRESHOLDS: Tuple[float, float] = (2.5, 3.5)
+
+    EXPORT_CHUNK_SIZE: int = 2000  # İxracda verilənlər bazasından bir dəfəyə oxunan sətirlərin sayı
+
+    # Fon işləri (scripts/job_worker.py) parametrləri
+    JOB_WORKER_PROCESSES: int = 0  # İşçi proseslərin sayı, 0 - prosessor nüvələrinin sayı
+    JOB_POLL_SECONDS: float = 2.0  # Növbənin yoxlanma intervalı
+    JOB_PROGRESS_INTERVAL_SECONDS: float = 0.5  # Gedişatın bazaya yazılma intervalı (ən azı)
+    JOB_OUTPUT_DIR: str = "exports"  # İşlərin yaratdığı faylların qovluğu (səhifə ilə ortaq disk)
+    JOB_HEARTBEAT_SECONDS: float = 10.0  # İcra olunan işin siqnal (heartbeat) intervalı
+    JOB_STALE_SECONDS: float = 120.0  # Bu müddətdə siqnal verməyən RUNNING iş dayanmış sayılır
+    JOB_WAIT_TIMEOUT_SECONDS: float = 900.0  # Səhifənin işi avtomatik izləmə müddəti
+    JOB_OUTPUT_RETENTION_HOURS: float = 24.0  # İşlərin yaratdığı faylların saxlanma müddəti
+
+    # Analitika snapshot-u (services/snapshot_service.py)
+    ANALYTICS_SNAPSHOT_DIR: str = "snapshots"  # Parquet fayllarının qovluğu (səhifə ilə ortaq disk)
+    ANALYTICS_SNAPSHOT_INTERVAL_MINUTES: int = 5  # Planlayıcı rejimində köhnəlmiş dövrlərin yoxlanma intervalı
+
     @property
     def get_db_url(self):
         return f"{self.DRIVER_KPI_DB}://{self.USER_KPI_DB}:{self.PASS_KPI_DB}@{self.HOST_KPI_DB}/{self.NAME_KPI_DB}"
@@ -17,4 +54,3 @@ class Settings(BaseSettings):
 settings = Settings(_env_file='.env', _env_file_encoding='utf-8') # type: ignore
     
 
-
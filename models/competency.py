@@ -1,6 +1,7 @@
 """Competency models for the HR management system."""
 
-from sqlalchemy import Column, Integer, String, Text, Table, ForeignKey
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, Table, ForeignKey, Float, DateTime
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -22,7 +23,7 @@ class Competency(Base):
     
     # Relationships
     kpi_questions = relationship(
-        "KPIQuestion",
+        KPIQuestion,
         secondary=kpi_question_competency_association
     )
     
@@ -32,4 +33,29 @@ class Competency(Base):
     )
     
     def __repr__(self):
-        return f"<Competency(id={self.id}, name='{self.name}', category='{self.category}')>"
\ No newline at end of file
+        return f"<Competency(id={self.id}, name='{self.name}', category='{self.category}')>"
+
+
+class CompetencyRollup(Base):
+    """
+    Precomputed competency score totals per evaluation period and department.
+    
+    Holds finalized KPI answers of the period and completed 360-degree answers of
+    sessions overlapping the period, for questions linked to the competency. Rows
+    are updated incrementally in the transactions that finalize evaluations or
+    submit 360-degree answers; the primary key order makes a period's heatmap a
+    single index range scan.
+    """
+    
+    __tablename__ = 'competency_rollups'
+    
+    period_id = Column(Integer, ForeignKey('evaluation_periods.id', ondelete='CASCADE'), primary_key=True)
+    department = Column(String, primary_key=True, default="")  # Empty string for users without a department
+    competency_id = Column(Integer, ForeignKey('competencies.id', ondelete='CASCADE'), primary_key=True)
+    score_sum = Column(Float, nullable=False, default=0.0)
+    score_count = Column(Integer, nullable=False, default=0)
+    score_sumsq = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<CompetencyRollup(period_id={self.period_id}, department='{self.department}', competency_id={self.competency_id})>"
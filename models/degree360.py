@@ -1,7 +1,7 @@
 # models/degree360.py
 
 import enum
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Date, Enum, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Date, Enum, Boolean, DateTime, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
@@ -37,6 +37,7 @@ class Degree360Session(Base):
     is_anonymous = Column(Boolean, default=True)  # Anonimlik parametri
     status = Column(String, default="ACTIVE")  # ACTIVE, COMPLETED, CANCELLED
     created_at = Column(DateTime, default=datetime.utcnow)
+    answers_version = Column(Integer, nullable=False, default=0)  # Cavablar dəyişdikcə artır (hesabat keşi üçün)
     
     # Relationship
     evaluated_user = relationship("User", foreign_keys=[evaluated_user_id], backref="evaluated_360_sessions")
@@ -60,6 +61,10 @@ class Degree360Participant(Base):
     Hər bir qiymətləndiriləcək şəxs üçün müxtəlif roldakı qiymətləndiricilər olur.
     """
     __tablename__ = 'degree360_participants'
+    __table_args__ = (
+        Index('ix_degree360_participants_evaluator_status', 'evaluator_user_id', 'status'),
+        Index('ix_degree360_participants_session_status', 'session_id', 'status'),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(Integer, ForeignKey('degree360_sessions.id'), nullable=False)
@@ -114,4 +119,20 @@ class Degree360Answer(Base):
     
     # Relationship
     participant = relationship("Degree360Participant", back_populates="answers")
-    question = relationship("Degree360Question", back_populates="answers")
\ No newline at end of file
+    question = relationship("Degree360Question", back_populates="answers")
+
+class Degree360Aggregate(Base):
+    """
+    360 dərəcə qiymətləndirmə cavablarının sessiya, sual və rol üzrə yığılmış cəmləri.
+    Yalnız tamamlanmış iştirakçıların cavabları daxil edilir və cəmlər cavablar
+    təsdiqlənərkən eyni tranzaksiyada yenilənir.
+    """
+    __tablename__ = 'degree360_aggregates'
+
+    session_id = Column(Integer, ForeignKey('degree360_sessions.id', ondelete='CASCADE'), primary_key=True)
+    question_id = Column(Integer, ForeignKey('degree360_questions.id', ondelete='CASCADE'), primary_key=True)
+    role = Column(Enum(Degree360ParticipantRole), primary_key=True)
+    score_sum = Column(Float, nullable=False, default=0.0)  # Balların cəmi
+    score_count = Column(Integer, nullable=False, default=0)  # Cavabların sayı
+    score_sumsq = Column(Float, nullable=False, default=0.0)  # Balların kvadratlarının cəmi
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,43 @@
+# models/job.py
+
+from datetime import datetime
+
+from sqlalchemy import JSON, Column, DateTime, Float, ForeignKey, Index, Integer, String, Text
+
+from database import Base
+
+
+# İşin vəziyyətləri
+JOB_PENDING = "PENDING"
+JOB_RUNNING = "RUNNING"
+JOB_SUCCEEDED = "SUCCEEDED"
+JOB_FAILED = "FAILED"
+JOB_FINISHED_STATUSES = (JOB_SUCCEEDED, JOB_FAILED)
+
+
+class Job(Base):
+    """
+    Fon işi: səhifədən növbəyə qoyulur və scripts/job_worker.py prosesləri tərəfindən icra olunur.
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # İşçi növbədəki ən köhnə işi bu indekslə götürür
+        Index("ix_jobs_status_id", "status", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(100), nullable=False)  # İşin növü (JobService qeydiyyatındakı ad)
+    params = Column(JSON, nullable=False, default=dict)  # İşin parametrləri
+    status = Column(String(20), nullable=False, default=JOB_PENDING)  # PENDING, RUNNING, SUCCEEDED, FAILED
+    progress = Column(Float, nullable=False, default=0.0)  # Gedişat (0-1)
+    progress_message = Column(String(255))  # Cari mərhələnin adı
+    result = Column(JSON)  # Uğurlu işin nəticəsi
+    error = Column(Text)  # Uğursuz işin xəta mətni
+    created_by = Column(Integer, ForeignKey("user.id", ondelete="SET NULL"))
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    heartbeat_at = Column(DateTime)  # İcra edən işçinin son siqnalı; köhnələrsə iş dayanmış sayılır
+
+    def __repr__(self):
+        return f"<Job(id={self.id}, kind='{self.kind}', status='{self.status}')>"
@@ -2,7 +2,7 @@
 
 import enum
 import datetime
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Date, Enum, Boolean, Float
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Date, Enum, Boolean, Float, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -65,6 +65,11 @@ class EvaluationStatus(enum.Enum):
 class Evaluation(Base):
     """ Konkret qiymətləndirmə tapşırığı (kim kimi qiymətləndirəcək) """
     __tablename__ = 'evaluations'
+    __table_args__ = (
+        Index('ix_evaluations_period_status', 'period_id', 'status'),
+        Index('ix_evaluations_evaluator_status', 'evaluator_user_id', 'status'),
+        Index('ix_evaluations_evaluated_status', 'evaluated_user_id', 'status'),
+    )
     id = Column(Integer, primary_key=True)
     
     period_id = Column(Integer, ForeignKey('evaluation_periods.id'), nullable=False)
@@ -78,6 +83,7 @@ class Evaluation(Base):
     evaluator_user = relationship("User", foreign_keys=[evaluator_user_id])
     
     answers = relationship("Answer", back_populates="evaluation", cascade="all, delete-orphan")
+    score = relationship("EvaluationScore", back_populates="evaluation", uselist=False, cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<Evaluation(id={self.id}, status='{self.status.value}')>"
@@ -85,6 +91,9 @@ class Evaluation(Base):
 class Answer(Base):
     """ Verilmiş cavablar """
     __tablename__ = 'answers'
+    __table_args__ = (
+        Index('ix_answers_evaluation_author_role', 'evaluation_id', 'author_role'),
+    )
     id = Column(Integer, primary_key=True)
     
     evaluation_id = Column(Integer, ForeignKey('evaluations.id'), nullable=False)
@@ -98,4 +107,28 @@ class Answer(Base):
     question = relationship("Question")
 
     def __repr__(self):
-        return f"<Answer(score={self.score}, author_role='{self.author_role}')>"
\ No newline at end of file
+        return f"<Answer(score={self.score}, author_role='{self.author_role}')>"
+
+class EvaluationScore(Base):
+    """
+    Qiymətləndirmənin hesablanmış balları (materiallaşdırılmış cədvəl).
+    Cavablar təsdiqləndikdə və status yeniləndikdə KpiService tərəfindən yazılır.
+    """
+    __tablename__ = 'evaluation_scores'
+    __table_args__ = (
+        Index('ix_evaluation_scores_period_user', 'period_id', 'evaluated_user_id'),
+    )
+
+    evaluation_id = Column(Integer, ForeignKey('evaluations.id', ondelete='CASCADE'), primary_key=True)
+    period_id = Column(Integer, ForeignKey('evaluation_periods.id'), nullable=False)
+    evaluated_user_id = Column(Integer, ForeignKey('user.id'), nullable=False, index=True)
+
+    employee_score = Column(Float, nullable=True)  # İşçinin cavabları üzrə bal
+    manager_score = Column(Float, nullable=True)  # Rəhbərin cavabları üzrə bal
+    total_score = Column(Float, nullable=False, default=0.0)  # Bütün cavablar üzrə çəkili yekun bal
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
+    evaluation = relationship("Evaluation", back_populates="score")
+
+    def __repr__(self):
+        return f"<EvaluationScore(evaluation_id={self.evaluation_id}, total_score={self.total_score})>"
@@ -1,6 +1,6 @@
 # models/notification.py
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
@@ -10,14 +10,29 @@ try:
 except ImportError:
     from database import Base
 
+# Strukturlaşdırılmış bildiriş növləri (dedup mətnə görə yox, növ + mənbə ID-yə görə aparılır)
+NOTIFICATION_KIND_360_REMINDER = "DEGREE360_REMINDER"
+
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Yalnız oxunmamış bildirişlər indekslənir (qismən indeks)
+        Index(
+            "ix_notifications_user_unread", "user_id", "is_read",
+            postgresql_where=text("is_read = false"),
+            sqlite_where=text("is_read = 0"),
+        ),
+        # Xatırlatmaların təkrarını yoxlamaq üçün (istifadəçi, növ, mənbə)
+        Index("ix_notifications_user_kind_source", "user_id", "kind", "source_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("user.id"), nullable=False)
     message = Column(String, nullable=False)
     is_read = Column(Boolean, default=False, server_default=text("false"))
     created_at = Column(DateTime, default=datetime.utcnow)
+    kind = Column(String, nullable=True)  # Məs. NOTIFICATION_KIND_360_REMINDER; adi bildirişlərdə NULL
+    source_id = Column(Integer, nullable=True)  # Bildirişin aid olduğu obyektin ID-si (məs. 360 sessiyası)
     
     # Relationship
     user = relationship("User", backref="notifications")
\ No newline at end of file
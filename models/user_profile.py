@@ -1,4 +1,5 @@
-from sqlalchemy import Integer, String, ForeignKey
+from datetime import datetime
+from sqlalchemy import DateTime, Integer, String, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from database import Base
 from typing import TYPE_CHECKING
@@ -15,6 +16,8 @@ class UserProfile(Base):
     full_name: Mapped[str] = mapped_column(String, nullable=False)
     position: Mapped[str] = mapped_column(String, nullable=False)
     department: Mapped[str] = mapped_column(String, nullable=True)
+    # Analitika snapshot-unun barmaq izi üçün: ad və ya şöbə dəyişdikdə snapshot köhnəlir
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationship to User
     user = relationship("User", back_populates="profile", lazy="select")
\ No newline at end of file
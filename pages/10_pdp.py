@@ -94,8 +94,7 @@ else:
                         comments = PDPService.get_comments_for_plan_item(item.id)
                         if comments:
                             for comment in comments:
-                                author = UserService.get_user_by_id(comment.author_id)
-                                st.markdown(f"**{author.get_full_name() if author else 'Naməlum'}** - {comment.created_at.strftime('%d.%m.%Y %H:%M')}")
+                                st.markdown(f"**{comment.author.get_full_name() if comment.author else 'Naməlum'}** - {comment.created_at.strftime('%d.%m.%Y %H:%M')}")
                                 st.markdown(f"> {comment.comment_text}")
                                 st.markdown("---")
                         else:
@@ -157,7 +156,8 @@ else:
                 st.warning("Bu dövr üçün qiymətləndirməniz yoxdur.")
             else:
                 # Qiymətləndirməni seçmək
-                eval_options = [f"{e.period.name} - Qiymətləndirən: {UserService.get_user_by_id(e.evaluator_user_id).get_full_name()}" for e in evaluations]
+                user_directory = UserService.get_user_directory()
+                eval_options = [f"{e.period.name} - Qiymətləndirən: {user_directory.full_name(e.evaluator_user_id)}" for e in evaluations]
                 selected_eval_index = st.selectbox("Qiymətləndirmə seçin:", options=eval_options, index=0)
                 selected_eval = evaluations[eval_options.index(selected_eval_index)]
                 
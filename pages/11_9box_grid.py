@@ -5,11 +5,11 @@ st.set_page_config(layout="wide")
 
 import pandas as pd
 import altair as alt
-import numpy as np
-from database import get_db
 from services.kpi_service import KpiService
-from services.user_service import UserService
-from services.pdp_service import PDPService
+from services.talent_grid_service import (
+    TalentGridService, PERFORMANCE_LABELS, POTENTIAL_LABELS,
+    POTENTIAL_SOURCE_AUTO, POTENTIAL_SOURCE_360, POTENTIAL_SOURCE_MANAGER
+)
 from utils.utils import check_login, logout, show_notifications
 
 # Təhlükəsizlik yoxlaması
@@ -47,58 +47,30 @@ period_id = selected_period.id
 st.divider()
 
 # 9-Box Grid üçün məlumatları əldə edirik
-# Bu nümunədə sadələşdirilmiş versiya göstərilir
-# Real tətbiqdə burada KPI nəticələri və rəhbərin subyektiv qiymətləndirməsi əsasında hesablama aparılmalıdır
-
-# Sadələşdirilmiş nümunə: 
-# X oxu (Performans) - KPI nəticələri əsasında (0-5 arası)
-# Y oxu (Potensial) - Rəhbərin qiymətləndirməsi əsasında (0-5 arası)
-
-# Bu nümunədə hər bir işçi üçün təsadüfi qiymətlər yaradırıq
-np.random.seed(42)  # Təkrarlanan nəticələr üçün sabit tohum
-users = UserService.get_all_active_users()
-grid_data = []
-
-for user in users:
-    # KPI nəticəsi (0-5 arası təsadüfi qiymət)
-    kpi_score = np.random.uniform(2.0, 5.0)
-    
-    # Potensial (0-5 arası təsadüfi qiymət)
-    potential_score = np.random.uniform(2.0, 5.0)
-    
-    grid_data.append({
-        "id": user.id,
-        "full_name": user.get_full_name(),
-        "kpi_score": kpi_score,
-        "potential_score": potential_score
-    })
-
-df_grid = pd.DataFrame(grid_data)
-
-# 9-Box Grid matrisini yaradırıq
-# X oxu (Performans): 3 qrup - Aşağı (0-2.5), Orta (2.5-3.5), Yüksək (3.5-5)
-# Y oxu (Potensial): 3 qrup - Aşağı (0-2.5), Orta (2.5-3.5), Yüksək (3.5-5)
-
-def categorize_performance(score):
-    """Performans kateqoriyasını müəyyənləşdirir."""
-    if score < 2.5:
-        return "Aşağı Performans"
-    elif 2.5 <= score <= 3.5:
-        return "Orta Performans"
-    else:
-        return "Yüksək Performans"
-
-def categorize_potential(score):
-    """Potensial kateqoriyasını müəyyənləşdirir."""
-    if score < 2.5:
-        return "Aşağı Potensial"
-    elif 2.5 <= score <= 3.5:
-        return "Orta Potensial"
-    else:
-        return "Yüksək Potensial"
-
-df_grid['performance_category'] = df_grid['kpi_score'].apply(categorize_performance)
-df_grid['potential_category'] = df_grid['potential_score'].apply(categorize_potential)
+# X oxu (Performans) - dövrün yekunlaşdırılmış KPI nəticələri
+# Y oxu (Potensial) - 360° qiymətləndirmə balları, olmadıqda rəhbərin qiymətləndirməsi
+potential_source_labels = {
+    POTENTIAL_SOURCE_AUTO: "360° (yoxdursa rəhbərin qiymətləndirməsi)",
+    POTENTIAL_SOURCE_360: "360° qiymətləndirmə",
+    POTENTIAL_SOURCE_MANAGER: "Rəhbərin qiymətləndirməsi",
+}
+potential_source = st.radio(
+    "Potensial mənbəyi:",
+    options=list(potential_source_labels),
+    format_func=potential_source_labels.get,
+    horizontal=True
+)
+
+# Ballar analitika snapshot-undan oxunur; snapshot yoxdursa canlı sorğu istifadə olunur
+talent_grid = TalentGridService.build_talent_grid(period_id, potential_source=potential_source, use_snapshot=True)
+df_grid = talent_grid.employees
+
+if talent_grid.unscored_count:
+    st.caption(f"KPI və ya potensial balı olmayan {talent_grid.unscored_count} əməkdaş cədvələ daxil edilməyib.")
+
+if df_grid.empty:
+    st.info("Seçilmiş dövr üçün yekunlaşdırılmış KPI və potensial balları olan əməkdaş yoxdur.")
+    st.stop()
 
 # 9-Box Grid üçün vizuallaşdırma
 st.header("9-Box Grid Matrisi")
@@ -108,16 +80,16 @@ st.header("9-Box Grid Matrisi")
 # Y oxu - Potensial (aşağıdan yuxarı: Aşağı -> Orta -> Yüksək)
 
 # Kateqoriyaların düzülüş sırası
-performance_order = ["Aşağı Performans", "Orta Performans", "Yüksək Performans"]
-potential_order = ["Aşağı Potensial", "Orta Potensial", "Yüksək Potensial"]
+performance_order = list(PERFORMANCE_LABELS)
+potential_order = list(POTENTIAL_LABELS)
 
 # Scatter plot yaratmaq
-scatter = alt.Chart(df_grid).mark_circle(size=100).encode(
+scatter = alt.Chart(df_grid.astype({'performance_category': str, 'potential_category': str})).mark_circle(size=100).encode(
     x=alt.X('performance_category:N', 
             title='Performans (KPI Nəticələri)', 
             sort=performance_order),
     y=alt.Y('potential_category:N', 
-            title='Potensial (Rəhbərin Qiymətləndirməsi)', 
+            title='Potensial', 
             sort=potential_order),
     tooltip=['full_name:N', 'kpi_score:Q', 'potential_score:Q'],
     color=alt.Color('full_name:N', legend=None)
@@ -141,15 +113,16 @@ st.divider()
 st.header("Ətraflı Məlumat")
 
 # Hər bir kateqoriyada olan işçiləri göstərmək
+st.dataframe(talent_grid.cell_counts, use_container_width=True)
+
+df_by_user = df_grid.set_index('user_id')
 for potential_cat in potential_order:
     for performance_cat in performance_order:
-        employees_in_box = df_grid[
-            (df_grid['potential_category'] == potential_cat) & 
-            (df_grid['performance_category'] == performance_cat)
-        ]
-        
-        if not employees_in_box.empty:
-            box_title = f"{potential_cat} / {performance_cat}"
+        user_ids = talent_grid.members[(potential_cat, performance_cat)]
+
+        if user_ids:
+            employees_in_box = df_by_user.loc[list(user_ids)]
+            box_title = f"{potential_cat} / {performance_cat} ({len(user_ids)})"
             with st.expander(box_title, expanded=False):
                 st.dataframe(
                     employees_in_box[['full_name', 'kpi_score', 'potential_score']].rename(columns={
@@ -175,7 +148,6 @@ st.dataframe(
 )
 
 # Real tətbiqdə burada aşağıdakı funksionallıqlar əlavə edilə bilər:
-# 1. Hər bir işçi üçün real KPI nəticələrini əldə etmək
-# 2. Rəhbərlərin hər bir işçi üçün potensial qiymətləndirməsi əlavə etməsi üçün interfeys
-# 3. 9-Box Grid-in interaktiv şəkildə yenilənməsi
-# 4. Hər bir kvadrat üçün təkliflər (məsələn, "Yüksək Performans/Yüksək Potensial" üçün "Liderlikə Hazırlıq" və s.)
\ No newline at end of file
+# 1. Rəhbərlərin hər bir işçi üçün potensial qiymətləndirməsi əlavə etməsi üçün interfeys
+# 2. 9-Box Grid-in interaktiv şəkildə yenilənməsi
+# 3. Hər bir kvadrat üçün təkliflər (məsələn, "Yüksək Performans/Yüksək Potensial" üçün "Liderlikə Hazırlıq" və s.)
\ No newline at end of file
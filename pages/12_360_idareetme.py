@@ -5,7 +5,6 @@ st.set_page_config(layout="wide")
 
 import pandas as pd
 from datetime import date
-from database import get_db
 from services.degree360_service import Degree360Service
 from services.user_service import UserService
 from utils.utils import check_login, logout, show_notifications
@@ -86,6 +85,15 @@ with tab2:
     if not sessions:
         st.info("Hələ heç bir 360° qiymətləndirmə sessiyası yaradılmayıb.")
     else:
+        # Nəticələri açılmış bütün sessiyalar üçün nəticələri bir sorğu ilə hesabla
+        try:
+            results_by_session = Degree360Service.calculate_360_results_for_sessions(
+                [s.id for s in sessions if st.session_state.get(f"show_results_{s.id}", False)]
+            )
+        except Exception as e:
+            results_by_session = {}
+            st.error(f"Nəticələri əldə edərkən xəta baş verdi: {str(e)}")
+
         for session in sessions:
             with st.expander(f"{session.name} - Qiymətləndirilən: {session.evaluated_user.get_full_name()}", expanded=False):
                 st.write(f"**Başlama tarixi:** {session.start_date.strftime('%d.%m.%Y')}")
@@ -184,7 +192,7 @@ with tab2:
                 # Nəticələri göstərmə
                 if st.session_state.get(f"show_results_{session.id}", False):
                     try:
-                        results = Degree360Service.calculate_360_session_results(session.id)
+                        results = results_by_session.get(session.id)
                         if results:
                             st.subheader("Nəticələr")
                             st.write(f"**Qiymətləndirilən işçi:** {results['evaluated_user']}")
@@ -209,21 +217,75 @@ with tab2:
 with tab3:
     st.header("Bütün İştirakçılar")
     
-    # Bütün iştirakçıları əldə et
-    with get_db() as session:
-        from models.degree360 import Degree360Participant
-        participants = session.query(Degree360Participant).all()
+    # Filtrlər
+    filter_sessions = {s.id: s.name for s in Degree360Service.get_all_active_360_sessions()}
+    filter_users = {u.id: u.get_full_name() for u in UserService.get_all_active_users()}
+    filter_statuses = {"PENDING": "Gözləyir", "COMPLETED": "Tamamlanıb"}
+    
+    col1, col2, col3, col4, col5 = st.columns([3, 2, 2, 3, 1])
+    with col1:
+        filter_session_id = st.selectbox(
+            "Sessiya", options=[None] + list(filter_sessions),
+            format_func=lambda x: "Hamısı" if x is None else filter_sessions[x]
+        )
+    with col2:
+        filter_status = st.selectbox(
+            "Status", options=[None] + list(filter_statuses),
+            format_func=lambda x: "Hamısı" if x is None else filter_statuses[x]
+        )
+    with col3:
+        filter_role = st.selectbox(
+            "Rol", options=[None] + list(Degree360ParticipantRole),
+            format_func=lambda x: "Hamısı" if x is None else x.value
+        )
+    with col4:
+        filter_evaluator_id = st.selectbox(
+            "Qiymətləndirici", options=[None] + list(filter_users),
+            format_func=lambda x: "Hamısı" if x is None else filter_users[x]
+        )
+    with col5:
+        page_size = st.selectbox("Sətir", options=[25, 50, 100], index=1)
+    
+    # Filtrlər dəyişdikdə birinci səhifəyə qayıdırıq
+    participant_filters = (filter_session_id, filter_status, filter_role, filter_evaluator_id, page_size)
+    if st.session_state.get("participants_filters") != participant_filters:
+        st.session_state.participants_filters = participant_filters
+        st.session_state.participants_cursors = [None]
+    cursors = st.session_state.participants_cursors
+    
+    page = Degree360Service.get_participants_page(
+        session_id=filter_session_id,
+        status=filter_status,
+        role=filter_role,
+        evaluator_user_id=filter_evaluator_id,
+        after_id=cursors[-1],
+        page_size=page_size
+    )
+    
+    if not page["items"]:
+        st.info("Hələ heç bir iştirakçı yoxdur.")
+    else:
+        df_participants = pd.DataFrame([
+            {
+                "İştirakçı": p["evaluator_name"],
+                "Rol": p["role"].value,
+                "Status": p["status"],
+                "Sessiya": p["session_name"]
+            }
+            for p in page["items"]
+        ])
+        st.dataframe(df_participants, use_container_width=True, hide_index=True)
         
-        if not participants:
-            st.info("Hələ heç bir iştirakçı yoxdur.")
-        else:
-            participant_data = []
-            for p in participants:
-                participant_data.append({
-                    "İştirakçı": p.evaluator_user.get_full_name(),
-                    "Rol": p.role.value,
-                    "Status": p.status,
-                    "Sessiya": p.session.name if p.session else "Naməlum"
-                })
-            df_participants = pd.DataFrame(participant_data)
-            st.dataframe(df_participants, use_container_width=True)
\ No newline at end of file
+        total_label = page["total"] if page["total_is_exact"] else f"~{page['total']}"
+        first_row = (len(cursors) - 1) * page_size + 1
+        st.caption(f"Göstərilir: {first_row}–{first_row + len(page['items']) - 1} / {total_label}")
+    
+    col_prev, col_next = st.columns(2)
+    with col_prev:
+        if st.button("← Əvvəlki", disabled=len(cursors) == 1, key="participants_prev"):
+            cursors.pop()
+            st.rerun()
+    with col_next:
+        if st.button("Növbəti →", disabled=page["next_cursor"] is None, key="participants_next"):
+            cursors.append(page["next_cursor"])
+            st.rerun()
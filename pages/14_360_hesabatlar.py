@@ -6,8 +6,9 @@ st.set_page_config(layout="wide")
 import pandas as pd
 import altair as alt
 from datetime import datetime
-from database import get_db
 from services.degree360_service import Degree360Service
+from services.competency_rollup_service import CompetencyRollupService
+from services.export_service import ExportService
 from services.user_service import UserService
 from utils.utils import check_login, logout, show_notifications
 
@@ -183,73 +184,62 @@ else:
                     )
                     st.altair_chart(question_chart, use_container_width=True)
                 
-                # Competency-based analysis
+                # Səriştələr üzrə analiz (sessiyanın cəmlərindən)
                 st.divider()
                 st.header("🧠 Səriştələr Üzrə Analiz")
                 
-                # Get competency data
-                from services.competency_service import CompetencyService
-                db = next(get_db())
-                competency_service = CompetencyService(db)
+                competency_scores = Degree360Service.get_360_session_competency_scores(selected_session_id)
                 
-                # Get all competencies associated with questions in this session
-                competencies = set()
-                for question in report_data.get("detailed_results", []):
-                    # This would require getting question ID from the report data
-                    # For demonstration, we'll use mock data
-                    pass
-                
-                # Mock competency data for demonstration
-                import random
-                competency_data = []
-                mock_competencies = ["Liderlik", "Kommunikasiya", "Problemləri Həll Etme", "İşə Həvəs", "Komanda İşİ"]
-                
-                for comp in mock_competencies:
-                    competency_data.append({
-                        "Səriştə": comp,
-                        "Orta Bal": round(random.uniform(3.0, 5.0), 2),
-                        "Kateqoriya": random.choice(["İdarəetmə", "Ünsiyyət", "Texniki"])
-                    })
-                
-                df_competencies = pd.DataFrame(competency_data)
-                df_competencies = df_competencies.sort_values("Orta Bal", ascending=False)
-                
-                st.subheader("Səriştələr Üzrə Ümumi Nəticələr")
-                st.dataframe(df_competencies, use_container_width=True, hide_index=True)
-                
-                # Chart for competency performance
-                competency_chart = alt.Chart(df_competencies).mark_bar().encode(
-                    x=alt.X('Orta Bal:Q', scale=alt.Scale(domain=(0, 5))),
-                    y=alt.Y('Səriştə:N', sort='-x'),
-                    color=alt.Color('Kateqoriya:N', legend=alt.Legend(title="Kateqoriya")),
-                    tooltip=['Səriştə', 'Orta Bal', 'Kateqoriya']
-                ).properties(
-                    title="Səriştələr Üzrə Performans",
-                    height=300
-                )
-                
-                st.altair_chart(competency_chart, use_container_width=True)
-                
-                # Detailed competency analysis
-                st.subheader("Ətraflı Səriştə Analizi")
-                selected_competency = st.selectbox(
-                    "Təfərrütlə analiz etmək üçün səriştə seçin:", 
-                    options=df_competencies["Səriştə"].tolist()
-                )
-                
-                if selected_competency:
-                    st.write(f"**{selected_competency}** səriştəsi üzrə təfərrütlər:")
+                if not competency_scores:
+                    st.info("Bu sessiyanın sualları heç bir səriştəyə bağlanmayıb və ya hələ cavab yoxdur.")
+                else:
+                    # Şöbə ortalaması: sessiya ilə kəsişən ən son dövrün səriştə cəmlərindən
+                    department_averages = CompetencyRollupService.get_department_averages_for_360_session(
+                        selected_session_id
+                    )
+                    df_competencies = pd.DataFrame([
+                        {
+                            "Səriştə": c["competency"],
+                            "Orta Bal": round(c["average_score"], 2),
+                            "Şöbə Ortalaması": round(department_averages[c["competency_id"]], 2)
+                            if c["competency_id"] in department_averages else None,
+                            "Kateqoriya": c["category"] or "Kateqoriyasız"
+                        }
+                        for c in competency_scores
+                    ])
+                    
+                    st.subheader("Səriştələr Üzrə Ümumi Nəticələr")
+                    st.dataframe(df_competencies, use_container_width=True, hide_index=True)
+                    
+                    # Chart for competency performance
+                    competency_chart = alt.Chart(df_competencies).mark_bar().encode(
+                        x=alt.X('Orta Bal:Q', scale=alt.Scale(domain=(0, 5))),
+                        y=alt.Y('Səriştə:N', sort='-x'),
+                        color=alt.Color('Kateqoriya:N', legend=alt.Legend(title="Kateqoriya")),
+                        tooltip=['Səriştə', 'Orta Bal', 'Şöbə Ortalaması', 'Kateqoriya']
+                    ).properties(
+                        title="Səriştələr Üzrə Performans",
+                        height=300
+                    )
                     
-                    # Mock detailed analysis
-                    detail_data = [
-                        {"Rol": "Özünü qiymətləndirən", "Orta Bal": round(random.uniform(3.5, 4.5), 2)},
-                        {"Rol": "Rəhbər", "Orta Bal": round(random.uniform(3.0, 4.0), 2)},
-                        {"Rol": "Həmkar", "Orta Bal": round(random.uniform(3.2, 4.2), 2)},
-                        {"Rol": "Tabeçil", "Orta Bal": round(random.uniform(3.4, 4.4), 2)}
-                    ]
+                    st.altair_chart(competency_chart, use_container_width=True)
                     
-                    df_detail = pd.DataFrame(detail_data)
-                    st.dataframe(df_detail, use_container_width=True, hide_index=True)
+                    # Detailed competency analysis
+                    st.subheader("Ətraflı Səriştə Analizi")
+                    competency_by_name = {c["competency"]: c for c in competency_scores}
+                    selected_competency = st.selectbox(
+                        "Təfərrütlə analiz etmək üçün səriştə seçin:", 
+                        options=list(competency_by_name)
+                    )
+                    
+                    if selected_competency:
+                        st.write(f"**{selected_competency}** səriştəsi üzrə təfərrütlər:")
+                        
+                        df_detail = pd.DataFrame([
+                            {"Rol": role, "Orta Bal": round(score, 2)}
+                            for role, score in competency_by_name[selected_competency]["scores_by_role"].items()
+                        ])
+                        st.dataframe(df_detail, use_container_width=True, hide_index=True)
                 
                 # Hesabatı yükləmək imkanı
                 st.divider()
@@ -276,15 +266,17 @@ else:
                         # Gap analizi üçün DataFrame
                         df_gap = pd.DataFrame(gap_analysis)
                         
-                        # Excel faylı yarat
+                        # Excel faylı yarat (vərəqlər sətir-sətir, constant_memory rejimində yazılır)
                         import io
                         buffer = io.BytesIO()
-                        with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
-                            df_summary.to_excel(writer, sheet_name='Ümumi Nəticə', index=False)
-                            df_roles.to_excel(writer, sheet_name='Rol Üzrə Ballar', index=False)
-                            df_questions.to_excel(writer, sheet_name='Sual Üzrə Nəticələr', index=False)
-                            if not df_gap.empty:
-                                df_gap.to_excel(writer, sheet_name='Gap Analizi', index=False)
+                        sheets = [
+                            ExportService.dataframe_table('Ümumi Nəticə', df_summary),
+                            ExportService.dataframe_table('Rol Üzrə Ballar', df_roles),
+                            ExportService.dataframe_table('Sual Üzrə Nəticələr', df_questions),
+                        ]
+                        if not df_gap.empty:
+                            sheets.append(ExportService.dataframe_table('Gap Analizi', df_gap))
+                        ExportService.write_xlsx(buffer, sheets)
                         
                         st.download_button(
                             label="📥 Excel Hesabatını Yüklə",
@@ -61,14 +61,12 @@ else:
             else:
                 # Qiymətləndirmə məlumatlarını hazırlayırıq
                 eval_data = []
+                user_directory = UserService.get_user_directory()
                 for eval in evaluations:
-                    evaluated_user = UserService.get_user_by_id(eval.evaluated_user_id)
-                    evaluator_user = UserService.get_user_by_id(eval.evaluator_user_id)
-                    
                     eval_data.append({
                         "id": eval.id,
-                        "evaluated_user": evaluated_user.get_full_name() if evaluated_user else "Naməlum",
-                        "evaluator_user": evaluator_user.get_full_name() if evaluator_user else "Naməlum",
+                        "evaluated_user": user_directory.full_name(eval.evaluated_user_id),
+                        "evaluator_user": user_directory.full_name(eval.evaluator_user_id),
                         "status": eval.status.value,
                         "end_date": selected_period.end_date.strftime('%d.%m.%Y')
                     })
@@ -108,12 +106,12 @@ else:
                 st.subheader("Hesabat Yarat")
                 
                 # İstifadəçi seçimi üçün dropdown
-                user_options = [u.get_full_name() for u in UserService.get_all_active_users() if u.role != "admin"]
+                user_options = [u.get_full_name() for u in user_directory.active_users() if u.role != "admin"]
                 selected_user_name = st.selectbox("Hesabat üçün işçi seçin:", options=user_options, index=0)
                 
                 if st.button("Hesabat Yarat"):
                     # Seçilmiş istifadəçinin ID-sini tapırıq
-                    selected_user = next((u for u in UserService.get_all_active_users() if u.get_full_name() == selected_user_name), None)
+                    selected_user = user_directory.get_by_full_name(selected_user_name)
                     if selected_user:
                         # İstifadəçinin bu dövrdə qiymətləndirilməsini tapırıq
                         user_evaluations = [e for e in evaluations if e.evaluated_user_id == selected_user.id]
@@ -122,7 +120,7 @@ else:
                             st.warning(f"{selected_user_name} bu dövr üçün qiymətləndirilməyib.")
                         else:
                             # Qiymətləndirmənin yekun balını hesablayırıq
-                            scores = [KpiService.calculate_evaluation_score(e.id) for e in user_evaluations]
+                            scores = list(KpiService.get_evaluation_scores([e.id for e in user_evaluations]).values())
                             avg_score = sum(scores) / len(scores) if scores else 0
                             
                             # Hesabat məlumatlarını hazırlayırıq (sadələşdirilmiş format)
@@ -54,8 +54,7 @@ with tab1:
                     if eval.evaluated_user_id == current_user.id:
                         st.markdown("**Özünüqiymətləndirmə**")
                     else:
-                        evaluated_user = UserService.get_user_by_id(eval.evaluated_user_id)
-                        st.markdown(f"**Qiymətləndirilən:** {evaluated_user.get_full_name() if evaluated_user else 'Naməlum'}")
+                        st.markdown(f"**Qiymətləndirilən:** {UserService.get_user_directory().full_name(eval.evaluated_user_id)}")
                     st.caption(f"Dövr: {eval.period.name} | Son tarix: {eval.period.end_date.strftime('%d.%m.%Y')}")
                 with col2:
                     if st.button("Başla", key=f"eval_{eval.id}", use_container_width=True):
@@ -172,6 +171,9 @@ with tab2:
         if not evaluated_sessions:
             st.info("Hələ heç bir 360° qiymətləndirməsi tamamlamısınız.")
         else:
+            results_by_session = Degree360Service.calculate_360_results_for_sessions(
+                [s.id for s in evaluated_sessions]
+            )
             for degree360_session in evaluated_sessions:
                 # Bütün iştirakçılar tamamlamıbsa, nəticələri göstərmə
                 participants = Degree360Service.get_participants_for_360_session(degree360_session.id)
@@ -179,7 +181,7 @@ with tab2:
                 
                 if len(completed_participants) >= len(participants) * 0.5:  # Ən az 50% tamamlanıbsa
                     st.markdown(f"**{degree360_session.name}**")
-                    results = Degree360Service.calculate_360_session_results(degree360_session.id)
+                    results = results_by_session.get(degree360_session.id)
                     if results:
                         col1, col2 = st.columns(2)
                         with col1:
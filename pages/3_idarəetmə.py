@@ -4,13 +4,9 @@ import streamlit as st
 st.set_page_config(layout="wide")
 
 import pandas as pd
-from sqlalchemy import select, update, func
-from database import get_db
-from models.user import User
-from models.user_profile import UserProfile
-from models.kpi import Question
 from utils.utils import download_guide_doc_file, logout, check_login, show_notifications
 from services.user_service import UserService
+from services.question_service import QuestionService
 
 current_user = check_login()
 if current_user.role != "admin":
@@ -52,134 +48,157 @@ with tab1:
                 if not all([new_username, new_password, new_role, new_full_name, new_position]):
                     st.warning("Zəhmət olmasa, bütün xanaları doldurun.")
                 else:
-                    with get_db() as session:
-                        existing_user = session.query(User).filter(User.username == new_username).first()
-                        if existing_user:
-                            st.error(f"'{new_username}' adlı istifadəçi artıq mövcuddur. Fərqli ad seçin.")
-                        else:
-                            user_to_add = User(username=new_username, role=new_role, manager_id=new_manager_id if new_manager_id else None)
-                            user_to_add.set_password(new_password)
-                            session.add(user_to_add)
-                            session.commit()
-                            session.refresh(user_to_add)
-                            profile_to_add = UserProfile(user_id=user_to_add.id, full_name=new_full_name, position=new_position, department=new_department if new_department else None)
-                            session.add(profile_to_add)
-                            session.commit()
-                            st.success(f"İstifadəçi '{new_full_name}' uğurla yaradıldı!")
-                            st.rerun()
+                    try:
+                        UserService.create_user(
+                            username=new_username,
+                            password=new_password,
+                            role=new_role,
+                            full_name=new_full_name,
+                            position=new_position,
+                            department=new_department,
+                            manager_id=new_manager_id
+                        )
+                        st.success(f"İstifadəçi '{new_full_name}' uğurla yaradıldı!")
+                        st.rerun()
+                    except ValueError as e:
+                        st.error(str(e))
 
     st.subheader("Mövcud İstifadəçilər")
     try:
-        # Bütün istifadəçiləri və onların profillərini əldə edirik
-        users_data = UserService.get_all_users_with_profiles()
-        
-        if users_data:
-            # Get all users for manager selection
-            all_users = UserService.get_all_active_users()
-            user_name_map = {user.id: user.get_full_name() for user in all_users}
-            user_name_map[None] = "Rəhbər yoxdur"
-            
-            # Format data for display
-            formatted_users_data = []
-            for user in users_data:
-                manager_name = user_name_map.get(user["manager_id"], "Naməlum")
-                formatted_users_data.append({
+        # Filtrlər verilənlər bazası səviyyəsində tətbiq olunur
+        col1, col2, col3, col4, col5 = st.columns([3, 2, 2, 2, 1])
+        with col1:
+            user_search = st.text_input("Axtarış (ad və ya istifadəçi adı)")
+        with col2:
+            user_role_filter = st.selectbox("Rol", options=[None, "user", "admin", "manager"],
+                                            format_func=lambda x: "Hamısı" if x is None else x)
+        with col3:
+            user_department_filter = st.selectbox("Şöbə", options=[None] + UserService.get_departments(),
+                                                  format_func=lambda x: "Hamısı" if x is None else x)
+        with col4:
+            active_options = {None: "Hamısı", True: "Aktiv", False: "Deaktiv"}
+            user_active_filter = st.selectbox("Status", options=list(active_options),
+                                              format_func=lambda x: active_options[x])
+        with col5:
+            users_page_size = st.selectbox("Sətir", options=[25, 50, 100], index=1)
+
+        # Filtrlər dəyişdikdə birinci səhifəyə qayıdırıq
+        user_filters = (user_search, user_role_filter, user_department_filter, user_active_filter, users_page_size)
+        if st.session_state.get("users_filters") != user_filters:
+            st.session_state.users_filters = user_filters
+            st.session_state.users_cursors = [None]
+        users_cursors = st.session_state.users_cursors
+
+        users_page = UserService.get_users_page(
+            search=user_search,
+            role=user_role_filter,
+            department=user_department_filter,
+            is_active=user_active_filter,
+            after_id=users_cursors[-1],
+            page_size=users_page_size
+        )
+        users_data = users_page["items"]
+
+        if not users_data:
+            st.info("Filtrlərə uyğun istifadəçi tapılmadı.")
+        else:
+            # Rəhbər seçimi üçün etiketlər: "Ad (istifadəçi adı)" -> ID
+            manager_label_to_id = {"Rəhbər yoxdur": None}
+            manager_id_to_label = {None: "Rəhbər yoxdur"}
+            for user in UserService.get_all_active_users():
+                label = f"{user.get_full_name()} ({user.username})"
+                manager_label_to_id[label] = user.id
+                manager_id_to_label[user.id] = label
+
+            # Redaktə edilə bilən sütunlar -> xidmətin sahələri
+            editable_columns = {
+                "İstifadəçi Adı": "username",
+                "Tam Adı": "full_name",
+                "Vəzifəsi": "position",
+                "Rolu": "role",
+                "Aktivdir": "is_active",
+                "Rəhbəri": "manager_id",
+                "Şöbə": "department"
+            }
+
+            df_users = pd.DataFrame([
+                {
                     "ID": user["id"],
                     "İstifadəçi Adı": user["username"],
                     "Tam Adı": user["full_name"],
                     "Vəzifəsi": user["position"],
                     "Rolu": user["role"],
                     "Aktivdir": user["is_active"],
-                    "Rəhbəri": manager_name,
-                    "Şöbə": user["department"] if user["department"] else ""
-                })
-            
-            df_users = pd.DataFrame(formatted_users_data)
-            if 'original_users_df' not in st.session_state:
-                st.session_state['original_users_df'] = df_users.copy()
-                
-            edited_df = st.data_editor(
-                df_users, use_container_width=True, hide_index=True, key="user_editor",
+                    "Rəhbəri": manager_id_to_label.get(user["manager_id"], user["manager_name"]),
+                    "Şöbə": user["department"]
+                }
+                for user in users_data
+            ])
+
+            # Redaktor açarı səhifəyə bağlıdır ki, səhifə dəyişdikdə köhnə dəyişikliklər daşınmasın
+            editor_key = f"user_editor_{hash(user_filters)}_{users_cursors[-1]}"
+            st.data_editor(
+                df_users, use_container_width=True, hide_index=True, key=editor_key,
                 column_config={
                     "ID": st.column_config.NumberColumn("ID", disabled=True),
                     "Rolu": st.column_config.SelectboxColumn("Rolu", options=["user", "admin", "manager"]),
-                    "Aktivdir": st.column_config.CheckboxColumn("Aktivdir")
+                    "Aktivdir": st.column_config.CheckboxColumn("Aktivdir"),
+                    "Rəhbəri": st.column_config.SelectboxColumn("Rəhbəri", options=list(manager_label_to_id))
                 }
             )
-            
-            if st.button("İstifadəçiləri Yadda Saxla"):
-                try:
-                    # Orijinal DataFrame-i əldə edirik
-                    original_df = st.session_state['original_users_df']
-                    
-                    # Dəyişdirilmiş sətirləri müqayisə edirik
-                    # ID-lərə görə birləşdiririk
-                    merged_df = pd.merge(original_df, edited_df, on='ID', suffixes=('_orig', '_new'))
-                    
-                    # Dəyişdirilmiş sütunları müqayisə edirik
-                    changed_rows = merged_df[
-                        (merged_df['İstifadəçi Adı_orig'] != merged_df['İstifadəçi Adı_new']) |
-                        (merged_df['Tam Adı_orig'] != merged_df['Tam Adı_new']) |
-                        (merged_df['Vəzifəsi_orig'] != merged_df['Vəzifəsi_new']) |
-                        (merged_df['Rolu_orig'] != merged_df['Rolu_new']) |
-                        (merged_df['Aktivdir_orig'] != merged_df['Aktivdir_new']) |
-                        (merged_df['Rəhbəri_orig'] != merged_df['Rəhbəri_new']) |
-                        (merged_df['Şöbə_orig'] != merged_df['Şöbə_new'])
-                    ]
-                    
-                    if not changed_rows.empty:
-                        updated_count = 0
-                        for index, row in changed_rows.iterrows():
-                            # İstifadəçi ID-sini əldə edirik
-                            user_id = row['ID']
-                            
-                            # Manager ID-ni tapırıq
-                            manager_name = row['Rəhbəri_new']
-                            manager_id = None
-                            for user in all_users:
-                                if user.get_full_name() == manager_name:
-                                    manager_id = user.id
-                                    break
-                            
-                            # Yeniləmə məlumatlarını yığırıq
-                            update_data = {
-                                "username": row['İstifadəçi Adı_new'],
-                                "role": row['Rolu_new'],
-                                "is_active": row['Aktivdir_new'],
-                                "manager_id": manager_id if manager_id else None,
-                                "full_name": row['Tam Adı_new'],
-                                "position": row['Vəzifəsi_new'],
-                                "department": row['Şöbə_new'] if row['Şöbə_new'] else None
-                            }
-                            
-                            # İstifadəçini yeniləyirik
-                            try:
-                                UserService.update_user_profile(user_id, update_data)
-                                updated_count += 1
-                            except Exception as e:
-                                st.error(f"İstifadəçi ID {user_id} yenilənərkən xəta baş verdi: {str(e)}")
-                        
-                        if updated_count > 0:
-                            st.success(f"{updated_count} istifadəçinin məlumatları uğurla yeniləndi!")
-                            # Session state-i yeniləyirik
-                            del st.session_state['original_users_df']
-                            st.rerun()
-                    else:
-                        st.warning("Heç bir dəyişiklik edilməyib.")
-                except Exception as e:
-                    st.error(f"İstifadəçiləri yeniləyərkən xəta baş verdi: {str(e)}")
+
+            first_row = (len(users_cursors) - 1) * users_page_size + 1
+            st.caption(f"Göstərilir: {first_row}–{first_row + len(users_data) - 1} / {users_page['total']}")
+
+            col_prev, col_next, col_save = st.columns([1, 1, 2])
+            with col_prev:
+                if st.button("← Əvvəlki", disabled=len(users_cursors) == 1, key="users_prev"):
+                    users_cursors.pop()
+                    st.rerun()
+            with col_next:
+                if st.button("Növbəti →", disabled=users_page["next_cursor"] is None, key="users_next"):
+                    users_cursors.append(users_page["next_cursor"])
+                    st.rerun()
+            with col_save:
+                save_users = st.button("İstifadəçiləri Yadda Saxla")
+
+            if save_users:
+                # Redaktorun yalnız dəyişdirilmiş xanalarından fərq (diff) yığırıq
+                edited_rows = st.session_state.get(editor_key, {}).get("edited_rows", {})
+                changes = {}
+                for row_index, edited_cells in edited_rows.items():
+                    original = df_users.iloc[int(row_index)]
+                    fields = {}
+                    for column, value in edited_cells.items():
+                        if column not in editable_columns or value == original[column]:
+                            continue
+                        if column == "Rəhbəri":
+                            value = manager_label_to_id.get(value)
+                        fields[editable_columns[column]] = value
+                    if fields:
+                        changes[int(original["ID"])] = fields
+
+                if not changes:
+                    st.warning("Heç bir dəyişiklik edilməyib.")
+                else:
+                    try:
+                        updated_count = UserService.bulk_update_users(changes)
+                        st.success(f"{updated_count} istifadəçinin məlumatları uğurla yeniləndi!")
+                        del st.session_state[editor_key]
+                        st.rerun()
+                    except ValueError as e:
+                        st.error(str(e))
+                    except Exception as e:
+                        st.error(f"İstifadəçiləri yeniləyərkən xəta baş verdi: {str(e)}")
     except Exception as e:
         st.error(f"İstifadəçilərlə işləyərkən xəta baş verdi: {e}")
 
 with tab2:
     try:
-        with get_db() as session:
-            total_weight_query = session.query(func.sum(Question.weight)).filter(Question.is_active == True)
-            current_total_weight = total_weight_query.scalar() or 0.0
-
-            st.warning(f"Diqqət: Aktiv sualların çəkilərinin cəmi 1.0 (100%) olmalıdır. Hazırkı cəm: {current_total_weight:.2f}")
-            if abs(current_total_weight - 1.0) > 0.001:
-                st.error("Çəkilərin cəmi 1.0 deyil! Zəhmət olmasa, sualları redaktə edərək cəmi 1.0-a bərabərləşdirin.")
+        current_total_weight = QuestionService.get_active_weight_total()
+        st.warning(f"Diqqət: Aktiv sualların çəkilərinin cəmi 1.0 (100%) olmalıdır. Hazırkı cəm: {current_total_weight:.2f}")
+        if abs(current_total_weight - 1.0) > 0.001:
+            st.error("Çəkilərin cəmi 1.0 deyil! Zəhmət olmasa, sualları redaktə edərək cəmi 1.0-a bərabərləşdirin.")
 
         with st.expander("➕ Yeni Sual Yarat"):
             with st.form("new_question_form", clear_on_submit=True):
@@ -190,83 +209,62 @@ with tab2:
                 submitted_question = st.form_submit_button("Yeni Sual Yarat")
                 if submitted_question:
                     if text and weight > 0:
-                        with get_db() as session:
-                            new_question = Question(text=text, category=category, weight=weight, is_active=True)
-                            session.add(new_question)
-                            session.commit()
+                        try:
+                            QuestionService.create_question(text=text, category=category, weight=weight)
                             st.success(f"Yeni sual uğurla yaradıldı!")
                             st.rerun()
+                        except ValueError as e:
+                            st.error(str(e))
                     else:
                         st.warning("Zəhmət olmasa, bütün xanaları doldurun.")
 
         st.subheader("Mövcud Suallar")
-        with get_db() as session:
-            questions = session.query(Question).order_by(Question.id).all()
-            if questions:
-                df_questions = pd.DataFrame(
-                    [{'ID': q.id, 'Sual': q.text, 'Kateqoriya': q.category, 'Çəkisi': q.weight, 'Aktivdir': q.is_active} for q in questions]
-                )
-                if 'original_questions_df' not in st.session_state:
-                    st.session_state['original_questions_df'] = df_questions.copy()
-                
-                edited_questions_df = st.data_editor(
-                    df_questions, use_container_width=True, hide_index=True, key="question_editor",
-                    column_config={
-                        "ID": st.column_config.NumberColumn(disabled=True),
-                        "Sual": st.column_config.TextColumn(width="large"),
-                        "Çəkisi": st.column_config.NumberColumn(format="%.2f", step=0.01),
-                        "Aktivdir": st.column_config.CheckboxColumn()
+        questions = QuestionService.get_all_questions()
+        if questions:
+            df_questions = pd.DataFrame(
+                [{'ID': q.id, 'Sual': q.text, 'Kateqoriya': q.category, 'Çəkisi': q.weight, 'Aktivdir': q.is_active} for q in questions]
+            )
+            # Redaktə edilə bilən sütunlar -> sualın sahələri
+            question_columns = {'Sual': 'text', 'Kateqoriya': 'category', 'Çəkisi': 'weight', 'Aktivdir': 'is_active'}
+            
+            # Redaktor açarı sualların versiyasına bağlıdır ki, yadda saxladıqdan sonra təmiz açılsın
+            question_editor_key = f"question_editor_{QuestionService.get_questions_version()}"
+            st.data_editor(
+                df_questions, use_container_width=True, hide_index=True, key=question_editor_key,
+                column_config={
+                    "ID": st.column_config.NumberColumn(disabled=True),
+                    "Sual": st.column_config.TextColumn(width="large"),
+                    "Çəkisi": st.column_config.NumberColumn(format="%.2f", step=0.01),
+                    "Aktivdir": st.column_config.CheckboxColumn()
+                }
+            )
+
+            if st.button("Sualları Yadda Saxla"):
+                # Redaktorun yalnız dəyişdirilmiş xanalarından fərq (diff) yığırıq
+                edited_rows = st.session_state.get(question_editor_key, {}).get("edited_rows", {})
+                changes = []
+                for row_index, edited_cells in edited_rows.items():
+                    original = df_questions.iloc[int(row_index)]
+                    fields = {
+                        question_columns[column]: value
+                        for column, value in edited_cells.items()
+                        if column in question_columns and value != original[column]
                     }
-                )
+                    if fields:
+                        changes.append({"id": int(original['ID']), **fields})
 
-                if st.button("Sualları Yadda Saxla"):
-                    new_total_weight = edited_questions_df[edited_questions_df['Aktivdir'] == True]['Çəkisi'].sum()
-                    if abs(new_total_weight - 1.0) > 0.001:
-                        st.error(f"Yadda saxlamaq mümkün deyil! Aktiv sualların yeni cəmi {new_total_weight:.2f} olur. Cəm 1.0 olmalıdır.")
-                    else:
-                        try:
-                            # Orijinal DataFrame-i əldə edirik
-                            original_questions_df = st.session_state.original_questions_df
-                            
-                            # Dəyişdirilmiş sətirləri müqayisə edirik
-                            # ID-lərə görə birləşdiririk
-                            merged_df = pd.merge(original_questions_df, edited_questions_df, on='ID', suffixes=('_orig', '_new'))
-                            
-                            # Dəyişdirilmiş sütunları müqayisə edirik
-                            changed_rows = merged_df[
-                                (merged_df['Sual_orig'] != merged_df['Sual_new']) |
-                                (merged_df['Kateqoriya_orig'] != merged_df['Kateqoriya_new']) |
-                                (merged_df['Çəkisi_orig'] != merged_df['Çəkisi_new']) |
-                                (merged_df['Aktivdir_orig'] != merged_df['Aktivdir_new'])
-                            ]
-                            
-                            if not changed_rows.empty:
-                                updated_count = 0
-                                for index, row in changed_rows.iterrows():
-                                    # Sual ID-sini əldə edirik
-                                    question_id = row['ID']
-                                    
-                                    # Sualı yeniləyirik
-                                    question = session.query(Question).filter(Question.id == question_id).first()
-                                    if question:
-                                        question.text = row['Sual_new']
-                                        question.category = row['Kateqoriya_new']
-                                        question.weight = row['Çəkisi_new']
-                                        question.is_active = row['Aktivdir_new']
-                                        session.commit()
-                                        updated_count += 1
-                                
-                                if updated_count > 0:
-                                    st.success(f"{updated_count} sualın məlumatları uğurla yeniləndi!")
-                                    # Session state-i yeniləyirik
-                                    del st.session_state['original_questions_df']
-                                    st.rerun()
-                                else:
-                                    st.warning("Heç bir dəyişiklik edilməyib.")
-                            else:
-                                st.warning("Heç bir dəyişiklik edilməyib.")
-                        except Exception as e:
-                            st.error(f"Sualları yeniləyərkən xəta baş verdi: {str(e)}")
+                if not changes:
+                    st.warning("Heç bir dəyişiklik edilməyib.")
+                else:
+                    try:
+                        # Cəmin yoxlanılması yazı ilə eyni tranzaksiyada aparılır
+                        result = QuestionService.upsert_questions(changes)
+                        st.success(f"{result['updated']} sualın məlumatları uğurla yeniləndi!")
+                        st.rerun()
+                    except ValueError as e:
+                        st.error(str(e))
+                    except Exception as e:
+                        st.error(f"Sualları yeniləyərkən xəta baş verdi: {str(e)}")
                         
     except Exception as e:
-        st.error(f"Suallarla işləyərkən xəta baş verdi: {e}")
\ No newline at end of file
+        st.error(f"Suallarla işləyərkən xəta baş verdi: {e}")
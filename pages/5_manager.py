@@ -25,13 +25,14 @@ show_notifications()  # Show notifications in sidebar
 
 # Əgər istifadəçi managerdirsə, yalnız öz komanda üzvlərini görəcək
 # Əgər istifadəçi admindirsə, bütün istifadəçiləri görəcək
+user_directory = UserService.get_user_directory()
 if current_user.role == "manager":
-    subordinates = UserService.get_subordinates(current_user.id)
+    subordinates = user_directory.subordinates(current_user.id)
     subordinate_ids = [sub.id for sub in subordinates]
     subordinate_names = [sub.get_full_name() for sub in subordinates]
 else:
     # Admin üçün bütün aktiv istifadəçilər
-    all_users = UserService.get_all_active_users()
+    all_users = user_directory.active_users()
     # Admin özünü çıxardırıq
     all_users = [user for user in all_users if user.id != current_user.id]
     subordinate_ids = [user.id for user in all_users]
@@ -81,7 +82,8 @@ else:
                         st.info("Seçilmiş işçi üçün bu dövr üzrə hələ qiymətləndirmə yoxdur.")
                     else:
                         # Qiymətləndirmələrin yekun ballarını hesablayırıq
-                        scores = [KpiService.calculate_evaluation_score(e.id) for e in evaluations]
+                        evaluation_scores = KpiService.get_evaluation_scores([e.id for e in evaluations])
+                        scores = list(evaluation_scores.values())
                         avg_score = sum(scores) / len(scores) if scores else 0
                         
                         st.subheader(f"{selected_employee} - {selected_period.name} Nəticələri")
@@ -90,13 +92,12 @@ else:
                         # Qiymətləndirmə detalları
                         eval_details = []
                         for e in evaluations:
-                            evaluator = UserService.get_user_by_id(e.evaluator_user_id)
-                            score = KpiService.calculate_evaluation_score(e.id)
+                            score = evaluation_scores[e.id]
                             status = e.status.value
                             
                             eval_details.append({
                                 "ID": e.id,
-                                "Qiymətləndirən": evaluator.get_full_name() if evaluator else "Naməlum",
+                                "Qiymətləndirən": user_directory.full_name(e.evaluator_user_id),
                                 "Status": status,
                                 "Yekun Bal": round(score, 2)
                             })
@@ -112,7 +113,7 @@ else:
                             st.info("Aşağıdakı qiymətləndirmələri yekunlaşdırmaq mümkündür:")
                             
                             # Yekunlaşdırmaq üçün qiymətləndirmə seçimi
-                            eval_options = [f"{e.id} - {UserService.get_user_by_id(e.evaluator_user_id).get_full_name() if UserService.get_user_by_id(e.evaluator_user_id) else 'Naməlum'} ({e.status.value})" for e in finalizable_evals]
+                            eval_options = [f"{e.id} - {user_directory.full_name(e.evaluator_user_id)} ({e.status.value})" for e in finalizable_evals]
                             selected_evals_to_finalize = st.multiselect(
                                 "Yekunlaşdırmaq üçün qiymətləndirmələri seçin:",
                                 options=eval_options,
@@ -121,15 +122,11 @@ else:
                             
                             if st.button("Seçilmiş Qiymətləndirmələri Yekunlaşdır"):
                                 if selected_evals_to_finalize:
-                                    finalized_count = 0
-                                    for eval_option in selected_evals_to_finalize:
-                                        eval_id = int(eval_option.split(" - ")[0])
-                                        evaluation = session.query(Evaluation).filter(Evaluation.id == eval_id).first()
-                                        if evaluation and evaluation.status in [EvaluationStatus.SELF_EVAL_COMPLETED, EvaluationStatus.MANAGER_REVIEW_COMPLETED]:
-                                            evaluation.status = EvaluationStatus.FINALIZED
-                                            session.commit()
-                                            finalized_count += 1
-                                    
+                                    # Status servis vasitəsilə dəyişdirilir (ballar, səriştə cəmləri və bildirişlər)
+                                    finalized_count = KpiService.finalize_evaluations(
+                                        int(eval_option.split(" - ")[0]) for eval_option in selected_evals_to_finalize
+                                    )
+
                                     if finalized_count > 0:
                                         st.success(f"{finalized_count} qiymətləndirmə uğurla yekunlaşdırıldı!")
                                         st.rerun()
@@ -146,7 +143,7 @@ else:
                                 st.switch_page(f"pages/5_qiymetlendirme_formu.py?evaluation_id={evaluations[0].id}")
                             else:
                                 # Əks halda, qiymətləndirmə seçmək üçün dropdown göstər
-                                eval_options = [f"{e.id} - {UserService.get_user_by_id(e.evaluator_user_id).get_full_name() if UserService.get_user_by_id(e.evaluator_user_id) else 'Naməlum'} ({e.status.value})" for e in evaluations]
+                                eval_options = [f"{e.id} - {user_directory.full_name(e.evaluator_user_id)} ({e.status.value})" for e in evaluations]
                                 selected_eval_option = st.selectbox("Qiymətləndirmə seçin:", options=eval_options)
                                 if selected_eval_option:
                                     eval_id = int(selected_eval_option.split(" - ")[0])
@@ -175,12 +172,11 @@ else:
                         ).all()
                         
                         if evaluations:
-                            scores = [KpiService.calculate_evaluation_score(e.id) for e in evaluations]
+                            scores = list(KpiService.get_evaluation_scores([e.id for e in evaluations]).values())
                             avg_score = sum(scores) / len(scores) if scores else 0
                             
-                            user = UserService.get_user_by_id(user_id)
                             performance_data.append({
-                                "İşçi": user.get_full_name() if user else "Naməlum",
+                                "İşçi": user_directory.full_name(user_id),
                                 "Orta Yekun Bal": round(avg_score, 2)
                             })
                 
@@ -273,13 +269,11 @@ else:
                 st.markdown("### Gözləyən Qiymətləndirmələr")
                 pending_eval_details = []
                 for e in pending_evaluations:
-                    evaluated_user = UserService.get_user_by_id(e.evaluated_user_id)
-                    evaluator = UserService.get_user_by_id(e.evaluator_user_id)
                     status = e.status.value
                     
                     pending_eval_details.append({
                         "ID": e.id,
-                        "Qiymətləndirilən": evaluated_user.get_full_name() if evaluated_user else "Naməlum",
+                        "Qiymətləndirilən": user_directory.full_name(e.evaluated_user_id),
                         "Dövr": e.period.name,
                         "Status": status
                     })
@@ -311,16 +305,15 @@ else:
             if self_eval_completed_evaluations:
                 st.markdown("### Rəhbər Rəyi Gözləyən Qiymətləndirmələr")
                 eval_details = []
+                evaluation_scores = KpiService.get_evaluation_scores([e.id for e in self_eval_completed_evaluations])
                 for e in self_eval_completed_evaluations:
-                    evaluated_user = UserService.get_user_by_id(e.evaluated_user_id)
-                    evaluator = UserService.get_user_by_id(e.evaluator_user_id)
-                    score = KpiService.calculate_evaluation_score(e.id)
+                    score = evaluation_scores[e.id]
                     status = e.status.value
                     
                     eval_details.append({
                         "ID": e.id,
-                        "Qiymətləndirilən": evaluated_user.get_full_name() if evaluated_user else "Naməlum",
-                        "Qiymətləndirən": evaluator.get_full_name() if evaluator else "Naməlum",
+                        "Qiymətləndirilən": user_directory.full_name(e.evaluated_user_id),
+                        "Qiymətləndirən": user_directory.full_name(e.evaluator_user_id),
                         "Dövr": e.period.name,
                         "Status": status,
                         "Yekun Bal": round(score, 2)
@@ -352,15 +345,14 @@ else:
             if finalized_evaluations:
                 st.markdown("### Yekunlaşmış Qiymətləndirmələr")
                 finalized_eval_details = []
+                evaluation_scores = KpiService.get_evaluation_scores([e.id for e in finalized_evaluations])
                 for e in finalized_evaluations:
-                    evaluated_user = UserService.get_user_by_id(e.evaluated_user_id)
-                    evaluator = UserService.get_user_by_id(e.evaluator_user_id)
-                    score = KpiService.calculate_evaluation_score(e.id)
+                    score = evaluation_scores[e.id]
                     status = e.status.value
                     
                     finalized_eval_details.append({
                         "ID": e.id,
-                        "Qiymətləndirilən": evaluated_user.get_full_name() if evaluated_user else "Naməlum",
+                        "Qiymətləndirilən": user_directory.full_name(e.evaluated_user_id),
                         "Dövr": e.period.name,
                         "Status": status,
                         "Yekun Bal": round(score, 2)
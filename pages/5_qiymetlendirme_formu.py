@@ -2,7 +2,7 @@
 
 import streamlit as st
 from database import get_db
-from models.kpi import Evaluation, Question, Answer, EvaluationStatus
+from models.kpi import Evaluation, Answer, EvaluationStatus
 from models.user import User
 from services.kpi_service import KpiService
 
@@ -40,7 +40,7 @@ with get_db() as session:
             Answer.author_role == 'employee'
         ).all()
         
-        questions = session.query(Question).filter(Question.is_active == True).all()
+        questions = KpiService.get_active_questions()
         question_dict = {q.id: q for q in questions}
         
         for i, answer in enumerate(employee_answers, 1):
@@ -91,7 +91,7 @@ with get_db() as session:
             Answer.author_role == 'employee'
         ).all()
         
-        questions = session.query(Question).filter(Question.is_active == True).all()
+        questions = KpiService.get_active_questions()
         question_dict = {q.id: q for q in questions}
         
         for i, answer in enumerate(employee_answers, 1):
@@ -143,7 +143,7 @@ with get_db() as session:
         st.markdown("---")
         
         with st.form("employee_evaluation_form"):
-            questions = session.query(Question).filter(Question.is_active == True).all()
+            questions = KpiService.get_active_questions()
             employee_answers_data = {}
 
             for i, question in enumerate(questions, 1):
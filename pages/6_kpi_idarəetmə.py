@@ -2,12 +2,15 @@
 
 import streamlit as st
 import datetime
-from sqlalchemy import func
 from database import get_db
 from models.user import User
-from models.kpi import EvaluationPeriod, Question, Evaluation, EvaluationStatus
-from utils.utils import check_login, show_notifications
-from services.notification_service import NotificationService
+from models.kpi import EvaluationPeriod
+from utils.utils import check_login, show_notifications, show_job_progress
+from models.job import JOB_SUCCEEDED
+from services.cache import invalidate
+from services.job_service import JobService, JOB_LAUNCH_PERIOD
+from services.question_service import QuestionService
+from services.sidebar_service import SidebarService
 
 st.set_page_config(layout="wide", page_title="KPI İdarəetmə")
 
@@ -37,36 +40,33 @@ with tab1:
             
             submitted = st.form_submit_button("Dövrü Yarat və Tapşırıqları Təyin Et")
             if submitted and period_name:
-                try:
-                    with get_db() as session:
-                        new_period = EvaluationPeriod(name=period_name, start_date=start_date, end_date=end_date)
-                        session.add(new_period)
-                        session.flush() # ID-ni almaq üçün
+                # Tapşırıqların yaradılması fon işində icra olunur, səhifə yalnız gedişatı izləyir
+                st.session_state["launch_period_job"] = {
+                    "job_id": JobService.submit(
+                        JOB_LAUNCH_PERIOD,
+                        {"name": period_name, "start_date": start_date.isoformat(), "end_date": end_date.isoformat()},
+                        created_by=current_user.id
+                    ),
+                    "name": period_name
+                }
 
-                        users = session.query(User).filter(User.is_active == True).all()
-                        for user in users:
-                            # Hər istifadəçi üçün özünüqiymətləndirmə tapşırığı
-                            self_evaluation = Evaluation(
-                                period_id=new_period.id,
-                                evaluated_user_id=user.id,
-                                evaluator_user_id=user.id,
-                                status=EvaluationStatus.PENDING
-                            )
-                            session.add(self_evaluation)
-                        
-                        session.commit()
-                        
-                        # İstifadəçilərə bildiriş göndəririk
-                        for user in users:
-                            NotificationService.create_notification(
-                                user_id=user.id,
-                                message=f"Yeni qiymətləndirmə dövrü '{period_name}' yaradıldı. Qiymətləndirmə formunu doldurun."
-                            )
-                            
-                        st.success(f"'{period_name}' dövrü və {len(users)} özünüqiymətləndirmə tapşırığı yaradıldı!")
-                        st.rerun()
-                except Exception as e:
-                    st.error(f"Dövr yaratma zamanı xəta baş verdi: {str(e)}")
+    launch_job = st.session_state.get("launch_period_job")
+    if launch_job:
+        job = show_job_progress(launch_job["job_id"])
+        if job and job.status == JOB_SUCCEEDED:
+            # İşçi prosesdəki keş yeniləməsi bu prosesə çatmır
+            invalidate("evaluation_periods")
+            SidebarService.invalidate_sidebar_state()
+            result = JobService.result(job.id)
+            st.success(
+                f"'{launch_job['name']}' dövrü üçün {result['self_evaluations']} özünüqiymətləndirmə və "
+                f"{result['manager_evaluations']} rəhbər qiymətləndirməsi tapşırığı yaradıldı!"
+            )
+        elif job and job.is_finished:
+            st.caption("Dövr yaradılmadı. Məlumatları yoxlayıb yenidən cəhd edin.")
+        # Avtomatik izləmə dayandırılmış bitməmiş iş səhifədə qalır
+        if job is None or job.is_finished:
+            del st.session_state["launch_period_job"]
 
     st.markdown("---")
     st.subheader("📊 Mövcud Dövrlər")
@@ -86,14 +86,11 @@ with tab1:
 with tab2:
     st.header("Sualların İdarə Edilməsi")
     
-    # Aktiv sualların çəkilərinin cəmini göstər
-    with get_db() as session:
-        total_weight_query = session.query(func.sum(Question.weight)).filter(Question.is_active == True)
-        current_total_weight = total_weight_query.scalar() or 0.0
-
-        st.warning(f"Diqqət: Aktiv sualların çəkilərinin cəmi 1.0 (100%) olmalıdır. Hazırkı cəm: {current_total_weight:.2f}")
-        if abs(current_total_weight - 1.0) > 0.001:
-            st.error("Çəkilərin cəmi 1.0 deyil! Zəhmət olmasa, sualları redaktə edərək cəmi 1.0-a bərabərləşdirin.")
+    # Aktiv sualların çəkilərinin cəmini göstər (bir dəfə, keşdən)
+    current_total_weight = QuestionService.get_active_weight_total()
+    st.warning(f"Diqqət: Aktiv sualların çəkilərinin cəmi 1.0 (100%) olmalıdır. Hazırkı cəm: {current_total_weight:.2f}")
+    if abs(current_total_weight - 1.0) > 0.001:
+        st.error("Çəkilərin cəmi 1.0 deyil! Zəhmət olmasa, sualları redaktə edərək cəmi 1.0-a bərabərləşdirin.")
 
     with st.expander("➕ Yeni Sual Əlavə Et", expanded=False):
         with st.form("yeni_sual_form", clear_on_submit=True):
@@ -103,31 +100,23 @@ with tab2:
             q_submitted = st.form_submit_button("Əlavə et")
             if q_submitted and q_text:
                 try:
-                    with get_db() as session:
-                        # Yeni sual əlavə etməzdən əvvəl çəki cəmini yoxlayırıq
-                        total_weight_query = session.query(func.sum(Question.weight)).filter(Question.is_active == True)
-                        current_total_weight = total_weight_query.scalar() or 0.0
-                        
-                        if current_total_weight + q_weight > 1.0:
-                            st.error(f"Yeni sual əlavə etmək mümkün deyil! Cəm {current_total_weight + q_weight:.2f} olacaq, lakin maksimum 1.0 ola bilər.")
-                        else:
-                            new_question = Question(text=q_text, category=q_category, weight=q_weight)
-                            session.add(new_question)
-                            session.commit()
-                            st.success("Yeni sual əlavə edildi!")
-                            st.rerun()
+                    # Çəki cəminin yoxlanılması yazı ilə eyni tranzaksiyada aparılır
+                    QuestionService.create_question(text=q_text, category=q_category, weight=q_weight)
+                    st.success("Yeni sual əlavə edildi!")
+                    st.rerun()
+                except ValueError as e:
+                    st.error(str(e))
                 except Exception as e:
                     st.error(f"Sual əlavə edərkən xəta baş verdi: {str(e)}")
 
     st.markdown("---")
     st.subheader("❓ Mövcud Suallar")
     try:
-        with get_db() as session:
-            questions = session.query(Question).all()
-            st.dataframe(
-                [{"ID": q.id, "Kateqoriya": q.category, "Sual": q.text, "Çəki": q.weight, "Aktiv": q.is_active} for q in questions],
-                use_container_width=True
-            )
+        questions = QuestionService.get_all_questions()
+        st.dataframe(
+            [{"ID": q.id, "Kateqoriya": q.category, "Sual": q.text, "Çəki": q.weight, "Aktiv": q.is_active} for q in questions],
+            use_container_width=True
+        )
     except Exception as e:
         st.error(f"Sualları yükləyərkən xəta baş verdi: {str(e)}")
 
@@ -3,12 +3,16 @@
 import streamlit as st
 st.set_page_config(layout="wide")
 
+import os
 import pandas as pd
 import altair as alt
 from database import get_db
 from services.kpi_service import KpiService
+from services.snapshot_service import AnalyticsSnapshotService
 from services.user_service import UserService
-from utils.utils import check_login, logout, show_notifications
+from models.job import JOB_SUCCEEDED
+from services.job_service import JobService, JOB_EXPORT_PERIOD_REPORT
+from utils.utils import check_login, logout, show_notifications, show_job_progress
 
 current_user = check_login()
 if current_user.role != "admin":
@@ -61,9 +65,11 @@ with tab1:
 
     st.divider()
 
-    # Performans məlumatlarını əldə edirik
+    # Performans məlumatlarını analitika snapshot-undan əldə edirik (yoxdursa, canlı sorğu)
     department_filter = None if selected_department == "Bütün şöbələr" else selected_department
-    performance_data = KpiService.get_user_performance_data(period_id, department=department_filter)
+    performance_data = AnalyticsSnapshotService.get_user_performance_data(period_id, department=department_filter)
+    if performance_data is None:
+        performance_data = KpiService.get_user_performance_data(period_id, department=department_filter)
 
     if performance_data:
         df_performance = pd.DataFrame(performance_data)
@@ -185,7 +191,9 @@ with tab1:
     selected_user_id = user_id_map.get(selected_user_name)
 
     if selected_user_id:
-        trend_data = KpiService.get_user_performance_trend(selected_user_id)
+        trend_data = AnalyticsSnapshotService.get_user_performance_trend(selected_user_id)
+        if trend_data is None:
+            trend_data = KpiService.get_user_performance_trend(selected_user_id)
         
         if trend_data:
             df_trend = pd.DataFrame(trend_data)
@@ -225,6 +233,43 @@ with tab1:
     else:
         st.info("Performans trend analizi üçün məlumat mövcud deyil.")
 
+    # Dövr hesabatının tam ixracı (cavab səviyyəsində təfərrüatla)
+    st.divider()
+    st.header("📥 Dövr Hesabatının İxracı")
+    st.caption("Hesabat fon işində hazırlanır: sətirlər verilənlər bazasından hissə-hissə oxunaraq fayla yazılır.")
+    
+    export_col1, export_col2 = st.columns([1, 3])
+    with export_col1:
+        export_format = st.radio("Format:", options=["xlsx", "csv"], horizontal=True, key="period_export_format")
+    with export_col2:
+        if st.button("Hesabatı hazırla", key="period_export_button"):
+            st.session_state["period_export_job_id"] = JobService.submit(
+                JOB_EXPORT_PERIOD_REPORT,
+                {"period_id": period_id, "format": export_format},
+                created_by=current_user.id
+            )
+        
+        export_job_id = st.session_state.get("period_export_job_id")
+        if export_job_id:
+            export_job = show_job_progress(export_job_id)
+            if export_job and export_job.status == JOB_SUCCEEDED:
+                export_result = JobService.result(export_job_id)
+                st.caption(f"{export_result['rows']} sətir ixrac edildi.")
+                if not os.path.exists(export_result["path"]):
+                    # Köhnə fayllar JOB_OUTPUT_RETENTION_HOURS-dan sonra silinir
+                    st.info("Hesabat faylının saxlanma müddəti bitib. Hesabatı yenidən hazırlayın.")
+                    del st.session_state["period_export_job_id"]
+                else:
+                    with open(export_result["path"], "rb") as export_stream:
+                        st.download_button(
+                            label="📥 Faylı Yüklə",
+                            data=export_stream,
+                            file_name=f"{selected_period.name}.{export_result['format']}",
+                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                            if export_result["format"] == "xlsx" else "text/csv",
+                            key="period_export_download"
+                        )
+
 with tab2:
     st.title("Dövrlər Arası Müqayisə")
     st.divider()
@@ -249,28 +294,31 @@ with tab2:
     selected_periods = [p for p in available_periods if p.name in selected_period_names]
     period_ids = [p.id for p in selected_periods]
     
-    # Performans məlumatlarını əldə edirik
-    performance_comparison = KpiService.get_multiple_periods_performance_data(period_ids)
+    # Performans məlumatlarını əldə edirik (bütün dövrlər üçün tək sorğu)
+    comparison = KpiService.get_period_comparison(period_ids)
     
-    if performance_comparison:
-        # Məlumatları vizuallaşdırmaq üçün hazırlanır
-        comparison_data = []
-        for period_name, data in performance_comparison.items():
-            for item in data:
-                comparison_data.append({
-                    "Dövr": period_name,
-                    "Əməkdaş": item["full_name"],
-                    "Şöbə": item["department"],
-                    "Yekun Bal": item["total_score"]
-                })
-        
-        df_comparison = pd.DataFrame(comparison_data)
+    if not comparison["long"].empty:
+        df_comparison = comparison["long"].rename(columns={
+            "period_name": "Dövr",
+            "full_name": "Əməkdaş",
+            "department": "Şöbə",
+            "total_score": "Yekun Bal"
+        })
         
         # Hər bir işçinin müxtəlif dövrlərdəki nəticələri
         st.header("İşçilərin Dövrlər Üzrə Nəticələri")
-        pivot_df = df_comparison.pivot(index="Əməkdaş", columns="Dövr", values="Yekun Bal")
+        pivot_df = comparison["scores"].rename_axis(index="Əməkdaş", columns="Dövr")
         st.dataframe(pivot_df, use_container_width=True)
         
+        if len(pivot_df.columns) > 1:
+            col1, col2 = st.columns(2)
+            with col1:
+                st.subheader("Bal Dəyişikliyi")
+                st.dataframe(comparison["deltas"].iloc[:, 1:].rename_axis(index="Əməkdaş", columns="Dövr"), use_container_width=True)
+            with col2:
+                st.subheader("Sıralama Dəyişikliyi")
+                st.dataframe(comparison["rank_changes"].iloc[:, 1:].rename_axis(index="Əməkdaş", columns="Dövr"), use_container_width=True)
+        
         # Qrafik şəkildə müqayisə
         st.divider()
         st.header("Dövrlər Üzrə Ortalama Performans")
@@ -315,86 +363,143 @@ with tab3:
     
     # Competency service
     from services.competency_service import CompetencyService
-    db = next(get_db())
-    competency_service = CompetencyService(db)
-    
-    # Get all competencies
-    competencies = competency_service.get_all_competencies()
-    
-    if not competencies:
-        st.info("Hələ heç bir səriştə yaradılmayıb.")
-    else:
-        # Select competency for analysis
-        competency_options = {f"{c.name} ({c.category or 'Kateqoriyasız'})": c.id for c in competencies}
-        selected_competency_name = st.selectbox("Analiz etmək üçün səriştə seçin:", options=list(competency_options.keys()))
+    from services.competency_rollup_service import CompetencyRollupService
+    with get_db() as db:
+        competency_service = CompetencyService(db)
         
-        if selected_competency_name:
-            selected_competency_id = competency_options[selected_competency_name]
-            competency = competency_service.get_competency_by_id(selected_competency_id)
+        # Get all competencies
+        competencies = competency_service.get_all_competencies()
+        
+        if not competencies:
+            st.info("Hələ heç bir səriştə yaradılmayıb.")
+        else:
+            # Dövr seçimi (bütün dövrlər və ya bir dövr)
+            competency_period_options = {None: "Bütün dövrlər"}
+            competency_period_options.update({p.id: p.name for p in available_periods})
+            competency_period_id = st.selectbox(
+                "Dövr:", options=list(competency_period_options),
+                format_func=lambda x: competency_period_options[x], key="competency_period"
+            )
             
-            if competency:
-                st.subheader(f"Analiz: {competency.name}")
-                
-                # Get performance data for this competency
-                # This is a simplified example - in a real implementation, you would need to
-                # implement the actual performance calculation logic in the service
-                
-                # For demonstration, let's show associated questions
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.write("KPI Sualları:")
-                    if competency.kpi_questions:
-                        kpi_questions_df = pd.DataFrame([
-                            {"ID": q.id, "Sual": q.text[:100] + "..." if len(q.text) > 100 else q.text}
-                            for q in competency.kpi_questions
-                        ])
-                        st.dataframe(kpi_questions_df, use_container_width=True, hide_index=True)
-                    else:
-                        st.info("Bu səriştə ilə əlaqəli KPI sualı yoxdur.")
+            # Select competency for analysis
+            competency_options = {f"{c.name} ({c.category or 'Kateqoriyasız'})": c.id for c in competencies}
+            selected_competency_name = st.selectbox("Analiz etmək üçün səriştə seçin:", options=list(competency_options.keys()))
+            
+            if selected_competency_name:
+                selected_competency_id = competency_options[selected_competency_name]
+                competency = competency_service.get_competency_by_id(selected_competency_id)
                 
-                with col2:
-                    st.write("360° Sualları:")
-                    if competency.degree360_questions:
-                        degree360_questions_df = pd.DataFrame([
-                            {"ID": q.id, "Sual": q.text[:100] + "..." if len(q.text) > 100 else q.text}
-                            for q in competency.degree360_questions
-                        ])
-                        st.dataframe(degree360_questions_df, use_container_width=True, hide_index=True)
+                if competency:
+                    st.subheader(f"Analiz: {competency.name}")
+                    
+                    col1, col2 = st.columns(2)
+                    
+                    with col1:
+                        st.write("KPI Sualları:")
+                        if competency.kpi_questions:
+                            kpi_questions_df = pd.DataFrame([
+                                {"ID": q.id, "Sual": q.text[:100] + "..." if len(q.text) > 100 else q.text}
+                                for q in competency.kpi_questions
+                            ])
+                            st.dataframe(kpi_questions_df, use_container_width=True, hide_index=True)
+                        else:
+                            st.info("Bu səriştə ilə əlaqəli KPI sualı yoxdur.")
+                    
+                    with col2:
+                        st.write("360° Sualları:")
+                        if competency.degree360_questions:
+                            degree360_questions_df = pd.DataFrame([
+                                {"ID": q.id, "Sual": q.text[:100] + "..." if len(q.text) > 100 else q.text}
+                                for q in competency.degree360_questions
+                            ])
+                            st.dataframe(degree360_questions_df, use_container_width=True, hide_index=True)
+                        else:
+                            st.info("Bu səriştə ilə əlaqəli 360° sualı yoxdur.")
+                    
+                    # Şöbələr üzrə performans (KPI və 360° cavablarından)
+                    st.divider()
+                    st.subheader("Şöbələr üzrə Performans")
+                    
+                    dept_scores = competency_service.get_department_competency_scores(
+                        selected_competency_id, period_id=competency_period_id
+                    )
+                    
+                    if dept_scores.empty:
+                        st.info("Bu səriştə üzrə yekunlaşdırılmış KPI və ya 360° cavabı yoxdur.")
                     else:
-                        st.info("Bu səriştə ilə əlaqəli 360° sualı yoxdur.")
-                
-                # Show performance by department (mock data for demonstration)
-                st.divider()
-                st.subheader("Şöbələr üzrə Performans")
-                
-                # Mock data for demonstration
-                import random
-                dept_performance_data = []
-                departments = ["İnsan Resursları", "Maliyyə", "Marketinq", "İT", "Satış"]
-                
-                for dept in departments:
-                    dept_performance_data.append({
-                        "Şöbə": dept,
-                        "Orta Bal": round(random.uniform(3.0, 5.0), 2),
-                        "İşçi Sayı": random.randint(5, 20)
-                    })
-                
-                dept_df = pd.DataFrame(dept_performance_data)
-                dept_df = dept_df.sort_values("Orta Bal", ascending=False)
-                
-                st.dataframe(dept_df, use_container_width=True, hide_index=True)
+                        dept_df = dept_scores.rename(columns={
+                            "department": "Şöbə",
+                            "average_score": "Orta Bal",
+                            "employee_count": "İşçi Sayı"
+                        })
+                        dept_df["Orta Bal"] = dept_df["Orta Bal"].round(2)
+                        
+                        st.dataframe(dept_df, use_container_width=True, hide_index=True)
+                        
+                        # Chart for department performance
+                        chart = alt.Chart(dept_df).mark_bar().encode(
+                            x=alt.X('Orta Bal:Q', scale=alt.Scale(domain=[0, 5])),
+                            y=alt.Y('Şöbə:N', sort='-x'),
+                            color=alt.Color('Orta Bal:Q', scale=alt.Scale(scheme='blues')),
+                            tooltip=['Şöbə', 'Orta Bal', 'İşçi Sayı']
+                        ).properties(
+                            title=f"'{competency.name}' Səriştəsi üzrə Şöbələr Arası Müqayisə",
+                            height=300
+                        )
+                        
+                        st.altair_chart(chart, use_container_width=True)
+            
+            # Şöbə × səriştə xəritəsi (dövr üzrə yığılmış cəmlərdən)
+            st.divider()
+            st.subheader("Təşkilat üzrə Səriştə Xəritəsi")
+            
+            if competency_period_id is None:
+                st.info("Şöbə × səriştə xəritəsi üçün dövr seçin.")
+            else:
+                org_heatmap = CompetencyRollupService.get_competency_heatmap(competency_period_id).round(2)
+                if org_heatmap.empty:
+                    st.info("Bu dövr üçün səriştə cəmləri yoxdur.")
+                else:
+                    org_heatmap.index.name = "Şöbə"
+                    org_heatmap_df = org_heatmap.reset_index().melt(
+                        id_vars="Şöbə", var_name="Səriştə", value_name="Orta Bal"
+                    ).dropna(subset=["Orta Bal"])
+                    org_chart = alt.Chart(org_heatmap_df).mark_rect().encode(
+                        x=alt.X('Səriştə:N'),
+                        y=alt.Y('Şöbə:N'),
+                        color=alt.Color('Orta Bal:Q', scale=alt.Scale(scheme='blues', domain=[0, 5])),
+                        tooltip=['Şöbə', 'Səriştə', 'Orta Bal']
+                    ).properties(height=max(200, 30 * len(org_heatmap)))
+                    
+                    st.altair_chart(org_chart, use_container_width=True)
+                    st.dataframe(org_heatmap, use_container_width=True)
+            
+            # İşçi × səriştə matrisi
+            st.divider()
+            st.subheader("İşçilər üzrə Səriştə Matrisi")
+            
+            matrix = competency_service.get_competency_score_matrix(period_id=competency_period_id)
+            if matrix.empty:
+                st.info("Matris üçün məlumat yoxdur.")
+            else:
+                user_directory = UserService.get_user_directory()
+                competency_names = {c.id: c.name for c in competencies}
+                matrix_display = matrix.rename(
+                    index=lambda user_id: user_directory.full_name(user_id),
+                    columns=lambda competency_id: competency_names.get(competency_id, str(competency_id))
+                ).round(2)
+                matrix_display.index.name = "Əməkdaş"
+                matrix_display.columns.name = None
                 
-                # Chart for department performance
-                import altair as alt
-                chart = alt.Chart(dept_df).mark_bar().encode(
-                    x=alt.X('Orta Bal:Q', scale=alt.Scale(domain=[0, 5])),
-                    y=alt.Y('Şöbə:N', sort='-x'),
-                    color=alt.Color('Orta Bal:Q', scale=alt.Scale(scheme='blues')),
-                    tooltip=['Şöbə', 'Orta Bal']
-                ).properties(
-                    title=f"'{competency.name}' Səriştəsi üzrə Şöbələr Arası Müqayisə",
-                    height=300
-                )
+                heatmap_df = matrix_display.reset_index().melt(
+                    id_vars="Əməkdaş", var_name="Səriştə", value_name="Bal"
+                ).dropna(subset=["Bal"])
+                heatmap = alt.Chart(heatmap_df).mark_rect().encode(
+                    x=alt.X('Səriştə:N'),
+                    y=alt.Y('Əməkdaş:N'),
+                    color=alt.Color('Bal:Q', scale=alt.Scale(scheme='blues', domain=[0, 5])),
+                    tooltip=['Əməkdaş', 'Səriştə', 'Bal']
+                ).properties(height=max(200, 20 * len(matrix_display)))
                 
-                st.altair_chart(chart, use_container_width=True)
\ No newline at end of file
+                st.altair_chart(heatmap, use_container_width=True)
+                st.dataframe(matrix_display, use_container_width=True)
@@ -20,4 +20,41 @@ st.subheader("Test Əməliyyatları")
 if st.button("Cookie-ni Düzgün Üsulla Sil"):
     controller.set("user_id", None, max_age=0)
     st.success("'controller.set(\"user_id\", None, max_age=0)' əmri icra edildi!")
-    st.rerun()
\ No newline at end of file
+    st.rerun()
+st.divider()
+
+st.subheader("Verilənlər Bazası Bağlantı Hovuzu")
+from database import get_pool_stats, pool_stats
+
+stats = get_pool_stats()
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("İstifadədə olan bağlantılar", f"{stats['checked_out']} / {stats['pool_size'] + stats['max_overflow']}")
+col2.metric("Orta gözləmə (ms)", f"{stats['avg_wait_ms']:.1f}")
+col3.metric("Overflow hadisələri", stats["overflow_events"])
+col4.metric("Timeout-lar", stats["timeouts"])
+st.json(stats)
+
+if st.button("Statistikanı Sıfırla"):
+    pool_stats.reset()
+    st.rerun()
+st.divider()
+
+st.subheader("Servis Keşi")
+from services.cache import cache_stats, invalidate_all, reset_cache_stats
+
+cache_data = cache_stats()
+if cache_data:
+    st.dataframe(
+        [{"Ad fəzası": namespace, **counters} for namespace, counters in cache_data.items()],
+        use_container_width=True
+    )
+else:
+    st.info("Hələ heç bir keşlənmiş sorğu yoxdur.")
+
+col1, col2 = st.columns(2)
+if col1.button("Keşi Təmizlə"):
+    invalidate_all()
+    st.rerun()
+if col2.button("Keş Sayğaclarını Sıfırla"):
+    reset_cache_stats()
+    st.rerun()
@@ -0,0 +1,64 @@
+"""Write the Parquet analytics snapshot read by the dashboard pages.
+
+Only periods whose data changed since their last snapshot (e.g. after a wave of
+finalized evaluations) are rewritten, so running this often is cheap.
+
+Usage:
+    python scripts/build_analytics_snapshot.py                  # refresh stale periods once (e.g. from cron)
+    python scripts/build_analytics_snapshot.py --loop           # repeat every ANALYTICS_SNAPSHOT_INTERVAL_MINUTES minutes
+    python scripts/build_analytics_snapshot.py --period-id 3    # rewrite one period unconditionally
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add the project root to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from config import settings
+from services.snapshot_service import AnalyticsSnapshotService
+
+
+def run_once(period_id=None):
+    """Build the snapshot a single time and print the row counts per period."""
+    if period_id is not None:
+        built = {period_id: AnalyticsSnapshotService.build_period_snapshot(period_id)}
+    else:
+        built = AnalyticsSnapshotService.build_stale_snapshots()
+
+    if not built:
+        print("Analytics snapshot is up to date.")
+    for built_period_id, rows in built.items():
+        counts = ", ".join(f"{dataset}: {count}" for dataset, count in rows.items())
+        print(f"Period {built_period_id}: {counts}")
+    return built
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write the Parquet analytics snapshot for the dashboards.")
+    parser.add_argument("--period-id", type=int, default=None,
+                        help="Rewrite this period even if it is not stale")
+    parser.add_argument("--loop", action="store_true",
+                        help="Keep running and refresh stale periods every --interval-minutes")
+    parser.add_argument("--interval-minutes", type=int, default=settings.ANALYTICS_SNAPSHOT_INTERVAL_MINUTES,
+                        help="Scheduler interval used with --loop")
+    args = parser.parse_args(argv)
+
+    if not args.loop:
+        run_once(args.period_id)
+        return
+
+    while True:
+        try:
+            run_once()
+        except Exception as e:
+            # A single failed run must not stop the scheduler
+            print(f"Error during snapshot run: {e}")
+        time.sleep(args.interval_minutes * 60)
+
+
+if __name__ == "__main__":
+    main()
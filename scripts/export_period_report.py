@@ -0,0 +1,41 @@
+"""Export a full evaluation period report without loading it into memory.
+
+Usage:
+    python scripts/export_period_report.py 3 --output period_3.xlsx
+    python scripts/export_period_report.py 3 --format csv --output period_3_answers.csv
+    python scripts/export_period_report.py 3 --chunk-size 5000
+"""
+
+import argparse
+import os
+import sys
+
+# Add the project root to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from config import settings
+from services.export_service import EXPORT_FORMATS, FORMAT_XLSX, ExportService
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream an evaluation period report to an Excel or CSV file.")
+    parser.add_argument("period_id", type=int, help="ID of the evaluation period")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default=FORMAT_XLSX,
+                        help="xlsx: scores and answers sheets; csv: answer-level detail only")
+    parser.add_argument("--output", help="Output file (default: period_<id>.<format>)")
+    parser.add_argument("--chunk-size", type=int, default=settings.EXPORT_CHUNK_SIZE,
+                        help="Rows fetched from the database per round trip")
+    args = parser.parse_args(argv)
+
+    output = args.output or f"period_{args.period_id}.{args.format}"
+    rows = ExportService.export_period_report(
+        args.period_id, output, fmt=args.format, chunk_size=args.chunk_size,
+        on_rows=lambda total: print(f"\r{total} rows written", end="", flush=True)
+    )
+    print(f"\rExported {rows} rows to {output}")
+    return rows
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Run queued background jobs in a pool of worker processes.
+
+Usage:
+    python scripts/job_worker.py                      # one process per CPU core, poll forever
+    python scripts/job_worker.py --processes 4
+    python scripts/job_worker.py --once               # drain the queue and exit (e.g. from cron)
+    python scripts/job_worker.py --inline --once      # run jobs in this process, no pool
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+# Add the project root to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from config import settings
+from database import engine
+from services.job_service import JobService
+
+
+# How often expired job output files are swept from JOB_OUTPUT_DIR
+OUTPUT_PURGE_INTERVAL_SECONDS = 300
+
+
+def _purge_outputs(last_purge):
+    """Delete expired job outputs at most once per OUTPUT_PURGE_INTERVAL_SECONDS."""
+    now = time.monotonic()
+    if last_purge is not None and now - last_purge < OUTPUT_PURGE_INTERVAL_SECONDS:
+        return last_purge
+    try:
+        removed = JobService.purge_expired_outputs()
+        if removed:
+            print(f"{removed} expired job output files removed")
+    except OSError as e:
+        print(f"Error while removing expired job outputs: {e}")
+    return now
+
+
+def _init_process():
+    """Drop pooled connections inherited from the parent; each worker opens its own."""
+    engine.dispose(close=False)
+
+
+def run_pool(processes, poll_seconds, once):
+    """Claim jobs while a worker slot is free and run them in the process pool."""
+    running = set()
+    last_purge = None
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_process) as pool:
+        while True:
+            last_purge = _purge_outputs(last_purge)
+            finished = {future for future in running if future.done()}
+            for future in finished:
+                try:
+                    job = future.result()
+                    if job:
+                        print(f"Job {job.id} ({job.kind}): {job.status}")
+                except Exception as e:
+                    # A crashed worker must not stop the loop; its job stops sending heartbeats
+                    # and is marked FAILED by the next claim after JOB_STALE_SECONDS
+                    print(f"Worker error: {e}")
+            running -= finished
+
+            claimed = False
+            while len(running) < processes:
+                job_id = JobService.claim_next_job()
+                if job_id is None:
+                    break
+                running.add(pool.submit(JobService.run_job, job_id))
+                claimed = True
+
+            if once and not running and not claimed:
+                return
+            if running:
+                wait(running, timeout=poll_seconds, return_when=FIRST_COMPLETED)
+            else:
+                time.sleep(poll_seconds)
+
+
+def run_inline(poll_seconds, once):
+    """Run jobs one by one in this process."""
+    last_purge = None
+    while True:
+        last_purge = _purge_outputs(last_purge)
+        count = JobService.run_pending_jobs()
+        if count:
+            print(f"{count} jobs finished")
+        if once:
+            return
+        time.sleep(poll_seconds)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run queued background jobs.")
+    parser.add_argument("--processes", type=int, default=settings.JOB_WORKER_PROCESSES,
+                        help="Number of worker processes (0: one per CPU core)")
+    parser.add_argument("--poll-seconds", type=float, default=settings.JOB_POLL_SECONDS,
+                        help="How often to check the queue when idle")
+    parser.add_argument("--once", action="store_true",
+                        help="Exit when the queue is empty instead of polling forever")
+    parser.add_argument("--inline", action="store_true",
+                        help="Run jobs in this process instead of a process pool")
+    args = parser.parse_args(argv)
+
+    if args.inline:
+        run_inline(args.poll_seconds, args.once)
+    else:
+        run_pool(args.processes or os.cpu_count() or 1, args.poll_seconds, args.once)
+
+
+if __name__ == "__main__":
+    main()
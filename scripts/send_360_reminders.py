@@ -0,0 +1,61 @@
+"""Send 360-degree reminder notifications once, or periodically as an in-process scheduler.
+
+Usage:
+    python scripts/send_360_reminders.py                 # run once (e.g. from cron)
+    python scripts/send_360_reminders.py --loop          # repeat every REMINDER_360_INTERVAL_MINUTES minutes
+    python scripts/send_360_reminders.py --days 5 --window-hours 12
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add the project root to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from config import settings
+from services.degree360_service import Degree360Service
+
+
+def run_once(days, window_hours):
+    """Run the reminder job a single time and print the counts."""
+    counts = Degree360Service.send_360_reminders(
+        days_before_end=days,
+        dedup_window_hours=window_hours
+    )
+    print(
+        f"360° reminders: {counts['created']} sent, "
+        f"{counts['skipped']} skipped (already reminded), {counts['candidates']} candidates"
+    )
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Send reminders to pending 360° participants.")
+    parser.add_argument("--days", type=int, default=settings.REMINDER_360_DAYS_BEFORE_END,
+                        help="Remind when a session ends within this many days")
+    parser.add_argument("--window-hours", type=int, default=settings.REMINDER_360_DEDUP_HOURS,
+                        help="Do not remind the same user about the same session again within this window")
+    parser.add_argument("--loop", action="store_true",
+                        help="Keep running and repeat the job every --interval-minutes")
+    parser.add_argument("--interval-minutes", type=int, default=settings.REMINDER_360_INTERVAL_MINUTES,
+                        help="Scheduler interval used with --loop")
+    args = parser.parse_args(argv)
+
+    if not args.loop:
+        run_once(args.days, args.window_hours)
+        return
+
+    while True:
+        try:
+            run_once(args.days, args.window_hours)
+        except Exception as e:
+            # A single failed run must not stop the scheduler
+            print(f"Error during reminder run: {e}")
+        time.sleep(args.interval_minutes * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# services/cache.py
+
+"""
+Servislərin oxuma API-ləri üçün proses daxili TTL keşi.
+
+Streamlit bütün istifadəçi sessiyalarını eyni prosesdə icra etdiyi üçün bu keş
+st.cache_data kimi bütün səhifələr və rerun-lar arasında paylaşılır, lakin
+ad fəzaları (namespace) üzrə mərkəzləşdirilmiş etibarsızlaşdırmaya imkan verir.
+Keşlənən funksiyalar dəyişməz DTO-lar qaytarmalıdır.
+"""
+
+import functools
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+@dataclass
+class CacheStats:
+    """Bir ad fəzası üzrə keş statistikası."""
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+
+
+_cache_lock = threading.Lock()
+# namespace -> {açar: (bitmə vaxtı, dəyər)}
+_entries: Dict[str, Dict[Hashable, Tuple[float, Any]]] = {}
+_stats: Dict[str, CacheStats] = {}
+# Hər etibarsızlaşdırmada artır; hesablanma zamanı yazı olubsa, köhnə nəticə keşə yazılmır
+_generations: Dict[str, int] = {}
+
+
+def cached(namespace: str, ttl: float, method: bool = False) -> Callable:
+    """
+    Funksiyanın nəticəsini arqumentlərinə görə `ttl` saniyəlik keşləyən dekorator.
+
+    Args:
+        namespace (str): Etibarsızlaşdırma üçün ad fəzası (məsələn, "evaluation_periods")
+        ttl (float): Nəticənin keşdə qalma müddəti (saniyə)
+        method (bool): True olduqda ilk arqument (self) açara daxil edilmir
+    """
+    def decorator(func):
+        with _cache_lock:
+            _entries.setdefault(namespace, {})
+            _stats.setdefault(namespace, CacheStats())
+            _generations.setdefault(namespace, 0)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key_args = args[1:] if method else args
+            key = (func.__qualname__, key_args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            with _cache_lock:
+                entry = _entries[namespace].get(key)
+                if entry is not None and entry[0] > now:
+                    _stats[namespace].hits += 1
+                    return _copy(entry[1])
+                _stats[namespace].misses += 1
+                generation = _generations[namespace]
+
+            value = func(*args, **kwargs)
+            with _cache_lock:
+                if _generations[namespace] == generation:
+                    _entries[namespace][key] = (now + ttl, value)
+            return _copy(value)
+
+        wrapper.namespace = namespace
+        return wrapper
+    return decorator
+
+
+def _copy(value):
+    """Siyahıların surətini qaytarır ki, çağıran tərəf keşdəki siyahını dəyişməsin."""
+    return list(value) if isinstance(value, list) else value
+
+
+def invalidate(*namespaces: str) -> None:
+    """
+    Verilmiş ad fəzalarının bütün keşlənmiş nəticələrini silir.
+    Yazı əməliyyatları dəyişdirdikləri məlumatın ad fəzasını burada etibarsızlaşdırır.
+    """
+    with _cache_lock:
+        for namespace in namespaces:
+            _entries.get(namespace, {}).clear()
+            _generations[namespace] = _generations.get(namespace, 0) + 1
+            _stats.setdefault(namespace, CacheStats()).invalidations += 1
+
+
+def invalidate_all() -> None:
+    """Bütün ad fəzalarını təmizləyir."""
+    with _cache_lock:
+        namespaces = list(_entries)
+    invalidate(*namespaces)
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    """Hər ad fəzası üzrə hit/miss/invalidation sayğaclarını və keşdəki açar sayını qaytarır."""
+    with _cache_lock:
+        return {
+            namespace: {
+                "hits": stats.hits,
+                "misses": stats.misses,
+                "invalidations": stats.invalidations,
+                "entries": len(_entries.get(namespace, {})),
+            }
+            for namespace, stats in _stats.items()
+        }
+
+
+def reset_cache_stats() -> None:
+    """Sayğacları sıfırlayır (keşlənmiş nəticələr saxlanılır)."""
+    with _cache_lock:
+        for namespace in _stats:
+            _stats[namespace] = CacheStats()
@@ -0,0 +1,570 @@
+# services/competency_rollup_service.py
+
+"""
+Səriştə ballarının (dövr, şöbə, səriştə) üzrə yığılmış cəmləri.
+
+competency_rollups cədvəli hər dövr, şöbə və səriştə üçün balların cəmini, sayını və
+kvadratlarının cəmini saxlayır. Cəmlər qiymətləndirmə yekunlaşdırıldıqda və 360°
+cavabları təsdiqləndikdə həmin tranzaksiyada fərq (delta) kimi yenilənir, buna görə
+bütün təşkilatın səriştə xəritəsi dövr üzrə tək indeksli oxunuşla qurulur.
+
+Cəmlərə daxildir:
+    * yekunlaşdırılmış (FINALIZED) KPI qiymətləndirmələrinin səriştəyə bağlı sualları üzrə cavablar;
+    * dövrlə tarixləri kəsişən, ləğv edilməmiş 360° sessiyalarında tamamlanmış iştirakçıların
+      səriştəyə bağlı aktiv sualları üzrə cavabları (degree360_aggregates ilə eyni mənbə).
+
+Yeni dövr yaradıldıqda (KpiService.launch_period), sual-səriştə əlaqələri dəyişdikdə
+(CompetencyService.associate_*/dissociate_*), işçinin şöbəsi dəyişdikdə
+(UserService.bulk_update_users/update_user_profile), 360° sessiyası ləğv edildikdə və ya
+360° sualı deaktiv edildikdə (Degree360Service.update_360_session_status/
+set_360_question_active) təsirlənən dövrlər həmin tranzaksiyada yenidən hesablanır. Dövrün tarixləri bazada əl ilə düzəldildikdə isə
+cəmlər rebuild_competency_rollups (və ya JOB_REBUILD_COMPETENCY_ROLLUPS fon işi) ilə
+yenidən hesablanmalıdır.
+"""
+
+import datetime
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import and_, delete, func, insert, select
+
+from database import get_db
+from models.competency import Competency, CompetencyRollup
+from models.degree360 import (
+    Degree360Aggregate, Degree360Question, Degree360Session, degree360_question_competency_association
+)
+from models.kpi import (
+    Answer, Evaluation, EvaluationPeriod, EvaluationStatus, kpi_question_competency_association
+)
+from models.user_profile import UserProfile
+
+
+# Şöbəsi olmayan işçilərin cəmləri bu açarla saxlanılır
+NO_DEPARTMENT = ""
+NO_DEPARTMENT_LABEL = "Şöbəsiz"
+
+# Bu statuslu 360° sessiyaları cəmlərə daxil edilmir (CompetencyService ilə eyni qayda)
+DEGREE360_CANCELLED = "CANCELLED"
+
+ROLLUP_COLUMNS = [
+    "department", "competency_id", "competency", "category",
+    "score_sum", "score_count", "average_score", "std_dev"
+]
+
+# (period_id, department, competency_id) -> [cəm, say, kvadratların cəmi]
+RollupDeltas = Dict[Tuple[int, str, int], list]
+
+
+class CompetencyRollupService:
+    @staticmethod
+    def _department_of(session, user_id: int) -> str:
+        department = session.query(UserProfile.department).filter(UserProfile.user_id == user_id).scalar()
+        return department or NO_DEPARTMENT
+
+    @staticmethod
+    def evaluation_contribution(session, evaluation: Evaluation) -> Dict[int, Tuple[float, int, float]]:
+        """
+        Qiymətləndirmənin cəmlərə payını səriştələr üzrə qaytarır. Yalnız FINALIZED
+        qiymətləndirmələrin payı var; digər statuslar üçün sorğu icra olunmur.
+
+        Args:
+            session: Açıq verilənlər bazası sessiyası
+            evaluation (Evaluation): Qiymətləndirmə (status yaddaşdakı qiymətə görə yoxlanılır)
+
+        Returns:
+            Dict[int, Tuple[float, int, float]]: competency_id -> (cəm, say, kvadratların cəmi)
+        """
+        if evaluation.status != EvaluationStatus.FINALIZED:
+            return {}
+
+        link = kpi_question_competency_association.c
+        rows = session.query(
+            link.competency_id,
+            func.sum(Answer.score),
+            func.count(Answer.score),
+            func.sum(Answer.score * Answer.score)
+        ).select_from(Answer).join(
+            kpi_question_competency_association, link.question_id == Answer.question_id
+        ).filter(
+            Answer.evaluation_id == evaluation.id,
+            Answer.score.isnot(None)
+        ).group_by(link.competency_id).all()
+
+        return {
+            competency_id: (float(score_sum or 0.0), int(score_count or 0), float(score_sumsq or 0.0))
+            for competency_id, score_sum, score_count, score_sumsq in rows
+        }
+
+    @staticmethod
+    def apply_evaluation_change(session, evaluation: Evaluation,
+                                before: Dict[int, Tuple[float, int, float]]) -> None:
+        """
+        Qiymətləndirmənin dəyişiklikdən əvvəlki və sonrakı payının fərqini cəmlərə tətbiq edir.
+        Commit etmir; çağıran tranzaksiyanın bir hissəsidir.
+
+        Args:
+            session: Açıq verilənlər bazası sessiyası
+            evaluation (Evaluation): Dəyişdirilmiş qiymətləndirmə
+            before: Dəyişiklikdən əvvəl evaluation_contribution ilə alınmış pay
+        """
+        if evaluation.status != EvaluationStatus.FINALIZED and not before:
+            return
+
+        session.flush()
+        after = CompetencyRollupService.evaluation_contribution(session, evaluation)
+        department = CompetencyRollupService._department_of(session, evaluation.evaluated_user_id)
+
+        deltas: RollupDeltas = defaultdict(lambda: [0.0, 0, 0.0])
+        for sign, contribution in ((-1, before), (1, after)):
+            for competency_id, (score_sum, score_count, score_sumsq) in contribution.items():
+                delta = deltas[(evaluation.period_id, department, competency_id)]
+                delta[0] += sign * score_sum
+                delta[1] += sign * score_count
+                delta[2] += sign * score_sumsq
+
+        CompetencyRollupService._apply_deltas(session, deltas)
+
+    @staticmethod
+    def apply_360_change(session, session_id: int, old_scores, new_scores) -> None:
+        """
+        360° iştirakçısının köhnə və yeni cavablarının fərqini sessiya ilə kəsişən bütün
+        dövrlərin cəmlərinə tətbiq edir. Commit etmir; çağıran tranzaksiyanın bir hissəsidir.
+
+        Args:
+            session: Açıq verilənlər bazası sessiyası
+            session_id (int): 360° sessiyasının ID-si
+            old_scores: Çıxılacaq (question_id, score) cütləri
+            new_scores: Əlavə ediləcək (question_id, score) cütləri
+        """
+        question_ids = {question_id for question_id, _ in old_scores} | {question_id for question_id, _ in new_scores}
+        if not question_ids:
+            return
+
+        link = degree360_question_competency_association.c
+        competencies_by_question = defaultdict(list)
+        for question_id, competency_id in session.query(link.question_id, link.competency_id).join(
+            Degree360Question, Degree360Question.id == link.question_id
+        ).filter(
+            link.question_id.in_(question_ids),
+            Degree360Question.is_active == True
+        ):
+            competencies_by_question[question_id].append(competency_id)
+        if not competencies_by_question:
+            return
+
+        degree360_session = session.query(
+            Degree360Session.evaluated_user_id, Degree360Session.start_date, Degree360Session.end_date,
+            Degree360Session.status
+        ).filter(Degree360Session.id == session_id).first()
+        # Ləğv edilmiş sessiyaların cavabları cəmlərə daxil edilmir
+        if degree360_session is None or degree360_session.status == DEGREE360_CANCELLED:
+            return
+        period_ids = [
+            period_id for (period_id,) in session.query(EvaluationPeriod.id).filter(
+                EvaluationPeriod.start_date <= degree360_session.end_date,
+                EvaluationPeriod.end_date >= degree360_session.start_date
+            )
+        ]
+        if not period_ids:
+            return
+
+        department = CompetencyRollupService._department_of(session, degree360_session.evaluated_user_id)
+        deltas: RollupDeltas = defaultdict(lambda: [0.0, 0, 0.0])
+        for sign, scores in ((-1, old_scores), (1, new_scores)):
+            for question_id, score in scores:
+                for competency_id in competencies_by_question.get(question_id, ()):
+                    for period_id in period_ids:
+                        delta = deltas[(period_id, department, competency_id)]
+                        delta[0] += sign * score
+                        delta[1] += sign
+                        delta[2] += sign * score * score
+
+        CompetencyRollupService._apply_deltas(session, deltas)
+
+    @staticmethod
+    def _apply_deltas(session, deltas: RollupDeltas) -> None:
+        """Fərqləri cəmlərə yazır: yeni sətirlər əlavə edilir, mövcudlar SQL tərəfində artırılır."""
+        deltas = {key: delta for key, delta in deltas.items() if any(delta)}
+        if not deltas:
+            return
+
+        existing = {
+            (rollup.period_id, rollup.department, rollup.competency_id): rollup
+            for rollup in session.query(CompetencyRollup).filter(
+                CompetencyRollup.period_id.in_({key[0] for key in deltas}),
+                CompetencyRollup.department.in_({key[1] for key in deltas}),
+                CompetencyRollup.competency_id.in_({key[2] for key in deltas})
+            ).with_for_update().all()
+        }
+
+        for key, (score_sum, score_count, score_sumsq) in deltas.items():
+            rollup = existing.get(key)
+            if rollup is None:
+                period_id, department, competency_id = key
+                session.add(CompetencyRollup(
+                    period_id=period_id,
+                    department=department,
+                    competency_id=competency_id,
+                    score_sum=score_sum,
+                    score_count=score_count,
+                    score_sumsq=score_sumsq
+                ))
+            else:
+                # Paralel yazılarda yeniləmə itməsin deyə artım SQL tərəfində edilir
+                rollup.score_sum = CompetencyRollup.score_sum + score_sum
+                rollup.score_count = CompetencyRollup.score_count + score_count
+                rollup.score_sumsq = CompetencyRollup.score_sumsq + score_sumsq
+        session.flush()
+
+    @staticmethod
+    def rebuild_competency_rollups(period_id: Optional[int] = None) -> int:
+        """
+        Cəmləri mənbə cədvəllərdən tam yenidən hesablayır (bir dövr və ya bütün dövrlər üçün).
+
+        Args:
+            period_id (Optional[int]): Dövrün ID-si; None olduqda bütün dövrlər
+
+        Returns:
+            int: Yazılmış sətirlərin sayı
+        """
+        with get_db() as session:
+            try:
+                written = CompetencyRollupService.rebuild_periods(
+                    session, None if period_id is None else [period_id]
+                )
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+
+        return written
+
+    @staticmethod
+    def rebuild_periods(session, period_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Verilmiş dövrlərin cəmlərini çağıranın tranzaksiyasında yenidən hesablayır (commit etmir).
+
+        Args:
+            session: Aktiv verilənlər bazası sessiyası
+            period_ids (Optional[Iterable[int]]): Dövrlərin ID-ləri; None olduqda bütün dövrlər
+
+        Returns:
+            int: Yazılmış sətirlərin sayı
+        """
+        kpi_link = kpi_question_competency_association.c
+        d360_link = degree360_question_competency_association.c
+
+        kpi_department = func.coalesce(UserProfile.department, NO_DEPARTMENT)
+        kpi_query = session.query(
+            Evaluation.period_id,
+            kpi_department,
+            kpi_link.competency_id,
+            func.sum(Answer.score),
+            func.count(Answer.score),
+            func.sum(Answer.score * Answer.score)
+        ).select_from(Answer).join(
+            Evaluation, Evaluation.id == Answer.evaluation_id
+        ).join(
+            kpi_question_competency_association, kpi_link.question_id == Answer.question_id
+        ).outerjoin(
+            UserProfile, UserProfile.user_id == Evaluation.evaluated_user_id
+        ).filter(
+            Evaluation.status == EvaluationStatus.FINALIZED,
+            Answer.score.isnot(None)
+        )
+
+        d360_department = func.coalesce(UserProfile.department, NO_DEPARTMENT)
+        d360_query = session.query(
+            EvaluationPeriod.id,
+            d360_department,
+            d360_link.competency_id,
+            func.sum(Degree360Aggregate.score_sum),
+            func.sum(Degree360Aggregate.score_count),
+            func.sum(Degree360Aggregate.score_sumsq)
+        ).select_from(Degree360Aggregate).join(
+            Degree360Session, Degree360Session.id == Degree360Aggregate.session_id
+        ).join(
+            Degree360Question, Degree360Question.id == Degree360Aggregate.question_id
+        ).join(
+            degree360_question_competency_association,
+            d360_link.question_id == Degree360Aggregate.question_id
+        ).join(
+            EvaluationPeriod, and_(
+                Degree360Session.start_date <= EvaluationPeriod.end_date,
+                Degree360Session.end_date >= EvaluationPeriod.start_date
+            )
+        ).outerjoin(
+            UserProfile, UserProfile.user_id == Degree360Session.evaluated_user_id
+        ).filter(
+            Degree360Session.status != DEGREE360_CANCELLED,
+            Degree360Question.is_active == True
+        )
+
+        delete_statement = delete(CompetencyRollup)
+        if period_ids is not None:
+            period_ids = list(period_ids)
+            kpi_query = kpi_query.filter(Evaluation.period_id.in_(period_ids))
+            d360_query = d360_query.filter(EvaluationPeriod.id.in_(period_ids))
+            delete_statement = delete_statement.where(CompetencyRollup.period_id.in_(period_ids))
+
+        totals: RollupDeltas = defaultdict(lambda: [0.0, 0, 0.0])
+        for grouped in (
+            kpi_query.group_by(Evaluation.period_id, kpi_department, kpi_link.competency_id).all(),
+            d360_query.group_by(EvaluationPeriod.id, d360_department, d360_link.competency_id).all()
+        ):
+            for row_period_id, department, competency_id, score_sum, score_count, score_sumsq in grouped:
+                total = totals[(row_period_id, department, competency_id)]
+                total[0] += float(score_sum or 0.0)
+                total[1] += int(score_count or 0)
+                total[2] += float(score_sumsq or 0.0)
+
+        now = datetime.datetime.utcnow()
+        rows = [
+            {
+                "period_id": row_period_id,
+                "department": department,
+                "competency_id": competency_id,
+                "score_sum": score_sum,
+                "score_count": score_count,
+                "score_sumsq": score_sumsq,
+                "updated_at": now
+            }
+            for (row_period_id, department, competency_id), (score_sum, score_count, score_sumsq)
+            in totals.items() if score_count > 0
+        ]
+
+        session.execute(delete_statement)
+        if rows:
+            session.execute(insert(CompetencyRollup), rows)
+        return len(rows)
+
+    @staticmethod
+    def rebuild_for_users(session, user_ids: Iterable[int]) -> List[int]:
+        """
+        İşçilərin şöbəsi dəyişdikdə, onların payı olan dövrlərin (yekunlaşdırılmış KPI
+        qiymətləndirmələri və kəsişən 360° sessiyaları) cəmlərini çağıranın tranzaksiyasında
+        yenidən hesablayır. Pay köhnə şöbədən çıxılıb yenisinə əlavə olunmuş olur.
+
+        Args:
+            session: Aktiv verilənlər bazası sessiyası
+            user_ids (Iterable[int]): Şöbəsi dəyişmiş işçilərin ID-ləri
+
+        Returns:
+            List[int]: Yenidən hesablanmış dövrlərin ID-ləri
+        """
+        user_ids = list(user_ids)
+        if not user_ids:
+            return []
+
+        # Şöbə dəyişikliyi sorğulardan əvvəl bazaya yazılmalıdır
+        session.flush()
+        kpi_periods = session.query(Evaluation.period_id).filter(
+            Evaluation.evaluated_user_id.in_(user_ids),
+            Evaluation.status == EvaluationStatus.FINALIZED
+        )
+        d360_periods = session.query(EvaluationPeriod.id).join(
+            Degree360Session, and_(
+                Degree360Session.start_date <= EvaluationPeriod.end_date,
+                Degree360Session.end_date >= EvaluationPeriod.start_date
+            )
+        ).filter(
+            Degree360Session.evaluated_user_id.in_(user_ids),
+            select(Degree360Aggregate.session_id).where(
+                Degree360Aggregate.session_id == Degree360Session.id
+            ).exists()
+        )
+        period_ids = sorted({period_id for (period_id,) in kpi_periods.union(d360_periods)})
+        if period_ids:
+            CompetencyRollupService.rebuild_periods(session, period_ids)
+        return period_ids
+
+    @staticmethod
+    def rebuild_for_kpi_question(session, question_id: int) -> List[int]:
+        """
+        KPI sualının səriştə əlaqələri dəyişdikdə, həmin suala yekunlaşdırılmış cavabı olan
+        dövrlərin cəmlərini çağıranın tranzaksiyasında yenidən hesablayır.
+
+        Args:
+            session: Aktiv verilənlər bazası sessiyası
+            question_id (int): KPI sualının ID-si
+
+        Returns:
+            List[int]: Yenidən hesablanmış dövrlərin ID-ləri
+        """
+        # Əlaqə dəyişikliyi sorğulardan əvvəl bazaya yazılmalıdır
+        session.flush()
+        period_ids = [
+            period_id for (period_id,) in session.query(Evaluation.period_id).join(
+                Answer, Answer.evaluation_id == Evaluation.id
+            ).filter(
+                Answer.question_id == question_id,
+                Evaluation.status == EvaluationStatus.FINALIZED
+            ).distinct()
+        ]
+        if period_ids:
+            CompetencyRollupService.rebuild_periods(session, period_ids)
+        return period_ids
+
+    @staticmethod
+    def rebuild_for_360_session(session, session_id: int) -> List[int]:
+        """
+        360° sessiyası ləğv edildikdə və ya bərpa olunduqda, sessiya ilə tarixləri kəsişən
+        dövrlərin cəmlərini çağıranın tranzaksiyasında yenidən hesablayır.
+
+        Args:
+            session: Aktiv verilənlər bazası sessiyası
+            session_id (int): 360° sessiyasının ID-si
+
+        Returns:
+            List[int]: Yenidən hesablanmış dövrlərin ID-ləri
+        """
+        session.flush()
+        period_ids = [
+            period_id for (period_id,) in session.query(EvaluationPeriod.id).join(
+                Degree360Session, and_(
+                    Degree360Session.start_date <= EvaluationPeriod.end_date,
+                    Degree360Session.end_date >= EvaluationPeriod.start_date
+                )
+            ).filter(
+                Degree360Session.id == session_id
+            ).distinct()
+        ]
+        if period_ids:
+            CompetencyRollupService.rebuild_periods(session, period_ids)
+        return period_ids
+
+    @staticmethod
+    def rebuild_for_360_question(session, question_id: int) -> List[int]:
+        """
+        360° sualının səriştə əlaqələri və ya aktivliyi dəyişdikdə, sualın sessiyası ilə tarixləri kəsişən
+        dövrlərin cəmlərini çağıranın tranzaksiyasında yenidən hesablayır.
+
+        Args:
+            session: Aktiv verilənlər bazası sessiyası
+            question_id (int): 360° sualının ID-si
+
+        Returns:
+            List[int]: Yenidən hesablanmış dövrlərin ID-ləri
+        """
+        session.flush()
+        period_ids = [
+            period_id for (period_id,) in session.query(EvaluationPeriod.id).join(
+                Degree360Session, and_(
+                    Degree360Session.start_date <= EvaluationPeriod.end_date,
+                    Degree360Session.end_date >= EvaluationPeriod.start_date
+                )
+            ).join(
+                Degree360Aggregate, Degree360Aggregate.session_id == Degree360Session.id
+            ).filter(
+                Degree360Aggregate.question_id == question_id
+            ).distinct()
+        ]
+        if period_ids:
+            CompetencyRollupService.rebuild_periods(session, period_ids)
+        return period_ids
+
+    @staticmethod
+    def get_period_rollup(period_id: int, department: Optional[str] = None,
+                          competency_ids: Optional[Iterable[int]] = None) -> pd.DataFrame:
+        """
+        Dövrün (şöbə, səriştə) üzrə cəmlərini orta bal və standart sapma ilə qaytarır.
+        Sorğu cədvəlin əsas açarının prefiksi (period_id) üzrə oxunur.
+
+        Args:
+            period_id (int): Dövrün ID-si
+            department (Optional[str]): Yalnız bu şöbə (şöbəsizlər üçün NO_DEPARTMENT)
+            competency_ids (Optional[Iterable[int]]): Yalnız bu səriştələr
+
+        Returns:
+            pd.DataFrame: ROLLUP_COLUMNS sütunları ilə; şöbə və səriştə adına görə sıralanır
+        """
+        with get_db() as session:
+            query = session.query(
+                CompetencyRollup.department,
+                CompetencyRollup.competency_id,
+                Competency.name,
+                Competency.category,
+                CompetencyRollup.score_sum,
+                CompetencyRollup.score_count,
+                CompetencyRollup.score_sumsq
+            ).join(
+                Competency, Competency.id == CompetencyRollup.competency_id
+            ).filter(
+                CompetencyRollup.period_id == period_id,
+                CompetencyRollup.score_count > 0
+            )
+            if department is not None:
+                query = query.filter(CompetencyRollup.department == department)
+            if competency_ids is not None:
+                query = query.filter(CompetencyRollup.competency_id.in_(list(competency_ids)))
+            rows = query.order_by(CompetencyRollup.department, Competency.name).all()
+
+        if not rows:
+            return pd.DataFrame(columns=ROLLUP_COLUMNS)
+
+        df = pd.DataFrame(
+            [tuple(row) for row in rows],
+            columns=["department", "competency_id", "competency", "category",
+                     "score_sum", "score_count", "score_sumsq"]
+        )
+        counts = df["score_count"].to_numpy(dtype=float)
+        means = df["score_sum"].to_numpy(dtype=float) / counts
+        variances = df["score_sumsq"].to_numpy(dtype=float) / counts - means ** 2
+        df["average_score"] = means
+        df["std_dev"] = np.sqrt(np.maximum(variances, 0.0))
+        return df[ROLLUP_COLUMNS]
+
+    @staticmethod
+    def get_competency_heatmap(period_id: int) -> pd.DataFrame:
+        """
+        Bütün təşkilat üçün şöbə × səriştə orta bal matrisini qaytarır.
+
+        Args:
+            period_id (int): Dövrün ID-si
+
+        Returns:
+            pd.DataFrame: Sətirlər şöbələr (şöbəsizlər NO_DEPARTMENT_LABEL ilə), sütunlar
+                          səriştə adları; məlumat olmayan xanalar NaN
+        """
+        rollup = CompetencyRollupService.get_period_rollup(period_id)
+        if rollup.empty:
+            return pd.DataFrame()
+
+        rollup["department"] = rollup["department"].replace(NO_DEPARTMENT, NO_DEPARTMENT_LABEL)
+        heatmap = rollup.pivot_table(
+            index="department", columns="competency", values="average_score", aggfunc="first"
+        )
+        heatmap.index.name = None
+        heatmap.columns.name = None
+        return heatmap
+
+    @staticmethod
+    def get_department_averages_for_360_session(session_id: int) -> Dict[int, float]:
+        """
+        360° sessiyasında qiymətləndirilən işçinin şöbəsi üzrə səriştə ortalamalarını
+        sessiya ilə kəsişən ən son dövrün cəmlərindən qaytarır.
+
+        Args:
+            session_id (int): 360° sessiyasının ID-si
+
+        Returns:
+            Dict[int, float]: competency_id -> şöbənin orta balı; uyğun dövr yoxdursa boş lüğət
+        """
+        with get_db() as session:
+            degree360_session = session.query(
+                Degree360Session.evaluated_user_id, Degree360Session.start_date, Degree360Session.end_date
+            ).filter(Degree360Session.id == session_id).first()
+            if degree360_session is None:
+                return {}
+            period_id = session.query(EvaluationPeriod.id).filter(
+                EvaluationPeriod.start_date <= degree360_session.end_date,
+                EvaluationPeriod.end_date >= degree360_session.start_date
+            ).order_by(EvaluationPeriod.start_date.desc(), EvaluationPeriod.id.desc()).limit(1).scalar()
+            if period_id is None:
+                return {}
+            department = CompetencyRollupService._department_of(session, degree360_session.evaluated_user_id)
+
+        rollup = CompetencyRollupService.get_period_rollup(period_id, department=department)
+        return dict(zip(rollup["competency_id"], rollup["average_score"]))
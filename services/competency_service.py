@@ -1,11 +1,23 @@
 """Service layer for competency management."""
 
-from typing import List, Optional
+from typing import Iterable, List, Optional
+import pandas as pd
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from models.competency import Competency
-from models.kpi import Question as KPIQuestion
-from models.degree360 import Degree360Question
+from models.kpi import (
+    Answer, Evaluation, EvaluationPeriod, EvaluationStatus,
+    Question as KPIQuestion, kpi_question_competency_association
+)
+from models.degree360 import (
+    Degree360Aggregate, Degree360Question, Degree360Session,
+    degree360_question_competency_association
+)
+from models.user_profile import UserProfile
+from services.cache import cached, invalidate
+from services.competency_rollup_service import CompetencyRollupService
+from services.dto import CompetencyDTO
 import logging
 
 # Set up logging
@@ -50,6 +62,7 @@ class CompetencyService:
             self.db.add(competency)
             self.db.commit()
             self.db.refresh(competency)
+            invalidate("competencies")
             logger.info(f"Created competency: {name}")
             return competency
         except SQLAlchemyError as e:
@@ -81,20 +94,22 @@ class CompetencyService:
         """
         return self.db.query(Competency).filter(Competency.name == name).first()
     
-    def get_all_competencies(self, category: Optional[str] = None) -> List[Competency]:
+    @cached("competencies", ttl=600, method=True)
+    def get_all_competencies(self, category: Optional[str] = None) -> List[CompetencyDTO]:
         """
         Get all competencies, optionally filtered by category.
+        Results are cached per category until a competency is created, updated or deleted.
         
         Args:
             category: Optional category to filter by
             
         Returns:
-            List of competency objects
+            List of competency DTOs
         """
         query = self.db.query(Competency)
         if category:
             query = query.filter(Competency.category == category)
-        return query.all()
+        return [CompetencyDTO.from_orm(competency) for competency in query.order_by(Competency.id).all()]
     
     def update_competency(self, competency_id: int, name: Optional[str] = None,
                          description: Optional[str] = None, category: Optional[str] = None) -> Optional[Competency]:
@@ -127,6 +142,7 @@ class CompetencyService:
                 
             self.db.commit()
             self.db.refresh(competency)
+            invalidate("competencies")
             logger.info(f"Updated competency ID {competency_id}")
             return competency
         except SQLAlchemyError as e:
@@ -154,6 +170,7 @@ class CompetencyService:
             
             self.db.delete(competency)
             self.db.commit()
+            invalidate("competencies")
             logger.info(f"Deleted competency ID {competency_id}")
             return True
         except SQLAlchemyError as e:
@@ -185,6 +202,7 @@ class CompetencyService:
             # Check if already associated
             if competency not in question.competencies:
                 question.competencies.append(competency)
+                CompetencyRollupService.rebuild_for_kpi_question(self.db, question_id)
                 self.db.commit()
                 logger.info(f"Associated KPI question {question_id} with competency {competency_id}")
             
@@ -218,6 +236,7 @@ class CompetencyService:
             # Check if associated
             if competency in question.competencies:
                 question.competencies.remove(competency)
+                CompetencyRollupService.rebuild_for_kpi_question(self.db, question_id)
                 self.db.commit()
                 logger.info(f"Dissociated KPI question {question_id} from competency {competency_id}")
             
@@ -251,6 +270,7 @@ class CompetencyService:
             # Check if already associated
             if competency not in question.competencies:
                 question.competencies.append(competency)
+                CompetencyRollupService.rebuild_for_360_question(self.db, question_id)
                 self.db.commit()
                 logger.info(f"Associated 360 question {question_id} with competency {competency_id}")
             
@@ -284,6 +304,7 @@ class CompetencyService:
             # Check if associated
             if competency in question.competencies:
                 question.competencies.remove(competency)
+                CompetencyRollupService.rebuild_for_360_question(self.db, question_id)
                 self.db.commit()
                 logger.info(f"Dissociated 360 question {question_id} from competency {competency_id}")
             
@@ -293,54 +314,186 @@ class CompetencyService:
             logger.error(f"Error dissociating 360 question {question_id} from competency {competency_id}: {str(e)}")
             raise
     
-    def get_performance_by_competency(self, user_id: int, competency_id: int) -> Optional[float]:
+    def get_performance_by_competency(self, user_id: int, competency_id: int,
+                                      period_id: Optional[int] = None) -> Optional[float]:
         """
         Calculate the average score for a user in a specific competency.
         
-        This function looks at both KPI and 360-degree evaluations to calculate
-        the average performance for a given competency.
+        KPI and 360-degree scores of questions linked to the competency are pooled,
+        using the same grouped queries as the competency score matrix.
         
         Args:
             user_id: ID of the user
             competency_id: ID of the competency
+            period_id: Optional evaluation period to restrict the scores to
             
         Returns:
             Average score for the competency or None if no data
         """
         try:
-            # Get all questions associated with this competency
             competency = self.get_competency_by_id(competency_id)
             if not competency:
                 return None
             
-            # Get scores from KPI evaluations
-            kpi_scores = []
-            for question in competency.kpi_questions:
-                # Find answers for this user and question
-                answers = self.db.query(KPIQuestion).join(KPIQuestion.answers).filter(
-                    KPIQuestion.id == question.id
-                ).all()
-                kpi_scores.extend([answer.score for answer in answers])
-            
-            # Get scores from 360-degree evaluations
-            degree360_scores = []
-            for question in competency.degree360_questions:
-                # Find answers for this user and question
-                answers = self.db.query(Degree360Question).join(Degree360Question.answers).filter(
-                    Degree360Question.id == question.id
-                ).all()
-                degree360_scores.extend([answer.score for answer in answers])
-            
-            # Combine all scores
-            all_scores = kpi_scores + degree360_scores
-            
-            if not all_scores:
+            matrix = self.get_competency_score_matrix(
+                period_id=period_id, user_ids=[user_id], competency_ids=[competency_id]
+            )
+            if matrix.empty or pd.isna(matrix.iat[0, 0]):
                 return None
             
-            # Calculate average
-            average_score = sum(all_scores) / len(all_scores)
+            average_score = float(matrix.iat[0, 0])
             logger.info(f"Calculated performance for user {user_id} in competency {competency_id}: {average_score}")
             return average_score
         except Exception as e:
             logger.error(f"Error calculating performance for user {user_id} in competency {competency_id}: {str(e)}")
-            return None
\ No newline at end of file
+            return None
+    
+    def get_competency_score_matrix(self, period_id: Optional[int] = None, department: Optional[str] = None,
+                                    user_ids: Optional[Iterable[int]] = None,
+                                    competency_ids: Optional[Iterable[int]] = None) -> pd.DataFrame:
+        """
+        Build a dense user x competency score matrix.
+        
+        Each cell is the pooled average of all KPI answers and completed 360-degree
+        answers given for the user on questions linked to the competency.
+        
+        Args:
+            period_id: Optional evaluation period to restrict the scores to
+            department: Optional department of the evaluated users
+            user_ids: Optional users to restrict the matrix to (rows are kept even without scores)
+            competency_ids: Optional competencies to restrict the matrix to (columns are kept even without scores)
+            
+        Returns:
+            DataFrame indexed by user_id with one column per competency_id; NaN where there is no data
+        """
+        user_ids = list(user_ids) if user_ids is not None else None
+        competency_ids = list(competency_ids) if competency_ids is not None else None
+        totals = self.get_competency_score_totals(period_id, department, user_ids, competency_ids)
+        
+        totals["score"] = totals["score_sum"] / totals["score_count"]
+        matrix = totals.pivot(index="user_id", columns="competency_id", values="score")
+        
+        if user_ids is not None:
+            matrix = matrix.reindex(index=user_ids)
+        if competency_ids is not None:
+            matrix = matrix.reindex(columns=competency_ids)
+        matrix.index.name = "user_id"
+        matrix.columns.name = "competency_id"
+        return matrix.astype(float)
+    
+    def get_department_competency_scores(self, competency_id: int,
+                                         period_id: Optional[int] = None) -> pd.DataFrame:
+        """
+        Summarize a competency per department.
+        
+        Args:
+            competency_id: ID of the competency
+            period_id: Optional evaluation period to restrict the scores to
+            
+        Returns:
+            DataFrame with department, average_score (mean of the users' scores) and
+            employee_count (users with at least one score), best department first
+        """
+        totals = self.get_competency_score_totals(period_id=period_id, competency_ids=[competency_id])
+        if totals.empty:
+            return pd.DataFrame(columns=["department", "average_score", "employee_count"])
+        
+        totals["score"] = totals["score_sum"] / totals["score_count"]
+        totals["department"] = totals["department"].fillna("Şöbəsiz")
+        summary = totals.groupby("department", sort=False)["score"].agg(
+            average_score="mean", employee_count="count"
+        ).reset_index()
+        return summary.sort_values(["average_score", "department"], ascending=[False, True]).reset_index(drop=True)
+    
+    def get_competency_score_totals(self, period_id: Optional[int] = None, department: Optional[str] = None,
+                                    user_ids: Optional[List[int]] = None,
+                                    competency_ids: Optional[List[int]] = None) -> pd.DataFrame:
+        """
+        Load per-user, per-competency score sums and counts.
+        
+        One grouped query reads finalized KPI answers through the kpi_question_competency
+        association, a second one reads the 360-degree aggregates through the
+        degree360_question_competency association. 360-degree sessions count towards a
+        period when their dates overlap it.
+        
+        Returns:
+            DataFrame with user_id, department, competency_id, score_sum and score_count
+        """
+        columns = ["user_id", "department", "competency_id", "score_sum", "score_count"]
+        kpi_table = kpi_question_competency_association
+        d360_table = degree360_question_competency_association
+        kpi_link = kpi_table.c
+        d360_link = d360_table.c
+        
+        kpi_query = self.db.query(
+            Evaluation.evaluated_user_id,
+            UserProfile.department,
+            kpi_link.competency_id,
+            func.sum(Answer.score),
+            func.count(Answer.score)
+        ).select_from(Answer).join(
+            Evaluation, Evaluation.id == Answer.evaluation_id
+        ).join(
+            kpi_table, kpi_link.question_id == Answer.question_id
+        ).outerjoin(
+            UserProfile, UserProfile.user_id == Evaluation.evaluated_user_id
+        ).filter(
+            Evaluation.status == EvaluationStatus.FINALIZED,
+            Answer.score.isnot(None)
+        )
+        
+        d360_query = self.db.query(
+            Degree360Session.evaluated_user_id,
+            UserProfile.department,
+            d360_link.competency_id,
+            func.sum(Degree360Aggregate.score_sum),
+            func.sum(Degree360Aggregate.score_count)
+        ).select_from(Degree360Aggregate).join(
+            Degree360Session, Degree360Session.id == Degree360Aggregate.session_id
+        ).join(
+            Degree360Question, Degree360Question.id == Degree360Aggregate.question_id
+        ).join(
+            d360_table, d360_link.question_id == Degree360Aggregate.question_id
+        ).outerjoin(
+            UserProfile, UserProfile.user_id == Degree360Session.evaluated_user_id
+        ).filter(
+            Degree360Session.status != "CANCELLED",
+            Degree360Question.is_active == True,
+            Degree360Aggregate.score_count > 0
+        )
+        
+        if period_id is not None:
+            period = self.db.query(EvaluationPeriod).filter(EvaluationPeriod.id == period_id).first()
+            if period is None:
+                return pd.DataFrame(columns=columns)
+            kpi_query = kpi_query.filter(Evaluation.period_id == period_id)
+            d360_query = d360_query.filter(
+                Degree360Session.start_date <= period.end_date,
+                Degree360Session.end_date >= period.start_date
+            )
+        if department:
+            kpi_query = kpi_query.filter(UserProfile.department == department)
+            d360_query = d360_query.filter(UserProfile.department == department)
+        if user_ids is not None:
+            kpi_query = kpi_query.filter(Evaluation.evaluated_user_id.in_(user_ids))
+            d360_query = d360_query.filter(Degree360Session.evaluated_user_id.in_(user_ids))
+        if competency_ids is not None:
+            kpi_query = kpi_query.filter(kpi_link.competency_id.in_(competency_ids))
+            d360_query = d360_query.filter(d360_link.competency_id.in_(competency_ids))
+        
+        kpi_rows = kpi_query.group_by(
+            Evaluation.evaluated_user_id, UserProfile.department, kpi_link.competency_id
+        ).all()
+        d360_rows = d360_query.group_by(
+            Degree360Session.evaluated_user_id, UserProfile.department, d360_link.competency_id
+        ).all()
+        
+        totals = pd.DataFrame([tuple(row) for row in kpi_rows] + [tuple(row) for row in d360_rows], columns=columns)
+        if totals.empty:
+            return totals
+        totals["score_sum"] = totals["score_sum"].astype(float)
+        totals["score_count"] = totals["score_count"].astype(int)
+        # Pool the KPI and 360-degree totals of the same user and competency
+        return totals.groupby(
+            ["user_id", "department", "competency_id"], dropna=False, sort=True
+        )[["score_sum", "score_count"]].sum().reset_index()
@@ -6,12 +6,51 @@ from models.degree360 import (
     Degree360Participant, 
     Degree360Question, 
     Degree360Answer,
-    Degree360ParticipantRole
+    Degree360Aggregate,
+    Degree360ParticipantRole,
+    degree360_question_competency_association
 )
+from models.competency import Competency
 from models.user import User
+from models.user_profile import UserProfile
+from models.notification import NOTIFICATION_KIND_360_REMINDER, Notification
+from config import settings
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import joinedload
 from services.notification_service import NotificationService
-from datetime import date, datetime
-from typing import List, Dict, Any
+from services.competency_rollup_service import CompetencyRollupService
+from services.cache import cached, invalidate
+from services.dto import (
+    Degree360SessionDTO,
+    Degree360ParticipantDTO,
+    Degree360QuestionDTO,
+    LOAD_SELECTIN,
+    degree360_session_load_options,
+    degree360_participant_load_options
+)
+import copy
+import math
+import threading
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple
+
+# Hesabat konveyerinin keşi: session_id -> (answers_version, {"results": ..., "report": ...})
+_report_cache_lock = threading.Lock()
+_report_cache: Dict[int, Tuple[int, Dict[str, Any]]] = {}
+
+# 360° sessiyasının mümkün statusları
+DEGREE360_SESSION_STATUSES = ("ACTIVE", "COMPLETED", "CANCELLED")
+
+# Xatırlatma bildirişinin mətni (str.format şablonu)
+_REMINDER_360_TEMPLATE = (
+    "Xatırlatma: {session_name} 360° qiymətləndirmə sessiyasının bitməsinə {days_left} gün qalıb. "
+    "Zəhmət olmasa, rəyinizi bildirin."
+)
+
+# İştirakçıların sayı bu həddən çox olduqda dəqiq sayılmır, "ən azı" kimi göstərilir
+_PARTICIPANT_COUNT_CAP = 10000
+
 
 class Degree360Service:
     @staticmethod
@@ -50,6 +89,7 @@ class Degree360Service:
             session.add(new_session)
             session.commit()
             session.refresh(new_session)
+            invalidate("degree360_sessions")
             
             # Qiymətləndiriləcək işçiyə bildiriş göndər
             evaluated_user = session.query(User).filter(User.id == evaluated_user_id).first()
@@ -62,36 +102,44 @@ class Degree360Service:
             return new_session
 
     @staticmethod
-    def get_360_session_by_id(session_id: int) -> Degree360Session:
+    def get_360_session_by_id(session_id: int, load: str = LOAD_SELECTIN) -> Degree360SessionDTO:
         """
         ID-sinə görə 360 dərəcə qiymətləndirmə sessiyasını qaytarır.
         
         Args:
             session_id (int): Sessiyanın ID-si
+            load (str): Əlaqələrin yükləmə profili ("selectin" və ya "joined")
             
         Returns:
-            Degree360Session: Sessiya obyekti və ya None əgər tapılmazsa
+            Degree360SessionDTO: Sessiya obyekti və ya None əgər tapılmazsa
         """
         with get_db() as session:
-            return session.query(Degree360Session).filter(Degree360Session.id == session_id).first()
+            degree360_session = session.query(Degree360Session).options(
+                *degree360_session_load_options(load)
+            ).filter(Degree360Session.id == session_id).first()
+            return Degree360SessionDTO.from_orm(degree360_session)
 
     @staticmethod
-    def get_360_sessions_for_user(user_id: int) -> List[Degree360Session]:
+    def get_360_sessions_for_user(user_id: int, load: str = LOAD_SELECTIN) -> List[Degree360SessionDTO]:
         """
         İstifadəçinin bütün 360 dərəcə qiymətləndirmə sessiyalarını qaytarır.
         Həm qiymətləndiriləcək şəxs kimi, həm də rəhbər kimi olan sessiyaları əhatə edir.
         
         Args:
             user_id (int): İstifadəçinin ID-si
+            load (str): Əlaqələrin yükləmə profili ("selectin" və ya "joined")
             
         Returns:
-            List[Degree360Session]: Sessiyalar siyahısı
+            List[Degree360SessionDTO]: Sessiyalar siyahısı
         """
         with get_db() as session:
-            return session.query(Degree360Session).filter(
+            sessions = session.query(Degree360Session).options(
+                *degree360_session_load_options(load)
+            ).filter(
                 (Degree360Session.evaluated_user_id == user_id) | 
                 (Degree360Session.evaluator_user_id == user_id)
             ).all()
+            return [Degree360SessionDTO.from_orm(s) for s in sessions]
 
     @staticmethod
     def add_participant_to_360_session(
@@ -123,20 +171,128 @@ class Degree360Service:
             return participant
 
     @staticmethod
-    def get_participants_for_360_session(session_id: int) -> List[Degree360Participant]:
+    def get_participants_for_360_session(session_id: int, load: str = LOAD_SELECTIN) -> List[Degree360ParticipantDTO]:
         """
         360 dərəcə qiymətləndirmə sessiyasının bütün iştirakçılarını qaytarır.
         
         Args:
             session_id (int): Sessiyanın ID-si
+            load (str): Əlaqələrin yükləmə profili ("selectin" və ya "joined")
             
         Returns:
-            List[Degree360Participant]: İştirakçılar siyahısı
+            List[Degree360ParticipantDTO]: İştirakçılar siyahısı
         """
         with get_db() as session:
-            return session.query(Degree360Participant).filter(
+            participants = session.query(Degree360Participant).options(
+                *degree360_participant_load_options(load)
+            ).filter(
                 Degree360Participant.session_id == session_id
             ).all()
+            return [Degree360ParticipantDTO.from_orm(p) for p in participants]
+
+    @staticmethod
+    def get_participants_page(
+        session_id: Optional[int] = None,
+        status: Optional[str] = None,
+        role: Optional[Degree360ParticipantRole] = None,
+        evaluator_user_id: Optional[int] = None,
+        after_id: Optional[int] = None,
+        page_size: int = 50
+    ) -> Dict[str, Any]:
+        """
+        360 dərəcə qiymətləndirmə iştirakçılarını səhifələrlə qaytarır.
+        
+        Səhifələmə keyset üsulu ilədir: iştirakçılar ID-yə görə azalan sırada düzülür və
+        növbəti səhifə əvvəlkinin son ID-sindən kiçik ID-lərdən başlayır, buna görə OFFSET
+        skan edilmir. Ümumi say ucuz qiymətləndirmə ilə verilir: filtrsiz PostgreSQL-də
+        planlayıcının statistikası (pg_class.reltuples), digər hallarda _PARTICIPANT_COUNT_CAP
+        ilə məhdudlaşdırılmış sayma.
+        
+        Args:
+            session_id (int, optional): Sessiya filtri
+            status (str, optional): Status filtri (PENDING, COMPLETED)
+            role (Degree360ParticipantRole, optional): Rol filtri
+            evaluator_user_id (int, optional): Qiymətləndirici filtri
+            after_id (int, optional): Əvvəlki səhifənin next_cursor dəyəri; None - birinci səhifə
+            page_size (int): Səhifədəki sətirlərin sayı
+            
+        Returns:
+            Dict[str, Any]: {"items": [...], "next_cursor": növbəti səhifənin kursoru və ya None,
+                             "total": ümumi say, "total_is_exact": say dəqiqdirsə True}
+        """
+        if page_size < 1:
+            raise ValueError("Səhifə ölçüsü müsbət olmalıdır.")
+
+        filters = []
+        if session_id is not None:
+            filters.append(Degree360Participant.session_id == session_id)
+        if status is not None:
+            filters.append(Degree360Participant.status == status)
+        if role is not None:
+            filters.append(Degree360Participant.role == role)
+        if evaluator_user_id is not None:
+            filters.append(Degree360Participant.evaluator_user_id == evaluator_user_id)
+
+        with get_db() as session:
+            query = session.query(
+                Degree360Participant.id,
+                Degree360Participant.session_id,
+                Degree360Session.name,
+                Degree360Participant.evaluator_user_id,
+                UserProfile.full_name,
+                Degree360Participant.role,
+                Degree360Participant.status,
+                Degree360Participant.created_at
+            ).join(
+                Degree360Session, Degree360Session.id == Degree360Participant.session_id
+            ).outerjoin(
+                UserProfile, UserProfile.user_id == Degree360Participant.evaluator_user_id
+            ).filter(*filters)
+
+            if after_id is not None:
+                query = query.filter(Degree360Participant.id < after_id)
+
+            # Növbəti səhifənin olub-olmadığını bilmək üçün bir sətir artıq oxunur
+            rows = query.order_by(Degree360Participant.id.desc()).limit(page_size + 1).all()
+            total, total_is_exact = Degree360Service._estimate_participant_count(session, filters)
+
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        return {
+            "items": [
+                {
+                    "id": participant_id,
+                    "session_id": participant_session_id,
+                    "session_name": session_name,
+                    "evaluator_user_id": participant_evaluator_id,
+                    "evaluator_name": full_name or "Naməlum",
+                    "role": participant_role,
+                    "status": participant_status,
+                    "created_at": created_at
+                }
+                for (participant_id, participant_session_id, session_name, participant_evaluator_id,
+                     full_name, participant_role, participant_status, created_at) in rows
+            ],
+            "next_cursor": rows[-1][0] if has_more else None,
+            "total": total,
+            "total_is_exact": total_is_exact
+        }
+
+    @staticmethod
+    def _estimate_participant_count(session, filters) -> Tuple[int, bool]:
+        """İştirakçıların sayını ucuz üsulla qiymətləndirir: (say, dəqiqdirmi)."""
+        if not filters and session.get_bind().dialect.name == "postgresql":
+            reltuples = session.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE relname = :table_name"),
+                {"table_name": Degree360Participant.__tablename__}
+            ).scalar()
+            # Cədvəl heç analiz edilməyibsə reltuples -1 olur
+            if reltuples is not None and reltuples >= 0:
+                return int(reltuples), False
+
+        capped = select(Degree360Participant.id).where(*filters).limit(_PARTICIPANT_COUNT_CAP).subquery()
+        count = session.execute(select(func.count()).select_from(capped)).scalar() or 0
+        return count, count < _PARTICIPANT_COUNT_CAP
 
     @staticmethod
     def add_question_to_360_session(
@@ -166,12 +322,78 @@ class Degree360Service:
                 is_active=True
             )
             session.add(question)
+            # Yeni sual nəticələrin strukturunu dəyişir
+            Degree360Service._bump_answers_version(session, session_id)
             session.commit()
             session.refresh(question)
-            return question
+        Degree360Service.invalidate_360_report_cache(session_id)
+        invalidate("degree360_questions")
+        return question
+
+    @staticmethod
+    def update_360_session_status(session_id: int, status: str) -> bool:
+        """
+        360 dərəcə qiymətləndirmə sessiyasının statusunu dəyişir. Sessiya ləğv edildikdə
+        və ya bərpa olunduqda onunla kəsişən dövrlərin səriştə cəmləri həmin
+        tranzaksiyada yenidən hesablanır.
+        
+        Args:
+            session_id (int): Sessiyanın ID-si
+            status (str): Yeni status (ACTIVE, COMPLETED və ya CANCELLED)
+            
+        Returns:
+            bool: Sessiya tapılıbsa True
+            
+        Raises:
+            ValueError: Status naməlumdursa
+        """
+        if status not in DEGREE360_SESSION_STATUSES:
+            raise ValueError(f"Naməlum sessiya statusu: {status}")
+
+        with get_db() as session:
+            degree360_session = session.query(Degree360Session).filter(Degree360Session.id == session_id).first()
+            if degree360_session is None:
+                return False
+
+            was_cancelled = degree360_session.status == "CANCELLED"
+            degree360_session.status = status
+            if was_cancelled != (status == "CANCELLED"):
+                CompetencyRollupService.rebuild_for_360_session(session, session_id)
+            session.commit()
+        invalidate("degree360_sessions")
+        return True
+
+    @staticmethod
+    def set_360_question_active(question_id: int, is_active: bool) -> bool:
+        """
+        360 dərəcə qiymətləndirmə sualını aktiv və ya deaktiv edir. Deaktiv sualların
+        cavabları nəticələrdən və səriştə cəmlərindən çıxarılır.
+        
+        Args:
+            question_id (int): Sualın ID-si
+            is_active (bool): Yeni aktivlik vəziyyəti
+            
+        Returns:
+            bool: Sual tapılıbsa True
+        """
+        with get_db() as session:
+            question = session.query(Degree360Question).filter(Degree360Question.id == question_id).first()
+            if question is None:
+                return False
+
+            if bool(question.is_active) != is_active:
+                question.is_active = is_active
+                Degree360Service._bump_answers_version(session, question.session_id)
+                CompetencyRollupService.rebuild_for_360_question(session, question_id)
+            session_id = question.session_id
+            session.commit()
+        Degree360Service.invalidate_360_report_cache(session_id)
+        invalidate("degree360_questions")
+        return True
 
     @staticmethod
-    def get_questions_for_360_session(session_id: int) -> List[Degree360Question]:
+    @cached("degree360_questions", ttl=300)
+    def get_questions_for_360_session(session_id: int) -> List[Degree360QuestionDTO]:
         """
         360 dərəcə qiymətləndirmə sessiyasının bütün suallarını qaytarır.
         
@@ -179,13 +401,14 @@ class Degree360Service:
             session_id (int): Sessiyanın ID-si
             
         Returns:
-            List[Degree360Question]: Suallar siyahısı
+            List[Degree360QuestionDTO]: Suallar siyahısı
         """
         with get_db() as session:
-            return session.query(Degree360Question).filter(
+            questions = session.query(Degree360Question).filter(
                 Degree360Question.session_id == session_id,
                 Degree360Question.is_active == True
-            ).all()
+            ).order_by(Degree360Question.id).all()
+            return [Degree360QuestionDTO.from_orm(q) for q in questions]
 
     @staticmethod
     def submit_answers_for_360_participant(
@@ -203,8 +426,23 @@ class Degree360Service:
                     "score": int (1-5),
                     "comment": str (vacib deyil)
                 }
+        
+        Sessiya/sual/rol üzrə yığılmış cəmlər (degree360_aggregates) və səriştə cəmləri
+        (competency_rollups) eyni tranzaksiyada yenilənir: təkrar təsdiqdə köhnə cavabların
+        payı çıxılır, yeniləri əlavə edilir.
         """
         with get_db() as session:
+            participant = session.query(Degree360Participant).filter(
+                Degree360Participant.id == participant_id
+            ).first()
+
+            # Köhnə cavablar yalnız iştirakçı tamamlanmış olduqda cəmlərə daxildir
+            old_scores = []
+            if participant and participant.status == "COMPLETED":
+                old_scores = session.query(
+                    Degree360Answer.question_id, Degree360Answer.score
+                ).filter(Degree360Answer.participant_id == participant_id).all()
+
             # Mövcud cavabları sil
             session.query(Degree360Answer).filter(
                 Degree360Answer.participant_id == participant_id
@@ -221,11 +459,22 @@ class Degree360Service:
                 session.add(answer)
             
             # İştirakçının statusunu "COMPLETED" et
-            participant = session.query(Degree360Participant).filter(
-                Degree360Participant.id == participant_id
-            ).first()
             if participant:
+                Degree360Service._apply_360_aggregate_deltas(
+                    session,
+                    participant.session_id,
+                    participant.role,
+                    old_scores,
+                    [(a["question_id"], a["score"]) for a in answers]
+                )
+                CompetencyRollupService.apply_360_change(
+                    session,
+                    participant.session_id,
+                    old_scores,
+                    [(a["question_id"], a["score"]) for a in answers]
+                )
                 participant.status = "COMPLETED"
+                Degree360Service._bump_answers_version(session, participant.session_id)
                 
                 # Qiymətləndirmə sessiyasını əldə et
                 degree360_session = session.query(Degree360Session).filter(
@@ -249,6 +498,125 @@ class Degree360Service:
             
             session.commit()
 
+        if participant:
+            Degree360Service.invalidate_360_report_cache(participant.session_id)
+
+    @staticmethod
+    def _bump_answers_version(session, session_id: int) -> None:
+        """
+        Sessiyanın cavab versiyasını artırır ki, keşlənmiş nəticələr və hesabat köhnəlsin.
+        Commit etmir; çağıran tranzaksiyanın bir hissəsidir.
+        """
+        session.query(Degree360Session).filter(
+            Degree360Session.id == session_id
+        ).update(
+            {Degree360Session.answers_version: Degree360Session.answers_version + 1},
+            synchronize_session=False
+        )
+
+    @staticmethod
+    def invalidate_360_report_cache(session_id: Optional[int] = None) -> None:
+        """
+        Hesabat konveyerinin keşini təmizləyir.
+        
+        Args:
+            session_id (Optional[int]): Sessiyanın ID-si; None olduqda bütün keş təmizlənir
+        """
+        with _report_cache_lock:
+            if session_id is None:
+                _report_cache.clear()
+            else:
+                _report_cache.pop(session_id, None)
+
+    @staticmethod
+    def _get_360_report_pipeline(session_id: int) -> Dict[str, Any]:
+        """
+        Sessiyanın nəticələrini və hesabatını (session_id, answers_version) açarı ilə keşdən
+        qaytarır; keşdə yoxdursa, bir dəfə hesablayır.
+        
+        Args:
+            session_id (int): Sessiyanın ID-si
+            
+        Returns:
+            Dict[str, Any]: {"results": ..., "report": ...}; sessiya tapılmazsa hər ikisi boş lüğətdir
+        """
+        with get_db() as session:
+            row = session.query(
+                Degree360Session.answers_version,
+                Degree360Session.name
+            ).filter(Degree360Session.id == session_id).first()
+
+        if row is None:
+            return {"results": {}, "report": {}}
+        answers_version, session_name = row
+
+        with _report_cache_lock:
+            cached = _report_cache.get(session_id)
+            if cached is not None and cached[0] == answers_version:
+                return cached[1]
+
+        results = Degree360Service.calculate_360_results_for_sessions([session_id]).get(session_id, {})
+        pipeline = {
+            "results": results,
+            "report": Degree360Service._build_360_report(session_name, results) if results else {}
+        }
+
+        with _report_cache_lock:
+            _report_cache[session_id] = (answers_version, pipeline)
+        return pipeline
+
+    @staticmethod
+    def _apply_360_aggregate_deltas(session, session_id: int, role: Degree360ParticipantRole,
+                                    old_scores, new_scores) -> None:
+        """
+        Bir iştirakçının köhnə və yeni cavablarının fərqini yığılmış cəmlərə tətbiq edir.
+        Commit etmir; çağıran tranzaksiyanın bir hissəsidir.
+        
+        Args:
+            session: Açıq verilənlər bazası sessiyası
+            session_id (int): Sessiyanın ID-si
+            role (Degree360ParticipantRole): İştirakçının rolu
+            old_scores: Çıxılacaq (question_id, score) cütləri
+            new_scores: Əlavə ediləcək (question_id, score) cütləri
+        """
+        deltas = defaultdict(lambda: [0.0, 0, 0.0])
+        for sign, scores in ((-1, old_scores), (1, new_scores)):
+            for question_id, score in scores:
+                delta = deltas[question_id]
+                delta[0] += sign * score
+                delta[1] += sign
+                delta[2] += sign * score * score
+
+        deltas = {question_id: d for question_id, d in deltas.items() if any(d)}
+        if not deltas:
+            return
+
+        existing = {
+            aggregate.question_id: aggregate
+            for aggregate in session.query(Degree360Aggregate).filter(
+                Degree360Aggregate.session_id == session_id,
+                Degree360Aggregate.role == role,
+                Degree360Aggregate.question_id.in_(list(deltas))
+            ).with_for_update().all()
+        }
+
+        for question_id, (score_sum, score_count, score_sumsq) in deltas.items():
+            aggregate = existing.get(question_id)
+            if aggregate is None:
+                session.add(Degree360Aggregate(
+                    session_id=session_id,
+                    question_id=question_id,
+                    role=role,
+                    score_sum=score_sum,
+                    score_count=score_count,
+                    score_sumsq=score_sumsq
+                ))
+            else:
+                # Paralel təsdiqlərdə yeniləmə itməsin deyə artım SQL tərəfində edilir
+                aggregate.score_sum = Degree360Aggregate.score_sum + score_sum
+                aggregate.score_count = Degree360Aggregate.score_count + score_count
+                aggregate.score_sumsq = Degree360Aggregate.score_sumsq + score_sumsq
+
     @staticmethod
     def get_answers_for_360_participant(participant_id: int) -> List[Degree360Answer]:
         """
@@ -282,137 +650,232 @@ class Degree360Service:
                     "detailed_results": List[Dict]  # Hər bir sual üzrə ətraflı nəticələr
                 }
         """
-        with get_db() as session:
-            # Sessiyanı əldə et
-            degree360_session = session.query(Degree360Session).filter(
-                Degree360Session.id == session_id
-            ).first()
-            
-            if not degree360_session:
-                return {}
-            
-            # Qiymətləndirilən istifadəçinin adını əldə et
-            evaluated_user = session.query(User).filter(
-                User.id == degree360_session.evaluated_user_id
-            ).first()
-            evaluated_user_name = evaluated_user.get_full_name() if evaluated_user else "Naməlum"
-            
-            # Bütün iştirakçıları əldə et
-            participants = session.query(Degree360Participant).filter(
-                Degree360Participant.session_id == session_id,
-                Degree360Participant.status == "COMPLETED"
-            ).all()
+        return copy.deepcopy(Degree360Service._get_360_report_pipeline(session_id)["results"])
+
+    @staticmethod
+    def get_360_session_competency_scores(session_id: int) -> List[Dict[str, Any]]:
+        """
+        Sessiyanın nəticələrini səriştələr üzrə qaytarır. Sessiyanın aktiv suallarının
+        yığılmış cəmləri degree360_question_competency əlaqəsi ilə səriştələrə bağlanır
+        və bir qruplaşdırılmış sorğu ilə oxunur.
+        
+        Args:
+            session_id (int): Sessiyanın ID-si
             
-            if not participants:
-                return {
-                    "evaluated_user": evaluated_user_name,
-                    "overall_score": 0.0,
-                    "scores_by_role": {},
-                    "detailed_results": []
+        Returns:
+            List[Dict[str, Any]]: Orta bala görə azalan sırada, hər biri:
+                {
+                    "competency_id": int,
+                    "competency": str,
+                    "category": str,
+                    "average_score": float,
+                    "score_count": int,
+                    "scores_by_role": Dict[str, float]  # Rolun adı -> orta bal
                 }
+        """
+        link = degree360_question_competency_association.c
+        with get_db() as session:
+            rows = session.query(
+                Competency.id,
+                Competency.name,
+                Competency.category,
+                Degree360Aggregate.role,
+                func.sum(Degree360Aggregate.score_sum),
+                func.sum(Degree360Aggregate.score_count)
+            ).select_from(Degree360Aggregate).join(
+                Degree360Question, Degree360Question.id == Degree360Aggregate.question_id
+            ).join(
+                degree360_question_competency_association, link.question_id == Degree360Aggregate.question_id
+            ).join(
+                Competency, Competency.id == link.competency_id
+            ).filter(
+                Degree360Aggregate.session_id == session_id,
+                Degree360Question.is_active == True,
+                Degree360Aggregate.score_count > 0
+            ).group_by(
+                Competency.id, Competency.name, Competency.category, Degree360Aggregate.role
+            ).all()
+
+        competencies: Dict[int, Dict[str, Any]] = {}
+        for competency_id, name, category, role, score_sum, score_count in rows:
+            entry = competencies.setdefault(competency_id, {
+                "competency_id": competency_id,
+                "competency": name,
+                "category": category,
+                "score_sum": 0.0,
+                "score_count": 0,
+                "scores_by_role": {}
+            })
+            entry["score_sum"] += float(score_sum)
+            entry["score_count"] += int(score_count)
+            entry["scores_by_role"][role.value] = float(score_sum) / int(score_count)
+
+        results = []
+        for entry in competencies.values():
+            score_sum = entry.pop("score_sum")
+            entry["average_score"] = score_sum / entry["score_count"]
+            results.append(entry)
+        return sorted(results, key=lambda entry: (-entry["average_score"], entry["competency"]))
+
+    @staticmethod
+    def calculate_360_results_for_sessions(session_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Bir neçə 360 dərəcə qiymətləndirmə sessiyasının nəticələrini birlikdə hesablayır.
+        
+        Rol və sual üzrə cəmlər bütün sessiyalar üçün yığılmış cəmlər cədvəlindən
+        (session_id, question_id, role -> sum, count, sumsq) bir sorğu ilə oxunur,
+        buna görə iş həcmi cavabların deyil, sualların sayı ilə müəyyən olunur.
+        
+        Args:
+            session_ids (List[int]): Sessiyaların ID-ləri
             
-            # Bütün sualları əldə et
+        Returns:
+            Dict[int, Dict[str, Any]]: Sessiya ID-si -> calculate_360_session_results ilə eyni formada nəticə.
+                                       Tapılmayan sessiyalar nəticəyə daxil edilmir.
+        """
+        session_ids = list(set(session_ids))
+        if not session_ids:
+            return {}
+
+        with get_db() as session:
+            # Sessiyaları qiymətləndirilən istifadəçinin profili ilə birlikdə əldə et
+            degree360_sessions = session.query(Degree360Session).options(
+                joinedload(Degree360Session.evaluated_user).joinedload(User.profile)
+            ).filter(Degree360Session.id.in_(session_ids)).all()
+
+            if not degree360_sessions:
+                return {}
+
+            # Bütün sessiyaların aktiv sualları
+            questions_by_session = defaultdict(list)
             questions = session.query(Degree360Question).filter(
-                Degree360Question.session_id == session_id,
+                Degree360Question.session_id.in_(session_ids),
                 Degree360Question.is_active == True
-            ).all()
-            
-            question_scores = {}
-            role_scores = {}
-            
-            # Hər bir sual üçün qiymətləndirmələri topla
+            ).order_by(Degree360Question.id).all()
             for question in questions:
-                question_scores[question.id] = {
-                    "text": question.text,
-                    "category": question.category,
-                    "weight": question.weight,
-                    "scores_by_role": {},
-                    "average_score": 0.0
-                }
-            
-            # Hər bir iştirakçı üçün cavabları topla
-            for participant in participants:
-                # İştirakçının rolu
-                role = participant.role.value
-                
-                # Bu rola görə qiymətləndirmə sayı
-                if role not in role_scores:
-                    role_scores[role] = {"total_score": 0.0, "count": 0}
-                
-                # İştirakçının cavablarını əldə et
-                answers = session.query(Degree360Answer).filter(
-                    Degree360Answer.participant_id == participant.id
-                ).all()
-                
-                # Hər bir cavabı topla
-                for answer in answers:
-                    question_id = answer.question_id
-                    score = answer.score
-                    
-                    # Sual üzrə qiymətləri topla
-                    if question_id in question_scores:
-                        if role not in question_scores[question_id]["scores_by_role"]:
-                            question_scores[question_id]["scores_by_role"][role] = {
-                                "total_score": 0.0,
-                                "count": 0
-                            }
-                        
-                        question_scores[question_id]["scores_by_role"][role]["total_score"] += score
-                        question_scores[question_id]["scores_by_role"][role]["count"] += 1
-                        
-                        # Ümumi qiymətləri topla
-                        role_scores[role]["total_score"] += score
-                        role_scores[role]["count"] += 1
-            
-            # Hesablamaları tamamla
-            detailed_results = []
-            overall_total_score = 0.0
-            overall_count = 0
-            
-            for question_id, data in question_scores.items():
-                # Hər bir sual üzrə orta qiyməti hesabla
-                question_total_score = 0.0
-                question_count = 0
-                
-                for role, role_data in data["scores_by_role"].items():
-                    role_average = role_data["total_score"] / role_data["count"] if role_data["count"] > 0 else 0
-                    data["scores_by_role"][role]["average_score"] = role_average
-                    
-                    question_total_score += role_data["total_score"]
-                    question_count += role_data["count"]
-                
-                question_average = question_total_score / question_count if question_count > 0 else 0
-                data["average_score"] = question_average
-                
-                detailed_results.append({
-                    "question": data["text"],
-                    "category": data["category"],
-                    "weight": data["weight"],
-                    "average_score": round(question_average, 2),
-                    "scores_by_role": {
-                        role: round(role_data["average_score"], 2) 
-                        for role, role_data in data["scores_by_role"].items()
-                    }
-                })
-                
-                overall_total_score += question_total_score
-                overall_count += question_count
-            
-            # Ümumi orta qiyməti hesabla
-            overall_average = overall_total_score / overall_count if overall_count > 0 else 0.0
-            
-            # Rol üzrə orta qiymətləri hesabla
-            roles_average = {}
-            for role, role_data in role_scores.items():
-                role_average = role_data["total_score"] / role_data["count"] if role_data["count"] > 0 else 0
-                roles_average[role] = round(role_average, 2)
-            
+                questions_by_session[question.session_id].append(question)
+
+            # Tamamlanmış iştirakçıların rolları: cavabı olmayan iştirakçıların rolu da
+            # nəticədə görünməlidir
+            aggregates_by_session = defaultdict(list)
+            completed_roles = session.query(
+                Degree360Participant.session_id,
+                Degree360Participant.role
+            ).filter(
+                Degree360Participant.session_id.in_(session_ids),
+                Degree360Participant.status == "COMPLETED"
+            ).distinct().all()
+            for session_id, role in completed_roles:
+                aggregates_by_session[session_id].append((None, role.value, 0.0, 0, 0.0))
+
+            # (session_id, question_id, role) -> sum, count, sumsq
+            aggregates = session.query(
+                Degree360Aggregate.session_id,
+                Degree360Aggregate.question_id,
+                Degree360Aggregate.role,
+                Degree360Aggregate.score_sum,
+                Degree360Aggregate.score_count,
+                Degree360Aggregate.score_sumsq
+            ).filter(
+                Degree360Aggregate.session_id.in_(session_ids),
+                Degree360Aggregate.score_count > 0
+            ).all()
+            for session_id, question_id, role, score_sum, score_count, score_sumsq in aggregates:
+                aggregates_by_session[session_id].append(
+                    (question_id, role.value, float(score_sum), score_count, float(score_sumsq))
+                )
+
+            results = {}
+            for degree360_session in degree360_sessions:
+                evaluated_user = degree360_session.evaluated_user
+                results[degree360_session.id] = Degree360Service._build_360_results(
+                    evaluated_user.get_full_name() if evaluated_user else "Naməlum",
+                    questions_by_session[degree360_session.id],
+                    aggregates_by_session.get(degree360_session.id)
+                )
+            return results
+
+    @staticmethod
+    def _build_360_results(evaluated_user_name: str, questions, aggregates) -> Dict[str, Any]:
+        """
+        Bir sessiyanın qruplaşdırılmış cəmlərindən nəticə strukturunu qurur.
+        
+        Args:
+            evaluated_user_name (str): Qiymətləndirilən istifadəçinin adı
+            questions: Sessiyanın aktiv sualları
+            aggregates: (question_id, role, total_score, count, total_sumsq) sətirləri və ya
+                        None əgər tamamlanmış iştirakçı yoxdursa
+        """
+        if not aggregates:
             return {
                 "evaluated_user": evaluated_user_name,
-                "overall_score": round(overall_average, 2),
-                "scores_by_role": roles_average,
-                "detailed_results": detailed_results
+                "overall_score": 0.0,
+                "scores_by_role": {},
+                "detailed_results": []
+            }
+
+        question_scores = {
+            question.id: {
+                "text": question.text,
+                "category": question.category,
+                "weight": question.weight,
+                "sumsq": 0.0,
+                "scores_by_role": {}
             }
+            for question in questions
+        }
+        role_scores = {}
+
+        for question_id, role, total_score, count, total_sumsq in aggregates:
+            role_data = role_scores.setdefault(role, {"total_score": 0.0, "count": 0})
+            # Aktiv olmayan və ya başqa sessiyaya aid suallara verilən cavablar nəzərə alınmır
+            if question_id not in question_scores:
+                continue
+            question_role = question_scores[question_id]["scores_by_role"].setdefault(
+                role, {"total_score": 0.0, "count": 0}
+            )
+            question_role["total_score"] += total_score
+            question_role["count"] += count
+            question_scores[question_id]["sumsq"] += total_sumsq
+            role_data["total_score"] += total_score
+            role_data["count"] += count
+
+        detailed_results = []
+        overall_total_score = 0.0
+        overall_count = 0
+
+        for data in question_scores.values():
+            question_total_score = sum(r["total_score"] for r in data["scores_by_role"].values())
+            question_count = sum(r["count"] for r in data["scores_by_role"].values())
+            question_average = question_total_score / question_count if question_count > 0 else 0
+            question_variance = data["sumsq"] / question_count - question_average ** 2 if question_count > 0 else 0
+
+            detailed_results.append({
+                "question": data["text"],
+                "category": data["category"],
+                "weight": data["weight"],
+                "average_score": round(question_average, 2),
+                "std_dev": round(math.sqrt(max(question_variance, 0.0)), 2),
+                "scores_by_role": {
+                    role: round(r["total_score"] / r["count"] if r["count"] > 0 else 0, 2)
+                    for role, r in data["scores_by_role"].items()
+                }
+            })
+
+            overall_total_score += question_total_score
+            overall_count += question_count
+
+        overall_average = overall_total_score / overall_count if overall_count > 0 else 0.0
+
+        return {
+            "evaluated_user": evaluated_user_name,
+            "overall_score": round(overall_average, 2),
+            "scores_by_role": {
+                role: round(r["total_score"] / r["count"] if r["count"] > 0 else 0, 2)
+                for role, r in role_scores.items()
+            },
+            "detailed_results": detailed_results
+        }
 
     @staticmethod
     def get_pending_360_evaluations_for_user(user_id: int) -> List[Dict[str, Any]]:
@@ -455,57 +918,112 @@ class Degree360Service:
             return pending_evaluations
             
     @staticmethod
-    def send_360_reminders() -> None:
+    def send_360_reminders(
+        days_before_end: Optional[int] = None,
+        dedup_window_hours: Optional[int] = None,
+        now: Optional[datetime] = None
+    ) -> Dict[str, int]:
         """
         360 dərəcə qiymətləndirmələr üçün xatırlatma bildirişləri göndərir.
-        Bitmə tarixinə 3 gün qalmış iştirakçılara xatırlatma göndərilir.
-        """
-        from datetime import timedelta
         
-        with get_db() as session:
-            # Bitmə tarixinə 3 gün qalmış aktiv sessiyaları tap
-            reminder_date = date.today() + timedelta(days=3)
+        Bitmə tarixinə days_before_end gün və ya daha az qalmış aktiv sessiyaların bütün
+        tamamlanmamış iştirakçıları bir sorğu ilə seçilir. Son dedup_window_hours saat ərzində
+        həmin sessiya üçün artıq xatırlatma almış istifadəçilər (bildirişin kind/source_id
+        sahələrinə görə) ötürülür, qalanlarına bildirişlər hər sessiya üçün
+        NotificationService.create_notifications_bulk ilə yazılır.
+        
+        Args:
+            days_before_end (int, optional): Xatırlatma pəncərəsi (gün); default REMINDER_360_DAYS_BEFORE_END
+            dedup_window_hours (int, optional): Təkrar göndərmə qadağası (saat); default REMINDER_360_DEDUP_HOURS
+            now (datetime, optional): Cari vaxt (testlər üçün)
             
-            sessions = session.query(Degree360Session).filter(
+        Returns:
+            Dict[str, int]: {"candidates": ..., "created": ..., "skipped": ...}
+        """
+        if days_before_end is None:
+            days_before_end = settings.REMINDER_360_DAYS_BEFORE_END
+        if dedup_window_hours is None:
+            dedup_window_hours = settings.REMINDER_360_DEDUP_HOURS
+        now = now or datetime.utcnow()
+        today = now.date()
+
+        already_reminded = select(Notification.id).where(
+            Notification.user_id == Degree360Participant.evaluator_user_id,
+            Notification.kind == NOTIFICATION_KIND_360_REMINDER,
+            Notification.source_id == Degree360Session.id,
+            Notification.created_at >= now - timedelta(hours=dedup_window_hours)
+        ).exists()
+
+        with get_db() as session:
+            candidates = session.query(
+                Degree360Participant.evaluator_user_id,
+                Degree360Session.id,
+                Degree360Session.name,
+                Degree360Session.end_date,
+                already_reminded
+            ).join(
+                Degree360Session, Degree360Session.id == Degree360Participant.session_id
+            ).join(
+                User, User.id == Degree360Participant.evaluator_user_id
+            ).filter(
                 Degree360Session.status == "ACTIVE",
-                Degree360Session.end_date == reminder_date
-            ).all()
-            
-            for degree360_session in sessions:
-                # Hələ tamamlamamış iştirakçıları tap
-                participants = session.query(Degree360Participant).filter(
-                    Degree360Participant.session_id == degree360_session.id,
-                    Degree360Participant.status == "PENDING"
-                ).all()
-                
-                for participant in participants:
-                    evaluator_user = session.query(User).filter(
-                        User.id == participant.evaluator_user_id
-                    ).first()
-                    
-                    if evaluator_user:
-                        NotificationService.create_notification(
-                            user_id=participant.evaluator_user_id,
-                            message=f"Xatırlatma: {degree360_session.name} 360° qiymətləndirmə sessiyasının bitməsinə 3 gün qalıb. Zəhmət olmasa, rəyinizi bildirin."
-                        )
-                        
+                Degree360Session.end_date >= today,
+                Degree360Session.end_date <= today + timedelta(days=days_before_end),
+                Degree360Participant.status == "PENDING",
+                User.is_active == True
+            ).distinct().all()
+
+        # Mesaj sessiyadan asılıdır, ona görə hər sessiya üçün bir toplu yazı edilir
+        recipients_by_session = defaultdict(list)
+        session_info = {}
+        for user_id, session_id, session_name, end_date, reminded in candidates:
+            session_info[session_id] = (session_name, end_date)
+            if not reminded:
+                recipients_by_session[session_id].append(user_id)
+
+        created = 0
+        for session_id, user_ids in recipients_by_session.items():
+            session_name, end_date = session_info[session_id]
+            created += NotificationService.create_notifications_bulk(
+                user_ids,
+                _REMINDER_360_TEMPLATE,
+                context={"session_name": session_name, "days_left": (end_date - today).days},
+                kind=NOTIFICATION_KIND_360_REMINDER,
+                source_id=session_id,
+                created_at=now
+            )["created"]
+
+        return {
+            "candidates": len(candidates),
+            "created": created,
+            "skipped": len(candidates) - created
+        }
+
     @staticmethod
-    def get_all_active_360_sessions() -> List[Degree360Session]:
+    @cached("degree360_sessions", ttl=60)
+    def get_all_active_360_sessions(load: str = LOAD_SELECTIN) -> List[Degree360SessionDTO]:
         """
         Bütün aktiv 360 dərəcə qiymətləndirmə sessiyalarını qaytarır.
         
+        Args:
+            load (str): Əlaqələrin yükləmə profili ("selectin" və ya "joined")
+            
         Returns:
-            List[Degree360Session]: Aktiv sessiyalar siyahısı
+            List[Degree360SessionDTO]: Aktiv sessiyalar siyahısı
         """
         with get_db() as session:
-            return session.query(Degree360Session).filter(
+            sessions = session.query(Degree360Session).options(
+                *degree360_session_load_options(load)
+            ).filter(
                 Degree360Session.status == "ACTIVE"
             ).all()
+            return [Degree360SessionDTO.from_orm(s) for s in sessions]
             
     @staticmethod
     def generate_360_report(session_id: int) -> Dict[str, Any]:
         """
         360 dərəcə qiymətləndirmə üçün PDF hesabat generasiya edir.
+        Nəticələr calculate_360_session_results ilə ortaq keşdən götürülür.
         
         Args:
             session_id (int): Sessiyanın ID-si
@@ -513,79 +1031,79 @@ class Degree360Service:
         Returns:
             Dict[str, Any]: Hesabat məlumatları və statistikalar
         """
-        # Əsas nəticələri əldə edirik
-        results = Degree360Service.calculate_360_session_results(session_id)
-        
-        if not results:
+        report = Degree360Service._get_360_report_pipeline(session_id)["report"]
+        if not report:
             return {}
-            
-        with get_db() as session:
-            # Sessiyanı əldə et
-            degree360_session = session.query(Degree360Session).filter(
-                Degree360Session.id == session_id
-            ).first()
-            
-            if not degree360_session:
-                return {}
+
+        report_data = copy.deepcopy(report)
+        report_data["generated_date"] = datetime.now().strftime("%d.%m.%Y %H:%M")
+        return report_data
+
+    @staticmethod
+    def _build_360_report(session_name: str, results: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Nəticələrdən güclü/zəif tərəfləri və gap analizini çıxararaq hesabat məlumatlarını qurur.
+        
+        Args:
+            session_name (str): Sessiyanın adı
+            results (Dict[str, Any]): calculate_360_session_results formatında nəticələr
+        """
+        # Güclü və zəif tərəfləri müəyyən etmək üçün analiz
+        strengths = []
+        weaknesses = []
+        
+        for result in results.get("detailed_results", []):
+            avg_score = result.get("average_score", 0)
+            # 4.0 və yuxarı bal güclü tərəf kimi qəbul edilir
+            if avg_score >= 4.0:
+                strengths.append({
+                    "question": result["question"],
+                    "category": result["category"],
+                    "score": avg_score
+                })
+            # 2.5 və aşağı bal zəif tərəf kimi qəbul edilir
+            elif avg_score <= 2.5:
+                weaknesses.append({
+                    "question": result["question"],
+                    "category": result["category"],
+                    "score": avg_score
+                })
+        
+        # Öz və başqalarının qiyməti arasındakı fərq analizi (gap analysis)
+        gap_analysis = []
+        detailed_results = results.get("detailed_results", [])
+        
+        for result in detailed_results:
+            scores_by_role = result.get("scores_by_role", {})
+            if scores_by_role:
+                # Öz qiymətləndirməsi və digər rolların qiymətləndirmələri arasında fərq
+                self_score = scores_by_role.get("Özünü qiymətləndirən", 0)
+                other_scores = [score for role, score in scores_by_role.items() if role != "Özünü qiymətləndirən"]
                 
-            # Güclü və zəif tərəfləri müəyyən etmək üçün analiz
-            strengths = []
-            weaknesses = []
-            
-            for result in results.get("detailed_results", []):
-                avg_score = result.get("average_score", 0)
-                # 4.0 və yuxarı bal güclü tərəf kimi qəbul edilir
-                if avg_score >= 4.0:
-                    strengths.append({
-                        "question": result["question"],
-                        "category": result["category"],
-                        "score": avg_score
-                    })
-                # 2.5 və aşağı bal zəif tərəf kimi qəbul edilir
-                elif avg_score <= 2.5:
-                    weaknesses.append({
+                if other_scores and self_score > 0:
+                    avg_other_score = sum(other_scores) / len(other_scores)
+                    gap = avg_other_score - self_score
+                    
+                    gap_analysis.append({
                         "question": result["question"],
                         "category": result["category"],
-                        "score": avg_score
+                        "self_score": self_score,
+                        "others_avg_score": round(avg_other_score, 2),
+                        "gap": round(gap, 2),
+                        "interpretation": "Özünü qiymətləndirməsi aşağıdır" if gap > 0.5 else 
+                                        "Özünü qiymətləndirməsi yüksəkdir" if gap < -0.5 else 
+                                        "Uyğundur"
                     })
-            
-            # Öz və başqalarının qiyməti arasındakı fərq analizi (gap analysis)
-            gap_analysis = []
-            detailed_results = results.get("detailed_results", [])
-            
-            for result in detailed_results:
-                scores_by_role = result.get("scores_by_role", {})
-                if scores_by_role:
-                    # Öz qiymətləndirməsi və digər rolların qiymətləndirmələri arasında fərq
-                    self_score = scores_by_role.get("Özünü qiymətləndirən", 0)
-                    other_scores = [score for role, score in scores_by_role.items() if role != "Özünü qiymətləndirən"]
-                    
-                    if other_scores and self_score > 0:
-                        avg_other_score = sum(other_scores) / len(other_scores)
-                        gap = avg_other_score - self_score
-                        
-                        gap_analysis.append({
-                            "question": result["question"],
-                            "category": result["category"],
-                            "self_score": self_score,
-                            "others_avg_score": round(avg_other_score, 2),
-                            "gap": round(gap, 2),
-                            "interpretation": "Özünü qiymətləndirməsi aşağıdır" if gap > 0.5 else 
-                                            "Özünü qiymətləndirməsi yüksəkdir" if gap < -0.5 else 
-                                            "Uyğundur"
-                        })
-            
-            # Hesabat məlumatlarını hazırlayırıq
-            report_data = {
-                "session_name": degree360_session.name,
-                "evaluated_user": results.get("evaluated_user", "Naməlum"),
-                "generated_date": datetime.now().strftime("%d.%m.%Y %H:%M"),
-                "overall_score": results.get("overall_score", 0),
-                "scores_by_role": results.get("scores_by_role", {}),
-                "strengths": strengths,
-                "weaknesses": weaknesses,
-                "gap_analysis": gap_analysis,
-                "detailed_results": detailed_results
-            }
-            
-            return report_data
\ No newline at end of file
+        
+        # Hesabat məlumatlarını hazırlayırıq
+        return {
+            "session_name": session_name,
+            "evaluated_user": results.get("evaluated_user", "Naməlum"),
+            "generated_date": datetime.now().strftime("%d.%m.%Y %H:%M"),
+            "overall_score": results.get("overall_score", 0),
+            "scores_by_role": results.get("scores_by_role", {}),
+            "strengths": strengths,
+            "weaknesses": weaknesses,
+            "gap_analysis": gap_analysis,
+            "detailed_results": detailed_results
+        }
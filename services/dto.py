@@ -0,0 +1,381 @@
+# services/dto.py
+
+"""
+Servislərin oxuma API-ləri üçün dəyişməz məlumat obyektləri (DTO) və
+əlaqələrin əvvəlcədən yüklənməsi (eager loading) profilləri.
+
+Servis sessiyası bağlandıqdan sonra ORM obyektlərinə müraciət lazy load və ya
+DetachedInstanceError yaradır. DTO-lar sessiya açıq ikən tam doldurulur, buna
+görə səhifələr sətir sayından asılı olmayaraq sabit sayda sorğu göndərir.
+"""
+
+import datetime
+import enum
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy.orm import joinedload, selectinload
+
+from models.user import User
+from models.kpi import Evaluation, EvaluationPeriod, Question
+from models.degree360 import Degree360Session, Degree360Participant, Degree360Question
+from models.competency import Competency
+from models.pdp import DevelopmentPlan, PlanItemComment
+from models.job import Job, JOB_FINISHED_STATUSES
+
+
+LOAD_SELECTIN = "selectin"
+LOAD_JOINED = "joined"
+
+_LOADERS = {
+    LOAD_SELECTIN: selectinload,
+    LOAD_JOINED: joinedload,
+}
+
+
+def _loader(load: str):
+    """Yükləmə profilinin adına görə SQLAlchemy loader funksiyasını qaytarır."""
+    try:
+        return _LOADERS[load]
+    except KeyError:
+        raise ValueError(f"Naməlum yükləmə profili: {load}. Mümkün dəyərlər: {', '.join(_LOADERS)}")
+
+
+def _user_with_profile(loader, relationship_attr):
+    return loader(relationship_attr).joinedload(User.profile)
+
+
+def evaluation_load_options(load: str = LOAD_SELECTIN) -> list:
+    """Evaluation üçün period, evaluated_user.profile və evaluator_user.profile yükləmə seçimləri."""
+    loader = _loader(load)
+    return [
+        loader(Evaluation.period),
+        _user_with_profile(loader, Evaluation.evaluated_user),
+        _user_with_profile(loader, Evaluation.evaluator_user),
+    ]
+
+
+def degree360_session_load_options(load: str = LOAD_SELECTIN) -> list:
+    """Degree360Session üçün evaluated_user.profile və evaluator_user.profile yükləmə seçimləri."""
+    loader = _loader(load)
+    return [
+        _user_with_profile(loader, Degree360Session.evaluated_user),
+        _user_with_profile(loader, Degree360Session.evaluator_user),
+    ]
+
+
+def degree360_participant_load_options(load: str = LOAD_SELECTIN) -> list:
+    """Degree360Participant üçün evaluator_user.profile yükləmə seçimləri."""
+    loader = _loader(load)
+    return [_user_with_profile(loader, Degree360Participant.evaluator_user)]
+
+
+def development_plan_load_options(load: str = LOAD_SELECTIN) -> list:
+    """DevelopmentPlan üçün evaluation.period, user.profile və manager.profile yükləmə seçimləri."""
+    loader = _loader(load)
+    return [
+        loader(DevelopmentPlan.evaluation).joinedload(Evaluation.period),
+        _user_with_profile(loader, DevelopmentPlan.user),
+        _user_with_profile(loader, DevelopmentPlan.manager),
+    ]
+
+
+def plan_item_comment_load_options(load: str = LOAD_SELECTIN) -> list:
+    """PlanItemComment üçün author.profile yükləmə seçimləri."""
+    loader = _loader(load)
+    return [_user_with_profile(loader, PlanItemComment.author)]
+
+
+@dataclass(frozen=True)
+class UserDTO:
+    id: int
+    username: str
+    role: str
+    is_active: bool
+    manager_id: Optional[int]
+    full_name: Optional[str]
+    position: Optional[str]
+    department: Optional[str]
+
+    def get_full_name(self) -> str:
+        return self.full_name or "Naməlum"
+
+    @classmethod
+    def from_orm(cls, user: Optional[User]) -> Optional["UserDTO"]:
+        if user is None:
+            return None
+        profile = user.profile
+        return cls(
+            id=user.id,
+            username=user.username,
+            role=user.role,
+            is_active=user.is_active,
+            manager_id=user.manager_id,
+            full_name=profile.full_name if profile else None,
+            position=profile.position if profile else None,
+            department=profile.department if profile else None,
+        )
+
+
+@dataclass(frozen=True)
+class PeriodDTO:
+    id: int
+    name: str
+    start_date: datetime.date
+    end_date: datetime.date
+    is_active: bool
+
+    @classmethod
+    def from_orm(cls, period: Optional[EvaluationPeriod]) -> Optional["PeriodDTO"]:
+        if period is None:
+            return None
+        return cls(
+            id=period.id,
+            name=period.name,
+            start_date=period.start_date,
+            end_date=period.end_date,
+            is_active=period.is_active,
+        )
+
+
+@dataclass(frozen=True)
+class EvaluationDTO:
+    id: int
+    period_id: int
+    evaluated_user_id: int
+    evaluator_user_id: int
+    status: enum.Enum
+    period: Optional[PeriodDTO]
+    evaluated_user: Optional[UserDTO]
+    evaluator_user: Optional[UserDTO]
+
+    @classmethod
+    def from_orm(cls, evaluation: Optional[Evaluation]) -> Optional["EvaluationDTO"]:
+        if evaluation is None:
+            return None
+        return cls(
+            id=evaluation.id,
+            period_id=evaluation.period_id,
+            evaluated_user_id=evaluation.evaluated_user_id,
+            evaluator_user_id=evaluation.evaluator_user_id,
+            status=evaluation.status,
+            period=PeriodDTO.from_orm(evaluation.period),
+            evaluated_user=UserDTO.from_orm(evaluation.evaluated_user),
+            evaluator_user=UserDTO.from_orm(evaluation.evaluator_user),
+        )
+
+
+@dataclass(frozen=True)
+class Degree360SessionDTO:
+    id: int
+    name: str
+    evaluated_user_id: int
+    evaluator_user_id: int
+    start_date: datetime.date
+    end_date: datetime.date
+    is_anonymous: bool
+    status: str
+    created_at: Optional[datetime.datetime]
+    evaluated_user: Optional[UserDTO]
+    evaluator_user: Optional[UserDTO]
+
+    @classmethod
+    def from_orm(cls, session: Optional[Degree360Session]) -> Optional["Degree360SessionDTO"]:
+        if session is None:
+            return None
+        return cls(
+            id=session.id,
+            name=session.name,
+            evaluated_user_id=session.evaluated_user_id,
+            evaluator_user_id=session.evaluator_user_id,
+            start_date=session.start_date,
+            end_date=session.end_date,
+            is_anonymous=session.is_anonymous,
+            status=session.status,
+            created_at=session.created_at,
+            evaluated_user=UserDTO.from_orm(session.evaluated_user),
+            evaluator_user=UserDTO.from_orm(session.evaluator_user),
+        )
+
+
+@dataclass(frozen=True)
+class Degree360ParticipantDTO:
+    id: int
+    session_id: int
+    evaluator_user_id: int
+    role: enum.Enum
+    status: str
+    created_at: Optional[datetime.datetime]
+    evaluator_user: Optional[UserDTO]
+
+    @classmethod
+    def from_orm(cls, participant: Optional[Degree360Participant]) -> Optional["Degree360ParticipantDTO"]:
+        if participant is None:
+            return None
+        return cls(
+            id=participant.id,
+            session_id=participant.session_id,
+            evaluator_user_id=participant.evaluator_user_id,
+            role=participant.role,
+            status=participant.status,
+            created_at=participant.created_at,
+            evaluator_user=UserDTO.from_orm(participant.evaluator_user),
+        )
+
+
+@dataclass(frozen=True)
+class DevelopmentPlanDTO:
+    id: int
+    user_id: int
+    evaluation_id: int
+    manager_id: Optional[int]
+    status: str
+    evaluation: Optional[EvaluationDTO]
+    user: Optional[UserDTO]
+    manager: Optional[UserDTO]
+
+    @classmethod
+    def from_orm(cls, plan: Optional[DevelopmentPlan]) -> Optional["DevelopmentPlanDTO"]:
+        if plan is None:
+            return None
+        evaluation = plan.evaluation
+        return cls(
+            id=plan.id,
+            user_id=plan.user_id,
+            evaluation_id=plan.evaluation_id,
+            manager_id=plan.manager_id,
+            status=plan.status,
+            evaluation=EvaluationDTO(
+                id=evaluation.id,
+                period_id=evaluation.period_id,
+                evaluated_user_id=evaluation.evaluated_user_id,
+                evaluator_user_id=evaluation.evaluator_user_id,
+                status=evaluation.status,
+                period=PeriodDTO.from_orm(evaluation.period),
+                evaluated_user=None,
+                evaluator_user=None,
+            ) if evaluation else None,
+            user=UserDTO.from_orm(plan.user),
+            manager=UserDTO.from_orm(plan.manager),
+        )
+
+
+@dataclass(frozen=True)
+class PlanItemCommentDTO:
+    id: int
+    item_id: int
+    author_id: int
+    comment_text: str
+    created_at: Optional[datetime.datetime]
+    author: Optional[UserDTO]
+
+    @classmethod
+    def from_orm(cls, comment: Optional[PlanItemComment]) -> Optional["PlanItemCommentDTO"]:
+        if comment is None:
+            return None
+        return cls(
+            id=comment.id,
+            item_id=comment.item_id,
+            author_id=comment.author_id,
+            comment_text=comment.comment_text,
+            created_at=comment.created_at,
+            author=UserDTO.from_orm(comment.author),
+        )
+
+
+@dataclass(frozen=True)
+class QuestionDTO:
+    id: int
+    text: str
+    category: Optional[str]
+    weight: float
+    is_active: bool
+
+    @classmethod
+    def from_orm(cls, question: Optional[Question]) -> Optional["QuestionDTO"]:
+        if question is None:
+            return None
+        return cls(
+            id=question.id,
+            text=question.text,
+            category=question.category,
+            weight=question.weight,
+            is_active=question.is_active,
+        )
+
+
+@dataclass(frozen=True)
+class Degree360QuestionDTO:
+    id: int
+    session_id: int
+    text: str
+    category: Optional[str]
+    weight: int
+    is_active: bool
+
+    @classmethod
+    def from_orm(cls, question: Optional[Degree360Question]) -> Optional["Degree360QuestionDTO"]:
+        if question is None:
+            return None
+        return cls(
+            id=question.id,
+            session_id=question.session_id,
+            text=question.text,
+            category=question.category,
+            weight=question.weight,
+            is_active=question.is_active,
+        )
+
+
+@dataclass(frozen=True)
+class CompetencyDTO:
+    id: int
+    name: str
+    description: Optional[str]
+    category: Optional[str]
+
+    @classmethod
+    def from_orm(cls, competency: Optional[Competency]) -> Optional["CompetencyDTO"]:
+        if competency is None:
+            return None
+        return cls(
+            id=competency.id,
+            name=competency.name,
+            description=competency.description,
+            category=competency.category,
+        )
+
+
+@dataclass(frozen=True)
+class JobDTO:
+    id: int
+    kind: str
+    status: str
+    progress: float
+    progress_message: Optional[str]
+    error: Optional[str]
+    created_by: Optional[int]
+    created_at: Optional[datetime.datetime]
+    started_at: Optional[datetime.datetime]
+    finished_at: Optional[datetime.datetime]
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in JOB_FINISHED_STATUSES
+
+    @classmethod
+    def from_orm(cls, job: Optional[Job]) -> Optional["JobDTO"]:
+        if job is None:
+            return None
+        return cls(
+            id=job.id,
+            kind=job.kind,
+            status=job.status,
+            progress=job.progress or 0.0,
+            progress_message=job.progress_message,
+            error=job.error,
+            created_by=job.created_by,
+            created_at=job.created_at,
+            started_at=job.started_at,
+            finished_at=job.finished_at,
+        )
@@ -0,0 +1,302 @@
+# services/export_service.py
+
+"""
+Böyük hesabatların axınla (streaming) ixracı.
+
+Sətirlər verilənlər bazasından server tərəfli kursorla (yield_per) hissə-hissə oxunur
+və dərhal faylaya yazılır: Excel üçün xlsxwriter-in constant_memory rejimi (hər sətir
+yazıldıqdan sonra diskə köçürülür), CSV üçün isə adi sətir yazısı istifadə olunur.
+Buna görə yaddaş istifadəsi hesabatın ölçüsündən deyil, hissənin ölçüsündən asılıdır.
+Servis Streamlit-dən asılı deyil və scripts/export_period_report.py ilə CLI-dən də çağırılır.
+"""
+
+import csv
+import enum
+import io
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, List, Optional, Sequence, Union
+
+import pandas as pd
+import xlsxwriter
+from sqlalchemy import func, select
+from sqlalchemy.orm import aliased
+
+from config import settings
+from database import get_db
+from models.kpi import Answer, Evaluation, EvaluationPeriod, EvaluationScore, Question
+from models.user_profile import UserProfile
+from services.kpi_service import KpiService
+
+
+FORMAT_XLSX = "xlsx"
+FORMAT_CSV = "csv"
+EXPORT_FORMATS = (FORMAT_XLSX, FORMAT_CSV)
+
+# Excel vərəqinin maksimum sətir sayı (başlıq daxil); artıq sətirlər növbəti vərəqə keçir
+XLSX_MAX_ROWS = 1_048_576
+
+SCORE_COLUMNS = ["Qiymətləndirmə ID", "Əməkdaş", "Şöbə", "Vəzifə", "Status",
+                 "İşçinin balı", "Rəhbərin balı", "Yekun bal"]
+ANSWER_COLUMNS = ["Qiymətləndirmə ID", "Əməkdaş", "Şöbə", "Vəzifə", "Qiymətləndirən",
+                  "Müəllif", "Sual", "Kateqoriya", "Çəki", "Bal", "Şərh"]
+
+
+@dataclass(frozen=True)
+class ExportTable:
+    """
+    İxrac ediləcək cədvəl: vərəqin adı, sütun başlıqları və sətir hissələri.
+    chunks yalnız bir dəfə oxunur (adətən generatordur).
+    """
+    name: str
+    columns: Sequence[str]
+    chunks: Iterable[Sequence[Sequence[Any]]]
+
+
+def _cell(value):
+    # Enum-lar (məsələn, status) oxunaqlı qiyməti ilə yazılır
+    return value.value if isinstance(value, enum.Enum) else value
+
+
+def _dataframe_cell(value):
+    # Lüğət və siyahılar (məsələn, rol üzrə ballar) mətn kimi yazılır, NaN boş xanadır
+    if isinstance(value, (dict, list, tuple, set)):
+        return str(value)
+    if pd.isna(value):
+        return None
+    return _cell(value)
+
+
+class ExportService:
+    @staticmethod
+    def _stream_rows(statement, chunk_size: Optional[int] = None) -> Iterator[List[tuple]]:
+        """
+        Sorğunun nəticəsini hissə-hissə qaytarır. yield_per server tərəfli kursoru
+        aktivləşdirir, buna görə nəticə bütövlükdə yaddaşa yüklənmir.
+        """
+        chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+        with get_db() as session:
+            result = session.execute(statement.execution_options(yield_per=chunk_size))
+            for partition in result.partitions():
+                yield [tuple(_cell(value) for value in row) for row in partition]
+
+    @staticmethod
+    def iter_period_score_rows(period_id: int, chunk_size: Optional[int] = None) -> Iterator[List[tuple]]:
+        """
+        Dövrün qiymətləndirmələri üzrə yekun balları (SCORE_COLUMNS sırası ilə) hissə-hissə qaytarır.
+
+        Args:
+            period_id (int): Dövrün ID-si
+            chunk_size (Optional[int]): Hissənin ölçüsü; None olduqda EXPORT_CHUNK_SIZE
+        """
+        statement = select(
+            Evaluation.id,
+            UserProfile.full_name,
+            UserProfile.department,
+            UserProfile.position,
+            Evaluation.status,
+            EvaluationScore.employee_score,
+            EvaluationScore.manager_score,
+            # Yekun bal UI-dakı kimi hesablanır: saxlanılmış bal, yoxdursa cavablardan
+            KpiService._evaluation_score_expression()
+        ).select_from(Evaluation).outerjoin(
+            EvaluationScore, EvaluationScore.evaluation_id == Evaluation.id
+        ).outerjoin(
+            UserProfile, UserProfile.user_id == Evaluation.evaluated_user_id
+        ).where(
+            Evaluation.period_id == period_id
+        ).order_by(Evaluation.id)
+        return ExportService._stream_rows(statement, chunk_size)
+
+    @staticmethod
+    def iter_period_answer_rows(period_id: int, chunk_size: Optional[int] = None) -> Iterator[List[tuple]]:
+        """
+        Dövrün bütün cavablarını sual və iştirakçı məlumatları ilə (ANSWER_COLUMNS sırası ilə)
+        hissə-hissə qaytarır.
+
+        Args:
+            period_id (int): Dövrün ID-si
+            chunk_size (Optional[int]): Hissənin ölçüsü; None olduqda EXPORT_CHUNK_SIZE
+        """
+        evaluated_profile = aliased(UserProfile)
+        evaluator_profile = aliased(UserProfile)
+        statement = select(
+            Evaluation.id,
+            evaluated_profile.full_name,
+            evaluated_profile.department,
+            evaluated_profile.position,
+            evaluator_profile.full_name,
+            Answer.author_role,
+            Question.text,
+            Question.category,
+            Question.weight,
+            Answer.score,
+            Answer.comment
+        ).select_from(Answer).join(
+            Evaluation, Evaluation.id == Answer.evaluation_id
+        ).join(
+            Question, Question.id == Answer.question_id
+        ).outerjoin(
+            evaluated_profile, evaluated_profile.user_id == Evaluation.evaluated_user_id
+        ).outerjoin(
+            evaluator_profile, evaluator_profile.user_id == Evaluation.evaluator_user_id
+        ).where(
+            Evaluation.period_id == period_id
+        ).order_by(Evaluation.id, Answer.id)
+        return ExportService._stream_rows(statement, chunk_size)
+
+    @staticmethod
+    def count_period_report_rows(period_id: int, fmt: str = FORMAT_XLSX) -> int:
+        """
+        export_period_report-un yazacağı sətirlərin sayını qaytarır (gedişatı faizlə göstərmək üçün).
+
+        Args:
+            period_id (int): Dövrün ID-si
+            fmt (str): FORMAT_XLSX və ya FORMAT_CSV
+        """
+        with get_db() as session:
+            answers = session.query(func.count(Answer.id)).join(
+                Evaluation, Evaluation.id == Answer.evaluation_id
+            ).filter(Evaluation.period_id == period_id).scalar() or 0
+            if fmt == FORMAT_CSV:
+                return answers
+            evaluations = session.query(func.count(Evaluation.id)).filter(
+                Evaluation.period_id == period_id
+            ).scalar() or 0
+            return answers + evaluations
+
+    @staticmethod
+    def dataframe_table(name: str, df: pd.DataFrame, chunk_size: Optional[int] = None) -> ExportTable:
+        """Kiçik, artıq yaddaşda olan DataFrame-i ExportTable kimi təqdim edir."""
+        chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+
+        def _chunks():
+            rows = df.itertuples(index=False, name=None)
+            chunk = []
+            for row in rows:
+                chunk.append(tuple(_dataframe_cell(value) for value in row))
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+
+        return ExportTable(name=name, columns=[str(column) for column in df.columns], chunks=_chunks())
+
+    @staticmethod
+    def _add_sheet(workbook, table: ExportTable, sheet_number: int, header_format):
+        # Excel vərəq adları 31 simvolla məhdudlaşır; nömrə şəkilçisi kəsilməməlidir
+        suffix = "" if sheet_number == 1 else f" ({sheet_number})"
+        worksheet = workbook.add_worksheet(table.name[:31 - len(suffix)] + suffix)
+        worksheet.write_row(0, 0, list(table.columns), header_format)
+        return worksheet
+
+    @staticmethod
+    def write_xlsx(target: Union[str, BinaryIO], tables: Iterable[ExportTable],
+                   on_rows: Optional[Callable[[int], None]] = None) -> int:
+        """
+        Cədvəlləri xlsxwriter-in constant_memory rejimində Excel faylına yazır. Hər cədvəl
+        ayrı vərəqdir; vərəqin sətir limiti aşıldıqda davamı "<ad> (2)" vərəqinə yazılır.
+
+        Args:
+            target (Union[str, BinaryIO]): Faylın yolu və ya yazıla bilən binar obyekt
+            tables (Iterable[ExportTable]): Vərəqlər (sırası ilə yazılır)
+            on_rows (Optional[Callable[[int], None]]): Hər hissədən sonra yazılmış sətirlərin
+                                                       ümumi sayı ilə çağırılır
+
+        Returns:
+            int: Yazılmış məlumat sətirlərinin sayı (başlıqlar xaric)
+        """
+        workbook = xlsxwriter.Workbook(target, {"constant_memory": True, "strings_to_urls": False})
+        header_format = workbook.add_format({"bold": True, "bg_color": "#DDEBF7", "border": 1})
+        total = 0
+        try:
+            for table in tables:
+                sheet_number = 1
+                worksheet = ExportService._add_sheet(workbook, table, sheet_number, header_format)
+                row_index = 1
+                for chunk in table.chunks:
+                    for row in chunk:
+                        if row_index >= XLSX_MAX_ROWS:
+                            sheet_number += 1
+                            worksheet = ExportService._add_sheet(workbook, table, sheet_number, header_format)
+                            row_index = 1
+                        worksheet.write_row(row_index, 0, row)
+                        row_index += 1
+                    total += len(chunk)
+                    if on_rows:
+                        on_rows(total)
+        finally:
+            workbook.close()
+        return total
+
+    @staticmethod
+    def write_csv(target: Union[str, BinaryIO], table: ExportTable,
+                  on_rows: Optional[Callable[[int], None]] = None) -> int:
+        """
+        Cədvəli UTF-8 (BOM ilə, Excel-in düzgün açması üçün) CSV faylına hissə-hissə yazır.
+
+        Args:
+            target (Union[str, BinaryIO]): Faylın yolu və ya yazıla bilən binar obyekt
+            table (ExportTable): Cədvəl
+            on_rows (Optional[Callable[[int], None]]): write_xlsx-dəki kimi
+
+        Returns:
+            int: Yazılmış məlumat sətirlərinin sayı (başlıq xaric)
+        """
+        if isinstance(target, str):
+            with open(target, "wb") as stream:
+                return ExportService.write_csv(stream, table, on_rows)
+
+        text_stream = io.TextIOWrapper(target, encoding="utf-8-sig", newline="")
+        total = 0
+        try:
+            writer = csv.writer(text_stream)
+            writer.writerow(table.columns)
+            for chunk in table.chunks:
+                writer.writerows(chunk)
+                total += len(chunk)
+                if on_rows:
+                    on_rows(total)
+        finally:
+            # Çağıranın obyektini bağlamamaq üçün wrapper ayrılır
+            text_stream.flush()
+            text_stream.detach()
+        return total
+
+    @staticmethod
+    def export_period_report(period_id: int, target: Union[str, BinaryIO], fmt: str = FORMAT_XLSX,
+                             chunk_size: Optional[int] = None,
+                             on_rows: Optional[Callable[[int], None]] = None) -> int:
+        """
+        Dövr hesabatını axınla ixrac edir. Excel faylında "Yekun ballar" və "Cavablar"
+        vərəqləri olur; CSV yalnız cavab səviyyəsində təfərrüatı ehtiva edir.
+
+        Args:
+            period_id (int): Dövrün ID-si
+            target (Union[str, BinaryIO]): Faylın yolu və ya yazıla bilən binar obyekt
+            fmt (str): FORMAT_XLSX və ya FORMAT_CSV
+            chunk_size (Optional[int]): Hissənin ölçüsü; None olduqda EXPORT_CHUNK_SIZE
+            on_rows (Optional[Callable[[int], None]]): İrəliləyiş üçün, write_xlsx-dəki kimi
+
+        Returns:
+            int: Yazılmış məlumat sətirlərinin sayı
+
+        Raises:
+            ValueError: Dövr tapılmadıqda və ya format dəstəklənmədikdə.
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Dəstəklənməyən format: {fmt}")
+        with get_db() as session:
+            if session.get(EvaluationPeriod, period_id) is None:
+                raise ValueError("Qiymətləndirmə dövrü tapılmadı.")
+
+        answers = ExportTable(
+            "Cavablar", ANSWER_COLUMNS, ExportService.iter_period_answer_rows(period_id, chunk_size)
+        )
+        if fmt == FORMAT_CSV:
+            return ExportService.write_csv(target, answers, on_rows)
+
+        scores = ExportTable(
+            "Yekun ballar", SCORE_COLUMNS, ExportService.iter_period_score_rows(period_id, chunk_size)
+        )
+        return ExportService.write_xlsx(target, [scores, answers], on_rows)
@@ -0,0 +1,399 @@
+# services/job_service.py
+
+"""
+Uzun sürən əməliyyatlar üçün fon işləri.
+
+Səhifə işi jobs cədvəlinə növbəyə qoyur (submit) və vəziyyətini (status) və nəticəsini
+(result) sorğulayır; işin özü scripts/job_worker.py-nin işçi proseslərində icra olunur.
+Beləliklə Streamlit sessiyası bloklanmır, uzun əməliyyat boyunca səhifənin bağlantısı
+tutulmur və bir neçə iş prosessorun müxtəlif nüvələrində paralel icra olunur.
+
+İcra olunan iş JOB_HEARTBEAT_SECONDS-dən bir siqnal (heartbeat_at) yazır. İşçi prosesi
+çökdükdə və ya öldürüldükdə siqnal kəsilir; JOB_STALE_SECONDS ərzində siqnal verməyən
+RUNNING işlər növbəti claim_next_job çağırışında FAILED vəziyyətinə keçirilir ki, onları
+izləyən səhifələr sonsuz gözləməsin.
+
+İşçi prosesdə yenilənən yaddaşdaxili keşlər (məsələn, dövrlər, yan panel) Streamlit
+prosesinə ötürülmür; iş bitdikdən sonra onları işi izləyən səhifə etibarsızlaşdırır.
+"""
+
+import datetime
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import func
+
+from config import settings
+from database import get_db
+from models.job import Job, JOB_FAILED, JOB_FINISHED_STATUSES, JOB_PENDING, JOB_RUNNING, JOB_SUCCEEDED
+from services.competency_rollup_service import CompetencyRollupService
+from services.degree360_service import Degree360Service
+from services.dto import JobDTO
+from services.export_service import EXPORT_FORMATS, FORMAT_XLSX, ExportService
+from services.kpi_service import KpiService
+from services.snapshot_service import AnalyticsSnapshotService
+
+
+# İşin icraçısı: (parametrlər, gedişat funksiyası) -> JSON-a çevrilə bilən nəticə
+JobHandler = Callable[[Dict[str, Any], Callable[[float, str], None]], Any]
+
+JOB_LAUNCH_PERIOD = "launch_period"
+JOB_SEND_360_REMINDERS = "send_360_reminders"
+JOB_EXPORT_PERIOD_REPORT = "export_period_report"
+JOB_REBUILD_COMPETENCY_ROLLUPS = "rebuild_competency_rollups"
+JOB_BUILD_ANALYTICS_SNAPSHOT = "build_analytics_snapshot"
+
+
+def _launch_period(params, progress):
+    return KpiService.launch_period(
+        params["name"],
+        datetime.date.fromisoformat(params["start_date"]),
+        datetime.date.fromisoformat(params["end_date"]),
+        progress=progress
+    )
+
+
+def _send_360_reminders(params, progress):
+    return Degree360Service.send_360_reminders(
+        days_before_end=params.get("days_before_end"),
+        dedup_window_hours=params.get("dedup_window_hours")
+    )
+
+
+def _export_period_report(params, progress):
+    period_id = params["period_id"]
+    fmt = params.get("format", FORMAT_XLSX)
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Dəstəklənməyən format: {fmt}")
+
+    os.makedirs(settings.JOB_OUTPUT_DIR, exist_ok=True)
+    path = os.path.abspath(os.path.join(
+        settings.JOB_OUTPUT_DIR,
+        f"period_{period_id}_{datetime.datetime.utcnow():%Y%m%d%H%M%S}.{fmt}"
+    ))
+    total = max(ExportService.count_period_report_rows(period_id, fmt), 1)
+    try:
+        rows = ExportService.export_period_report(
+            period_id, path, fmt=fmt,
+            on_rows=lambda written: progress(min(written / total, 0.99), f"{written} sətir yazıldı")
+        )
+    except Exception:
+        # Yarımçıq fayl diskdə qalmamalıdır
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return {"path": path, "rows": rows, "format": fmt}
+
+
+def _rebuild_competency_rollups(params, progress):
+    return {"rows": CompetencyRollupService.rebuild_competency_rollups(params.get("period_id"))}
+
+
+def _build_analytics_snapshot(params, progress):
+    # Dövr verilməzsə yalnız köhnəlmiş dövrlər yazılır; JSON açarları mətn olmalıdır
+    if params.get("period_id") is not None:
+        built = {params["period_id"]: AnalyticsSnapshotService.build_period_snapshot(params["period_id"])}
+    else:
+        built = AnalyticsSnapshotService.build_stale_snapshots(progress=progress)
+    return {"periods": {str(period_id): rows for period_id, rows in built.items()}}
+
+
+_JOB_HANDLERS: Dict[str, JobHandler] = {
+    JOB_LAUNCH_PERIOD: _launch_period,
+    JOB_SEND_360_REMINDERS: _send_360_reminders,
+    JOB_EXPORT_PERIOD_REPORT: _export_period_report,
+    JOB_REBUILD_COMPETENCY_ROLLUPS: _rebuild_competency_rollups,
+    JOB_BUILD_ANALYTICS_SNAPSHOT: _build_analytics_snapshot,
+}
+
+
+class JobService:
+    @staticmethod
+    def register_handler(kind: str, handler: JobHandler) -> None:
+        """
+        Yeni iş növünü qeydiyyata alır. İşçi proseslər də eyni qeydiyyatı görməlidir,
+        buna görə qeydiyyat modul import edilərkən aparılmalıdır.
+        """
+        _JOB_HANDLERS[kind] = handler
+
+    @staticmethod
+    def submit(kind: str, params: Optional[Dict[str, Any]] = None, created_by: Optional[int] = None,
+               deduplicate: bool = False) -> int:
+        """
+        İşi növbəyə qoyur.
+
+        Args:
+            kind (str): İşin növü (məsələn, JOB_LAUNCH_PERIOD)
+            params (Optional[Dict[str, Any]]): JSON-a çevrilə bilən parametrlər
+            created_by (Optional[int]): İşi yaradan istifadəçinin ID-si
+            deduplicate (bool): True olduqda eyni növlü və parametrli PENDING iş varsa,
+                yenisi yaradılmır və onun ID-si qaytarılır
+
+        Returns:
+            int: İşin ID-si
+
+        Raises:
+            ValueError: İş növü qeydiyyatda olmadıqda.
+        """
+        if kind not in _JOB_HANDLERS:
+            raise ValueError(f"Naməlum iş növü: {kind}")
+
+        with get_db() as session:
+            if deduplicate:
+                for pending in session.query(Job).filter(Job.kind == kind, Job.status == JOB_PENDING).order_by(Job.id):
+                    if (pending.params or {}) == (params or {}):
+                        return pending.id
+            job = Job(kind=kind, params=params or {}, status=JOB_PENDING, progress=0.0, created_by=created_by)
+            session.add(job)
+            session.commit()
+            return job.id
+
+    @staticmethod
+    def status(job_id: int) -> Optional[JobDTO]:
+        """
+        İşin vəziyyətini və gedişatını qaytarır (səhifələr bunu periodik sorğulayır).
+
+        Args:
+            job_id (int): İşin ID-si
+
+        Returns:
+            Optional[JobDTO]: İş; tapılmadıqda None
+        """
+        with get_db() as session:
+            return JobDTO.from_orm(session.get(Job, job_id))
+
+    @staticmethod
+    def result(job_id: int) -> Any:
+        """
+        Uğurla bitmiş işin nəticəsini qaytarır.
+
+        Args:
+            job_id (int): İşin ID-si
+
+        Returns:
+            Any: İşin nəticəsi; iş hələ bitməyibsə None
+
+        Raises:
+            ValueError: İş tapılmadıqda.
+            RuntimeError: İş uğursuz bitdikdə (mətn işin xətasıdır).
+        """
+        with get_db() as session:
+            job = session.get(Job, job_id)
+            if job is None:
+                raise ValueError("İş tapılmadı.")
+            if job.status == JOB_FAILED:
+                raise RuntimeError(job.error)
+            return job.result if job.status == JOB_SUCCEEDED else None
+
+    @staticmethod
+    def list_jobs(created_by: Optional[int] = None, kind: Optional[str] = None, limit: int = 20) -> List[JobDTO]:
+        """Son işləri (ən yenisi birinci) qaytarır."""
+        with get_db() as session:
+            query = session.query(Job)
+            if created_by is not None:
+                query = query.filter(Job.created_by == created_by)
+            if kind is not None:
+                query = query.filter(Job.kind == kind)
+            return [JobDTO.from_orm(job) for job in query.order_by(Job.id.desc()).limit(limit).all()]
+
+    @staticmethod
+    def cancel(job_id: int) -> bool:
+        """
+        Bitməmiş işi ləğv edir (FAILED). İcra olunan işin nəticəsi sonradan yazılmır.
+
+        Args:
+            job_id (int): İşin ID-si
+
+        Returns:
+            bool: İş ləğv edildisə True; tapılmadıqda və ya artıq bitibsə False
+        """
+        with get_db() as session:
+            job = session.get(Job, job_id)
+            if job is None or job.status in JOB_FINISHED_STATUSES:
+                return False
+            job.status = JOB_FAILED
+            job.error = "İş ləğv edildi."
+            job.finished_at = datetime.datetime.utcnow()
+            session.commit()
+            return True
+
+    @staticmethod
+    def reclaim_stale_jobs() -> int:
+        """
+        JOB_STALE_SECONDS ərzində siqnal verməyən RUNNING işləri (işçi prosesi çöküb və ya
+        öldürülüb) FAILED vəziyyətinə keçirir. İşlər təkrar icra olunmur, çünki bəziləri
+        (məsələn, dövrün başladılması) yarımçıq qaldıqda təkrarlana bilməz.
+
+        Returns:
+            int: FAILED edilmiş işlərin sayı
+        """
+        now = datetime.datetime.utcnow()
+        threshold = now - datetime.timedelta(seconds=settings.JOB_STALE_SECONDS)
+        with get_db() as session:
+            stale_jobs = session.query(Job).filter(
+                Job.status == JOB_RUNNING,
+                func.coalesce(Job.heartbeat_at, Job.started_at) < threshold
+            ).with_for_update(skip_locked=True).all()
+            for job in stale_jobs:
+                job.status = JOB_FAILED
+                job.error = "İşçi prosesi cavab vermir (dayandırılıb və ya çöküb)."
+                job.finished_at = now
+            session.commit()
+            return len(stale_jobs)
+
+    @staticmethod
+    def claim_next_job() -> Optional[int]:
+        """
+        Növbədəki ən köhnə işi RUNNING vəziyyətinə keçirib ID-sini qaytarır. Sətir
+        FOR UPDATE SKIP LOCKED ilə kilidlənir, buna görə bir neçə işçi proses (və ya host)
+        eyni işi götürmür. Əvvəlcə dayanmış işlər FAILED edilir (reclaim_stale_jobs).
+
+        Returns:
+            Optional[int]: İşin ID-si; növbə boşdursa None
+        """
+        JobService.reclaim_stale_jobs()
+        with get_db() as session:
+            job = session.query(Job).filter(
+                Job.status == JOB_PENDING
+            ).order_by(Job.id).with_for_update(skip_locked=True).first()
+            if job is None:
+                session.rollback()
+                return None
+            job.status = JOB_RUNNING
+            job.started_at = job.heartbeat_at = datetime.datetime.utcnow()
+            job.progress_message = "İcra olunur"
+            session.commit()
+            return job.id
+
+    @staticmethod
+    def update_progress(job_id: int, progress: float, message: Optional[str] = None) -> None:
+        """İşin gedişatını (0-1) ayrıca qısa tranzaksiyada yazır (həm də siqnal sayılır)."""
+        with get_db() as session:
+            job = session.get(Job, job_id)
+            if job is not None:
+                job.progress = max(0.0, min(float(progress), 1.0))
+                job.progress_message = message
+                job.heartbeat_at = datetime.datetime.utcnow()
+                session.commit()
+
+    @staticmethod
+    def _heartbeat(job_id: int) -> None:
+        with get_db() as session:
+            job = session.get(Job, job_id)
+            if job is not None and job.status == JOB_RUNNING:
+                job.heartbeat_at = datetime.datetime.utcnow()
+                session.commit()
+
+    @staticmethod
+    def _finish(job_id: int, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        with get_db() as session:
+            job = session.get(Job, job_id)
+            # Ləğv edilmiş və ya dayanmış sayılmış işin vəziyyəti dəyişdirilmir
+            if job is None or job.status != JOB_RUNNING:
+                return
+            job.status = status
+            job.result = result
+            job.error = error
+            job.finished_at = datetime.datetime.utcnow()
+            if status == JOB_SUCCEEDED:
+                job.progress = 1.0
+                job.progress_message = "Tamamlandı"
+            session.commit()
+
+    @staticmethod
+    def run_job(job_id: int) -> Optional[JobDTO]:
+        """
+        Götürülmüş (RUNNING) işi cari prosesdə icra edir və nəticəni və ya xətanı yazır.
+        Gedişat bazaya ən çoxu JOB_PROGRESS_INTERVAL_SECONDS-də bir dəfə yazılır; icra
+        boyunca ayrıca axın JOB_HEARTBEAT_SECONDS-dən bir siqnal yazır.
+
+        Args:
+            job_id (int): İşin ID-si
+
+        Returns:
+            Optional[JobDTO]: İşin son vəziyyəti; iş tapılmadıqda None
+        """
+        with get_db() as session:
+            job = session.get(Job, job_id)
+            if job is None:
+                return None
+            kind, params = job.kind, dict(job.params or {})
+
+        handler = _JOB_HANDLERS.get(kind)
+        if handler is None:
+            JobService._finish(job_id, JOB_FAILED, error=f"Naməlum iş növü: {kind}")
+            return JobService.status(job_id)
+
+        last_write = [0.0]
+
+        def _progress(fraction: float, message: str) -> None:
+            now = time.monotonic()
+            if now - last_write[0] >= settings.JOB_PROGRESS_INTERVAL_SECONDS:
+                last_write[0] = now
+                JobService.update_progress(job_id, fraction, message)
+
+        stop_heartbeat = threading.Event()
+
+        def _beat() -> None:
+            while not stop_heartbeat.wait(settings.JOB_HEARTBEAT_SECONDS):
+                JobService._heartbeat(job_id)
+
+        heartbeat = threading.Thread(target=_beat, name=f"job-{job_id}-heartbeat", daemon=True)
+        heartbeat.start()
+        try:
+            result = handler(params, _progress)
+        except Exception as e:
+            JobService._finish(job_id, JOB_FAILED, error=f"{type(e).__name__}: {e}")
+        else:
+            JobService._finish(job_id, JOB_SUCCEEDED, result=result)
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+        return JobService.status(job_id)
+
+    @staticmethod
+    def purge_expired_outputs() -> int:
+        """
+        JOB_OUTPUT_DIR-dəki JOB_OUTPUT_RETENTION_HOURS-dan köhnə faylları (məsələn, ixrac
+        hesabatlarını) silir. İşçi proses bunu periodik çağırır; silinmiş faylı göstərən
+        səhifə istifadəçidən hesabatı yenidən hazırlamağı xahiş edir.
+
+        Returns:
+            int: Silinmiş faylların sayı
+        """
+        if not os.path.isdir(settings.JOB_OUTPUT_DIR):
+            return 0
+
+        cutoff = time.time() - settings.JOB_OUTPUT_RETENTION_HOURS * 3600
+        removed = 0
+        for entry in os.scandir(settings.JOB_OUTPUT_DIR):
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                try:
+                    os.remove(entry.path)
+                    removed += 1
+                except FileNotFoundError:
+                    # Başqa işçi artıq silib
+                    pass
+        return removed
+
+    @staticmethod
+    def run_pending_jobs(limit: Optional[int] = None) -> int:
+        """
+        Növbədəki işləri cari prosesdə bir-bir icra edir (işçi hovuzu olmadan).
+
+        Args:
+            limit (Optional[int]): İcra ediləcək işlərin maksimum sayı
+
+        Returns:
+            int: İcra edilmiş işlərin sayı
+        """
+        count = 0
+        while limit is None or count < limit:
+            job_id = JobService.claim_next_job()
+            if job_id is None:
+                break
+            JobService.run_job(job_id)
+            count += 1
+        return count
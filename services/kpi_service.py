@@ -1,12 +1,171 @@
 # services/kpi_service.py
 
 from database import get_db
-from models.kpi import Evaluation, Question, Answer, EvaluationPeriod, EvaluationStatus
+from models.kpi import Evaluation, Question, Answer, EvaluationPeriod, EvaluationStatus, EvaluationScore
+from models.user import User
+from models.user_profile import UserProfile
+from models.notification import Notification
 from services.user_service import UserService
 from services.notification_service import NotificationService
-from typing import List
+from services.sidebar_service import SidebarService
+from services.competency_rollup_service import CompetencyRollupService
+from services.cache import cached, invalidate
+from services.dto import EvaluationDTO, PeriodDTO, QuestionDTO, LOAD_SELECTIN, evaluation_load_options
+from sqlalchemy import func, case, select, insert, literal, and_
+from sqlalchemy.orm import aliased
+from typing import Callable, Dict, Iterable, List, Optional
+import datetime
+import pandas as pd
 
 class KpiService:
+    @staticmethod
+    def _evaluation_scores(session, evaluation_ids) -> Dict[int, float]:
+        """
+        Verilmiş qiymətləndirmələrin yekun ballarını bir aqreqat sorğu ilə hesablayır.
+
+        Formula:
+        Yekun Bal = (Σ (cavab.score * sual.weight)) / (Σ sual.weight)
+
+        Args:
+            session: Açıq verilənlər bazası sessiyası.
+            evaluation_ids (Iterable[int]): Qiymətləndirmələrin ID-ləri.
+
+        Returns:
+            dict: {evaluation_id: yekun bal}. Cavabı olmayan və ya çəkisi 0 olan
+            qiymətləndirmələr üçün 0.0 qaytarılır.
+        """
+        evaluation_ids = list(dict.fromkeys(evaluation_ids))
+        if not evaluation_ids:
+            return {}
+
+        rows = session.query(
+            Answer.evaluation_id,
+            func.sum(Answer.score * Question.weight),
+            func.sum(Question.weight)
+        ).join(
+            Question, Answer.question_id == Question.id
+        ).filter(
+            Answer.evaluation_id.in_(evaluation_ids)
+        ).group_by(Answer.evaluation_id).all()
+
+        scores = {evaluation_id: 0.0 for evaluation_id in evaluation_ids}
+        for evaluation_id, total_weighted_score, total_weight in rows:
+            if total_weight:
+                scores[evaluation_id] = float(total_weighted_score) / float(total_weight)
+        return scores
+
+    @staticmethod
+    def calculate_evaluation_scores(evaluation_ids: Iterable[int]) -> Dict[int, float]:
+        """
+        Bir və ya bir neçə qiymətləndirmənin yekun balını tək sorğu ilə hesablayır.
+
+        Args:
+            evaluation_ids (Iterable[int]): Qiymətləndirmələrin ID-ləri.
+
+        Returns:
+            dict: {evaluation_id: yekun bal}.
+        """
+        with get_db() as session:
+            return KpiService._evaluation_scores(session, evaluation_ids)
+
+    @staticmethod
+    def _refresh_evaluation_scores(session, evaluation_ids) -> Dict[int, EvaluationScore]:
+        """
+        `evaluation_scores` cədvəlindəki sətirləri cari cavablara görə yeniləyir.
+        Commit etmir - çağıran tərəfin tranzaksiyasının bir hissəsi kimi işləyir.
+
+        Args:
+            session: Açıq verilənlər bazası sessiyası.
+            evaluation_ids (Iterable[int]): Qiymətləndirmələrin ID-ləri.
+
+        Returns:
+            dict: {evaluation_id: EvaluationScore}.
+        """
+        evaluation_ids = list(dict.fromkeys(evaluation_ids))
+        if not evaluation_ids:
+            return {}
+
+        def _role_sum(role, expression):
+            return func.sum(case((Answer.author_role == role, expression)))
+
+        weighted = Answer.score * Question.weight
+        rows = session.query(
+            Evaluation.id,
+            Evaluation.period_id,
+            Evaluation.evaluated_user_id,
+            _role_sum('employee', weighted),
+            _role_sum('employee', Question.weight),
+            _role_sum('manager', weighted),
+            _role_sum('manager', Question.weight),
+            func.sum(weighted),
+            func.sum(Question.weight)
+        ).outerjoin(
+            Answer, Answer.evaluation_id == Evaluation.id
+        ).outerjoin(
+            Question, Answer.question_id == Question.id
+        ).filter(
+            Evaluation.id.in_(evaluation_ids)
+        ).group_by(
+            Evaluation.id, Evaluation.period_id, Evaluation.evaluated_user_id
+        ).all()
+
+        existing = {
+            row.evaluation_id: row
+            for row in session.query(EvaluationScore).filter(EvaluationScore.evaluation_id.in_(evaluation_ids))
+        }
+
+        def _ratio(total, weight):
+            return float(total) / float(weight) if weight else None
+
+        for (evaluation_id, period_id, evaluated_user_id,
+             employee_total, employee_weight, manager_total, manager_weight,
+             total, total_weight) in rows:
+            score_row = existing.get(evaluation_id)
+            if score_row is None:
+                score_row = EvaluationScore(evaluation_id=evaluation_id)
+                session.add(score_row)
+                existing[evaluation_id] = score_row
+            score_row.period_id = period_id
+            score_row.evaluated_user_id = evaluated_user_id
+            score_row.employee_score = _ratio(employee_total, employee_weight)
+            score_row.manager_score = _ratio(manager_total, manager_weight)
+            score_row.total_score = _ratio(total, total_weight) or 0.0
+
+        return existing
+
+    @staticmethod
+    def _stored_evaluation_scores(session, evaluation_ids) -> Dict[int, float]:
+        """
+        Yekun balları `evaluation_scores` cədvəlindən oxuyur.
+        Cədvəldə sətri olmayan qiymətləndirmələr üçün bal canlı hesablanır.
+        """
+        evaluation_ids = list(dict.fromkeys(evaluation_ids))
+        if not evaluation_ids:
+            return {}
+
+        scores = dict(session.query(
+            EvaluationScore.evaluation_id, EvaluationScore.total_score
+        ).filter(EvaluationScore.evaluation_id.in_(evaluation_ids)).all())
+
+        missing = [evaluation_id for evaluation_id in evaluation_ids if evaluation_id not in scores]
+        if missing:
+            scores.update(KpiService._evaluation_scores(session, missing))
+        return scores
+
+    @staticmethod
+    def get_evaluation_scores(evaluation_ids: Iterable[int]) -> Dict[int, float]:
+        """
+        Qiymətləndirmələrin saxlanılmış yekun ballarını qaytarır.
+
+        Args:
+            evaluation_ids (Iterable[int]): Qiymətləndirmələrin ID-ləri.
+
+        Returns:
+            dict: {evaluation_id: yekun bal}.
+        """
+        with get_db() as session:
+            return KpiService._stored_evaluation_scores(session, evaluation_ids)
+
     @staticmethod
     def calculate_evaluation_score(evaluation_id):
         """
@@ -21,46 +180,34 @@ class KpiService:
         Returns:
             float: Yekun bal. Əgər qiymətləndirmə tapılmazsa və ya sual yoxdursa, 0.0 qaytarır.
         """
-        with get_db() as session:
-            # Qiymətləndirməni əldə edirik
-            evaluation = session.query(Evaluation).filter(Evaluation.id == evaluation_id).first()
-            if not evaluation:
-                return 0.0
-            
-            # Qiymətləndirməyə aid cavabları və sualları əldə edirik
-            answers = session.query(Answer).filter(Answer.evaluation_id == evaluation_id).all()
-            if not answers:
-                return 0.0
-                
-            total_weighted_score = 0.0
-            total_weight = 0.0
-            
-            for answer in answers:
-                question = session.query(Question).filter(Question.id == answer.question_id).first()
-                if question:
-                    total_weighted_score += answer.score * question.weight
-                    total_weight += question.weight
-                    
-            if total_weight == 0:
-                return 0.0
-                
-            return total_weighted_score / total_weight
+        return KpiService.calculate_evaluation_scores([evaluation_id]).get(evaluation_id, 0.0)
 
     @staticmethod
-    def update_evaluation_status(evaluation_id, new_status):
+    def update_evaluation_status(evaluation_id, new_status, refresh_snapshot=True):
         """
         Qiymətləndirmənin statusunu yeniləyir və tərəflərə bildiriş göndərir.
+        Səriştə cəmləri (competency_rollups) eyni tranzaksiyada yenilənir. Yekunlaşdırma
+        və ya ondan geri qaytarma analitika snapshot-unun yenilənməsini növbəyə qoyur.
         
         Args:
             evaluation_id (int): Qiymətləndirmənin ID-si.
             new_status (EvaluationStatus): Yeni status.
+            refresh_snapshot (bool): False olduqda snapshot işi növbəyə qoyulmur (toplu əməliyyatlar üçün).
         """
         with get_db() as session:
             evaluation = session.query(Evaluation).filter(Evaluation.id == evaluation_id).first()
             if evaluation:
                 old_status = evaluation.status
+                rollup_before = CompetencyRollupService.evaluation_contribution(session, evaluation)
                 evaluation.status = new_status
+                CompetencyRollupService.apply_evaluation_change(session, evaluation, rollup_before)
+                KpiService._refresh_evaluation_scores(session, [evaluation.id])
                 session.commit()
+                SidebarService.invalidate_sidebar_state(
+                    [evaluation.evaluator_user_id, evaluation.evaluated_user_id]
+                )
+                if refresh_snapshot and EvaluationStatus.FINALIZED in (old_status, new_status):
+                    KpiService._schedule_snapshot_refresh()
                 
                 # Bildiriş göndərmək
                 if new_status == EvaluationStatus.SELF_EVAL_COMPLETED:
@@ -80,11 +227,68 @@ class KpiService:
                             message=f"{evaluation.period.name} qiymətləndirməniz yekunlaşdırıldı."
                         )
 
+    @staticmethod
+    def finalize_evaluations(evaluation_ids: Iterable[int]) -> int:
+        """
+        Seçilmiş qiymətləndirmələri yekunlaşdırır. Hər biri update_evaluation_status ilə
+        yenilənir ki, ballar, səriştə cəmləri, yan panel və bildirişlər də yenilənsin.
+        Yalnız SELF_EVAL_COMPLETED və ya MANAGER_REVIEW_COMPLETED statuslu qiymətləndirmələr
+        yekunlaşdırılır.
+
+        Args:
+            evaluation_ids (Iterable[int]): Qiymətləndirmələrin ID-ləri.
+
+        Returns:
+            int: Yekunlaşdırılmış qiymətləndirmələrin sayı.
+        """
+        finalizable = (EvaluationStatus.SELF_EVAL_COMPLETED, EvaluationStatus.MANAGER_REVIEW_COMPLETED)
+        with get_db() as session:
+            ids = [
+                evaluation_id for (evaluation_id,) in session.query(Evaluation.id).filter(
+                    Evaluation.id.in_(list(evaluation_ids)),
+                    Evaluation.status.in_(finalizable)
+                ).order_by(Evaluation.id).all()
+            ]
+
+        for evaluation_id in ids:
+            KpiService.update_evaluation_status(evaluation_id, EvaluationStatus.FINALIZED, refresh_snapshot=False)
+        # Bütün toplu yekunlaşdırma üçün bir snapshot işi
+        if ids:
+            KpiService._schedule_snapshot_refresh()
+        return len(ids)
+
+    @staticmethod
+    def _schedule_snapshot_refresh() -> None:
+        """Analitika snapshot-unun köhnəlmiş dövrlərini yeniləyən fon işini (təkrarsız) növbəyə qoyur."""
+        # job_service bu modulu idxal edir, buna görə idxal burada edilir
+        from services.job_service import JOB_BUILD_ANALYTICS_SNAPSHOT, JobService
+        JobService.submit(JOB_BUILD_ANALYTICS_SNAPSHOT, deduplicate=True)
+
+    @staticmethod
+    def _evaluation_score_expression():
+        """
+        Qiymətləndirmənin yekun balı üçün SQL ifadəsi.
+
+        `evaluation_scores` cədvəlindəki bal götürülür; sətir yoxdursa, bal
+        cavablar və suallar üzrə korrelyasiyalı alt sorğu ilə hesablanır.
+        Sorğuya `EvaluationScore` cədvəli `Evaluation`-a outer join edilməlidir.
+        """
+        live_score = select(
+            func.sum(Answer.score * Question.weight) / func.nullif(func.sum(Question.weight), 0)
+        ).join(
+            Question, Answer.question_id == Question.id
+        ).where(
+            Answer.evaluation_id == Evaluation.id
+        ).correlate(Evaluation).scalar_subquery()
+
+        return func.coalesce(EvaluationScore.total_score, live_score, 0.0)
+
     @staticmethod
     def get_user_performance_data(period_id, department=None):
         """
         Verilmiş dövr üçün istifadəçilərin performans məlumatlarını əldə edir.
         Yalnız FINALIZED statuslu qiymətləndirmələri nəzərə alır.
+        Hesablama və şöbə filtri tək sorğuda, verilənlər bazası tərəfində aparılır.
         
         Args:
             period_id (int): Qiymətləndirmə dövrünün ID-si.
@@ -93,50 +297,38 @@ class KpiService:
         Returns:
             list: Hər bir istifadəçi üçün əməkdaş adı, şöbə və yekun bal siyahısı.
         """
-        performance_data = []
-        
         with get_db() as session:
-            # Qiymətləndirmə dövrünə aid FINALIZED qiymətləndirmələri əldə edirik
-            evaluations = session.query(Evaluation).filter(
+            query = session.query(
+                UserProfile.full_name,
+                UserProfile.department,
+                func.avg(KpiService._evaluation_score_expression())
+            ).select_from(Evaluation).join(
+                User, User.id == Evaluation.evaluated_user_id
+            ).outerjoin(
+                UserProfile, UserProfile.user_id == User.id
+            ).outerjoin(
+                EvaluationScore, EvaluationScore.evaluation_id == Evaluation.id
+            ).filter(
                 Evaluation.period_id == period_id,
                 Evaluation.status == EvaluationStatus.FINALIZED
-            ).all()
+            )
             
-            user_scores = {}
-            user_departments = {}
+            # Şöbə filtri SQL səviyyəsində tətbiq olunur
+            if department:
+                query = query.filter(UserProfile.department == department)
             
-            for evaluation in evaluations:
-                score = KpiService.calculate_evaluation_score(evaluation.id)
-                user_id = evaluation.evaluated_user_id
-                
-                if user_id not in user_scores:
-                    user_scores[user_id] = []
-                user_scores[user_id].append(score)
-                
-                # İstifadəçinin şöbəsini əldə edirik (əgər yoxdursa, None olacaq)
-                if user_id not in user_departments:
-                    profile = UserService.get_user_profile_by_user_id(user_id)
-                    user_departments[user_id] = profile.department if profile else None
-                    
-            # Hər bir istifadəçi üçün orta balı hesablayırıq
-            for user_id, scores in user_scores.items():
-                if scores:
-                    avg_score = sum(scores) / len(scores)
-                    user = UserService.get_user_by_id(user_id)
-                    full_name = user.get_full_name() if user else "Naməlum"
-                    department_name = user_departments.get(user_id)
-                    
-                    # Əgər şöbə filtr varsa və istifadəçi həmin şöbədə deyilsə, əlavə etmirik
-                    if department and department_name != department:
-                        continue
-                        
-                    performance_data.append({
-                        "full_name": full_name,
-                        "department": department_name,
-                        "total_score": avg_score
-                    })
-                    
-        return performance_data
+            rows = query.group_by(
+                User.id, UserProfile.full_name, UserProfile.department
+            ).order_by(User.id).all()
+            
+            return [
+                {
+                    "full_name": full_name or "Naməlum",
+                    "department": department_name,
+                    "total_score": float(avg_score)
+                }
+                for full_name, department_name, avg_score in rows
+            ]
 
     @staticmethod
     def get_department_performance_data(period_id):
@@ -150,39 +342,31 @@ class KpiService:
         Returns:
             list: Hər bir şöbə üçün adı və orta bal siyahısı.
         """
-        department_data = []
-        
         with get_db() as session:
-            # Qiymətləndirmə dövrünə aid FINALIZED qiymətləndirmələri əldə edirik
-            evaluations = session.query(Evaluation).filter(
+            # Profili olmayan istifadəçilər "Naməlum" şöbəsinə aid edilir
+            department_name = case(
+                (UserProfile.id.is_(None), "Naməlum"),
+                else_=UserProfile.department
+            )
+            rows = session.query(
+                department_name,
+                func.avg(KpiService._evaluation_score_expression())
+            ).select_from(Evaluation).outerjoin(
+                UserProfile, UserProfile.user_id == Evaluation.evaluated_user_id
+            ).outerjoin(
+                EvaluationScore, EvaluationScore.evaluation_id == Evaluation.id
+            ).filter(
                 Evaluation.period_id == period_id,
                 Evaluation.status == EvaluationStatus.FINALIZED
-            ).all()
+            ).group_by(department_name).all()
             
-            dept_scores = {}
-            
-            for evaluation in evaluations:
-                score = KpiService.calculate_evaluation_score(evaluation.id)
-                user_id = evaluation.evaluated_user_id
-                
-                # İstifadəçinin şöbəsini əldə edirik
-                profile = UserService.get_user_profile_by_user_id(user_id)
-                department_name = profile.department if profile else "Naməlum"
-                
-                if department_name not in dept_scores:
-                    dept_scores[department_name] = []
-                dept_scores[department_name].append(score)
-                    
-            # Hər bir şöbə üçün orta balı hesablayırıq
-            for dept_name, scores in dept_scores.items():
-                if scores:
-                    avg_score = sum(scores) / len(scores)
-                    department_data.append({
-                        "department": dept_name,
-                        "avg_score": avg_score
-                    })
-                    
-        return department_data
+            return [
+                {
+                    "department": dept_name,
+                    "avg_score": float(avg_score)
+                }
+                for dept_name, avg_score in rows
+            ]
 
     @staticmethod
     def get_user_performance_trend(user_id):
@@ -204,9 +388,10 @@ class KpiService:
                 Evaluation.evaluated_user_id == user_id,
                 Evaluation.status == EvaluationStatus.FINALIZED
             ).order_by(Evaluation.period_id).all()
+            evaluation_scores = KpiService._stored_evaluation_scores(session, [e.id for e in evaluations])
             
             for evaluation in evaluations:
-                score = KpiService.calculate_evaluation_score(evaluation.id)
+                score = evaluation_scores[evaluation.id]
                 period_name = evaluation.period.name
                 
                 trend_data.append({
@@ -217,10 +402,139 @@ class KpiService:
         return trend_data
 
     @staticmethod
-    def get_all_evaluation_periods():
+    @cached("evaluation_periods", ttl=300)
+    def get_all_evaluation_periods() -> List[PeriodDTO]:
         """Bütün qiymətləndirmə dövrlərini əldə edir."""
         with get_db() as session:
-            return session.query(EvaluationPeriod).order_by(EvaluationPeriod.start_date.desc()).all()
+            periods = session.query(EvaluationPeriod).order_by(EvaluationPeriod.start_date.desc()).all()
+            return [PeriodDTO.from_orm(period) for period in periods]
+
+    @staticmethod
+    @cached("kpi_questions", ttl=300)
+    def get_active_questions() -> List[QuestionDTO]:
+        """Aktiv qiymətləndirmə suallarını ID sırası ilə əldə edir."""
+        with get_db() as session:
+            questions = session.query(Question).filter(Question.is_active == True).order_by(Question.id).all()
+            return [QuestionDTO.from_orm(question) for question in questions]
+
+    @staticmethod
+    def launch_period(
+        name: str,
+        start_date: datetime.date,
+        end_date: datetime.date,
+        progress: Optional[Callable[[float, str], None]] = None
+    ) -> Dict[str, int]:
+        """
+        Qiymətləndirmə dövrünü yaradır və bütün aktiv istifadəçilər üçün tapşırıqları təyin edir.
+        
+        Dövr, özünüqiymətləndirmələr, rəhbər qiymətləndirmələri (User.manager_id əsasında) və
+        bildirişlər bir tranzaksiyada INSERT ... SELECT sorğuları ilə yaradılır. Təkrar çağırış
+        təhlükəsizdir: eyni adlı dövr yenidən istifadə olunur və yalnız çatışmayan
+        qiymətləndirmələr və bildirişlər əlavə edilir.
+        
+        Args:
+            name (str): Dövrün adı
+            start_date (datetime.date): Başlama tarixi
+            end_date (datetime.date): Bitmə tarixi
+            progress (Callable[[float, str], None], optional): Gedişat (0-1) və mərhələ adını qəbul edən funksiya
+            
+        Returns:
+            Dict[str, int]: period_id, created_period (0/1), self_evaluations, manager_evaluations, notifications
+        """
+        def _report(fraction, stage):
+            if progress:
+                progress(fraction, stage)
+
+        pending = literal(EvaluationStatus.PENDING, Evaluation.status.type)
+
+        with get_db() as session:
+            period = session.query(EvaluationPeriod).filter(EvaluationPeriod.name == name).first()
+            created_period = period is None
+            if created_period:
+                period = EvaluationPeriod(name=name, start_date=start_date, end_date=end_date)
+                session.add(period)
+                session.flush()
+            elif (period.start_date, period.end_date) != (start_date, end_date):
+                raise ValueError(f"'{name}' adlı dövr artıq başqa tarixlərlə mövcuddur")
+            period_id = period.id
+            _report(0.1, "Dövr yaradıldı")
+
+            def _missing(evaluated_column, evaluator_column):
+                # Bu dövrdə artıq mövcud olan tapşırıqları təkrar yaratmırıq
+                return ~select(Evaluation.id).where(
+                    Evaluation.period_id == period_id,
+                    Evaluation.evaluated_user_id == evaluated_column,
+                    Evaluation.evaluator_user_id == evaluator_column
+                ).exists()
+
+            # Hər aktiv istifadəçi üçün özünüqiymətləndirmə
+            self_rows = select(literal(period_id), User.id, User.id, pending).where(
+                User.is_active == True,
+                _missing(User.id, User.id)
+            )
+            self_count = session.execute(
+                insert(Evaluation).from_select(
+                    ["period_id", "evaluated_user_id", "evaluator_user_id", "status"], self_rows
+                )
+            ).rowcount
+            _report(0.4, "Özünüqiymətləndirmə tapşırıqları yaradıldı")
+
+            # Aktiv rəhbəri olan hər aktiv istifadəçi üçün rəhbər qiymətləndirməsi
+            manager = aliased(User)
+            manager_rows = select(literal(period_id), User.id, User.manager_id, pending).join(
+                manager, and_(manager.id == User.manager_id, manager.is_active == True)
+            ).where(
+                User.is_active == True,
+                User.manager_id != User.id,
+                _missing(User.id, User.manager_id)
+            )
+            manager_count = session.execute(
+                insert(Evaluation).from_select(
+                    ["period_id", "evaluated_user_id", "evaluator_user_id", "status"], manager_rows
+                )
+            ).rowcount
+            _report(0.7, "Rəhbər qiymətləndirmələri yaradıldı")
+
+            # Dövrdə tapşırığı olan hər qiymətləndiriciyə bir bildiriş
+            message = f"Yeni qiymətləndirmə dövrü '{name}' yaradıldı. Qiymətləndirmə formunu doldurun."
+            already_notified = select(Notification.id).where(
+                Notification.user_id == Evaluation.evaluator_user_id,
+                Notification.message == message
+            ).exists()
+            notification_rows = select(
+                Evaluation.evaluator_user_id,
+                literal(message),
+                literal(False),
+                literal(datetime.datetime.utcnow())
+            ).where(
+                Evaluation.period_id == period_id,
+                ~already_notified
+            ).distinct()
+            notification_count = session.execute(
+                insert(Notification).from_select(
+                    ["user_id", "message", "is_read", "created_at"], notification_rows
+                )
+            ).rowcount
+            _report(0.9, "Bildirişlər göndərildi")
+
+            if created_period:
+                # Yeni dövrlə tarixləri kəsişən 360° sessiyalarının cavabları cəmlərə daxil edilir
+                CompetencyRollupService.rebuild_periods(session, [period_id])
+
+            session.commit()
+            if created_period:
+                invalidate("evaluation_periods")
+            # Yeni tapşırıqlar və bildirişlər bütün istifadəçilərin yan panelini dəyişir
+            SidebarService.invalidate_sidebar_state()
+            _report(1.0, "Tamamlandı")
+
+        return {
+            "period_id": period_id,
+            "created_period": int(created_period),
+            "self_evaluations": self_count,
+            "manager_evaluations": manager_count,
+            "notifications": notification_count
+        }
 
     @staticmethod
     def get_evaluation_period_by_id(period_id):
@@ -229,37 +543,119 @@ class KpiService:
             return session.query(EvaluationPeriod).filter(EvaluationPeriod.id == period_id).first()
 
     @staticmethod
-    def get_pending_evaluations_for_user(user_id):
-        """İstifadəçinin tamamlanmamış qiymətləndirmələrini əldə edir."""
+    def _get_evaluations_for_evaluator(evaluator_user_id, status, load) -> List[EvaluationDTO]:
+        """Qiymətləndiricinin verilmiş statuslu qiymətləndirmələrini tam doldurulmuş DTO kimi qaytarır."""
         with get_db() as session:
-            return session.query(Evaluation).filter(
-                Evaluation.evaluator_user_id == user_id,
-                Evaluation.status == EvaluationStatus.PENDING
-            ).all()
+            evaluations = session.query(Evaluation).options(
+                *evaluation_load_options(load)
+            ).filter(
+                Evaluation.evaluator_user_id == evaluator_user_id,
+                Evaluation.status == status
+            ).order_by(Evaluation.id).all()
+            return [EvaluationDTO.from_orm(evaluation) for evaluation in evaluations]
+
+    @staticmethod
+    def get_pending_evaluations_for_user(user_id, load: str = LOAD_SELECTIN) -> List[EvaluationDTO]:
+        """
+        İstifadəçinin tamamlanmamış qiymətləndirmələrini əldə edir.
+        
+        Args:
+            user_id (int): İstifadəçinin ID-si.
+            load (str): Əlaqələrin yükləmə profili ("selectin" və ya "joined").
+        """
+        return KpiService._get_evaluations_for_evaluator(user_id, EvaluationStatus.PENDING, load)
 
     @staticmethod
-    def get_completed_evaluations_for_user(user_id):
+    def get_completed_evaluations_for_user(user_id, load: str = LOAD_SELECTIN) -> List[EvaluationDTO]:
         """
         İstifadəçinin tamamlanmış qiymətləndirmələrini əldə edir.
         Burada "tamamlanmış" ifadəsi FINALIZED statusu ilə bağlıdır.
         """
-        with get_db() as session:
-            return session.query(Evaluation).filter(
-                Evaluation.evaluator_user_id == user_id,
-                Evaluation.status == EvaluationStatus.FINALIZED
-            ).all()
+        return KpiService._get_evaluations_for_evaluator(user_id, EvaluationStatus.FINALIZED, load)
             
     @staticmethod
-    def get_self_eval_completed_evaluations_for_manager(manager_id):
+    def get_self_eval_completed_evaluations_for_manager(manager_id, load: str = LOAD_SELECTIN) -> List[EvaluationDTO]:
         """
         Menecer üçün SELF_EVAL_COMPLETED statuslu qiymətləndirmələri əldə edir.
         """
-        with get_db() as session:
-            return session.query(Evaluation).filter(
-                Evaluation.evaluator_user_id == manager_id,
-                Evaluation.status == EvaluationStatus.SELF_EVAL_COMPLETED
-            ).all()
+        return KpiService._get_evaluations_for_evaluator(manager_id, EvaluationStatus.SELF_EVAL_COMPLETED, load)
+            
+    @staticmethod
+    def get_period_comparison(period_ids: List[int]) -> Dict[str, pd.DataFrame]:
+        """
+        Seçilmiş dövrlərin nəticələrini tək qruplaşdırılmış sorğu ilə müqayisə edir.
+        Dövrlərin sayından asılı olmayaraq verilənlər bazasına bir sorğu göndərilir.
+        
+        Args:
+            period_ids (List[int]): Qiymətləndirmə dövrlərinin ID-ləri.
             
+        Returns:
+            dict: Aşağıdakı DataFrame-lər:
+                "long": dövr, əməkdaş, şöbə və yekun bal (hər sətir bir istifadəçi-dövr cütü),
+                "scores": əməkdaş × dövr yekun bal cədvəli (dövrlər xronoloji sırada),
+                "deltas": əvvəlki dövrə nisbətən bal dəyişikliyi,
+                "ranks": hər dövr üzrə sıralama (1 - ən yüksək bal),
+                "rank_changes": əvvəlki dövrə nisbətən sıralama dəyişikliyi (müsbət - irəliləyiş).
+        """
+        columns = ["period_id", "period_name", "start_date", "user_id", "full_name", "department", "total_score"]
+        
+        rows = []
+        if period_ids:
+            with get_db() as session:
+                rows = session.query(
+                    EvaluationPeriod.id,
+                    EvaluationPeriod.name,
+                    EvaluationPeriod.start_date,
+                    User.id,
+                    UserProfile.full_name,
+                    UserProfile.department,
+                    func.avg(KpiService._evaluation_score_expression())
+                ).select_from(Evaluation).join(
+                    EvaluationPeriod, EvaluationPeriod.id == Evaluation.period_id
+                ).join(
+                    User, User.id == Evaluation.evaluated_user_id
+                ).outerjoin(
+                    UserProfile, UserProfile.user_id == User.id
+                ).outerjoin(
+                    EvaluationScore, EvaluationScore.evaluation_id == Evaluation.id
+                ).filter(
+                    Evaluation.period_id.in_(period_ids),
+                    Evaluation.status == EvaluationStatus.FINALIZED
+                ).group_by(
+                    EvaluationPeriod.id, EvaluationPeriod.name, EvaluationPeriod.start_date,
+                    User.id, UserProfile.full_name, UserProfile.department
+                ).all()
+        
+        long_df = pd.DataFrame(rows, columns=columns)
+        long_df["full_name"] = long_df["full_name"].fillna("Naməlum")
+        long_df["total_score"] = long_df["total_score"].astype(float)
+        long_df = long_df.sort_values(["start_date", "period_id", "user_id"], ignore_index=True)
+        
+        period_order = long_df.drop_duplicates("period_id")["period_name"].tolist()
+        names = long_df.drop_duplicates("user_id").set_index("user_id")["full_name"]
+        
+        scores = long_df.pivot(index="user_id", columns="period_name", values="total_score")
+        scores = scores.reindex(columns=period_order)
+        
+        deltas = scores.diff(axis=1)
+        ranks = scores.rank(axis=0, ascending=False, method="min")
+        rank_changes = ranks.shift(1, axis=1) - ranks
+        
+        def _by_name(frame):
+            frame = frame.copy()
+            frame.index = names.reindex(frame.index).values
+            frame.index.name = "full_name"
+            frame.columns.name = "period_name"
+            return frame
+        
+        return {
+            "long": long_df[["period_name", "full_name", "department", "total_score"]],
+            "scores": _by_name(scores),
+            "deltas": _by_name(deltas),
+            "ranks": _by_name(ranks),
+            "rank_changes": _by_name(rank_changes)
+        }
+
     @staticmethod
     def get_multiple_periods_performance_data(period_ids: List[int]):
         """
@@ -271,51 +667,23 @@ class KpiService:
         Returns:
             dict: Hər bir dövr üçün əməkdaş adı, şöbə və yekun bal siyahısı.
         """
-        performance_comparison = {}
+        long_df = KpiService.get_period_comparison(period_ids)["long"]
         
         with get_db() as session:
-            for period_id in period_ids:
-                period = session.query(EvaluationPeriod).filter(EvaluationPeriod.id == period_id).first()
-                if period:
-                    # Qiymətləndirmə dövrünə aid FINALIZED qiymətləndirmələri əldə edirik
-                    evaluations = session.query(Evaluation).filter(
-                        Evaluation.period_id == period_id,
-                        Evaluation.status == EvaluationStatus.FINALIZED
-                    ).all()
-                    
-                    user_scores = {}
-                    user_departments = {}
-                    
-                    for evaluation in evaluations:
-                        score = KpiService.calculate_evaluation_score(evaluation.id)
-                        user_id = evaluation.evaluated_user_id
-                        
-                        if user_id not in user_scores:
-                            user_scores[user_id] = []
-                        user_scores[user_id].append(score)
-                        
-                        # İstifadəçinin şöbəsini əldə edirik (əgər yoxdursa, None olacaq)
-                        if user_id not in user_departments:
-                            profile = UserService.get_user_profile_by_user_id(user_id)
-                            user_departments[user_id] = profile.department if profile else None
-                    
-                    # Hər bir istifadəçi üçün orta balı hesablayırıq
-                    period_data = []
-                    for user_id, scores in user_scores.items():
-                        if scores:
-                            avg_score = sum(scores) / len(scores)
-                            user = UserService.get_user_by_id(user_id)
-                            full_name = user.get_full_name() if user else "Naməlum"
-                            department_name = user_departments.get(user_id)
-                            
-                            period_data.append({
-                                "full_name": full_name,
-                                "department": department_name,
-                                "total_score": avg_score
-                            })
-                    
-                    performance_comparison[period.name] = period_data
-                    
+            periods = session.query(EvaluationPeriod.id, EvaluationPeriod.name).filter(
+                EvaluationPeriod.id.in_(period_ids)
+            ).all() if period_ids else []
+        period_names = dict(periods)
+        
+        performance_comparison = {}
+        for period_id in period_ids:
+            if period_id in period_names:
+                period_name = period_names[period_id]
+                period_rows = long_df[long_df["period_name"] == period_name]
+                performance_comparison[period_name] = period_rows[
+                    ["full_name", "department", "total_score"]
+                ].to_dict("records")
+        
         return performance_comparison
 
     @staticmethod
@@ -342,12 +710,19 @@ class KpiService:
             is_employee = evaluation.evaluated_user_id == user_id
             is_manager = evaluation.evaluator_user_id == user_id and evaluation.evaluated_user_id != user_id
             
-            # Mövcud cavabları silirik
-            session.query(Answer).filter(Answer.evaluation_id == evaluation_id).delete()
+            author_role = 'employee' if is_employee else 'manager'
+            
+            # Səriştə cəmlərindən çıxılacaq köhnə pay (cavablar silinməmişdən əvvəl)
+            rollup_before = CompetencyRollupService.evaluation_contribution(session, evaluation)
+            
+            # Bu müəllifin mövcud cavablarını silirik (digər tərəfin cavabları saxlanılır)
+            session.query(Answer).filter(
+                Answer.evaluation_id == evaluation_id,
+                Answer.author_role == author_role
+            ).delete()
             
             # Yeni cavabları əlavə edirik
             for question_id, answer_data in answers.items():
-                author_role = 'employee' if is_employee else 'manager'
                 new_answer = Answer(
                     evaluation_id=evaluation_id,
                     question_id=question_id,
@@ -379,4 +754,14 @@ class KpiService:
                         message=f"{evaluation.period.name} qiymətləndirməniz yekunlaşdırıldı."
                     )
             
-            session.commit()
\ No newline at end of file
+            # Materiallaşdırılmış balları eyni tranzaksiyada yeniləyirik
+            session.flush()
+            KpiService._refresh_evaluation_scores(session, [evaluation_id])
+            CompetencyRollupService.apply_evaluation_change(session, evaluation, rollup_before)
+            
+            session.commit()
+            SidebarService.invalidate_sidebar_state(
+                [evaluation.evaluator_user_id, evaluation.evaluated_user_id]
+            )
+            if evaluation.status == EvaluationStatus.FINALIZED:
+                KpiService._schedule_snapshot_refresh()
\ No newline at end of file
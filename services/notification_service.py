@@ -1,8 +1,14 @@
 # services/notification_service.py
 
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import insert
+
 from database import get_db
 from models.notification import Notification
 from models.user import User
+from services.sidebar_service import SidebarService
 
 class NotificationService:
     @staticmethod
@@ -16,7 +22,68 @@ class NotificationService:
             session.add(notification)
             session.commit()
             session.refresh(notification)
-            return notification
+        SidebarService.invalidate_sidebar_state([user_id])
+        return notification
+
+    @staticmethod
+    def create_notifications_bulk(
+        user_ids: Iterable[int],
+        message_template: str,
+        context: Optional[Dict[str, Any]] = None,
+        deduplicate: bool = False,
+        kind: Optional[str] = None,
+        source_id: Optional[int] = None,
+        created_at: Optional[datetime] = None
+    ) -> Dict[str, int]:
+        """
+        Eyni bildirişi bir çox istifadəçiyə bir executemany sorğusu ilə göndərir.
+        
+        Args:
+            user_ids (Iterable[int]): Bildiriş alacaq istifadəçilərin ID-ləri
+            message_template (str): str.format şablonu (məsələn, "{session_name} bitir")
+            context (Dict[str, Any], optional): Şablonun dəyərləri
+            deduplicate (bool): True olduqda eyni mətnli oxunmamış bildirişi olan istifadəçilər ötürülür
+            kind (str, optional): Bildirişin növü (məs. NOTIFICATION_KIND_360_REMINDER)
+            source_id (int, optional): Bildirişin aid olduğu obyektin ID-si
+            created_at (datetime, optional): Yaradılma vaxtı; default cari vaxt
+            
+        Returns:
+            Dict[str, int]: {"requested": ..., "created": ..., "skipped": ...}
+        """
+        user_ids = list(dict.fromkeys(uid for uid in user_ids if uid is not None))
+        message = message_template.format(**(context or {}))
+        if not user_ids:
+            return {"requested": 0, "created": 0, "skipped": 0}
+
+        with get_db() as session:
+            recipients = user_ids
+            if deduplicate:
+                already_unread = {
+                    uid for (uid,) in session.query(Notification.user_id).filter(
+                        Notification.user_id.in_(user_ids),
+                        Notification.is_read == False,
+                        Notification.message == message
+                    ).distinct()
+                }
+                recipients = [uid for uid in user_ids if uid not in already_unread]
+
+            if recipients:
+                created_at = created_at or datetime.utcnow()
+                session.execute(insert(Notification), [
+                    {
+                        "user_id": uid, "message": message, "is_read": False, "created_at": created_at,
+                        "kind": kind, "source_id": source_id
+                    }
+                    for uid in recipients
+                ])
+                session.commit()
+                SidebarService.invalidate_sidebar_state(recipients)
+
+        return {
+            "requested": len(user_ids),
+            "created": len(recipients),
+            "skipped": len(user_ids) - len(recipients)
+        }
 
     @staticmethod
     def get_unread_notifications(user_id: int):
@@ -35,6 +102,7 @@ class NotificationService:
             if notification:
                 notification.is_read = True
                 session.commit()
+                SidebarService.invalidate_sidebar_state([notification.user_id])
                 
     @staticmethod
     def mark_all_as_read(user_id: int):
@@ -46,4 +114,5 @@ class NotificationService:
             ).all()
             for notification in notifications:
                 notification.is_read = True
-            session.commit()
\ No newline at end of file
+            session.commit()
+        SidebarService.invalidate_sidebar_state([user_id])
\ No newline at end of file
@@ -4,6 +4,13 @@ from database import get_db
 from models.pdp import DevelopmentPlan, PlanItem, PlanItemComment
 from datetime import date, datetime
 from typing import List
+from services.dto import (
+    DevelopmentPlanDTO,
+    PlanItemCommentDTO,
+    LOAD_SELECTIN,
+    development_plan_load_options,
+    plan_item_comment_load_options
+)
 
 class PDPService:
     @staticmethod
@@ -21,25 +28,34 @@ class PDPService:
             return plan
 
     @staticmethod
-    def get_development_plan_by_id(plan_id: int) -> DevelopmentPlan:
+    def get_development_plan_by_id(plan_id: int, load: str = LOAD_SELECTIN) -> DevelopmentPlanDTO:
         """Planı ID-sinə görə qaytarır."""
         with get_db() as session:
-            return session.query(DevelopmentPlan).filter(DevelopmentPlan.id == plan_id).first()
+            plan = session.query(DevelopmentPlan).options(
+                *development_plan_load_options(load)
+            ).filter(DevelopmentPlan.id == plan_id).first()
+            return DevelopmentPlanDTO.from_orm(plan)
 
     @staticmethod
-    def get_development_plans_for_user(user_id: int):
+    def get_development_plans_for_user(user_id: int, load: str = LOAD_SELECTIN) -> List[DevelopmentPlanDTO]:
         """İstifadəçinin bütün inkişaf planlarını qaytarır."""
         with get_db() as session:
-            return session.query(DevelopmentPlan).filter(DevelopmentPlan.user_id == user_id).all()
+            plans = session.query(DevelopmentPlan).options(
+                *development_plan_load_options(load)
+            ).filter(DevelopmentPlan.user_id == user_id).all()
+            return [DevelopmentPlanDTO.from_orm(plan) for plan in plans]
 
     @staticmethod
-    def get_active_development_plans_for_user(user_id: int):
+    def get_active_development_plans_for_user(user_id: int, load: str = LOAD_SELECTIN) -> List[DevelopmentPlanDTO]:
         """İstifadəçinin aktiv inkişaf planlarını qaytarır."""
         with get_db() as session:
-            return session.query(DevelopmentPlan).filter(
+            plans = session.query(DevelopmentPlan).options(
+                *development_plan_load_options(load)
+            ).filter(
                 DevelopmentPlan.user_id == user_id,
                 DevelopmentPlan.status == "ACTIVE"
             ).all()
+            return [DevelopmentPlanDTO.from_orm(plan) for plan in plans]
 
     @staticmethod
     def update_development_plan_status(plan_id: int, status: str):
@@ -122,7 +138,10 @@ class PDPService:
             return comment
             
     @staticmethod
-    def get_comments_for_plan_item(item_id: int) -> List[PlanItemComment]:
+    def get_comments_for_plan_item(item_id: int, load: str = LOAD_SELECTIN) -> List[PlanItemCommentDTO]:
         """Hədəf üçün bütün şərhləri qaytarır."""
         with get_db() as session:
-            return session.query(PlanItemComment).filter(PlanItemComment.item_id == item_id).order_by(PlanItemComment.created_at.asc()).all()
\ No newline at end of file
+            comments = session.query(PlanItemComment).options(
+                *plan_item_comment_load_options(load)
+            ).filter(PlanItemComment.item_id == item_id).order_by(PlanItemComment.created_at.asc()).all()
+            return [PlanItemCommentDTO.from_orm(comment) for comment in comments]
\ No newline at end of file
@@ -0,0 +1,189 @@
+# services/question_service.py
+
+import threading
+from typing import Any, Dict, List
+
+from sqlalchemy import bindparam, func, insert, select, update
+
+from database import get_db
+from models.kpi import Answer, Question
+from services.cache import cached, invalidate
+from services.dto import QuestionDTO
+from services.kpi_service import KpiService
+
+
+# Toplu yazıda dəyişdirilə bilən sahələr
+QUESTION_FIELDS = ("text", "category", "weight", "is_active")
+
+# Aktiv sualların çəkilərinin cəmi bu qiymətə bərabər olmalıdır
+TARGET_TOTAL_WEIGHT = 1.0
+WEIGHT_TOLERANCE = 0.001
+
+_questions_lock = threading.Lock()
+_questions_version = 0
+
+
+class QuestionService:
+    @staticmethod
+    def get_questions_version() -> int:
+        """
+        Sualların versiyasını qaytarır. Suallar hər dəfə dəyişdikdə artır, buna görə
+        sualların mətnindən və ya çəkisindən asılı keşlər bu versiyanı açara daxil edə bilər.
+        """
+        with _questions_lock:
+            return _questions_version
+
+    @staticmethod
+    def _bump_questions_version() -> None:
+        """Sualların versiyasını artırır və sual keşlərini etibarsızlaşdırır."""
+        global _questions_version
+        with _questions_lock:
+            _questions_version += 1
+        invalidate("kpi_questions")
+
+    @staticmethod
+    @cached("kpi_questions", ttl=300)
+    def get_all_questions() -> List[QuestionDTO]:
+        """Bütün (aktiv və deaktiv) sualları ID sırası ilə əldə edir."""
+        with get_db() as session:
+            questions = session.query(Question).order_by(Question.id).all()
+            return [QuestionDTO.from_orm(q) for q in questions]
+
+    @staticmethod
+    @cached("kpi_questions", ttl=300)
+    def get_active_weight_total() -> float:
+        """Aktiv sualların çəkilərinin cəmini qaytarır."""
+        with get_db() as session:
+            return QuestionService._active_weight_total(session)
+
+    @staticmethod
+    def _active_weight_total(session) -> float:
+        total = session.query(func.sum(Question.weight)).filter(Question.is_active == True).scalar()
+        return float(total or 0.0)
+
+    @staticmethod
+    def create_question(text: str, category: str, weight: float) -> Dict[str, Any]:
+        """
+        Yeni aktiv sual yaradır. Aktiv sualların çəkilərinin cəmi TARGET_TOTAL_WEIGHT-dən
+        çox ola bilməz (cəm sual-sual yığıldığı üçün dəqiq bərabərlik tələb olunmur).
+
+        Returns:
+            Dict[str, Any]: upsert_questions-in nəticəsi
+        """
+        return QuestionService.upsert_questions(
+            [{"text": text, "category": category, "weight": weight, "is_active": True}],
+            require_exact_total=False
+        )
+
+    @staticmethod
+    def upsert_questions(questions: List[Dict[str, Any]], require_exact_total: bool = True) -> Dict[str, Any]:
+        """
+        Sualları bir tranzaksiyada toplu şəkildə yaradır və yeniləyir.
+
+        "id" açarı olan sətirlərdə yalnız verilmiş sahələr yenilənir; eyni sahələr dəstini
+        dəyişən suallar üçün bir UPDATE executemany ilə icra olunur. "id" olmayan sətirlər
+        yeni sual kimi əlavə edilir. Yazıdan sonra aktiv sualların çəkilərinin cəmi eyni
+        tranzaksiya daxilində SQL ilə yoxlanılır; şərt ödənmirsə, heç nə yazılmır.
+
+        Çəkisi dəyişən suallara cavabı olan qiymətləndirmələrin saxlanılmış balları
+        (evaluation_scores) eyni tranzaksiyada yenidən hesablanır. Səriştə cəmləri
+        (competency_rollups) çəkidən və is_active-dən asılı deyil, buna görə toxunulmur.
+
+        Args:
+            questions (List[Dict[str, Any]]): Sətirlər; sahələr QUESTION_FIELDS-dən (və "id")
+            require_exact_total (bool): True olduqda cəm TARGET_TOTAL_WEIGHT-ə bərabər,
+                                        False olduqda ondan çox olmamalıdır
+
+        Returns:
+            Dict[str, Any]: {"created": ..., "updated": ..., "total_weight": ...}
+
+        Raises:
+            ValueError: Naməlum sahə, mövcud olmayan sual, boş mətn, mənfi çəki və ya
+                        çəkilərin cəmi şərti ödəmədikdə.
+        """
+        updates: Dict[tuple, List[Dict[str, Any]]] = {}
+        new_rows = []
+        for row in questions:
+            fields = {key: value for key, value in row.items() if key != "id"}
+            unknown = set(fields) - set(QUESTION_FIELDS)
+            if unknown:
+                raise ValueError(f"Naməlum sahələr: {', '.join(sorted(unknown))}")
+            if "text" in fields and not str(fields["text"] or "").strip():
+                raise ValueError("Sualın mətni boş ola bilməz.")
+            if "weight" in fields:
+                fields["weight"] = float(fields["weight"])
+                if fields["weight"] < 0:
+                    raise ValueError("Sualın çəkisi mənfi ola bilməz.")
+            if "is_active" in fields:
+                fields["is_active"] = bool(fields["is_active"])
+
+            if row.get("id") is None:
+                if "text" not in fields:
+                    raise ValueError("Yeni sual üçün mətn tələb olunur.")
+                new_rows.append({
+                    "text": fields["text"],
+                    "category": fields.get("category") or "Ümumi",
+                    "weight": fields.get("weight", 1.0),
+                    "is_active": fields.get("is_active", True)
+                })
+            elif fields:
+                columns = tuple(field for field in QUESTION_FIELDS if field in fields)
+                updates.setdefault(columns, []).append(
+                    {"b_id": int(row["id"]), **{f"b_{field}": fields[field] for field in columns}}
+                )
+
+        if not updates and not new_rows:
+            return {"created": 0, "updated": 0, "total_weight": QuestionService.get_active_weight_total()}
+
+        update_ids = {params["b_id"] for rows in updates.values() for params in rows}
+        reweighted_ids = {
+            params["b_id"] for columns, rows in updates.items() if "weight" in columns for params in rows
+        }
+        table = Question.__table__
+        with get_db() as session:
+            try:
+                if update_ids:
+                    existing = set(session.scalars(select(Question.id).where(Question.id.in_(update_ids))))
+                    missing = sorted(update_ids - existing)
+                    if missing:
+                        raise ValueError(f"Sual tapılmadı: {', '.join(map(str, missing))}")
+
+                for columns, params in updates.items():
+                    session.execute(
+                        update(table).where(table.c.id == bindparam("b_id")).values(
+                            {column: bindparam(f"b_{column}") for column in columns}
+                        ),
+                        params
+                    )
+                if new_rows:
+                    session.execute(insert(table), new_rows)
+
+                # Cəm tranzaksiyanın öz dəyişiklikləri ilə birlikdə hesablanır
+                total_weight = QuestionService._active_weight_total(session)
+                if require_exact_total and abs(total_weight - TARGET_TOTAL_WEIGHT) > WEIGHT_TOLERANCE:
+                    raise ValueError(
+                        f"Yadda saxlamaq mümkün deyil! Aktiv sualların yeni cəmi {total_weight:.2f} olur. "
+                        f"Cəm {TARGET_TOTAL_WEIGHT} olmalıdır."
+                    )
+                if not require_exact_total and total_weight > TARGET_TOTAL_WEIGHT + WEIGHT_TOLERANCE:
+                    raise ValueError(
+                        f"Yadda saxlamaq mümkün deyil! Cəm {total_weight:.2f} olacaq, "
+                        f"lakin maksimum {TARGET_TOTAL_WEIGHT} ola bilər."
+                    )
+
+                if reweighted_ids:
+                    affected_evaluation_ids = session.scalars(
+                        select(Answer.evaluation_id).where(Answer.question_id.in_(reweighted_ids)).distinct()
+                    ).all()
+                    KpiService._refresh_evaluation_scores(session, affected_evaluation_ids)
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+
+        QuestionService._bump_questions_version()
+        return {
+            "created": len(new_rows),
+            "updated": len(update_ids),
+            "total_weight": total_weight
+        }
@@ -0,0 +1,119 @@
+# services/sidebar_service.py
+
+import datetime
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+
+from config import settings
+from database import get_db
+from models.kpi import Evaluation, EvaluationPeriod, EvaluationStatus
+from models.notification import Notification
+from models.user import User
+from services.dto import UserDTO
+
+
+@dataclass(frozen=True)
+class UpcomingDeadline:
+    """İstifadəçinin tamamlanmamış qiymətləndirməsi olan və bitməsi yaxınlaşan dövr."""
+    period_name: str
+    end_date: datetime.date
+
+
+@dataclass(frozen=True)
+class SidebarState:
+    """Hər səhifənin yan panelində göstərilən istifadəçi vəziyyəti."""
+    user: Optional[UserDTO]
+    unread_count: int
+    upcoming_deadlines: Tuple[UpcomingDeadline, ...]
+    loaded_at: float
+
+
+_sidebar_lock = threading.Lock()
+_sidebar_cache: Dict[int, SidebarState] = {}
+# Hər etibarsızlaşdırmada artır; yükləmə zamanı yazı olubsa, köhnə vəziyyət keşə yazılmır
+_sidebar_generation = 0
+
+
+class SidebarService:
+    @staticmethod
+    def get_sidebar_state(user_id: int) -> SidebarState:
+        """
+        İstifadəçinin yan panel vəziyyətini qaytarır.
+        Vəziyyət SIDEBAR_CACHE_TTL_SECONDS müddətində keşdə saxlanılır, buna görə
+        hər widget qarşılıqlı əlaqəsi verilənlər bazasına sorğu göndərmir.
+
+        Args:
+            user_id (int): İstifadəçinin ID-si
+
+        Returns:
+            SidebarState: Aktiv istifadəçi (tapılmazsa və ya deaktivdirsə None),
+                          oxunmamış bildirişlərin sayı və yaxınlaşan son tarixlər
+        """
+        now = time.monotonic()
+        with _sidebar_lock:
+            state = _sidebar_cache.get(user_id)
+            if state is not None and now - state.loaded_at < settings.SIDEBAR_CACHE_TTL_SECONDS:
+                return state
+            generation = _sidebar_generation
+
+        state = SidebarService._load_sidebar_state(user_id, now)
+        with _sidebar_lock:
+            # Yükləmə ilə yarışan etibarsızlaşdırma (məsələn, istifadəçinin deaktiv edilməsi)
+            # köhnə vəziyyətin bütün TTL müddətində keşdə qalmasına səbəb olmamalıdır
+            if _sidebar_generation == generation:
+                _sidebar_cache[user_id] = state
+        return state
+
+    @staticmethod
+    def _load_sidebar_state(user_id: int, loaded_at: float) -> SidebarState:
+        """Yan panel vəziyyətini verilənlər bazasından yükləyir."""
+        today = datetime.date.today()
+        with get_db() as session:
+            user = session.query(User).options(joinedload(User.profile)).filter(
+                User.id == user_id,
+                User.is_active == True
+            ).first()
+
+            unread_count = session.query(func.count(Notification.id)).filter(
+                Notification.user_id == user_id,
+                Notification.is_read == False
+            ).scalar()
+
+            # Növbəti 7 gündə bitən və istifadəçinin hələ doldurmadığı dövrlər
+            deadlines = session.query(EvaluationPeriod.name, EvaluationPeriod.end_date).join(
+                Evaluation, Evaluation.period_id == EvaluationPeriod.id
+            ).filter(
+                Evaluation.evaluator_user_id == user_id,
+                Evaluation.status == EvaluationStatus.PENDING,
+                EvaluationPeriod.end_date >= today,
+                EvaluationPeriod.end_date <= today + datetime.timedelta(days=7)
+            ).distinct().order_by(EvaluationPeriod.end_date, EvaluationPeriod.name).all()
+
+            return SidebarState(
+                user=UserDTO.from_orm(user),
+                unread_count=unread_count or 0,
+                upcoming_deadlines=tuple(UpcomingDeadline(name, end_date) for name, end_date in deadlines),
+                loaded_at=loaded_at
+            )
+
+    @staticmethod
+    def invalidate_sidebar_state(user_ids: Optional[Iterable[int]] = None) -> None:
+        """
+        Yan panel keşini təmizləyir ki, növbəti oxunuşda vəziyyət yenidən yüklənsin.
+
+        Args:
+            user_ids (Iterable[int], optional): İstifadəçilərin ID-ləri; None olduqda bütün keş təmizlənir
+        """
+        global _sidebar_generation
+        with _sidebar_lock:
+            _sidebar_generation += 1
+            if user_ids is None:
+                _sidebar_cache.clear()
+            else:
+                for user_id in user_ids:
+                    _sidebar_cache.pop(user_id, None)
@@ -0,0 +1,541 @@
+# services/snapshot_service.py
+
+"""
+Analitika səhifələri üçün sütunlu (Parquet) snapshot.
+
+Dashboard-lar OLTP cədvəllərini birbaşa sorğulamaq əvəzinə dövr üzrə bölünmüş,
+denormallaşdırılmış Parquet fayllarını oxuyur:
+
+    <ANALYTICS_SNAPSHOT_DIR>/<dataset>/period_id=<id>/part-0.parquet
+    <ANALYTICS_SNAPSHOT_DIR>/_manifests/period_<id>.json
+
+Snapshot qiymətləndirmələr yekunlaşdırıldıqdan sonra KpiService-in növbəyə qoyduğu fon işində
+(JOB_BUILD_ANALYTICS_SNAPSHOT) və ya scripts/build_analytics_snapshot.py ilə yenilənir. Hər dövr üçün verilənlər bazasının
+qısa "barmaq izi" (qiymətləndirmə və cavab sayları, yekunlaşdırılmışlar, son dəyişiklik
+vaxtları) manifestdə saxlanılır; yalnız barmaq izi dəyişmiş dövrlər yenidən yazılır, buna
+görə yekunlaşdırma dalğasından sonra bir iş bütün dəyişiklikləri bir dəfəyə toplayır.
+
+Fayllar yaddaşa xəritələnərək (memory_map) və yalnız lazım olan sütunlarla oxunur. Snapshot
+olmadıqda və ya manifestdəki barmaq izi cari barmaq izi ilə üst-üstə düşmədikdə oxuma
+funksiyaları None qaytarır və səhifələr canlı sorğuya qayıdır.
+"""
+
+import datetime
+import json
+import os
+import shutil
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from sqlalchemy import case, func, select
+
+from config import settings
+from database import get_db
+from models.competency import Competency
+from models.degree360 import Degree360Aggregate, Degree360Question, Degree360Session
+from models.kpi import (
+    Answer, Evaluation, EvaluationPeriod, EvaluationScore, EvaluationStatus, Question,
+    kpi_question_competency_association
+)
+from models.user_profile import UserProfile
+from services.export_service import ExportService
+from services.kpi_service import KpiService
+
+
+DATASET_EVALUATION_SCORES = "evaluation_scores"
+DATASET_ANSWER_FACTS = "answer_facts"
+DATASET_DEGREE360_AGGREGATES = "degree360_aggregates"
+
+# Hər dataset-in sütunları (bölmə sütunu period_id faylda deyil, qovluq adındadır)
+SNAPSHOT_SCHEMAS: Dict[str, pa.Schema] = {
+    DATASET_EVALUATION_SCORES: pa.schema([
+        ("evaluation_id", pa.int64()),
+        ("period_name", pa.string()),
+        ("evaluated_user_id", pa.int64()),
+        ("evaluator_user_id", pa.int64()),
+        ("full_name", pa.string()),
+        ("department", pa.string()),
+        ("position", pa.string()),
+        ("status", pa.string()),
+        ("employee_score", pa.float64()),
+        ("manager_score", pa.float64()),
+        ("total_score", pa.float64()),
+    ]),
+    # Cavab × səriştə: bir neçə səriştəyə bağlı sualın cavabı hər səriştə üçün ayrıca sətirdir,
+    # səriştəsiz sualın cavabı isə competency_id boş olan bir sətirdir
+    DATASET_ANSWER_FACTS: pa.schema([
+        ("answer_id", pa.int64()),
+        ("evaluation_id", pa.int64()),
+        ("period_name", pa.string()),
+        ("evaluated_user_id", pa.int64()),
+        ("full_name", pa.string()),
+        ("department", pa.string()),
+        ("evaluation_status", pa.string()),
+        ("author_role", pa.string()),
+        ("question_id", pa.int64()),
+        ("question_text", pa.string()),
+        ("question_category", pa.string()),
+        ("question_weight", pa.float64()),
+        ("competency_id", pa.int64()),
+        ("competency_name", pa.string()),
+        ("competency_category", pa.string()),
+        ("score", pa.int64()),
+    ]),
+    # Dövrlə üst-üstə düşən 360° sessiyalarının sual və rol üzrə yığılmış cəmləri
+    DATASET_DEGREE360_AGGREGATES: pa.schema([
+        ("session_id", pa.int64()),
+        ("session_name", pa.string()),
+        ("session_status", pa.string()),
+        ("evaluated_user_id", pa.int64()),
+        ("full_name", pa.string()),
+        ("department", pa.string()),
+        ("question_id", pa.int64()),
+        ("question_text", pa.string()),
+        ("question_category", pa.string()),
+        ("question_is_active", pa.bool_()),
+        ("role", pa.string()),
+        ("score_sum", pa.float64()),
+        ("score_count", pa.int64()),
+        ("score_sumsq", pa.float64()),
+    ]),
+}
+SNAPSHOT_DATASETS = tuple(SNAPSHOT_SCHEMAS)
+
+_MANIFEST_DIR = "_manifests"
+_PART_FILE = "part-0.parquet"
+_PARTITIONING = ds.partitioning(pa.schema([("period_id", pa.int64())]), flavor="hive")
+
+
+def _partition_dir(dataset: str, period_id: int) -> str:
+    return os.path.join(settings.ANALYTICS_SNAPSHOT_DIR, dataset, f"period_id={period_id}")
+
+
+def _manifest_path(period_id: int) -> str:
+    return os.path.join(settings.ANALYTICS_SNAPSHOT_DIR, _MANIFEST_DIR, f"period_{period_id}.json")
+
+
+def _write_atomic(path: str, write: Callable[[str], Any]) -> Any:
+    # Nöqtə ilə başlayan müvəqqəti fayl oxuyucular tərəfindən nəzərə alınmır; hazır olduqda əvəz edilir
+    tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.tmp")
+    try:
+        result = write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return result
+
+
+class AnalyticsSnapshotService:
+    @staticmethod
+    def _dataset_statement(dataset: str, period: EvaluationPeriod):
+        """Dataset-in dövr üzrə sətirlərini SNAPSHOT_SCHEMAS sırası ilə qaytaran sorğu."""
+        if dataset == DATASET_EVALUATION_SCORES:
+            return select(
+                Evaluation.id,
+                EvaluationPeriod.name,
+                Evaluation.evaluated_user_id,
+                Evaluation.evaluator_user_id,
+                UserProfile.full_name,
+                UserProfile.department,
+                UserProfile.position,
+                Evaluation.status,
+                EvaluationScore.employee_score,
+                EvaluationScore.manager_score,
+                KpiService._evaluation_score_expression()
+            ).select_from(Evaluation).join(
+                EvaluationPeriod, EvaluationPeriod.id == Evaluation.period_id
+            ).outerjoin(
+                EvaluationScore, EvaluationScore.evaluation_id == Evaluation.id
+            ).outerjoin(
+                UserProfile, UserProfile.user_id == Evaluation.evaluated_user_id
+            ).where(
+                Evaluation.period_id == period.id
+            ).order_by(Evaluation.id)
+
+        if dataset == DATASET_ANSWER_FACTS:
+            return select(
+                Answer.id,
+                Evaluation.id,
+                EvaluationPeriod.name,
+                Evaluation.evaluated_user_id,
+                UserProfile.full_name,
+                UserProfile.department,
+                Evaluation.status,
+                Answer.author_role,
+                Question.id,
+                Question.text,
+                Question.category,
+                Question.weight,
+                Competency.id,
+                Competency.name,
+                Competency.category,
+                Answer.score
+            ).select_from(Answer).join(
+                Evaluation, Evaluation.id == Answer.evaluation_id
+            ).join(
+                EvaluationPeriod, EvaluationPeriod.id == Evaluation.period_id
+            ).join(
+                Question, Question.id == Answer.question_id
+            ).outerjoin(
+                UserProfile, UserProfile.user_id == Evaluation.evaluated_user_id
+            ).outerjoin(
+                kpi_question_competency_association,
+                kpi_question_competency_association.c.question_id == Question.id
+            ).outerjoin(
+                Competency, Competency.id == kpi_question_competency_association.c.competency_id
+            ).where(
+                Evaluation.period_id == period.id
+            ).order_by(Answer.id, Competency.id)
+
+        if dataset == DATASET_DEGREE360_AGGREGATES:
+            return select(
+                Degree360Session.id,
+                Degree360Session.name,
+                Degree360Session.status,
+                Degree360Session.evaluated_user_id,
+                UserProfile.full_name,
+                UserProfile.department,
+                Degree360Question.id,
+                Degree360Question.text,
+                Degree360Question.category,
+                Degree360Question.is_active,
+                Degree360Aggregate.role,
+                Degree360Aggregate.score_sum,
+                Degree360Aggregate.score_count,
+                Degree360Aggregate.score_sumsq
+            ).select_from(Degree360Aggregate).join(
+                Degree360Session, Degree360Session.id == Degree360Aggregate.session_id
+            ).join(
+                Degree360Question, Degree360Question.id == Degree360Aggregate.question_id
+            ).outerjoin(
+                UserProfile, UserProfile.user_id == Degree360Session.evaluated_user_id
+            ).where(
+                Degree360Session.start_date <= period.end_date,
+                Degree360Session.end_date >= period.start_date
+            ).order_by(Degree360Aggregate.session_id, Degree360Aggregate.question_id, Degree360Aggregate.role)
+
+        raise ValueError(f"Naməlum dataset: {dataset}")
+
+    @staticmethod
+    def _period_fingerprints(period_ids: Optional[Iterable[int]] = None) -> Dict[int, List[str]]:
+        """
+        Dövrlərin snapshot-a düşən məlumatlarının barmaq izini bir neçə qruplaşdırılmış
+        sorğu ilə hesablayır. Yekunlaşdırma, cavabların təsdiqi, yeni 360° cavabları və ya
+        qiymətləndirilən işçilərin profilinin (ad, şöbə) dəyişməsi barmaq izini dəyişir.
+
+        Args:
+            period_ids (Optional[Iterable[int]]): Dövrlər; None olduqda bütün dövrlər
+
+        Returns:
+            Dict[int, List[str]]: dövr ID-si -> barmaq izi
+        """
+        with get_db() as session:
+            periods = session.query(EvaluationPeriod)
+            if period_ids is not None:
+                periods = periods.filter(EvaluationPeriod.id.in_(list(period_ids)))
+            period_list = periods.all()
+            ids = [p.id for p in period_list]
+            if not ids:
+                return {}
+
+            is_finalized = Evaluation.status == EvaluationStatus.FINALIZED
+            evaluations = {
+                row[0]: row[1:] for row in session.query(
+                    Evaluation.period_id,
+                    func.count(Evaluation.id),
+                    func.sum(case((is_finalized, 1), else_=0)),
+                    func.sum(case((is_finalized, Evaluation.id), else_=0))
+                ).filter(Evaluation.period_id.in_(ids)).group_by(Evaluation.period_id)
+            }
+            scores = dict(session.query(
+                EvaluationScore.period_id, func.max(EvaluationScore.updated_at)
+            ).filter(EvaluationScore.period_id.in_(ids)).group_by(EvaluationScore.period_id).all())
+            answers = {
+                row[0]: row[1:] for row in session.query(
+                    Evaluation.period_id, func.count(Answer.id), func.max(Answer.id)
+                ).join(
+                    Answer, Answer.evaluation_id == Evaluation.id
+                ).filter(Evaluation.period_id.in_(ids)).group_by(Evaluation.period_id)
+            }
+            degree360 = {
+                row[0]: row[1:] for row in session.query(
+                    EvaluationPeriod.id,
+                    func.count(Degree360Aggregate.session_id),
+                    func.max(Degree360Aggregate.updated_at),
+                    func.max(UserProfile.updated_at)
+                ).join(
+                    Degree360Session, (Degree360Session.start_date <= EvaluationPeriod.end_date)
+                    & (Degree360Session.end_date >= EvaluationPeriod.start_date)
+                ).join(
+                    Degree360Aggregate, Degree360Aggregate.session_id == Degree360Session.id
+                ).outerjoin(
+                    UserProfile, UserProfile.user_id == Degree360Session.evaluated_user_id
+                ).filter(EvaluationPeriod.id.in_(ids)).group_by(EvaluationPeriod.id)
+            }
+            # Snapshot-dakı ad və şöbə sütunları qiymətləndirilən işçilərin profilindən gəlir
+            profiles = dict(session.query(
+                Evaluation.period_id, func.max(UserProfile.updated_at)
+            ).join(
+                UserProfile, UserProfile.user_id == Evaluation.evaluated_user_id
+            ).filter(Evaluation.period_id.in_(ids)).group_by(Evaluation.period_id).all())
+
+            return {
+                period.id: [
+                    str(value) for value in (
+                        period.name, period.start_date, period.end_date,
+                        *evaluations.get(period.id, (0, 0, 0)),
+                        scores.get(period.id),
+                        *answers.get(period.id, (0, None)),
+                        *degree360.get(period.id, (0, None, None)),
+                        profiles.get(period.id),
+                    )
+                ]
+                for period in period_list
+            }
+
+    @staticmethod
+    def _read_manifest(period_id: int) -> Optional[Dict[str, Any]]:
+        try:
+            with open(_manifest_path(period_id), encoding="utf-8") as manifest:
+                return json.load(manifest)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    @staticmethod
+    def snapshot_period_ids() -> List[int]:
+        """Snapshot-u hazır olan dövrlərin ID-lərini qaytarır."""
+        manifest_dir = os.path.join(settings.ANALYTICS_SNAPSHOT_DIR, _MANIFEST_DIR)
+        if not os.path.isdir(manifest_dir):
+            return []
+        return sorted(
+            int(name[len("period_"):-len(".json")]) for name in os.listdir(manifest_dir)
+            if name.startswith("period_") and name.endswith(".json")
+        )
+
+    @staticmethod
+    def build_period_snapshot(period_id: int, chunk_size: Optional[int] = None) -> Dict[str, int]:
+        """
+        Dövrün bütün dataset-lərini yenidən yazır. Sətirlər verilənlər bazasından hissə-hissə
+        oxunaraq Parquet sətir qruplarına yazılır; hər fayl və manifest ayrıca hazırlanıb
+        atomik əvəz edilir, buna görə oxuyucular yarımçıq fayl görmür.
+
+        Args:
+            period_id (int): Dövrün ID-si
+            chunk_size (Optional[int]): Hissənin ölçüsü; None olduqda EXPORT_CHUNK_SIZE
+
+        Returns:
+            Dict[str, int]: dataset -> yazılmış sətirlərin sayı
+
+        Raises:
+            ValueError: Dövr tapılmadıqda.
+        """
+        # Barmaq izi oxumadan əvvəl götürülür: yazı zamanı gələn dəyişikliklər növbəti dəfə nəzərə alınır
+        fingerprint = AnalyticsSnapshotService._period_fingerprints([period_id]).get(period_id)
+        if fingerprint is None:
+            raise ValueError("Qiymətləndirmə dövrü tapılmadı.")
+
+        with get_db() as session:
+            period = session.get(EvaluationPeriod, period_id)
+            statements = {
+                dataset: AnalyticsSnapshotService._dataset_statement(dataset, period)
+                for dataset in SNAPSHOT_DATASETS
+            }
+
+        rows = {}
+        for dataset, statement in statements.items():
+            schema = SNAPSHOT_SCHEMAS[dataset]
+
+            def _write(tmp_path, statement=statement, schema=schema):
+                written = 0
+                with pq.ParquetWriter(tmp_path, schema) as writer:
+                    for chunk in ExportService._stream_rows(statement, chunk_size):
+                        columns = list(zip(*chunk))
+                        writer.write_table(pa.Table.from_arrays(
+                            [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                            schema=schema
+                        ))
+                        written += len(chunk)
+                return written
+
+            os.makedirs(_partition_dir(dataset, period_id), exist_ok=True)
+            rows[dataset] = _write_atomic(os.path.join(_partition_dir(dataset, period_id), _PART_FILE), _write)
+
+        manifest = {
+            "period_id": period_id,
+            "fingerprint": fingerprint,
+            "built_at": datetime.datetime.utcnow().isoformat(),
+            "rows": rows,
+        }
+
+        def _write_manifest(tmp_path):
+            with open(tmp_path, "w", encoding="utf-8") as manifest_file:
+                json.dump(manifest, manifest_file, ensure_ascii=False)
+
+        os.makedirs(os.path.dirname(_manifest_path(period_id)), exist_ok=True)
+        _write_atomic(_manifest_path(period_id), _write_manifest)
+        return rows
+
+    @staticmethod
+    def remove_period_snapshot(period_id: int) -> None:
+        """Dövrün snapshot-unu (manifest birinci) silir."""
+        if os.path.exists(_manifest_path(period_id)):
+            os.remove(_manifest_path(period_id))
+        for dataset in SNAPSHOT_DATASETS:
+            shutil.rmtree(_partition_dir(dataset, period_id), ignore_errors=True)
+
+    @staticmethod
+    def stale_period_ids() -> List[int]:
+        """Snapshot-u olmayan və ya barmaq izi dəyişmiş dövrlərin ID-lərini qaytarır."""
+        return sorted(
+            period_id for period_id, fingerprint in AnalyticsSnapshotService._period_fingerprints().items()
+            if (AnalyticsSnapshotService._read_manifest(period_id) or {}).get("fingerprint") != fingerprint
+        )
+
+    @staticmethod
+    def build_stale_snapshots(progress: Optional[Callable[[float, str], None]] = None) -> Dict[int, Dict[str, int]]:
+        """
+        Köhnəlmiş dövrlərin snapshot-unu yeniləyir və silinmiş dövrlərin snapshot-unu təmizləyir.
+
+        Args:
+            progress (Optional[Callable[[float, str], None]]): Gedişat funksiyası (0-1, mesaj)
+
+        Returns:
+            Dict[int, Dict[str, int]]: yenilənmiş dövr ID-si -> dataset üzrə sətir sayları
+        """
+        existing = set(AnalyticsSnapshotService._period_fingerprints())
+        for period_id in AnalyticsSnapshotService.snapshot_period_ids():
+            if period_id not in existing:
+                AnalyticsSnapshotService.remove_period_snapshot(period_id)
+
+        stale = AnalyticsSnapshotService.stale_period_ids()
+        built = {}
+        for index, period_id in enumerate(stale):
+            if progress:
+                progress(index / len(stale), f"Dövr {period_id} yazılır")
+            built[period_id] = AnalyticsSnapshotService.build_period_snapshot(period_id)
+        return built
+
+    @staticmethod
+    def load_dataset(
+        dataset: str,
+        period_ids: Optional[Sequence[int]] = None,
+        columns: Optional[Sequence[str]] = None,
+        filters: Optional[List[tuple]] = None,
+    ) -> Optional[pd.DataFrame]:
+        """
+        Dataset-i yaddaşa xəritələnmiş fayllardan yalnız lazım olan sütun və dövrlərlə oxuyur.
+
+        Args:
+            dataset (str): SNAPSHOT_DATASETS-dən biri
+            period_ids (Optional[Sequence[int]]): Dövrlər; None olduqda snapshot-u olan bütün dövrlər
+            columns (Optional[Sequence[str]]): Sütunlar ("period_id" daxil ola bilər); None olduqda hamısı
+            filters (Optional[List[tuple]]): pyarrow filtrləri, məsələn [("status", "==", "...")]
+
+        Returns:
+            Optional[pd.DataFrame]: Cədvəl; istənilən dövrlərdən birinin snapshot-u yoxdursa
+                                    və ya köhnəlibsə None
+
+        Raises:
+            ValueError: Dataset naməlum olduqda.
+        """
+        if dataset not in SNAPSHOT_SCHEMAS:
+            raise ValueError(f"Naməlum dataset: {dataset}")
+
+        available = AnalyticsSnapshotService.snapshot_period_ids()
+        if period_ids is None:
+            period_ids = available
+        if not period_ids or not set(period_ids) <= set(available):
+            return None
+        # Barmaq izi dəyişmiş (məsələn, yekunlaşdırmadan sonra hələ yenidən yazılmamış) dövrlər
+        # köhnə məlumat göstərməsin deyə canlı sorğuya qayıdırıq
+        current = AnalyticsSnapshotService._period_fingerprints(period_ids)
+        if any(
+            (AnalyticsSnapshotService._read_manifest(period_id) or {}).get("fingerprint") != current.get(period_id)
+            for period_id in period_ids
+        ):
+            return None
+
+        table = pq.read_table(
+            os.path.join(settings.ANALYTICS_SNAPSHOT_DIR, dataset),
+            columns=list(columns) if columns is not None else None,
+            filters=[("period_id", "in", list(period_ids))] + list(filters or []),
+            memory_map=True,
+            partitioning=_PARTITIONING
+        )
+        return table.to_pandas()
+
+    @staticmethod
+    def get_user_performance_data(period_id: int, department: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        KpiService.get_user_performance_data-nın snapshot-dan oxunan variantı.
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: full_name, department, total_score siyahısı;
+                                            dövrün snapshot-u yoxdursa None
+        """
+        filters = [("status", "==", EvaluationStatus.FINALIZED.value)]
+        if department:
+            filters.append(("department", "==", department))
+        df = AnalyticsSnapshotService.load_dataset(
+            DATASET_EVALUATION_SCORES, [period_id],
+            columns=["evaluated_user_id", "full_name", "department", "total_score"],
+            filters=filters
+        )
+        if df is None:
+            return None
+
+        grouped = df.groupby("evaluated_user_id", sort=True).agg(
+            full_name=("full_name", "first"),
+            department=("department", "first"),
+            total_score=("total_score", "mean")
+        )
+        return [
+            {
+                "full_name": row.full_name if isinstance(row.full_name, str) else "Naməlum",
+                "department": row.department if isinstance(row.department, str) else None,
+                "total_score": float(row.total_score)
+            }
+            for row in grouped.itertuples()
+        ]
+
+    @staticmethod
+    def get_user_performance_trend(user_id: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        KpiService.get_user_performance_trend-in snapshot-dan oxunan variantı.
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: period_name, score siyahısı; işçinin yekunlaşdırılmış
+                                            qiymətləndirməsi olan dövrlərdən birinin snapshot-u
+                                            yoxdursa None (yeni dövrlər səssizcə itməsin deyə)
+        """
+        with get_db() as session:
+            period_ids = [
+                period_id for (period_id,) in session.query(Evaluation.period_id).filter(
+                    Evaluation.evaluated_user_id == user_id,
+                    Evaluation.status == EvaluationStatus.FINALIZED
+                ).distinct().order_by(Evaluation.period_id)
+            ]
+        if not period_ids:
+            return []
+
+        df = AnalyticsSnapshotService.load_dataset(
+            DATASET_EVALUATION_SCORES,
+            period_ids,
+            columns=["period_id", "evaluation_id", "period_name", "total_score"],
+            filters=[
+                ("evaluated_user_id", "==", user_id),
+                ("status", "==", EvaluationStatus.FINALIZED.value)
+            ]
+        )
+        if df is None:
+            return None
+
+        df = df.sort_values(["period_id", "evaluation_id"])
+        return [
+            {"period_name": period_name, "score": float(score)}
+            for period_name, score in zip(df["period_name"], df["total_score"])
+        ]
@@ -0,0 +1,338 @@
+# services/talent_grid_service.py
+
+"""
+İstedadların təsnifatı (9-Box Grid) üçün hesablama servisi.
+
+Dövrün KPI balları və potensial göstəricisi bütün aktiv istifadəçilər üçün tək
+qruplaşdırılmış sorğu ilə (və ya analitika snapshot-undan) yüklənir, kateqoriyalara
+bölünmə isə numpy ilə vektorlaşdırılmış şəkildə aparılır. Servis Streamlit-dən asılı deyil və
+skriptlərdən də çağırıla bilər.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func
+
+from config import settings
+from database import get_db
+from models.degree360 import (
+    Degree360Aggregate, Degree360ParticipantRole, Degree360Question, Degree360Session
+)
+from models.kpi import Evaluation, EvaluationPeriod, EvaluationScore, EvaluationStatus
+from models.user import User
+from models.user_profile import UserProfile
+from services.kpi_service import KpiService
+from services.snapshot_service import (
+    DATASET_DEGREE360_AGGREGATES, DATASET_EVALUATION_SCORES, AnalyticsSnapshotService
+)
+from services.user_service import UserService
+
+
+PERFORMANCE_LABELS = ("Aşağı Performans", "Orta Performans", "Yüksək Performans")
+POTENTIAL_LABELS = ("Aşağı Potensial", "Orta Potensial", "Yüksək Potensial")
+
+# Potensial mənbələri
+POTENTIAL_SOURCE_360 = "360"  # 360° qiymətləndirmədə başqalarının (SELF xaric) orta balı
+POTENTIAL_SOURCE_MANAGER = "manager"  # Rəhbərin KPI qiymətləndirməsi üzrə balı
+POTENTIAL_SOURCE_AUTO = "auto"  # 360° balı, yoxdursa rəhbərin balı
+
+_POTENTIAL_SOURCES = (POTENTIAL_SOURCE_360, POTENTIAL_SOURCE_MANAGER, POTENTIAL_SOURCE_AUTO)
+
+GRID_COLUMNS = [
+    "user_id", "full_name", "department", "kpi_score", "potential_score",
+    "performance_level", "potential_level", "performance_category", "potential_category", "box",
+]
+
+
+@dataclass(frozen=True)
+class TalentGrid:
+    """
+    9-Box Grid nəticəsi.
+
+    employees: GRID_COLUMNS sütunlu cədvəl (hər iki balı olan işçilər)
+    cell_counts: 3×3 say matrisi (sətirlər potensial - yuxarıdan aşağı Yüksək→Aşağı,
+                 sütunlar performans - Aşağı→Yüksək)
+    members: (potensial kateqoriyası, performans kateqoriyası) -> istifadəçi ID-ləri
+    unscored_count: KPI və ya potensial balı olmadığı üçün cədvələ düşməyən aktiv istifadəçilər
+    """
+    employees: pd.DataFrame
+    cell_counts: pd.DataFrame
+    members: Dict[Tuple[str, str], Tuple[int, ...]]
+    unscored_count: int
+
+
+class TalentGridService:
+    @staticmethod
+    def build_talent_grid(
+        period_id: int,
+        potential_source: str = POTENTIAL_SOURCE_AUTO,
+        performance_thresholds: Optional[Sequence[float]] = None,
+        potential_thresholds: Optional[Sequence[float]] = None,
+        use_snapshot: bool = False,
+    ) -> TalentGrid:
+        """
+        Verilmiş dövr üçün 9-Box Grid-i hesablayır.
+
+        Args:
+            period_id (int): Qiymətləndirmə dövrünün ID-si
+            potential_source (str): Potensial mənbəyi ("360", "manager" və ya "auto")
+            performance_thresholds (Sequence[float], optional): Performansın (aşağı, yuxarı) hədləri;
+                verilməzsə TALENT_GRID_PERFORMANCE_THRESHOLDS istifadə olunur
+            potential_thresholds (Sequence[float], optional): Potensialın (aşağı, yuxarı) hədləri;
+                verilməzsə TALENT_GRID_POTENTIAL_THRESHOLDS istifadə olunur
+            use_snapshot (bool): Balları analitika snapshot-undan oxumaq; dövrün snapshot-u
+                yoxdursa canlı sorğu istifadə olunur
+
+        Returns:
+            TalentGrid: İşçilərin cədvəli, 3×3 say matrisi və xanalar üzrə üzvlər
+        """
+        if performance_thresholds is None:
+            performance_thresholds = settings.TALENT_GRID_PERFORMANCE_THRESHOLDS
+        if potential_thresholds is None:
+            potential_thresholds = settings.TALENT_GRID_POTENTIAL_THRESHOLDS
+
+        scores = None
+        if use_snapshot:
+            scores = TalentGridService.get_snapshot_grid_scores(period_id, potential_source)
+        if scores is None:
+            scores = TalentGridService.get_grid_scores(period_id, potential_source)
+        scored = scores.dropna(subset=["kpi_score", "potential_score"]).reset_index(drop=True)
+        employees = TalentGridService.bucket_scores(scored, performance_thresholds, potential_thresholds)
+
+        return TalentGrid(
+            employees=employees,
+            cell_counts=TalentGridService.cell_counts(employees),
+            members=TalentGridService.cell_members(employees),
+            unscored_count=len(scores) - len(scored)
+        )
+
+    @staticmethod
+    def get_grid_scores(period_id: int, potential_source: str = POTENTIAL_SOURCE_AUTO) -> pd.DataFrame:
+        """
+        Bütün aktiv istifadəçilərin dövr üzrə KPI və potensial ballarını tək sorğu ilə qaytarır.
+
+        KPI balı dövrün FINALIZED qiymətləndirmələrinin orta yekun balıdır. 360° potensialı
+        dövrlə üst-üstə düşən ləğv edilməmiş sessiyaların aktiv sualları üzrə SELF rolundan
+        başqa bütün rolların yığılmış cəmlərindən (degree360_aggregates) hesablanır.
+
+        Args:
+            period_id (int): Qiymətləndirmə dövrünün ID-si
+            potential_source (str): Potensial mənbəyi ("360", "manager" və ya "auto")
+
+        Returns:
+            pd.DataFrame: user_id, full_name, department, kpi_score, potential_score sütunları;
+                          balı olmayan istifadəçilər üçün NaN
+        """
+        if potential_source not in _POTENTIAL_SOURCES:
+            raise ValueError(
+                f"Naməlum potensial mənbəyi: {potential_source}. Mümkün dəyərlər: {', '.join(_POTENTIAL_SOURCES)}"
+            )
+
+        with get_db() as session:
+            period = session.get(EvaluationPeriod, period_id)
+            if period is None:
+                raise ValueError("Qiymətləndirmə dövrü tapılmadı.")
+
+            kpi = session.query(
+                Evaluation.evaluated_user_id.label("user_id"),
+                func.avg(KpiService._evaluation_score_expression()).label("score")
+            ).outerjoin(
+                EvaluationScore, EvaluationScore.evaluation_id == Evaluation.id
+            ).filter(
+                Evaluation.period_id == period_id,
+                Evaluation.status == EvaluationStatus.FINALIZED
+            ).group_by(Evaluation.evaluated_user_id).subquery()
+
+            degree360 = session.query(
+                Degree360Session.evaluated_user_id.label("user_id"),
+                (func.sum(Degree360Aggregate.score_sum)
+                 / func.nullif(func.sum(Degree360Aggregate.score_count), 0)).label("score")
+            ).join(
+                Degree360Aggregate, Degree360Aggregate.session_id == Degree360Session.id
+            ).join(
+                Degree360Question, Degree360Question.id == Degree360Aggregate.question_id
+            ).filter(
+                Degree360Session.status != "CANCELLED",
+                Degree360Session.start_date <= period.end_date,
+                Degree360Session.end_date >= period.start_date,
+                Degree360Question.is_active == True,
+                Degree360Aggregate.role != Degree360ParticipantRole.SELF
+            ).group_by(Degree360Session.evaluated_user_id).subquery()
+
+            manager = session.query(
+                EvaluationScore.evaluated_user_id.label("user_id"),
+                func.avg(EvaluationScore.manager_score).label("score")
+            ).join(
+                Evaluation, Evaluation.id == EvaluationScore.evaluation_id
+            ).filter(
+                EvaluationScore.period_id == period_id,
+                Evaluation.status == EvaluationStatus.FINALIZED
+            ).group_by(EvaluationScore.evaluated_user_id).subquery()
+
+            if potential_source == POTENTIAL_SOURCE_360:
+                potential = degree360.c.score
+            elif potential_source == POTENTIAL_SOURCE_MANAGER:
+                potential = manager.c.score
+            else:
+                potential = func.coalesce(degree360.c.score, manager.c.score)
+
+            query = session.query(
+                User.id,
+                UserProfile.full_name,
+                UserProfile.department,
+                kpi.c.score,
+                potential
+            ).outerjoin(
+                UserProfile, UserProfile.user_id == User.id
+            ).outerjoin(
+                kpi, kpi.c.user_id == User.id
+            )
+            if potential_source != POTENTIAL_SOURCE_MANAGER:
+                query = query.outerjoin(degree360, degree360.c.user_id == User.id)
+            if potential_source != POTENTIAL_SOURCE_360:
+                query = query.outerjoin(manager, manager.c.user_id == User.id)
+
+            rows = query.filter(User.is_active == True).order_by(User.id).all()
+
+        df = pd.DataFrame(
+            rows, columns=["user_id", "full_name", "department", "kpi_score", "potential_score"]
+        )
+        df["full_name"] = df["full_name"].fillna("Naməlum")
+        df["kpi_score"] = df["kpi_score"].astype(float)
+        df["potential_score"] = df["potential_score"].astype(float)
+        return df
+
+    @staticmethod
+    def get_snapshot_grid_scores(period_id: int, potential_source: str = POTENTIAL_SOURCE_AUTO) -> Optional[pd.DataFrame]:
+        """
+        get_grid_scores-un analitika snapshot-undan oxunan variantı. Ballar Parquet fayllarından,
+        aktiv istifadəçilər isə keşlənmiş istifadəçi kataloqundan götürülür, buna görə
+        verilənlər bazası sorğulanmır.
+
+        Args:
+            period_id (int): Qiymətləndirmə dövrünün ID-si
+            potential_source (str): Potensial mənbəyi ("360", "manager" və ya "auto")
+
+        Returns:
+            Optional[pd.DataFrame]: get_grid_scores ilə eyni sütunlar; dövrün snapshot-u yoxdursa None
+        """
+        if potential_source not in _POTENTIAL_SOURCES:
+            raise ValueError(
+                f"Naməlum potensial mənbəyi: {potential_source}. Mümkün dəyərlər: {', '.join(_POTENTIAL_SOURCES)}"
+            )
+
+        evaluations = AnalyticsSnapshotService.load_dataset(
+            DATASET_EVALUATION_SCORES, [period_id],
+            columns=["evaluated_user_id", "manager_score", "total_score"],
+            filters=[("status", "==", EvaluationStatus.FINALIZED.value)]
+        )
+        if evaluations is None:
+            return None
+        by_user = evaluations.groupby("evaluated_user_id")
+        kpi = by_user["total_score"].mean()
+        manager = by_user["manager_score"].mean()
+
+        aggregates = AnalyticsSnapshotService.load_dataset(
+            DATASET_DEGREE360_AGGREGATES, [period_id],
+            columns=["evaluated_user_id", "score_sum", "score_count"],
+            filters=[
+                ("session_status", "!=", "CANCELLED"),
+                ("question_is_active", "==", True),
+                ("role", "!=", Degree360ParticipantRole.SELF.value)
+            ]
+        )
+        totals = aggregates.groupby("evaluated_user_id")[["score_sum", "score_count"]].sum()
+        degree360 = totals["score_sum"] / totals["score_count"].replace(0, np.nan)
+
+        if potential_source == POTENTIAL_SOURCE_360:
+            potential = degree360
+        elif potential_source == POTENTIAL_SOURCE_MANAGER:
+            potential = manager
+        else:
+            potential = degree360.combine_first(manager)
+
+        users = UserService.get_user_directory().active_users()
+        df = pd.DataFrame({
+            "user_id": [user.id for user in users],
+            "full_name": [user.full_name for user in users],
+            "department": [user.department for user in users],
+        })
+        df["full_name"] = df["full_name"].fillna("Naməlum")
+        df["kpi_score"] = df["user_id"].map(kpi).astype(float)
+        df["potential_score"] = df["user_id"].map(potential).astype(float)
+        return df
+
+    @staticmethod
+    def bucket_scores(
+        df: pd.DataFrame,
+        performance_thresholds: Sequence[float],
+        potential_thresholds: Sequence[float],
+    ) -> pd.DataFrame:
+        """
+        KPI və potensial ballarını üç səviyyəyə bölür (0 - Aşağı, 1 - Orta, 2 - Yüksək).
+        Aşağı həddən kiçik bal Aşağı, yuxarı həddən böyük bal Yüksək, hədlər daxil
+        aralıq isə Orta səviyyəyə düşür.
+
+        Args:
+            df (pd.DataFrame): kpi_score və potential_score sütunları olan cədvəl
+            performance_thresholds (Sequence[float]): Performansın (aşağı, yuxarı) hədləri
+            potential_thresholds (Sequence[float]): Potensialın (aşağı, yuxarı) hədləri
+
+        Returns:
+            pd.DataFrame: GRID_COLUMNS sütunlu yeni cədvəl; box - 1 (Aşağı/Aşağı) ... 9 (Yüksək/Yüksək)
+        """
+        result = df.copy()
+        performance_level = _digitize(result["kpi_score"].to_numpy(dtype=float), performance_thresholds)
+        potential_level = _digitize(result["potential_score"].to_numpy(dtype=float), potential_thresholds)
+
+        result["performance_level"] = performance_level
+        result["potential_level"] = potential_level
+        result["performance_category"] = pd.Categorical.from_codes(
+            performance_level, categories=list(PERFORMANCE_LABELS), ordered=True
+        )
+        result["potential_category"] = pd.Categorical.from_codes(
+            potential_level, categories=list(POTENTIAL_LABELS), ordered=True
+        )
+        result["box"] = potential_level * 3 + performance_level + 1
+        return result[GRID_COLUMNS]
+
+    @staticmethod
+    def cell_counts(employees: pd.DataFrame) -> pd.DataFrame:
+        """3×3 say matrisi: sətirlər potensial (Yüksək yuxarıda), sütunlar performans."""
+        counts = np.zeros((3, 3), dtype=int)
+        np.add.at(
+            counts,
+            (employees["potential_level"].to_numpy(dtype=int), employees["performance_level"].to_numpy(dtype=int)),
+            1
+        )
+        return pd.DataFrame(
+            counts[::-1], index=list(POTENTIAL_LABELS[::-1]), columns=list(PERFORMANCE_LABELS)
+        )
+
+    @staticmethod
+    def cell_members(employees: pd.DataFrame) -> Dict[Tuple[str, str], Tuple[int, ...]]:
+        """Hər 9 xana üçün (potensial, performans) -> həmin xanadakı istifadəçi ID-ləri."""
+        members = {
+            (potential_label, performance_label): ()
+            for potential_label in POTENTIAL_LABELS
+            for performance_label in PERFORMANCE_LABELS
+        }
+        user_ids = employees["user_id"].to_numpy()
+        for (potential_level, performance_level), indices in employees.groupby(
+            ["potential_level", "performance_level"]
+        ).indices.items():
+            key = (POTENTIAL_LABELS[potential_level], PERFORMANCE_LABELS[performance_level])
+            members[key] = tuple(int(user_id) for user_id in user_ids[indices])
+        return members
+
+
+def _digitize(scores: np.ndarray, thresholds: Sequence[float]) -> np.ndarray:
+    """Balları (aşağı, yuxarı) hədlərinə görə 0/1/2 səviyyələrinə çevirir."""
+    if len(thresholds) != 2 or thresholds[0] > thresholds[1]:
+        raise ValueError("Hədlər artan sırada iki ədəddən ibarət olmalıdır: (aşağı, yuxarı).")
+    low, high = float(thresholds[0]), float(thresholds[1])
+    # Aşağı hədd Orta səviyyəyə, yuxarı hədd də Orta səviyyəyə aiddir
+    return (np.digitize(scores, [low], right=False) + np.digitize(scores, [high], right=True)).astype(np.int8)
@@ -1,15 +1,121 @@
 # services/user_service.py
 
+import threading
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import bindparam, func, insert, or_, select, update
+from sqlalchemy.orm import aliased, joinedload
+
 from database import get_db
 from models.user import User
 from models.user_profile import UserProfile
+from services.sidebar_service import SidebarService
+from services.cache import cached, invalidate
+from services.competency_rollup_service import CompetencyRollupService
+from services.dto import UserDTO
+
+
+class UserDirectory:
+    """
+    İstifadəçilərin və profillərinin bir sorğu ilə yüklənmiş, dəyişməz kataloqu.
+    ID, istifadəçi adı və tam ada görə indekslənir; səhifələr adları sətir-sətir
+    sorğu göndərmək əvəzinə buradan götürür. Kataloq sessiyadan ayrılmış ORM
+    obyektlərini deyil, dəyişməz UserDTO-ları saxlayır ki, paylaşılan keş
+    çağıranlar tərəfindən dəyişdirilə bilməsin.
+    """
+
+    def __init__(self, users: List[UserDTO], version: int):
+        self.version = version
+        self._users = users
+        self._by_id: Dict[int, UserDTO] = {user.id: user for user in users}
+        self._by_username: Dict[str, UserDTO] = {user.username: user for user in users}
+        self._by_full_name: Dict[str, UserDTO] = {}
+        for user in users:
+            self._by_full_name.setdefault(user.get_full_name(), user)
+
+    def get(self, user_id) -> Optional[UserDTO]:
+        """İstifadəçini ID-sinə görə qaytarır."""
+        return self._by_id.get(user_id)
+
+    def get_by_username(self, username: str) -> Optional[UserDTO]:
+        """İstifadəçini istifadəçi adına görə qaytarır."""
+        return self._by_username.get(username)
+
+    def get_by_full_name(self, full_name: str) -> Optional[UserDTO]:
+        """İstifadəçini tam adına görə qaytarır."""
+        return self._by_full_name.get(full_name)
+
+    def full_name(self, user_id, default: str = "Naməlum") -> str:
+        """İstifadəçinin tam adını qaytarır; tapılmazsa, `default`."""
+        user = self._by_id.get(user_id)
+        return user.get_full_name() if user else default
+
+    def all_users(self) -> List[UserDTO]:
+        """Bütün istifadəçiləri qaytarır."""
+        return list(self._users)
+
+    def active_users(self) -> List[UserDTO]:
+        """Bütün aktiv istifadəçiləri qaytarır."""
+        return [user for user in self._users if user.is_active]
+
+    def subordinates(self, manager_id) -> List[UserDTO]:
+        """Menecerə tabe olan aktiv istifadəçiləri qaytarır."""
+        return [user for user in self._users if user.manager_id == manager_id and user.is_active]
+
+    def __len__(self):
+        return len(self._users)
+
+
+# Toplu yeniləmədə dəyişdirilə bilən sahələr (cədvəllər üzrə)
+USER_EDITABLE_FIELDS = ("username", "role", "is_active", "manager_id")
+PROFILE_EDITABLE_FIELDS = ("full_name", "position", "department")
+
+_directory_lock = threading.Lock()
+_directory_version = 0
+_directory: Optional[UserDirectory] = None
+
 
 class UserService:
+    @staticmethod
+    def get_user_directory() -> UserDirectory:
+        """
+        İstifadəçi kataloqunu qaytarır.
+        Kataloq versiyası köhnəlibsə, bütün istifadəçilər profilləri ilə birlikdə
+        bir sorğu ilə yenidən yüklənir.
+        """
+        global _directory
+        with _directory_lock:
+            if _directory is not None and _directory.version == _directory_version:
+                return _directory
+            version = _directory_version
+
+        with get_db() as session:
+            users = session.query(User).options(joinedload(User.profile)).order_by(User.id).all()
+            directory = UserDirectory([UserDTO.from_orm(user) for user in users], version)
+
+        with _directory_lock:
+            # Yükləmə zamanı yazı olubsa, köhnə versiyanı keşdə saxlamırıq
+            if version == _directory_version:
+                _directory = directory
+        return directory
+
+    @staticmethod
+    def invalidate_user_directory():
+        """
+        İstifadəçi kataloqunun versiyasını artırır ki, növbəti oxunuşda yenidən yüklənsin.
+        Yan paneldə keşlənmiş cari istifadəçi məlumatları da təmizlənir.
+        """
+        global _directory_version
+        with _directory_lock:
+            _directory_version += 1
+        invalidate("active_users")
+        SidebarService.invalidate_sidebar_state()
+
     @staticmethod
     def get_user_by_id(user_id):
         """İstifadəçini ID-sinə görə əldə edir."""
         with get_db() as session:
-            return session.query(User).filter(User.id == user_id).first()
+            return session.query(User).options(joinedload(User.profile)).filter(User.id == user_id).first()
 
     @staticmethod
     def get_user_profile_by_user_id(user_id):
@@ -18,37 +124,242 @@ class UserService:
             return session.query(UserProfile).filter(UserProfile.user_id == user_id).first()
 
     @staticmethod
-    def get_all_active_users():
+    @cached("active_users", ttl=300)
+    def get_all_active_users() -> List[UserDTO]:
         """Bütün aktiv istifadəçiləri əldə edir."""
-        with get_db() as session:
-            return session.query(User).filter(User.is_active == True).all()
+        return UserService.get_user_directory().active_users()
 
     @staticmethod
     def get_subordinates(manager_id):
         """Menecerə tabe olan istifadəçiləri əldə edir."""
-        with get_db() as session:
-            return session.query(User).filter(User.manager_id == manager_id, User.is_active == True).all()
+        return UserService.get_user_directory().subordinates(manager_id)
             
     @staticmethod
     def get_all_users_with_profiles():
-        """Bütün istifadəçiləri və onların profillərini əldə edir."""
+        """Bütün istifadəçiləri və onların profillərini bir sorğu ilə əldə edir."""
+        with get_db() as session:
+            rows = UserService._users_with_profiles_query(session).order_by(User.id).all()
+            return [UserService._user_row_to_dict(row) for row in rows]
+
+    @staticmethod
+    def get_users_page(
+        search: Optional[str] = None,
+        role: Optional[str] = None,
+        department: Optional[str] = None,
+        is_active: Optional[bool] = None,
+        after_id: Optional[int] = None,
+        page_size: int = 50
+    ) -> Dict[str, Any]:
+        """
+        İstifadəçiləri profilləri və rəhbərlərinin adları ilə birlikdə səhifələrlə qaytarır.
+        Filtrlər SQL səviyyəsində tətbiq olunur; səhifələmə ID üzrə keyset üsulu ilədir.
+        
+        Args:
+            search (str, optional): İstifadəçi adında və ya tam adda axtarılan mətn
+            role (str, optional): Rol filtri
+            department (str, optional): Şöbə filtri
+            is_active (bool, optional): Aktivlik filtri
+            after_id (int, optional): Əvvəlki səhifənin next_cursor dəyəri; None - birinci səhifə
+            page_size (int): Səhifədəki sətirlərin sayı
+            
+        Returns:
+            Dict[str, Any]: {"items": [...], "next_cursor": növbəti səhifənin kursoru və ya None,
+                             "total": filtrlərə uyğun istifadəçilərin sayı}
+        """
+        if page_size < 1:
+            raise ValueError("Səhifə ölçüsü müsbət olmalıdır.")
+
+        filters = []
+        if search:
+            pattern = f"%{search.strip()}%"
+            filters.append(or_(User.username.ilike(pattern), UserProfile.full_name.ilike(pattern)))
+        if role:
+            filters.append(User.role == role)
+        if department:
+            filters.append(UserProfile.department == department)
+        if is_active is not None:
+            filters.append(User.is_active == is_active)
+
+        with get_db() as session:
+            query = UserService._users_with_profiles_query(session).filter(*filters)
+            if after_id is not None:
+                query = query.filter(User.id > after_id)
+            rows = query.order_by(User.id).limit(page_size + 1).all()
+
+            total = session.query(func.count(User.id)).outerjoin(
+                UserProfile, UserProfile.user_id == User.id
+            ).filter(*filters).scalar()
+
+        has_more = len(rows) > page_size
+        items = [UserService._user_row_to_dict(row) for row in rows[:page_size]]
+        return {
+            "items": items,
+            "next_cursor": items[-1]["id"] if has_more else None,
+            "total": total or 0
+        }
+
+    @staticmethod
+    def get_departments() -> List[str]:
+        """Profillərdə istifadə olunan şöbələrin siyahısını qaytarır."""
         with get_db() as session:
-            users = session.query(User).all()
-            user_data = []
-            for user in users:
-                profile = session.query(UserProfile).filter(UserProfile.user_id == user.id).first()
-                user_data.append({
-                    "id": user.id,
-                    "username": user.username,
-                    "role": user.role,
-                    "is_active": user.is_active,
-                    "manager_id": user.manager_id,
-                    "full_name": profile.full_name if profile else "",
-                    "position": profile.position if profile else "",
-                    "department": profile.department if profile else ""
-                })
-            return user_data
+            rows = session.query(UserProfile.department).filter(
+                UserProfile.department.isnot(None),
+                UserProfile.department != ""
+            ).distinct().order_by(UserProfile.department).all()
+            return [department for (department,) in rows]
+
+    @staticmethod
+    def _users_with_profiles_query(session):
+        """İstifadəçi, profil və rəhbərin adını bir joined sorğu ilə seçir."""
+        manager_profile = aliased(UserProfile)
+        return session.query(
+            User.id,
+            User.username,
+            User.role,
+            User.is_active,
+            User.manager_id,
+            UserProfile.full_name,
+            UserProfile.position,
+            UserProfile.department,
+            manager_profile.full_name
+        ).outerjoin(
+            UserProfile, UserProfile.user_id == User.id
+        ).outerjoin(
+            manager_profile, manager_profile.user_id == User.manager_id
+        )
+
+    @staticmethod
+    def _user_row_to_dict(row) -> Dict[str, Any]:
+        user_id, username, role, is_active, manager_id, full_name, position, department, manager_name = row
+        return {
+            "id": user_id,
+            "username": username,
+            "role": role,
+            "is_active": is_active,
+            "manager_id": manager_id,
+            "manager_name": (manager_name or "Naməlum") if manager_id else None,
+            "full_name": full_name or "",
+            "position": position or "",
+            "department": department or ""
+        }
+
+    @staticmethod
+    def bulk_update_users(changes: Dict[int, Dict[str, Any]]) -> int:
+        """
+        Bir neçə istifadəçinin yalnız dəyişdirilmiş sahələrini bir tranzaksiyada yeniləyir.
+        
+        Eyni sahələr dəstini dəyişən istifadəçilər qruplaşdırılır və hər qrup üçün bir
+        UPDATE ... WHERE id = :id ifadəsi executemany ilə icra olunur. Profili olmayan
+        istifadəçilər üçün profil yaradılır. Hər hansı yoxlama uğursuz olarsa, heç bir
+        dəyişiklik yazılmır.
+        
+        Args:
+            changes (Dict[int, Dict[str, Any]]): user_id -> {sahə: yeni dəyər};
+                sahələr USER_EDITABLE_FIELDS və PROFILE_EDITABLE_FIELDS-dən olmalıdır
             
+        Returns:
+            int: Yenilənmiş istifadəçilərin sayı
+            
+        Raises:
+            ValueError: Naməlum sahə, mövcud olmayan istifadəçi, təkrarlanan istifadəçi adı
+                        və ya istifadəçinin özünə rəhbər təyin edilməsi halında.
+        """
+        changes = {user_id: dict(fields) for user_id, fields in changes.items() if fields}
+        if not changes:
+            return 0
+
+        for user_id, fields in changes.items():
+            unknown = set(fields) - set(USER_EDITABLE_FIELDS) - set(PROFILE_EDITABLE_FIELDS)
+            if unknown:
+                raise ValueError(f"Naməlum sahələr: {', '.join(sorted(unknown))}")
+            if "manager_id" in fields:
+                fields["manager_id"] = fields["manager_id"] or None
+                if fields["manager_id"] == user_id:
+                    raise ValueError(f"İstifadəçi ID {user_id} özünə rəhbər təyin edilə bilməz.")
+            if "department" in fields:
+                fields["department"] = fields["department"] or None
+
+        user_ids = list(changes)
+        new_usernames = {
+            fields["username"]: user_id for user_id, fields in changes.items() if "username" in fields
+        }
+        if len(new_usernames) != sum(1 for fields in changes.values() if "username" in fields):
+            raise ValueError("Eyni istifadəçi adı bir neçə istifadəçiyə verilə bilməz.")
+
+        with get_db() as session:
+            existing_ids = set(session.scalars(select(User.id).where(User.id.in_(user_ids))))
+            missing = sorted(set(user_ids) - existing_ids)
+            if missing:
+                raise ValueError(f"İstifadəçi tapılmadı: {', '.join(map(str, missing))}")
+
+            if new_usernames:
+                taken = session.execute(
+                    select(User.id, User.username).where(User.username.in_(list(new_usernames)))
+                ).all()
+                for owner_id, username in taken:
+                    if owner_id != new_usernames[username]:
+                        raise ValueError(f"'{username}' adlı istifadəçi artıq mövcuddur. Fərqli ad seçin.")
+
+            profile_user_ids = set(session.scalars(
+                select(UserProfile.user_id).where(UserProfile.user_id.in_(user_ids))
+            ))
+
+            user_groups: Dict[tuple, List[Dict[str, Any]]] = {}
+            profile_groups: Dict[tuple, List[Dict[str, Any]]] = {}
+            new_profiles = []
+            for user_id, fields in changes.items():
+                user_fields = tuple(f for f in USER_EDITABLE_FIELDS if f in fields)
+                if user_fields:
+                    user_groups.setdefault(user_fields, []).append(
+                        {"b_id": user_id, **{f"b_{f}": fields[f] for f in user_fields}}
+                    )
+                profile_fields = tuple(f for f in PROFILE_EDITABLE_FIELDS if f in fields)
+                if not profile_fields:
+                    continue
+                if user_id in profile_user_ids:
+                    profile_groups.setdefault(profile_fields, []).append(
+                        {"b_user_id": user_id, **{f"b_{f}": fields[f] for f in profile_fields}}
+                    )
+                else:
+                    # Əgər profil yoxdursa, yenisini yarat
+                    new_profiles.append({
+                        "user_id": user_id,
+                        "full_name": fields.get("full_name", ""),
+                        "position": fields.get("position", ""),
+                        "department": fields.get("department")
+                    })
+
+            users_table = User.__table__
+            profiles_table = UserProfile.__table__
+            try:
+                for fields, params in user_groups.items():
+                    session.execute(
+                        update(users_table).where(users_table.c.id == bindparam("b_id")).values(
+                            {field: bindparam(f"b_{field}") for field in fields}
+                        ),
+                        params
+                    )
+                for fields, params in profile_groups.items():
+                    session.execute(
+                        update(profiles_table).where(profiles_table.c.user_id == bindparam("b_user_id")).values(
+                            {field: bindparam(f"b_{field}") for field in fields}
+                        ),
+                        params
+                    )
+                if new_profiles:
+                    session.execute(insert(profiles_table), new_profiles)
+                # Şöbəsi dəyişən işçilərin səriştə cəmləri yeni şöbəyə köçürülür
+                CompetencyRollupService.rebuild_for_users(
+                    session, [user_id for user_id, fields in changes.items() if "department" in fields]
+                )
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+
+        UserService.invalidate_user_directory()
+        return len(changes)
+
     @staticmethod
     def update_user_profile(user_id, data):
         """İstifadəçinin profilini yeniləyir."""
@@ -83,6 +394,40 @@ class UserService:
                     department=data.get("department", "")
                 )
                 session.add(profile)
+
+            if "department" in data:
+                CompetencyRollupService.rebuild_for_users(session, [user_id])
+            
+            session.commit()
+            UserService.invalidate_user_directory()
+            return user, profile
+
+    @staticmethod
+    def create_user(username: str, password: str, role: str, full_name: str, position: str,
+                    department: str = None, manager_id: int = None) -> User:
+        """
+        Yeni istifadəçi və onun profilini bir tranzaksiyada yaradır.
+        
+        Raises:
+            ValueError: Bu istifadəçi adı artıq mövcuddursa.
+        """
+        with get_db() as session:
+            if session.query(User.id).filter(User.username == username).first():
+                raise ValueError(f"'{username}' adlı istifadəçi artıq mövcuddur. Fərqli ad seçin.")
+            
+            user = User(username=username, role=role, manager_id=manager_id if manager_id else None)
+            user.set_password(password)
+            session.add(user)
+            session.flush()
             
+            profile = UserProfile(
+                user_id=user.id,
+                full_name=full_name,
+                position=position,
+                department=department if department else None
+            )
+            session.add(profile)
             session.commit()
-            return user, profile
\ No newline at end of file
+            session.refresh(user)
+            UserService.invalidate_user_directory()
+            return user
\ No newline at end of file
@@ -1,11 +1,23 @@
 """Test configuration and fixtures for the application."""
 
 import pytest
+from contextlib import contextmanager
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from database import Base
 from config import settings
 
+# Register every model on Base.metadata so create_all builds the full schema
+import models.user  # noqa: F401
+import models.user_profile  # noqa: F401
+import models.kpi  # noqa: F401
+import models.degree360  # noqa: F401
+import models.competency  # noqa: F401
+import models.notification  # noqa: F401
+import models.pdp  # noqa: F401
+import models.job  # noqa: F401
+
 # Test database URL - using SQLite in-memory for faster tests
 TEST_DATABASE_URL = "sqlite:///:memory:"
 
@@ -32,4 +44,63 @@ def test_db(test_session):
     transaction = test_session.begin()
     yield test_session
     # Rollback the transaction after each test
-    transaction.rollback()
\ No newline at end of file
+    transaction.rollback()
+
+
+@pytest.fixture(scope="function")
+def sqlite_db(monkeypatch):
+    """
+    Provide an isolated in-memory SQLite session and route the services'
+    ``get_db()`` to it, so static service methods run against real tables.
+    """
+    import services.kpi_service
+    import services.user_service
+    import services.notification_service
+    import services.degree360_service
+    import services.pdp_service
+    import services.sidebar_service
+    import services.talent_grid_service
+    import services.question_service
+    import services.competency_rollup_service
+    import services.export_service
+    import services.job_service
+    import services.snapshot_service
+    import services.cache
+
+    engine = create_engine(
+        TEST_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine, expire_on_commit=False)()
+
+    @contextmanager
+    def _get_db():
+        yield session
+
+    for module in (
+        services.kpi_service,
+        services.user_service,
+        services.notification_service,
+        services.degree360_service,
+        services.pdp_service,
+        services.sidebar_service,
+        services.talent_grid_service,
+        services.question_service,
+        services.competency_rollup_service,
+        services.export_service,
+        services.job_service,
+        services.snapshot_service,
+    ):
+        monkeypatch.setattr(module, "get_db", _get_db)
+
+    # In-process caches must not carry data over from a previous test
+    services.user_service.UserService.invalidate_user_directory()
+    services.degree360_service.Degree360Service.invalidate_360_report_cache()
+    services.sidebar_service.SidebarService.invalidate_sidebar_state()
+    services.cache.invalidate_all()
+
+    yield session
+    session.close()
+    engine.dispose()
@@ -0,0 +1,71 @@
+"""Unit tests for the service read cache."""
+
+from services import cache
+from services.kpi_service import KpiService
+from services.user_service import UserService
+from models.user import User
+
+
+class TestServiceCache:
+    """Test cases for TTL caching, invalidation and counters."""
+
+    def test_results_are_cached_per_arguments_until_ttl(self, monkeypatch):
+        """Repeated calls with the same arguments hit the cache until the TTL expires."""
+        clock = [100.0]
+        monkeypatch.setattr(cache.time, "monotonic", lambda: clock[0])
+        calls = []
+
+        @cache.cached("test_namespace", ttl=10)
+        def square(x):
+            calls.append(x)
+            return [x * x]
+
+        assert square(3) == [9]
+        assert square(3) == [9]
+        assert square(4) == [16]
+        assert calls == [3, 4]
+
+        clock[0] += 11
+        square(3)
+        assert calls == [3, 4, 3]
+
+        stats = cache.cache_stats()["test_namespace"]
+        assert (stats["hits"], stats["misses"]) == (1, 3)
+
+        cache.invalidate("test_namespace")
+        square(3)
+        assert calls == [3, 4, 3, 3]
+
+    def test_cached_lists_are_copies(self):
+        """Callers mutating a returned list do not change the cached value."""
+        @cache.cached("test_copies", ttl=60)
+        def values():
+            return [1, 2]
+
+        values().append(3)
+        assert values() == [1, 2]
+
+    def test_service_writes_invalidate_read_apis(self, sqlite_db):
+        """Period launch and user directory invalidation refresh cached DTO lists."""
+        import datetime
+
+        sqlite_db.add(User(id=1, username="manager", password="x", role="user"))
+        sqlite_db.commit()
+
+        assert KpiService.get_all_evaluation_periods() == []
+        assert [u.username for u in UserService.get_all_active_users()] == ["manager"]
+
+        KpiService.launch_period("2025 - I Rüblük", datetime.date(2025, 1, 1), datetime.date(2025, 3, 31))
+        periods = KpiService.get_all_evaluation_periods()
+        assert [p.name for p in periods] == ["2025 - I Rüblük"]
+        assert KpiService.get_all_evaluation_periods() == periods
+
+        sqlite_db.add(User(id=2, username="employee", password="x", role="user"))
+        sqlite_db.commit()
+        assert len(UserService.get_all_active_users()) == 1
+        UserService.invalidate_user_directory()
+        assert len(UserService.get_all_active_users()) == 2
+
+        stats = cache.cache_stats()
+        assert stats["evaluation_periods"]["hits"] >= 1
+        assert stats["active_users"]["invalidations"] >= 1
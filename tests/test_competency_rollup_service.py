@@ -0,0 +1,266 @@
+"""Unit tests for the incrementally maintained competency rollups."""
+
+import datetime
+
+import pytest
+
+from models.competency import Competency, CompetencyRollup
+from models.degree360 import (
+    Degree360Participant, Degree360ParticipantRole, Degree360Question, Degree360Session
+)
+from models.kpi import Answer, Evaluation, EvaluationPeriod, EvaluationStatus, Question as KPIQuestion
+from models.user import User
+from models.user_profile import UserProfile
+from services.competency_rollup_service import CompetencyRollupService, NO_DEPARTMENT, NO_DEPARTMENT_LABEL
+from services.competency_service import CompetencyService
+from services.degree360_service import Degree360Service
+from services.kpi_service import KpiService
+from services.user_service import UserService
+
+
+def _rollup_state(sqlite_db):
+    """Return the rollup table as {(period, department, competency): (sum, count, sumsq)}."""
+    sqlite_db.expire_all()
+    return {
+        (r.period_id, r.department, r.competency_id): (
+            pytest.approx(r.score_sum), r.score_count, pytest.approx(r.score_sumsq)
+        )
+        for r in sqlite_db.query(CompetencyRollup).all()
+        if r.score_count
+    }
+
+
+class TestCompetencyRollupService:
+    """Test cases for rollup deltas applied on finalize and 360 submission."""
+
+    @pytest.fixture
+    def seeded_org(self, sqlite_db):
+        """Seed two departments, two overlapping periods, linked KPI and 360 questions."""
+        sqlite_db.add_all([
+            User(id=1, username="manager", password="x", role="user"),
+            User(id=2, username="dev", password="x", role="user", manager_id=1),
+            User(id=3, username="nodept", password="x", role="user", manager_id=1),
+        ])
+        sqlite_db.add_all([
+            UserProfile(user_id=1, full_name="Rəhbər", position="Rəhbər", department="İT"),
+            UserProfile(user_id=2, full_name="Proqramçı", position="Mütəxəssis", department="İT"),
+        ])
+        sqlite_db.add_all([
+            EvaluationPeriod(id=1, name="I Rüb", start_date=datetime.date(2025, 1, 1),
+                             end_date=datetime.date(2025, 3, 31)),
+            EvaluationPeriod(id=2, name="2025", start_date=datetime.date(2025, 1, 1),
+                             end_date=datetime.date(2025, 12, 31)),
+            EvaluationPeriod(id=3, name="2024", start_date=datetime.date(2024, 1, 1),
+                             end_date=datetime.date(2024, 12, 31)),
+        ])
+        leadership = Competency(id=1, name="Liderlik", category="İdarəetmə")
+        communication = Competency(id=2, name="Ünsiyyət", category="Ünsiyyət")
+        sqlite_db.add_all([leadership, communication])
+        kpi_lead = KPIQuestion(id=1, text="Rəhbərlik", weight=0.5)
+        kpi_comm = KPIQuestion(id=2, text="Ünsiyyət", weight=0.5)
+        kpi_lead.competencies.append(leadership)
+        kpi_comm.competencies.extend([communication, leadership])
+        sqlite_db.add_all([kpi_lead, kpi_comm])
+
+        sqlite_db.add_all([
+            Evaluation(id=1, period_id=1, evaluated_user_id=2, evaluator_user_id=1,
+                       status=EvaluationStatus.SELF_EVAL_COMPLETED),
+            Evaluation(id=2, period_id=1, evaluated_user_id=3, evaluator_user_id=1,
+                       status=EvaluationStatus.PENDING),
+        ])
+        sqlite_db.add_all([
+            Answer(evaluation_id=1, question_id=1, score=4, author_role="employee"),
+            Answer(evaluation_id=1, question_id=2, score=2, author_role="employee"),
+        ])
+
+        sqlite_db.add(Degree360Session(id=1, name="360 Proqramçı", evaluated_user_id=2, evaluator_user_id=1,
+                                       start_date=datetime.date(2025, 2, 1), end_date=datetime.date(2025, 2, 28)))
+        d360_lead = Degree360Question(id=1, session_id=1, text="Liderlik")
+        d360_lead.competencies.append(leadership)
+        sqlite_db.add_all([d360_lead, Degree360Question(id=2, session_id=1, text="Bağlanmayıb")])
+        sqlite_db.add_all([
+            Degree360Participant(id=1, session_id=1, evaluator_user_id=1, role=Degree360ParticipantRole.MANAGER),
+            Degree360Participant(id=2, session_id=1, evaluator_user_id=2, role=Degree360ParticipantRole.SELF),
+        ])
+        sqlite_db.commit()
+
+    def test_finalize_and_revert_apply_deltas(self, seeded_org, sqlite_db):
+        """Finalizing adds the evaluation's answers; leaving FINALIZED subtracts them again."""
+        KpiService.update_evaluation_status(1, EvaluationStatus.FINALIZED)
+
+        assert _rollup_state(sqlite_db) == {
+            (1, "İT", 1): (6.0, 2, 20.0),
+            (1, "İT", 2): (2.0, 1, 4.0),
+        }
+
+        KpiService.update_evaluation_status(1, EvaluationStatus.SELF_EVAL_COMPLETED)
+        assert _rollup_state(sqlite_db) == {}
+
+    def test_batch_finalize_updates_rollup(self, seeded_org, sqlite_db):
+        """The manager page's batch finalize goes through the service and updates the rollup rows."""
+        # Evaluation 2 is still PENDING and must not be finalized
+        assert KpiService.finalize_evaluations([1, 2]) == 1
+
+        assert _rollup_state(sqlite_db) == {
+            (1, "İT", 1): (6.0, 2, 20.0),
+            (1, "İT", 2): (2.0, 1, 4.0),
+        }
+        assert sqlite_db.get(Evaluation, 1).status == EvaluationStatus.FINALIZED
+        assert sqlite_db.get(Evaluation, 2).status == EvaluationStatus.PENDING
+        # Already finalized evaluations are skipped on a repeated click
+        assert KpiService.finalize_evaluations([1]) == 0
+
+    def test_manager_submission_replaces_contribution(self, seeded_org, sqlite_db):
+        """A manager resubmitting a finalized evaluation swaps old scores for new ones."""
+        KpiService.submit_evaluation(2, 1, {1: {"score": 5}, 2: {"score": 3}})
+        assert _rollup_state(sqlite_db) == {
+            (1, NO_DEPARTMENT, 1): (8.0, 2, 34.0),
+            (1, NO_DEPARTMENT, 2): (3.0, 1, 9.0),
+        }
+
+        KpiService.submit_evaluation(2, 1, {1: {"score": 1}})
+        assert _rollup_state(sqlite_db) == {(1, NO_DEPARTMENT, 1): (1.0, 1, 1.0)}
+
+    def test_360_submission_updates_overlapping_periods(self, seeded_org, sqlite_db):
+        """360 answers on linked questions land in every period overlapping the session."""
+        Degree360Service.submit_answers_for_360_participant(1, [
+            {"question_id": 1, "score": 3}, {"question_id": 2, "score": 5}
+        ])
+        Degree360Service.submit_answers_for_360_participant(2, [{"question_id": 1, "score": 5}])
+        assert _rollup_state(sqlite_db) == {
+            (1, "İT", 1): (8.0, 2, 34.0),
+            (2, "İT", 1): (8.0, 2, 34.0),
+        }
+
+        # Resubmission replaces the participant's previous answers
+        Degree360Service.submit_answers_for_360_participant(1, [{"question_id": 1, "score": 4}])
+        assert _rollup_state(sqlite_db) == {
+            (1, "İT", 1): (9.0, 2, 41.0),
+            (2, "İT", 1): (9.0, 2, 41.0),
+        }
+
+    def test_incremental_state_matches_rebuild(self, seeded_org, sqlite_db):
+        """A full rebuild from the source tables reproduces the incrementally kept totals."""
+        KpiService.update_evaluation_status(1, EvaluationStatus.FINALIZED)
+        KpiService.submit_evaluation(2, 1, {1: {"score": 5}})
+        Degree360Service.submit_answers_for_360_participant(1, [{"question_id": 1, "score": 3}])
+        incremental = _rollup_state(sqlite_db)
+
+        assert CompetencyRollupService.rebuild_competency_rollups() == len(incremental)
+        assert _rollup_state(sqlite_db) == incremental
+
+        assert CompetencyRollupService.rebuild_competency_rollups(period_id=2) == 1
+        assert _rollup_state(sqlite_db) == incremental
+
+    def test_new_period_picks_up_existing_360_answers(self, seeded_org, sqlite_db):
+        """A period launched after a 360 submission gets that session's contribution immediately."""
+        Degree360Service.submit_answers_for_360_participant(1, [{"question_id": 1, "score": 3}])
+
+        period_id = KpiService.launch_period("Fevral", datetime.date(2025, 2, 1), datetime.date(2025, 2, 28))["period_id"]
+
+        assert _rollup_state(sqlite_db)[(period_id, "İT", 1)] == (3.0, 1, 9.0)
+
+    def test_mapping_changes_rebuild_affected_periods(self, seeded_org, sqlite_db):
+        """Linking or unlinking a question to a competency re-aggregates the periods it contributed to."""
+        KpiService.update_evaluation_status(1, EvaluationStatus.FINALIZED)
+        Degree360Service.submit_answers_for_360_participant(1, [
+            {"question_id": 1, "score": 3}, {"question_id": 2, "score": 5}
+        ])
+        service = CompetencyService(sqlite_db)
+
+        assert service.dissociate_kpi_question(competency_id=1, question_id=2)
+        assert service.associate_360_question(competency_id=2, question_id=2)
+        assert _rollup_state(sqlite_db) == {
+            (1, "İT", 1): (7.0, 2, 25.0),
+            (1, "İT", 2): (7.0, 2, 29.0),
+            (2, "İT", 1): (3.0, 1, 9.0),
+            (2, "İT", 2): (5.0, 1, 25.0),
+        }
+
+        incremental = _rollup_state(sqlite_db)
+        CompetencyRollupService.rebuild_competency_rollups()
+        assert _rollup_state(sqlite_db) == incremental
+
+    def test_department_change_moves_contributions(self, seeded_org, sqlite_db):
+        """Moving an employee re-files their rollup share, so later deltas hit the right department."""
+        KpiService.update_evaluation_status(1, EvaluationStatus.FINALIZED)
+        Degree360Service.submit_answers_for_360_participant(1, [{"question_id": 1, "score": 3}])
+
+        UserService.bulk_update_users({2: {"department": "HR"}})
+        assert _rollup_state(sqlite_db) == {
+            (1, "HR", 1): (9.0, 3, 29.0),
+            (1, "HR", 2): (2.0, 1, 4.0),
+            (2, "HR", 1): (3.0, 1, 9.0),
+        }
+
+        KpiService.update_evaluation_status(1, EvaluationStatus.SELF_EVAL_COMPLETED)
+        assert _rollup_state(sqlite_db) == {
+            (1, "HR", 1): (3.0, 1, 9.0),
+            (2, "HR", 1): (3.0, 1, 9.0),
+        }
+
+        UserService.update_user_profile(2, {"department": ""})
+        assert _rollup_state(sqlite_db) == {
+            (1, NO_DEPARTMENT, 1): (3.0, 1, 9.0),
+            (2, NO_DEPARTMENT, 1): (3.0, 1, 9.0),
+        }
+
+    def test_cancelled_sessions_and_inactive_questions_are_excluded(self, seeded_org, sqlite_db):
+        """The rollup follows the score matrix: no cancelled sessions, no deactivated 360 questions."""
+        Degree360Service.submit_answers_for_360_participant(1, [{"question_id": 1, "score": 3}])
+        assert _rollup_state(sqlite_db)[(1, "İT", 1)] == (3.0, 1, 9.0)
+
+        assert Degree360Service.update_360_session_status(1, "CANCELLED")
+        assert _rollup_state(sqlite_db) == {}
+        assert CompetencyRollupService.get_competency_heatmap(1).empty
+        assert CompetencyService(sqlite_db).get_competency_score_matrix(period_id=1).empty
+
+        # Answers submitted while cancelled do not leak in through the delta path either
+        Degree360Service.submit_answers_for_360_participant(2, [{"question_id": 1, "score": 5}])
+        assert _rollup_state(sqlite_db) == {}
+
+        assert Degree360Service.update_360_session_status(1, "ACTIVE")
+        assert _rollup_state(sqlite_db)[(1, "İT", 1)] == (8.0, 2, 34.0)
+
+        assert Degree360Service.set_360_question_active(1, False)
+        assert _rollup_state(sqlite_db) == {}
+        Degree360Service.submit_answers_for_360_participant(1, [{"question_id": 1, "score": 4}])
+        assert _rollup_state(sqlite_db) == {}
+
+        assert CompetencyRollupService.rebuild_competency_rollups() == 0
+        with pytest.raises(ValueError):
+            Degree360Service.update_360_session_status(1, "UNKNOWN")
+
+    def test_heatmap_and_statistics(self, seeded_org, sqlite_db):
+        """The period read returns averages, population std dev and a department x competency pivot."""
+        KpiService.update_evaluation_status(1, EvaluationStatus.FINALIZED)
+        KpiService.submit_evaluation(2, 1, {1: {"score": 5}})
+
+        rollup = CompetencyRollupService.get_period_rollup(1).set_index(["department", "competency_id"])
+        assert rollup.loc[("İT", 1), "average_score"] == pytest.approx(3.0)
+        assert rollup.loc[("İT", 1), "std_dev"] == pytest.approx(1.0)
+        assert rollup.loc[(NO_DEPARTMENT, 1), "std_dev"] == pytest.approx(0.0)
+
+        heatmap = CompetencyRollupService.get_competency_heatmap(1)
+        assert sorted(heatmap.index) == sorted(["İT", NO_DEPARTMENT_LABEL])
+        assert heatmap.loc["İT", "Ünsiyyət"] == pytest.approx(2.0)
+        assert heatmap.loc[NO_DEPARTMENT_LABEL, "Liderlik"] == pytest.approx(5.0)
+        assert CompetencyRollupService.get_competency_heatmap(3).empty
+
+    def test_360_session_competency_scores(self, seeded_org, sqlite_db):
+        """The session breakdown reports per-role averages and the department benchmark."""
+        KpiService.update_evaluation_status(1, EvaluationStatus.FINALIZED)
+        Degree360Service.submit_answers_for_360_participant(1, [
+            {"question_id": 1, "score": 3}, {"question_id": 2, "score": 5}
+        ])
+        Degree360Service.submit_answers_for_360_participant(2, [{"question_id": 1, "score": 5}])
+
+        scores = Degree360Service.get_360_session_competency_scores(1)
+        assert len(scores) == 1
+        assert scores[0]["competency"] == "Liderlik"
+        assert scores[0]["average_score"] == pytest.approx(4.0)
+        assert scores[0]["scores_by_role"] == {"Rəhbər": 3.0, "Özünü qiymətləndirən": 5.0}
+
+        # Latest overlapping period is the year-long one; it holds only the 360 answers
+        assert CompetencyRollupService.get_department_averages_for_360_session(1) == {1: pytest.approx(4.0)}
+        assert CompetencyRollupService.get_department_averages_for_360_session(99) == {}
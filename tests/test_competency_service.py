@@ -1,6 +1,7 @@
 """Unit tests for Competency service."""
 
 import pytest
+import pandas as pd
 from unittest.mock import patch, MagicMock
 from sqlalchemy.orm import Session
 from services.competency_service import CompetencyService
@@ -184,4 +185,108 @@ class TestCompetencyService:
         
         # Assert
         # Since we have no questions/scores, result should be None
-        assert result is None
\ No newline at end of file
+        assert result is None
+
+class TestCompetencyScoringEngine:
+    """Test cases for the grouped user x competency score matrix."""
+
+    @pytest.fixture
+    def seeded_competencies(self, sqlite_db):
+        """Seed two users in two departments with KPI answers and 360 aggregates."""
+        import datetime
+        from models.user import User
+        from models.user_profile import UserProfile
+        from models.kpi import Answer, Evaluation, EvaluationPeriod, EvaluationStatus
+        from models.degree360 import Degree360Aggregate, Degree360ParticipantRole, Degree360Session
+
+        sqlite_db.add_all([
+            User(id=1, username="it", password="x", role="user"),
+            User(id=2, username="finance", password="x", role="user"),
+        ])
+        sqlite_db.add_all([
+            UserProfile(user_id=1, full_name="İT İşçisi", position="Mütəxəssis", department="İT"),
+            UserProfile(user_id=2, full_name="Maliyyəçi", position="Mütəxəssis", department="Maliyyə"),
+        ])
+        sqlite_db.add_all([
+            EvaluationPeriod(id=1, name="I Rüb", start_date=datetime.date(2025, 1, 1),
+                             end_date=datetime.date(2025, 3, 31)),
+            EvaluationPeriod(id=2, name="II Rüb", start_date=datetime.date(2025, 4, 1),
+                             end_date=datetime.date(2025, 6, 30)),
+        ])
+        leadership = Competency(id=1, name="Liderlik")
+        communication = Competency(id=2, name="Ünsiyyət")
+        unused = Competency(id=3, name="İstifadəsiz")
+        sqlite_db.add_all([leadership, communication, unused])
+        kpi_lead = KPIQuestion(id=1, text="Komandaya rəhbərlik", weight=0.5)
+        kpi_comm = KPIQuestion(id=2, text="Yazılı ünsiyyət", weight=0.5)
+        kpi_lead.competencies.append(leadership)
+        kpi_comm.competencies.extend([communication, leadership])
+        sqlite_db.add_all([kpi_lead, kpi_comm])
+
+        sqlite_db.add_all([
+            Evaluation(id=1, period_id=1, evaluated_user_id=1, evaluator_user_id=1,
+                       status=EvaluationStatus.FINALIZED),
+            Evaluation(id=2, period_id=1, evaluated_user_id=2, evaluator_user_id=2,
+                       status=EvaluationStatus.FINALIZED),
+            Evaluation(id=3, period_id=1, evaluated_user_id=1, evaluator_user_id=2,
+                       status=EvaluationStatus.PENDING),
+            Evaluation(id=4, period_id=2, evaluated_user_id=1, evaluator_user_id=1,
+                       status=EvaluationStatus.FINALIZED),
+        ])
+        sqlite_db.add_all([
+            Answer(evaluation_id=1, question_id=1, score=4, author_role="employee"),
+            Answer(evaluation_id=1, question_id=2, score=2, author_role="employee"),
+            Answer(evaluation_id=2, question_id=1, score=5, author_role="employee"),
+            # Not finalized: ignored
+            Answer(evaluation_id=3, question_id=1, score=1, author_role="manager"),
+            Answer(evaluation_id=4, question_id=1, score=3, author_role="employee"),
+        ])
+
+        sqlite_db.add(Degree360Session(id=1, name="360", evaluated_user_id=1, evaluator_user_id=2,
+                                       start_date=datetime.date(2025, 2, 1), end_date=datetime.date(2025, 2, 28)))
+        d360_comm = Degree360Question(id=1, session_id=1, text="Dinləmə bacarığı")
+        d360_comm.competencies.append(communication)
+        sqlite_db.add(d360_comm)
+        sqlite_db.add(Degree360Aggregate(session_id=1, question_id=1, role=Degree360ParticipantRole.PEER,
+                                         score_sum=10.0, score_count=2, score_sumsq=50.0))
+        sqlite_db.commit()
+
+    def test_score_matrix_pools_kpi_and_360_answers(self, seeded_competencies, sqlite_db):
+        """Each cell averages all linked KPI and 360 answers of one user."""
+        service = CompetencyService(sqlite_db)
+
+        matrix = service.get_competency_score_matrix(period_id=1)
+
+        assert list(matrix.index) == [1, 2]
+        assert matrix.loc[1, 1] == pytest.approx((4 + 2) / 2)
+        assert matrix.loc[1, 2] == pytest.approx((2 + 10) / 3)
+        assert matrix.loc[2, 1] == pytest.approx(5.0)
+        assert pd.isna(matrix.loc[2, 2])
+
+        everything = service.get_competency_score_matrix(competency_ids=[1, 3])
+        assert list(everything.columns) == [1, 3]
+        assert everything.loc[1, 1] == pytest.approx((4 + 2 + 3) / 3)
+        assert everything[3].isna().all()
+
+        it_only = service.get_competency_score_matrix(period_id=1, department="İT")
+        assert list(it_only.index) == [1]
+
+    def test_performance_by_competency_filters_by_user(self, seeded_competencies, sqlite_db):
+        """A single user's competency score ignores everybody else's answers."""
+        service = CompetencyService(sqlite_db)
+
+        assert service.get_performance_by_competency(2, 1) == pytest.approx(5.0)
+        assert service.get_performance_by_competency(1, 1, period_id=2) == pytest.approx(3.0)
+        assert service.get_performance_by_competency(2, 2) is None
+        assert service.get_performance_by_competency(1, 99) is None
+
+    def test_department_scores(self, seeded_competencies, sqlite_db):
+        """Department rows average their users' competency scores."""
+        service = CompetencyService(sqlite_db)
+
+        departments = service.get_department_competency_scores(1, period_id=1)
+
+        assert list(departments["department"]) == ["Maliyyə", "İT"]
+        assert list(departments["average_score"]) == [pytest.approx(5.0), pytest.approx(3.0)]
+        assert list(departments["employee_count"]) == [1, 1]
+        assert service.get_department_competency_scores(3).empty
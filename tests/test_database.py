@@ -0,0 +1,43 @@
+"""Unit tests for the shared engine and connection pool instrumentation."""
+
+import pytest
+from sqlalchemy import create_engine, exc
+
+from database import InstrumentedQueuePool, pool_stats
+
+
+class TestPoolInstrumentation:
+    """Test cases for pool statistics collection."""
+
+    @pytest.fixture
+    def small_engine(self, tmp_path):
+        """Engine with a one-connection pool and one overflow slot."""
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'pool.db'}",
+            poolclass=InstrumentedQueuePool,
+            pool_size=1,
+            max_overflow=1,
+            pool_timeout=0.1,
+        )
+        pool_stats.reset()
+        yield engine
+        engine.dispose()
+        pool_stats.reset()
+
+    def test_checkout_overflow_and_timeout_are_recorded(self, small_engine):
+        """Checkouts, overflow usage and pool timeouts show up in the snapshot."""
+        first = small_engine.connect()
+        second = small_engine.connect()
+
+        with pytest.raises(exc.TimeoutError):
+            small_engine.connect()
+
+        stats = pool_stats.snapshot()
+        assert stats["checkouts"] == 2
+        assert stats["overflow_events"] == 1
+        assert stats["timeouts"] == 1
+        assert stats["max_wait_ms"] >= 100
+
+        second.close()
+        first.close()
+        assert small_engine.pool.checkedout() == 0
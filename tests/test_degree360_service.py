@@ -136,4 +136,296 @@ class TestDegree360Service:
         # Check that gap analysis is performed
         assert "gap_analysis" in result
         gap_analysis = result["gap_analysis"]
-        assert len(gap_analysis) > 0
\ No newline at end of file
+        assert len(gap_analysis) > 0
+
+class TestDegree360BatchResults:
+    """Test cases for batched 360-degree results against a real schema."""
+
+    @pytest.fixture
+    def seeded_sessions(self, sqlite_db):
+        """Seed two sessions; completed participants submit through the service."""
+        import datetime
+        from models.user_profile import UserProfile
+
+        sqlite_db.add_all([
+            User(id=1, username="manager", password="x", role="user"),
+            User(id=2, username="employee", password="x", role="user", manager_id=1),
+            User(id=3, username="peer", password="x", role="user"),
+        ])
+        sqlite_db.add_all([
+            UserProfile(user_id=1, full_name="Rəhbər", position="Rəis", department="İT"),
+            UserProfile(user_id=2, full_name="İşçi", position="Mütəxəssis", department="İT"),
+        ])
+        for session_id, evaluated_user_id in ((1, 2), (2, 1)):
+            sqlite_db.add(Degree360Session(
+                id=session_id, name=f"Sessiya {session_id}",
+                evaluated_user_id=evaluated_user_id, evaluator_user_id=1,
+                start_date=datetime.date(2025, 1, 1), end_date=datetime.date(2025, 3, 31)
+            ))
+        sqlite_db.add_all([
+            Degree360Question(id=1, session_id=1, text="Ünsiyyət", category="Sosial"),
+            Degree360Question(id=2, session_id=1, text="Liderlik", category="İdarəetmə"),
+            Degree360Question(id=3, session_id=1, text="Köhnə", is_active=False),
+            Degree360Question(id=4, session_id=2, text="Planlama"),
+        ])
+        sqlite_db.add_all([
+            Degree360Participant(id=1, session_id=1, evaluator_user_id=2,
+                                 role=Degree360ParticipantRole.SELF, status="PENDING"),
+            Degree360Participant(id=2, session_id=1, evaluator_user_id=1,
+                                 role=Degree360ParticipantRole.MANAGER, status="PENDING"),
+            Degree360Participant(id=3, session_id=1, evaluator_user_id=3,
+                                 role=Degree360ParticipantRole.PEER, status="PENDING"),
+            Degree360Participant(id=4, session_id=2, evaluator_user_id=3,
+                                 role=Degree360ParticipantRole.PEER, status="PENDING"),
+        ])
+        sqlite_db.add(Degree360Answer(participant_id=3, question_id=1, score=1))
+        sqlite_db.commit()
+
+        Degree360Service.submit_answers_for_360_participant(1, [
+            {"question_id": 1, "score": 5},
+            {"question_id": 2, "score": 3},
+            {"question_id": 3, "score": 1},
+        ])
+        Degree360Service.submit_answers_for_360_participant(2, [
+            {"question_id": 1, "score": 3},
+            {"question_id": 2, "score": 2},
+        ])
+
+    def test_batch_results_match_single_session_structure(self, seeded_sessions):
+        """Role and question averages come from completed participants and active questions only."""
+        results = Degree360Service.calculate_360_results_for_sessions([1, 2, 99])
+
+        assert set(results) == {1, 2}
+        first = results[1]
+        assert first["evaluated_user"] == "İşçi"
+        assert first["overall_score"] == pytest.approx(3.25)
+        assert first["scores_by_role"] == {"Özünü qiymətləndirən": 4.0, "Rəhbər": 2.5}
+        assert [r["question"] for r in first["detailed_results"]] == ["Ünsiyyət", "Liderlik"]
+        assert first["detailed_results"][0]["average_score"] == pytest.approx(4.0)
+        assert first["detailed_results"][1]["scores_by_role"] == {"Özünü qiymətləndirən": 3.0, "Rəhbər": 2.0}
+
+        assert results[2] == {
+            "evaluated_user": "Rəhbər",
+            "overall_score": 0.0,
+            "scores_by_role": {},
+            "detailed_results": []
+        }
+        assert Degree360Service.calculate_360_session_results(1) == first
+        assert Degree360Service.calculate_360_session_results(99) == {}
+
+    def test_batch_results_empty_input(self, sqlite_db):
+        """No session IDs returns an empty mapping without querying."""
+        assert Degree360Service.calculate_360_results_for_sessions([]) == {}
+
+    def test_resubmission_replaces_aggregate_contribution(self, seeded_sessions, sqlite_db):
+        """Resubmitting answers subtracts the previous contribution from the running sums."""
+        from models.degree360 import Degree360Aggregate
+
+        Degree360Service.submit_answers_for_360_participant(1, [
+            {"question_id": 1, "score": 1},
+            {"question_id": 2, "score": 3},
+        ])
+
+        aggregate = sqlite_db.get(Degree360Aggregate, (1, 1, Degree360ParticipantRole.SELF))
+        assert (aggregate.score_sum, aggregate.score_count, aggregate.score_sumsq) == (1.0, 1, 1.0)
+        inactive = sqlite_db.get(Degree360Aggregate, (1, 3, Degree360ParticipantRole.SELF))
+        assert inactive.score_count == 0
+
+        result = Degree360Service.calculate_360_session_results(1)
+        first_question = result["detailed_results"][0]
+        assert first_question["average_score"] == pytest.approx(2.0)
+        assert first_question["std_dev"] == pytest.approx(1.0)
+        assert result["scores_by_role"]["Özünü qiymətləndirən"] == pytest.approx(2.0)
+
+    def test_report_pipeline_is_shared_and_invalidated(self, seeded_sessions, monkeypatch):
+        """Results and report are computed once per answers version."""
+        calls = []
+        original = Degree360Service.calculate_360_results_for_sessions
+
+        def counting(session_ids):
+            calls.append(list(session_ids))
+            return original(session_ids)
+
+        monkeypatch.setattr(Degree360Service, "calculate_360_results_for_sessions", staticmethod(counting))
+
+        results = Degree360Service.calculate_360_session_results(1)
+        report = Degree360Service.generate_360_report(1)
+        assert len(calls) == 1
+        assert report["session_name"] == "Sessiya 1"
+        assert report["overall_score"] == results["overall_score"]
+        assert [s["question"] for s in report["strengths"]] == ["Ünsiyyət"]
+        assert [w["question"] for w in report["weaknesses"]] == ["Liderlik"]
+        assert report["gap_analysis"][0]["gap"] == pytest.approx(-2.0)
+
+        # Callers get copies, so mutating a result does not poison the cache
+        results["overall_score"] = 0
+        assert Degree360Service.calculate_360_session_results(1)["overall_score"] == pytest.approx(3.25)
+        assert len(calls) == 1
+
+        Degree360Service.submit_answers_for_360_participant(2, [
+            {"question_id": 1, "score": 5},
+            {"question_id": 2, "score": 5},
+        ])
+        assert Degree360Service.generate_360_report(1)["scores_by_role"]["Rəhbər"] == pytest.approx(5.0)
+        assert len(calls) == 2
+
+        assert Degree360Service.generate_360_report(99) == {}
+
+
+class TestDegree360Reminders:
+    """Test cases for the set-based 360-degree reminder job."""
+
+    def test_reminders_are_windowed_and_deduplicated(self, sqlite_db):
+        """Only pending, active participants of sessions ending soon get one reminder per window."""
+        import datetime
+        from models.notification import Notification
+
+        now = datetime.datetime(2025, 3, 28, 9, 0)
+        sqlite_db.add_all([
+            User(id=1, username="manager", password="x", role="user"),
+            User(id=2, username="peer", password="x", role="user"),
+            User(id=3, username="former", password="x", role="user", is_active=False),
+        ])
+        for session_id, end_date in ((1, datetime.date(2025, 3, 30)), (2, datetime.date(2025, 4, 30))):
+            sqlite_db.add(Degree360Session(
+                id=session_id, name=f"Sessiya {session_id}", evaluated_user_id=1, evaluator_user_id=1,
+                start_date=datetime.date(2025, 3, 1), end_date=end_date
+            ))
+        sqlite_db.add_all([
+            Degree360Participant(session_id=1, evaluator_user_id=1,
+                                 role=Degree360ParticipantRole.MANAGER, status="COMPLETED"),
+            Degree360Participant(session_id=1, evaluator_user_id=2,
+                                 role=Degree360ParticipantRole.PEER, status="PENDING"),
+            Degree360Participant(session_id=1, evaluator_user_id=3,
+                                 role=Degree360ParticipantRole.PEER, status="PENDING"),
+            Degree360Participant(session_id=2, evaluator_user_id=2,
+                                 role=Degree360ParticipantRole.PEER, status="PENDING"),
+        ])
+        sqlite_db.commit()
+
+        first = Degree360Service.send_360_reminders(days_before_end=3, dedup_window_hours=24, now=now)
+        assert first == {"candidates": 1, "created": 1, "skipped": 0}
+        reminder = sqlite_db.query(Notification).one()
+        assert reminder.user_id == 2
+        assert reminder.message.startswith("Xatırlatma: Sessiya 1 360°")
+        assert "2 gün qalıb" in reminder.message
+
+        later_today = now + datetime.timedelta(hours=6)
+        again = Degree360Service.send_360_reminders(days_before_end=3, dedup_window_hours=24, now=later_today)
+        assert again == {"candidates": 1, "created": 0, "skipped": 1}
+
+        next_day = now + datetime.timedelta(hours=25)
+        assert Degree360Service.send_360_reminders(
+            days_before_end=3, dedup_window_hours=24, now=next_day
+        )["created"] == 1
+
+    def test_reminder_dedup_uses_session_id_not_message(self, sqlite_db):
+        """Same-named sessions each get a reminder; renaming a session does not reset the window."""
+        import datetime
+        from models.notification import NOTIFICATION_KIND_360_REMINDER, Notification
+
+        now = datetime.datetime(2025, 3, 28, 9, 0)
+        sqlite_db.add(User(id=1, username="peer", password="x", role="user"))
+        for session_id, name in ((1, "Rüb_1 100%"), (2, "Rüb_1 100%"), (3, "Rüb%")):
+            sqlite_db.add(Degree360Session(
+                id=session_id, name=name, evaluated_user_id=1, evaluator_user_id=1,
+                start_date=datetime.date(2025, 3, 1), end_date=datetime.date(2025, 3, 30)
+            ))
+            sqlite_db.add(Degree360Participant(session_id=session_id, evaluator_user_id=1,
+                                               role=Degree360ParticipantRole.PEER, status="PENDING"))
+        sqlite_db.commit()
+
+        first = Degree360Service.send_360_reminders(days_before_end=3, dedup_window_hours=24, now=now)
+        assert first == {"candidates": 3, "created": 3, "skipped": 0}
+        reminders = sqlite_db.query(Notification).order_by(Notification.source_id).all()
+        assert [(r.kind, r.source_id) for r in reminders] == [
+            (NOTIFICATION_KIND_360_REMINDER, 1), (NOTIFICATION_KIND_360_REMINDER, 2),
+            (NOTIFICATION_KIND_360_REMINDER, 3)
+        ]
+
+        sqlite_db.get(Degree360Session, 3).name = "Yeni ad"
+        sqlite_db.commit()
+        again = Degree360Service.send_360_reminders(
+            days_before_end=3, dedup_window_hours=24, now=now + datetime.timedelta(hours=1)
+        )
+        assert again == {"candidates": 3, "created": 0, "skipped": 3}
+
+
+class TestDegree360ParticipantsPage:
+    """Test cases for keyset-paginated participant listing."""
+
+    @pytest.fixture
+    def seeded_participants(self, sqlite_db):
+        """Seed two sessions with 30 participants in total."""
+        import datetime
+        from models.user_profile import UserProfile
+
+        sqlite_db.add_all([
+            User(id=1, username="manager", password="x", role="user"),
+            User(id=2, username="peer", password="x", role="user"),
+        ])
+        sqlite_db.add(UserProfile(user_id=1, full_name="Rəhbər", position="Rəis", department="İT"))
+        for session_id in (1, 2):
+            sqlite_db.add(Degree360Session(
+                id=session_id, name=f"Sessiya {session_id}", evaluated_user_id=1, evaluator_user_id=1,
+                start_date=datetime.date(2025, 1, 1), end_date=datetime.date(2025, 3, 31)
+            ))
+        for participant_id in range(1, 31):
+            sqlite_db.add(Degree360Participant(
+                id=participant_id,
+                session_id=1 if participant_id <= 20 else 2,
+                evaluator_user_id=1 if participant_id % 2 else 2,
+                role=Degree360ParticipantRole.PEER if participant_id % 3 else Degree360ParticipantRole.MANAGER,
+                status="COMPLETED" if participant_id % 5 == 0 else "PENDING"
+            ))
+        sqlite_db.commit()
+
+    def test_keyset_pages_cover_all_rows_once(self, seeded_participants):
+        """Walking next_cursor yields every participant exactly once, newest first."""
+        seen = []
+        cursor = None
+        while True:
+            page = Degree360Service.get_participants_page(after_id=cursor, page_size=12)
+            seen.extend(item["id"] for item in page["items"])
+            assert page["total"] == 30
+            assert page["total_is_exact"] is True
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert seen == list(range(30, 0, -1))
+
+    def test_filters_are_applied_in_sql(self, seeded_participants):
+        """Session, status, role and evaluator filters narrow both items and total."""
+        page = Degree360Service.get_participants_page(
+            session_id=1, status="PENDING", role=Degree360ParticipantRole.PEER,
+            evaluator_user_id=1, page_size=100
+        )
+
+        expected = [
+            pid for pid in range(20, 0, -1)
+            if pid % 2 and pid % 3 and pid % 5
+        ]
+        assert [item["id"] for item in page["items"]] == expected
+        assert page["total"] == len(expected)
+        assert page["next_cursor"] is None
+        first = page["items"][0]
+        assert first["session_name"] == "Sessiya 1"
+        assert first["evaluator_name"] == "Rəhbər"
+        assert first["role"] == Degree360ParticipantRole.PEER
+
+        unnamed = Degree360Service.get_participants_page(evaluator_user_id=2, page_size=1)
+        assert unnamed["items"][0]["evaluator_name"] == "Naməlum"
+
+    def test_total_is_capped_estimate(self, seeded_participants, monkeypatch):
+        """Past the count cap the total is reported as an estimate instead of a full count."""
+        import services.degree360_service
+
+        monkeypatch.setattr(services.degree360_service, "_PARTICIPANT_COUNT_CAP", 10)
+        page = Degree360Service.get_participants_page(page_size=5)
+
+        assert page["total"] == 10
+        assert page["total_is_exact"] is False
+
+        with pytest.raises(ValueError):
+            Degree360Service.get_participants_page(page_size=0)
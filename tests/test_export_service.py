@@ -0,0 +1,143 @@
+"""Unit tests for the streaming report export service."""
+
+import csv
+import datetime
+import io
+
+import numpy as np
+import openpyxl
+import pandas as pd
+import pytest
+
+import services.export_service as export_module
+from models.kpi import Answer, Evaluation, EvaluationPeriod, EvaluationScore, EvaluationStatus, Question
+from models.user import User
+from models.user_profile import UserProfile
+from services.export_service import ANSWER_COLUMNS, SCORE_COLUMNS, ExportService, ExportTable
+
+
+def _sheet_rows(workbook, name):
+    return [list(row) for row in workbook[name].iter_rows(values_only=True)]
+
+
+class TestExportService:
+    """Test cases for chunked period exports to Excel and CSV."""
+
+    @pytest.fixture
+    def seeded_period(self, sqlite_db):
+        """Seed one period with two evaluations and five answers."""
+        sqlite_db.add_all([
+            User(id=1, username="manager", password="x", role="user"),
+            User(id=2, username="dev", password="x", role="user", manager_id=1),
+            User(id=3, username="analyst", password="x", role="user", manager_id=1),
+        ])
+        sqlite_db.add_all([
+            UserProfile(user_id=1, full_name="Rəhbər", position="Rəhbər", department="İT"),
+            UserProfile(user_id=2, full_name="Proqramçı", position="Mütəxəssis", department="İT"),
+        ])
+        sqlite_db.add_all([
+            EvaluationPeriod(id=1, name="I Rüb", start_date=datetime.date(2025, 1, 1),
+                             end_date=datetime.date(2025, 3, 31)),
+            EvaluationPeriod(id=2, name="II Rüb", start_date=datetime.date(2025, 4, 1),
+                             end_date=datetime.date(2025, 6, 30)),
+        ])
+        sqlite_db.add_all([
+            Question(id=1, text="Keyfiyyət", category="Nəticə", weight=0.6),
+            Question(id=2, text="Vaxt", category="Nəticə", weight=0.4),
+        ])
+        sqlite_db.add_all([
+            Evaluation(id=1, period_id=1, evaluated_user_id=2, evaluator_user_id=1,
+                       status=EvaluationStatus.FINALIZED),
+            Evaluation(id=2, period_id=1, evaluated_user_id=3, evaluator_user_id=1,
+                       status=EvaluationStatus.PENDING),
+            Evaluation(id=3, period_id=2, evaluated_user_id=2, evaluator_user_id=1,
+                       status=EvaluationStatus.PENDING),
+        ])
+        sqlite_db.add_all([
+            Answer(id=1, evaluation_id=1, question_id=1, score=4, author_role="employee", comment="Yaxşı"),
+            Answer(id=2, evaluation_id=1, question_id=2, score=3, author_role="employee"),
+            Answer(id=3, evaluation_id=1, question_id=1, score=5, author_role="manager"),
+            Answer(id=4, evaluation_id=1, question_id=2, score=4, author_role="manager"),
+            Answer(id=5, evaluation_id=2, question_id=1, score=2, author_role="employee"),
+            # Other period: not exported
+            Answer(id=6, evaluation_id=3, question_id=1, score=1, author_role="employee"),
+        ])
+        sqlite_db.add(EvaluationScore(evaluation_id=1, period_id=1, evaluated_user_id=2,
+                                      employee_score=3.6, manager_score=4.6, total_score=4.1))
+        sqlite_db.commit()
+
+    def test_xlsx_export_streams_both_sheets(self, seeded_period):
+        """The Excel export has a scores sheet and an answer-level sheet for the period only."""
+        buffer = io.BytesIO()
+        progress = []
+
+        rows = ExportService.export_period_report(1, buffer, chunk_size=2, on_rows=progress.append)
+
+        assert rows == 2 + 5
+        # Progress is reported per chunk, not once at the end
+        assert progress == [2, 4, 6, 7]
+
+        workbook = openpyxl.load_workbook(io.BytesIO(buffer.getvalue()), read_only=True)
+        assert workbook.sheetnames == ["Yekun ballar", "Cavablar"]
+        scores = _sheet_rows(workbook, "Yekun ballar")
+        assert scores[0] == SCORE_COLUMNS
+        assert scores[1] == [1, "Proqramçı", "İT", "Mütəxəssis", "YEKUNLAŞDIRILDI", 3.6, 4.6, 4.1]
+        # Without a stored score row the total is computed from the answers, as on the dashboards
+        assert scores[2] == [2, None, None, None, "GÖZLƏMƏDƏ", None, None, 2.0]
+
+        answers = _sheet_rows(workbook, "Cavablar")
+        assert answers[0] == ANSWER_COLUMNS
+        assert len(answers) == 6
+        assert answers[1] == [1, "Proqramçı", "İT", "Mütəxəssis", "Rəhbər", "employee",
+                              "Keyfiyyət", "Nəticə", 0.6, 4, "Yaxşı"]
+
+    def test_csv_export(self, seeded_period, tmp_path):
+        """The CSV export contains the answer-level detail with a UTF-8 BOM for Excel."""
+        path = tmp_path / "period.csv"
+
+        assert ExportService.export_period_report(1, str(path), fmt="csv", chunk_size=3) == 5
+
+        raw = path.read_bytes()
+        assert raw.startswith(b"\xef\xbb\xbf")
+        rows = list(csv.reader(io.StringIO(raw.decode("utf-8-sig"))))
+        assert rows[0] == ANSWER_COLUMNS
+        assert [row[0] for row in rows[1:]] == ["1", "1", "1", "1", "2"]
+        assert rows[5][1] == ""
+
+    def test_invalid_requests(self, seeded_period):
+        """Unknown periods and formats are rejected before anything is written."""
+        with pytest.raises(ValueError):
+            ExportService.export_period_report(99, io.BytesIO())
+        with pytest.raises(ValueError):
+            ExportService.export_period_report(1, io.BytesIO(), fmt="pdf")
+
+    def test_sheet_overflow_continues_on_next_sheet(self, monkeypatch):
+        """Rows beyond the sheet limit go to a numbered continuation sheet."""
+        monkeypatch.setattr(export_module, "XLSX_MAX_ROWS", 3)
+        table = ExportTable("Uzun vərəq", ["n"], iter([[(1,), (2,), (3,)], [(4,), (5,)]]))
+        buffer = io.BytesIO()
+
+        assert ExportService.write_xlsx(buffer, [table]) == 5
+
+        workbook = openpyxl.load_workbook(io.BytesIO(buffer.getvalue()), read_only=True)
+        assert workbook.sheetnames == ["Uzun vərəq", "Uzun vərəq (2)", "Uzun vərəq (3)"]
+        assert _sheet_rows(workbook, "Uzun vərəq") == [["n"], [1], [2]]
+        assert _sheet_rows(workbook, "Uzun vərəq (3)") == [["n"], [5]]
+
+    def test_dataframe_table_cells(self):
+        """DataFrame sheets write NaN as blank and nested values as text."""
+        df = pd.DataFrame({
+            "question": ["A", "B"],
+            "average_score": [4.5, np.nan],
+            "scores_by_role": [{"Rəhbər": 4.5}, {}],
+        })
+        buffer = io.BytesIO()
+
+        ExportService.write_xlsx(buffer, [ExportService.dataframe_table("Suallar", df, chunk_size=1)])
+
+        workbook = openpyxl.load_workbook(io.BytesIO(buffer.getvalue()), read_only=True)
+        assert _sheet_rows(workbook, "Suallar") == [
+            ["question", "average_score", "scores_by_role"],
+            ["A", 4.5, "{'Rəhbər': 4.5}"],
+            ["B", None, "{}"],
+        ]
@@ -0,0 +1,196 @@
+"""Unit tests for the background job service."""
+
+import datetime
+import os
+import time
+
+import openpyxl
+import pytest
+
+import services.job_service as job_module
+from config import settings
+from models.job import JOB_FAILED, JOB_PENDING, JOB_RUNNING, JOB_SUCCEEDED, Job
+from models.kpi import Evaluation, EvaluationPeriod
+from models.user import User
+from services.export_service import ExportService
+from services.job_service import JOB_EXPORT_PERIOD_REPORT, JOB_LAUNCH_PERIOD, JobService
+
+
+class TestJobService:
+    """Test cases for submitting, claiming and running queued jobs."""
+
+    @pytest.fixture
+    def handlers(self, monkeypatch):
+        """Register test handlers without leaking them into other tests."""
+        monkeypatch.setattr(settings, "JOB_PROGRESS_INTERVAL_SECONDS", 0.0)
+        seen_progress = []
+
+        def _ok(params, progress):
+            progress(0.5, "Yarı yol")
+            seen_progress.append(JobService.list_jobs()[0].progress)
+            return {"doubled": params["value"] * 2}
+
+        def _broken(params, progress):
+            raise ValueError("pis parametr")
+
+        monkeypatch.setitem(job_module._JOB_HANDLERS, "test_ok", _ok)
+        monkeypatch.setitem(job_module._JOB_HANDLERS, "test_broken", _broken)
+        return seen_progress
+
+    def test_submit_and_run(self, sqlite_db, handlers):
+        """A submitted job is pending until a worker runs it, then exposes its result."""
+        job_id = JobService.submit("test_ok", {"value": 21}, created_by=None)
+
+        job = JobService.status(job_id)
+        assert job.status == JOB_PENDING
+        assert job.progress == 0.0
+        assert JobService.result(job_id) is None
+
+        assert JobService.run_pending_jobs() == 1
+
+        job = JobService.status(job_id)
+        assert job.status == JOB_SUCCEEDED
+        assert job.is_finished
+        assert job.progress == 1.0
+        assert job.started_at is not None and job.finished_at is not None
+        assert JobService.result(job_id) == {"doubled": 42}
+        # Progress reported by the handler was visible while it ran
+        assert handlers == [0.5]
+
+    def test_failed_job_keeps_error(self, sqlite_db, handlers):
+        """Handler exceptions mark the job failed instead of escaping the worker."""
+        job_id = JobService.submit("test_broken")
+
+        job = JobService.run_job(JobService.claim_next_job())
+
+        assert job.status == JOB_FAILED
+        assert job.error == "ValueError: pis parametr"
+        with pytest.raises(RuntimeError, match="pis parametr"):
+            JobService.result(job_id)
+
+    def test_claim_order_and_validation(self, sqlite_db, handlers):
+        """Jobs are claimed oldest first, once each; unknown kinds are rejected."""
+        first = JobService.submit("test_ok", {"value": 1})
+        second = JobService.submit("test_ok", {"value": 2})
+
+        assert JobService.claim_next_job() == first
+        assert JobService.claim_next_job() == second
+        assert JobService.claim_next_job() is None
+        assert JobService.status(first).status == JOB_RUNNING
+
+        with pytest.raises(ValueError):
+            JobService.submit("nonexistent")
+        with pytest.raises(ValueError):
+            JobService.result(999)
+        assert JobService.status(999) is None
+
+    def test_stale_running_job_is_failed_on_next_claim(self, sqlite_db, handlers):
+        """A RUNNING job whose worker stopped sending heartbeats is failed instead of hanging."""
+        stale = JobService.submit("test_ok", {"value": 1})
+        alive = JobService.submit("test_ok", {"value": 2})
+        assert JobService.claim_next_job() == stale
+        assert JobService.claim_next_job() == alive
+
+        old = datetime.datetime.utcnow() - datetime.timedelta(seconds=settings.JOB_STALE_SECONDS + 60)
+        sqlite_db.get(Job, stale).heartbeat_at = old
+        sqlite_db.get(Job, alive).started_at = old
+        sqlite_db.commit()
+        # Progress writes count as heartbeats
+        JobService.update_progress(alive, 0.3, "İşləyir")
+
+        assert JobService.claim_next_job() is None
+        assert JobService.status(stale).status == JOB_FAILED
+        assert "cavab vermir" in JobService.status(stale).error
+        assert JobService.status(alive).status == JOB_RUNNING
+
+        # A late result from the lost worker does not overwrite the failure
+        JobService._finish(stale, JOB_SUCCEEDED, result={"doubled": 2})
+        assert JobService.status(stale).status == JOB_FAILED
+
+    def test_cancel(self, sqlite_db, handlers):
+        """Unfinished jobs can be cancelled; cancelled jobs are never claimed."""
+        job_id = JobService.submit("test_ok", {"value": 1})
+
+        assert JobService.cancel(job_id) is True
+        assert JobService.status(job_id).status == JOB_FAILED
+        assert JobService.claim_next_job() is None
+        assert JobService.cancel(job_id) is False
+        assert JobService.cancel(999) is False
+
+    def test_launch_period_job(self, sqlite_db):
+        """The period launch runs as a job and stores its counts as the result."""
+        sqlite_db.add_all([
+            User(id=1, username="manager", password="x", role="user"),
+            User(id=2, username="dev", password="x", role="user", manager_id=1),
+        ])
+        sqlite_db.commit()
+
+        job_id = JobService.submit(JOB_LAUNCH_PERIOD, {
+            "name": "2025 - I Rüblük", "start_date": "2025-01-01", "end_date": "2025-03-31"
+        }, created_by=1)
+        JobService.run_pending_jobs()
+
+        result = JobService.result(job_id)
+        assert result["self_evaluations"] == 2
+        assert result["manager_evaluations"] == 1
+        period = sqlite_db.query(EvaluationPeriod).one()
+        assert period.start_date == datetime.date(2025, 1, 1)
+        assert sqlite_db.query(Evaluation).count() == 3
+        assert [job.id for job in JobService.list_jobs(created_by=1)] == [job_id]
+
+    def test_export_job_writes_file(self, sqlite_db, monkeypatch, tmp_path):
+        """The export job writes into the shared output directory and returns the path."""
+        monkeypatch.setattr(settings, "JOB_OUTPUT_DIR", str(tmp_path))
+        sqlite_db.add(User(id=1, username="dev", password="x", role="user"))
+        sqlite_db.add(EvaluationPeriod(id=1, name="I Rüb", start_date=datetime.date(2025, 1, 1),
+                                       end_date=datetime.date(2025, 3, 31)))
+        sqlite_db.add(Evaluation(id=1, period_id=1, evaluated_user_id=1, evaluator_user_id=1))
+        sqlite_db.commit()
+
+        job_id = JobService.submit(JOB_EXPORT_PERIOD_REPORT, {"period_id": 1, "format": "xlsx"})
+        JobService.run_pending_jobs()
+
+        result = JobService.result(job_id)
+        assert result["rows"] == 1
+        assert os.path.dirname(result["path"]) == str(tmp_path)
+        workbook = openpyxl.load_workbook(result["path"], read_only=True)
+        assert workbook.sheetnames == ["Yekun ballar", "Cavablar"]
+
+        bad_job = JobService.submit(JOB_EXPORT_PERIOD_REPORT, {"period_id": 99})
+        JobService.run_pending_jobs()
+        assert JobService.status(bad_job).status == JOB_FAILED
+
+    def test_failed_export_leaves_no_file(self, sqlite_db, monkeypatch, tmp_path):
+        """An export that fails midway removes its partial output file."""
+        monkeypatch.setattr(settings, "JOB_OUTPUT_DIR", str(tmp_path))
+
+        def _fail_midway(period_id, target, **kwargs):
+            with open(target, "w") as partial:
+                partial.write("yarımçıq")
+            raise RuntimeError("bağlantı kəsildi")
+
+        monkeypatch.setattr(ExportService, "count_period_report_rows", staticmethod(lambda *args: 10))
+        monkeypatch.setattr(ExportService, "export_period_report", staticmethod(_fail_midway))
+
+        job_id = JobService.submit(JOB_EXPORT_PERIOD_REPORT, {"period_id": 1})
+        JobService.run_pending_jobs()
+
+        assert JobService.status(job_id).status == JOB_FAILED
+        assert os.listdir(tmp_path) == []
+
+    def test_purge_expired_outputs(self, monkeypatch, tmp_path):
+        """Output files older than the retention window are deleted, newer ones are kept."""
+        monkeypatch.setattr(settings, "JOB_OUTPUT_DIR", str(tmp_path))
+        monkeypatch.setattr(settings, "JOB_OUTPUT_RETENTION_HOURS", 1.0)
+        expired = tmp_path / "period_1_old.xlsx"
+        fresh = tmp_path / "period_1_new.xlsx"
+        expired.write_bytes(b"x")
+        fresh.write_bytes(b"x")
+        two_hours_ago = time.time() - 2 * 3600
+        os.utime(expired, (two_hours_ago, two_hours_ago))
+
+        assert JobService.purge_expired_outputs() == 1
+        assert sorted(os.listdir(tmp_path)) == ["period_1_new.xlsx"]
+
+        monkeypatch.setattr(settings, "JOB_OUTPUT_DIR", str(tmp_path / "missing"))
+        assert JobService.purge_expired_outputs() == 0
@@ -101,4 +101,229 @@ class TestKpiService:
         
         # Act & Assert
         with pytest.raises(PermissionError):
-            KpiService.submit_evaluation_as_employee(mock_db_session, mock_evaluation.id, mock_user.id)
\ No newline at end of file
+            KpiService.submit_evaluation_as_employee(mock_db_session, mock_evaluation.id, mock_user.id)
+
+class TestKpiScoringEngine:
+    """Test cases for the set-based scoring engine against a real schema."""
+
+    @pytest.fixture
+    def seeded_period(self, sqlite_db):
+        """Seed two users, a period, weighted questions and two evaluations."""
+        import datetime
+        from models.kpi import EvaluationPeriod
+        from models.user_profile import UserProfile
+
+        manager = User(id=1, username="manager", password="x", role="user")
+        employee = User(id=2, username="employee", password="x", role="user", manager_id=1)
+        sqlite_db.add_all([manager, employee])
+        sqlite_db.add_all([
+            UserProfile(user_id=1, full_name="Rəhbər", position="Rəis", department="İT"),
+            UserProfile(user_id=2, full_name="İşçi", position="Mütəxəssis", department="İT"),
+        ])
+        period = EvaluationPeriod(
+            id=1, name="2025 - I Rüblük",
+            start_date=datetime.date(2025, 1, 1), end_date=datetime.date(2025, 3, 31)
+        )
+        sqlite_db.add(period)
+        sqlite_db.add_all([
+            Question(id=1, text="Q1", weight=1.0),
+            Question(id=2, text="Q2", weight=3.0),
+        ])
+        self_eval = Evaluation(id=1, period_id=1, evaluated_user_id=2, evaluator_user_id=2,
+                               status=EvaluationStatus.FINALIZED)
+        manager_eval = Evaluation(id=2, period_id=1, evaluated_user_id=2, evaluator_user_id=1,
+                                  status=EvaluationStatus.FINALIZED)
+        empty_eval = Evaluation(id=3, period_id=1, evaluated_user_id=1, evaluator_user_id=1,
+                                status=EvaluationStatus.PENDING)
+        sqlite_db.add_all([self_eval, manager_eval, empty_eval])
+        sqlite_db.add_all([
+            Answer(evaluation_id=1, question_id=1, score=5, author_role="employee"),
+            Answer(evaluation_id=1, question_id=2, score=3, author_role="employee"),
+            Answer(evaluation_id=2, question_id=1, score=2, author_role="manager"),
+            Answer(evaluation_id=2, question_id=2, score=4, author_role="manager"),
+        ])
+        sqlite_db.commit()
+        return period
+
+    def test_calculate_evaluation_scores_batch(self, seeded_period):
+        """Weighted scores for many evaluations come back as one mapping."""
+        scores = KpiService.calculate_evaluation_scores([1, 2, 3])
+
+        assert scores[1] == pytest.approx((5 * 1 + 3 * 3) / 4)
+        assert scores[2] == pytest.approx((2 * 1 + 4 * 3) / 4)
+        # No answers -> 0.0, same as the single-ID API
+        assert scores[3] == 0.0
+
+    def test_calculate_evaluation_score_is_thin_wrapper(self, seeded_period):
+        """The single-ID API delegates to the batch engine."""
+        assert KpiService.calculate_evaluation_score(1) == pytest.approx(3.5)
+        assert KpiService.calculate_evaluation_score(999) == 0.0
+
+    def test_calculate_evaluation_scores_empty(self, sqlite_db):
+        """An empty ID list does not hit the database."""
+        assert KpiService.calculate_evaluation_scores([]) == {}
+
+    def test_submit_evaluation_materializes_scores(self, seeded_period, sqlite_db):
+        """Submitting answers writes employee/manager/total scores in the same transaction."""
+        from models.kpi import EvaluationScore
+
+        sqlite_db.add(Evaluation(id=4, period_id=1, evaluated_user_id=2, evaluator_user_id=2,
+                                 status=EvaluationStatus.PENDING))
+        sqlite_db.commit()
+
+        with patch("services.kpi_service.NotificationService"):
+            KpiService.submit_evaluation(4, 2, {1: {"score": 4}, 2: {"score": 2}})
+
+        row = sqlite_db.get(EvaluationScore, 4)
+        assert row is not None
+        assert row.period_id == 1
+        assert row.evaluated_user_id == 2
+        assert row.employee_score == pytest.approx((4 * 1 + 2 * 3) / 4)
+        assert row.manager_score is None
+        assert row.total_score == pytest.approx(row.employee_score)
+        assert KpiService.get_evaluation_scores([4]) == {4: pytest.approx(2.5)}
+
+    def test_update_evaluation_status_refreshes_scores(self, seeded_period, sqlite_db):
+        """Status changes (re)write the materialized row, keeping both authors' scores."""
+        from models.kpi import EvaluationScore
+
+        sqlite_db.add(Answer(evaluation_id=1, question_id=1, score=1, author_role="manager"))
+        sqlite_db.commit()
+
+        with patch("services.kpi_service.NotificationService"):
+            KpiService.update_evaluation_status(1, EvaluationStatus.FINALIZED)
+
+        row = sqlite_db.get(EvaluationScore, 1)
+        assert row.employee_score == pytest.approx(3.5)
+        assert row.manager_score == pytest.approx(1.0)
+        assert row.total_score == pytest.approx((5 + 9 + 1) / 5)
+
+    def test_get_user_performance_data_single_query(self, seeded_period, sqlite_db):
+        """Per-user averages come from one grouped query with the department filter in SQL."""
+        data = KpiService.get_user_performance_data(1)
+
+        assert data == [{
+            "full_name": "İşçi",
+            "department": "İT",
+            "total_score": pytest.approx((3.5 + 3.5) / 2),
+        }]
+        assert KpiService.get_user_performance_data(1, department="Maliyyə") == []
+
+    def test_get_department_performance_data(self, seeded_period, sqlite_db):
+        """Department averages use stored scores and fall back to live aggregation."""
+        from models.kpi import EvaluationScore
+
+        sqlite_db.add(EvaluationScore(evaluation_id=1, period_id=1, evaluated_user_id=2, total_score=5.0))
+        sqlite_db.commit()
+
+        data = KpiService.get_department_performance_data(1)
+
+        assert data == [{"department": "İT", "avg_score": pytest.approx((5.0 + 3.5) / 2)}]
+
+    def test_get_period_comparison(self, seeded_period, sqlite_db):
+        """One grouped query yields a user x period pivot with deltas and rank changes."""
+        import datetime
+        from models.kpi import EvaluationPeriod
+
+        sqlite_db.add(EvaluationPeriod(
+            id=2, name="2025 - II Rüblük",
+            start_date=datetime.date(2025, 4, 1), end_date=datetime.date(2025, 6, 30)
+        ))
+        sqlite_db.add_all([
+            Evaluation(id=10, period_id=2, evaluated_user_id=2, evaluator_user_id=1,
+                       status=EvaluationStatus.FINALIZED),
+            Evaluation(id=11, period_id=2, evaluated_user_id=1, evaluator_user_id=1,
+                       status=EvaluationStatus.FINALIZED),
+            Answer(evaluation_id=10, question_id=1, score=3, author_role="manager"),
+            Answer(evaluation_id=11, question_id=1, score=5, author_role="manager"),
+        ])
+        sqlite_db.commit()
+
+        comparison = KpiService.get_period_comparison([2, 1])
+        scores = comparison["scores"]
+
+        assert list(scores.columns) == ["2025 - I Rüblük", "2025 - II Rüblük"]
+        assert scores.loc["İşçi", "2025 - I Rüblük"] == pytest.approx(3.5)
+        assert scores.loc["İşçi", "2025 - II Rüblük"] == pytest.approx(3.0)
+        assert comparison["deltas"].loc["İşçi", "2025 - II Rüblük"] == pytest.approx(-0.5)
+        assert comparison["ranks"].loc["Rəhbər", "2025 - II Rüblük"] == 1
+        assert comparison["rank_changes"].loc["İşçi", "2025 - II Rüblük"] == -1
+
+        legacy = KpiService.get_multiple_periods_performance_data([1, 2])
+        assert list(legacy) == ["2025 - I Rüblük", "2025 - II Rüblük"]
+        assert len(legacy["2025 - II Rüblük"]) == 2
+
+    def test_get_period_comparison_empty(self, sqlite_db):
+        """No periods selected returns empty frames instead of failing."""
+        comparison = KpiService.get_period_comparison([])
+
+        assert comparison["long"].empty
+        assert comparison["scores"].empty
+
+    def test_evaluation_read_apis_return_frozen_dtos(self, seeded_period):
+        """Read APIs return immutable DTOs with period and user profiles loaded."""
+        import dataclasses
+        from services.dto import EvaluationDTO, LOAD_JOINED
+
+        completed = KpiService.get_completed_evaluations_for_user(2)
+        assert len(completed) == 1
+        evaluation = completed[0]
+        assert isinstance(evaluation, EvaluationDTO)
+        assert evaluation.period.name == "2025 - I Rüblük"
+        assert evaluation.evaluated_user.get_full_name() == "İşçi"
+        assert evaluation.evaluator_user.department == "İT"
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            evaluation.status = EvaluationStatus.PENDING
+
+        assert KpiService.get_completed_evaluations_for_user(2, load=LOAD_JOINED) == completed
+        assert [e.id for e in KpiService.get_pending_evaluations_for_user(1)] == [3]
+
+    def test_evaluation_read_apis_reject_unknown_load_profile(self, seeded_period):
+        """An unknown eager-loading profile is reported instead of silently ignored."""
+        with pytest.raises(ValueError):
+            KpiService.get_pending_evaluations_for_user(1, load="lazy")
+
+    def test_launch_period_bulk_creates_tasks_idempotently(self, sqlite_db):
+        """Launching creates self and manager evaluations plus notifications once."""
+        import datetime
+        from models.kpi import EvaluationPeriod
+        from models.notification import Notification
+
+        sqlite_db.add_all([
+            User(id=1, username="manager", password="x", role="user"),
+            User(id=2, username="employee", password="x", role="user", manager_id=1),
+            User(id=3, username="former", password="x", role="user", manager_id=1, is_active=False),
+            User(id=4, username="orphan", password="x", role="user", manager_id=3),
+        ])
+        sqlite_db.commit()
+        start, end = datetime.date(2025, 4, 1), datetime.date(2025, 6, 30)
+        stages = []
+
+        result = KpiService.launch_period("2025 - II Rüblük", start, end,
+                                          progress=lambda fraction, stage: stages.append(fraction))
+
+        assert result["created_period"] == 1
+        assert result["self_evaluations"] == 3
+        assert result["manager_evaluations"] == 1
+        assert result["notifications"] == 3
+        assert stages[-1] == 1.0
+        pairs = {
+            (e.evaluated_user_id, e.evaluator_user_id, e.status)
+            for e in sqlite_db.query(Evaluation).all()
+        }
+        assert pairs == {
+            (1, 1, EvaluationStatus.PENDING),
+            (2, 2, EvaluationStatus.PENDING),
+            (4, 4, EvaluationStatus.PENDING),
+            (2, 1, EvaluationStatus.PENDING),
+        }
+
+        retry = KpiService.launch_period("2025 - II Rüblük", start, end)
+        assert retry == {**result, "created_period": 0, "self_evaluations": 0,
+                         "manager_evaluations": 0, "notifications": 0}
+        assert sqlite_db.query(EvaluationPeriod).count() == 1
+        assert sqlite_db.query(Notification).count() == 3
+
+        with pytest.raises(ValueError):
+            KpiService.launch_period("2025 - II Rüblük", start, datetime.date(2025, 7, 31))
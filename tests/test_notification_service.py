@@ -0,0 +1,43 @@
+"""Unit tests for notification service."""
+
+from services.notification_service import NotificationService
+from models.notification import Notification
+from models.user import User
+
+
+class TestNotificationBulk:
+    """Test cases for bulk notification fan-out."""
+
+    def test_create_notifications_bulk_with_deduplication(self, sqlite_db):
+        """Rows are inserted once per user and unread duplicates are skipped."""
+        sqlite_db.add_all([
+            User(id=i, username=f"user{i}", password="x", role="user") for i in (1, 2, 3)
+        ])
+        sqlite_db.add_all([
+            Notification(user_id=1, message="Dövr 2025 başladı"),
+            Notification(user_id=2, message="Dövr 2025 başladı", is_read=True),
+        ])
+        sqlite_db.commit()
+
+        counts = NotificationService.create_notifications_bulk(
+            [1, 2, 3, 3, None], "Dövr {period} başladı", {"period": 2025}, deduplicate=True
+        )
+
+        assert counts == {"requested": 3, "created": 2, "skipped": 1}
+        messages = sqlite_db.query(Notification.user_id).filter(
+            Notification.message == "Dövr 2025 başladı",
+            Notification.is_read == False  # noqa: E712
+        ).all()
+        assert sorted(uid for (uid,) in messages) == [1, 2, 3]
+
+    def test_create_notifications_bulk_without_deduplication(self, sqlite_db):
+        """Without deduplication every requested user gets a new row."""
+        sqlite_db.add(User(id=1, username="user1", password="x", role="user"))
+        sqlite_db.add(Notification(user_id=1, message="Salam"))
+        sqlite_db.commit()
+
+        assert NotificationService.create_notifications_bulk([1], "Salam") == {
+            "requested": 1, "created": 1, "skipped": 0
+        }
+        assert NotificationService.create_notifications_bulk([], "Salam")["requested"] == 0
+        assert sqlite_db.query(Notification).count() == 2
@@ -0,0 +1,122 @@
+"""Unit tests for the KPI question service."""
+
+import datetime
+
+import pytest
+
+from models.kpi import Answer, Evaluation, EvaluationPeriod, EvaluationScore, EvaluationStatus, Question
+from models.user import User
+from services.kpi_service import KpiService
+from services.question_service import QuestionService
+
+
+class TestQuestionService:
+    """Test cases for bulk question upserts with in-transaction weight validation."""
+
+    @pytest.fixture
+    def seeded_questions(self, sqlite_db):
+        """Seed three active questions whose weights sum to 1.0 and one inactive question."""
+        sqlite_db.add_all([
+            Question(id=1, text="Keyfiyyət", category="Nəticə", weight=0.5),
+            Question(id=2, text="Vaxt", category="Nəticə", weight=0.3),
+            Question(id=3, text="Komanda", category="Davranış", weight=0.2),
+            Question(id=4, text="Köhnə", weight=0.4, is_active=False),
+        ])
+        sqlite_db.commit()
+
+    def test_bulk_upsert_updates_and_inserts(self, seeded_questions, sqlite_db):
+        """Changed fields are written, new rows inserted, and the total is checked in SQL."""
+        result = QuestionService.upsert_questions([
+            {"id": 1, "weight": 0.4},
+            {"id": 2, "text": "Vaxtında icra", "weight": 0.2},
+            {"id": 3, "category": "Əməkdaşlıq"},
+            {"text": "Təşəbbüskarlıq", "weight": 0.2},
+        ])
+
+        assert result == {"created": 1, "updated": 3, "total_weight": pytest.approx(1.0)}
+        sqlite_db.expire_all()
+        assert sqlite_db.get(Question, 1).weight == pytest.approx(0.4)
+        assert sqlite_db.get(Question, 1).text == "Keyfiyyət"
+        assert sqlite_db.get(Question, 2).text == "Vaxtında icra"
+        assert sqlite_db.get(Question, 3).category == "Əməkdaşlıq"
+        created = sqlite_db.query(Question).filter_by(text="Təşəbbüskarlıq").one()
+        assert created.category == "Ümumi"
+        assert created.is_active is True
+
+    def test_invalid_total_rolls_back_everything(self, seeded_questions, sqlite_db):
+        """A batch that breaks the 1.0 total leaves all rows untouched."""
+        with pytest.raises(ValueError, match="1.20"):
+            QuestionService.upsert_questions([
+                {"id": 1, "weight": 0.3},
+                {"id": 4, "is_active": True},
+            ])
+
+        sqlite_db.expire_all()
+        assert sqlite_db.get(Question, 1).weight == pytest.approx(0.5)
+        assert sqlite_db.get(Question, 4).is_active is False
+
+        with pytest.raises(ValueError):
+            QuestionService.upsert_questions([{"id": 99, "weight": 0.1}])
+        with pytest.raises(ValueError):
+            QuestionService.upsert_questions([{"id": 1, "score": 5}])
+        with pytest.raises(ValueError):
+            QuestionService.upsert_questions([{"id": 1, "text": "  "}])
+
+    def test_create_question_allows_partial_total(self, sqlite_db):
+        """New questions may build the total up to 1.0 but not beyond it."""
+        QuestionService.create_question("Birinci", "Ümumi", 0.6)
+        assert QuestionService.get_active_weight_total() == pytest.approx(0.6)
+
+        with pytest.raises(ValueError):
+            QuestionService.create_question("İkinci", "Ümumi", 0.5)
+        assert [q.text for q in QuestionService.get_all_questions()] == ["Birinci"]
+
+    def test_writes_bump_version_and_invalidate_question_caches(self, seeded_questions):
+        """Cached question reads are refreshed after a successful write."""
+        version = QuestionService.get_questions_version()
+        assert [q.id for q in KpiService.get_active_questions()] == [1, 2, 3]
+        assert QuestionService.get_active_weight_total() == pytest.approx(1.0)
+
+        QuestionService.upsert_questions([
+            {"id": 3, "is_active": False},
+            {"id": 4, "is_active": True, "weight": 0.2},
+        ])
+
+        assert QuestionService.get_questions_version() == version + 1
+        assert [q.id for q in KpiService.get_active_questions()] == [1, 2, 4]
+        assert QuestionService.get_active_weight_total() == pytest.approx(1.0)
+
+        # A rejected write keeps the version
+        with pytest.raises(ValueError):
+            QuestionService.upsert_questions([{"id": 1, "weight": 0.9}])
+        assert QuestionService.get_questions_version() == version + 1
+
+    def test_weight_change_rescores_stored_evaluations(self, seeded_questions, sqlite_db):
+        """Stored totals of evaluations answering a reweighted question follow the new weights."""
+        sqlite_db.add(User(id=1, username="dev", password="x", role="user"))
+        sqlite_db.add(EvaluationPeriod(id=1, name="I Rüb", start_date=datetime.date(2025, 1, 1),
+                                       end_date=datetime.date(2025, 3, 31)))
+        sqlite_db.add_all([
+            Evaluation(id=1, period_id=1, evaluated_user_id=1, evaluator_user_id=1,
+                       status=EvaluationStatus.FINALIZED),
+            Evaluation(id=2, period_id=1, evaluated_user_id=1, evaluator_user_id=1,
+                       status=EvaluationStatus.FINALIZED),
+        ])
+        sqlite_db.add_all([
+            Answer(evaluation_id=1, question_id=1, score=5, author_role="manager"),
+            Answer(evaluation_id=1, question_id=2, score=1, author_role="manager"),
+            Answer(evaluation_id=2, question_id=3, score=4, author_role="manager"),
+        ])
+        sqlite_db.commit()
+        KpiService.update_evaluation_status(1, EvaluationStatus.FINALIZED)
+        KpiService.update_evaluation_status(2, EvaluationStatus.FINALIZED)
+        assert sqlite_db.get(EvaluationScore, 1).total_score == pytest.approx((2.5 + 0.3) / 0.8)
+
+        QuestionService.upsert_questions([{"id": 1, "weight": 0.3}, {"id": 2, "weight": 0.5}])
+
+        sqlite_db.expire_all()
+        assert sqlite_db.get(EvaluationScore, 1).total_score == pytest.approx((1.5 + 0.5) / 0.8)
+        assert sqlite_db.get(EvaluationScore, 1).manager_score == pytest.approx((1.5 + 0.5) / 0.8)
+        # Stored total and the live computation agree again
+        assert KpiService.get_evaluation_scores([1]) == KpiService.calculate_evaluation_scores([1])
+        assert sqlite_db.get(EvaluationScore, 2).total_score == pytest.approx(4.0)
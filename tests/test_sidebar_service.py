@@ -0,0 +1,83 @@
+"""Unit tests for the cached sidebar state."""
+
+import datetime
+
+from services.sidebar_service import SidebarService
+from services.notification_service import NotificationService
+from services.kpi_service import KpiService
+from models.kpi import Evaluation, EvaluationPeriod, EvaluationStatus
+from models.notification import Notification
+from models.user import User
+
+
+class TestSidebarState:
+    """Test cases for the per-user sidebar cache and its invalidation hooks."""
+
+    def _seed(self, sqlite_db):
+        today = datetime.date.today()
+        sqlite_db.add_all([
+            User(id=1, username="manager", password="x", role="user"),
+            User(id=2, username="employee", password="x", role="user", manager_id=1),
+            User(id=3, username="former", password="x", role="user", is_active=False),
+        ])
+        sqlite_db.add_all([
+            EvaluationPeriod(id=1, name="Cari", start_date=today, end_date=today + datetime.timedelta(days=3)),
+            EvaluationPeriod(id=2, name="Uzaq", start_date=today, end_date=today + datetime.timedelta(days=30)),
+        ])
+        sqlite_db.add_all([
+            Evaluation(id=1, period_id=1, evaluated_user_id=2, evaluator_user_id=2),
+            Evaluation(id=2, period_id=2, evaluated_user_id=2, evaluator_user_id=2),
+            Evaluation(id=3, period_id=1, evaluated_user_id=1, evaluator_user_id=1),
+            Notification(user_id=2, message="Salam"),
+        ])
+        sqlite_db.commit()
+
+    def test_state_is_cached_per_user(self, sqlite_db):
+        """A second read within the TTL does not see direct database writes."""
+        self._seed(sqlite_db)
+
+        state = SidebarService.get_sidebar_state(2)
+        assert state.user.username == "employee"
+        assert state.unread_count == 1
+        assert [d.period_name for d in state.upcoming_deadlines] == ["Cari"]
+        assert SidebarService.get_sidebar_state(3).user is None
+
+        sqlite_db.add(Notification(user_id=2, message="Birbaşa yazı"))
+        sqlite_db.commit()
+        assert SidebarService.get_sidebar_state(2) is state
+
+    def test_invalidation_hooks(self, sqlite_db):
+        """Notification and evaluation status writes refresh the affected users."""
+        self._seed(sqlite_db)
+        SidebarService.get_sidebar_state(2)
+
+        NotificationService.create_notification(user_id=2, message="Yeni")
+        assert SidebarService.get_sidebar_state(2).unread_count == 2
+
+        NotificationService.mark_all_as_read(2)
+        assert SidebarService.get_sidebar_state(2).unread_count == 0
+
+        KpiService.update_evaluation_status(1, EvaluationStatus.SELF_EVAL_COMPLETED)
+        assert SidebarService.get_sidebar_state(2).upcoming_deadlines == ()
+
+    def test_load_racing_invalidation_is_not_cached(self, sqlite_db, monkeypatch):
+        """A state loaded while an invalidation happens is returned but not kept for the TTL."""
+        self._seed(sqlite_db)
+        original_load = SidebarService._load_sidebar_state
+        loads = []
+
+        def _load_with_concurrent_write(user_id, loaded_at):
+            state = original_load(user_id, loaded_at)
+            loads.append(user_id)
+            if len(loads) == 1:
+                # Another request deactivates the user after the state was read
+                sqlite_db.get(User, 2).is_active = False
+                sqlite_db.commit()
+                SidebarService.invalidate_sidebar_state([2])
+            return state
+
+        monkeypatch.setattr(SidebarService, "_load_sidebar_state", staticmethod(_load_with_concurrent_write))
+
+        assert SidebarService.get_sidebar_state(2).user is not None
+        assert SidebarService.get_sidebar_state(2).user is None
+        assert loads == [2, 2]
@@ -0,0 +1,202 @@
+"""Unit tests for the Parquet analytics snapshot."""
+
+import datetime
+import os
+
+import pandas as pd
+import pytest
+
+from config import settings
+from models.competency import Competency
+from models.degree360 import Degree360Participant, Degree360ParticipantRole, Degree360Question, Degree360Session
+from models.kpi import Answer, Evaluation, EvaluationPeriod, EvaluationStatus, Question
+from models.user import User
+from models.user_profile import UserProfile
+from services.degree360_service import Degree360Service
+from services.job_service import JOB_BUILD_ANALYTICS_SNAPSHOT, JobService
+from services.kpi_service import KpiService
+from services.snapshot_service import (
+    DATASET_ANSWER_FACTS, DATASET_DEGREE360_AGGREGATES, DATASET_EVALUATION_SCORES, AnalyticsSnapshotService
+)
+from services.talent_grid_service import (
+    POTENTIAL_SOURCE_360, POTENTIAL_SOURCE_AUTO, POTENTIAL_SOURCE_MANAGER, TalentGridService
+)
+from services.user_service import UserService
+
+
+class TestAnalyticsSnapshotService:
+    """Test cases for writing period-partitioned snapshots and reading them back."""
+
+    @pytest.fixture
+    def seeded_periods(self, sqlite_db, monkeypatch, tmp_path):
+        """Seed two periods, answers linked to competencies and one 360 session."""
+        monkeypatch.setattr(settings, "ANALYTICS_SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+        sqlite_db.add_all([
+            User(id=1, username="manager", password="x", role="user"),
+            User(id=2, username="dev", password="x", role="user", manager_id=1),
+            User(id=3, username="analyst", password="x", role="user", manager_id=1),
+        ])
+        sqlite_db.add_all([
+            UserProfile(user_id=1, full_name="Rəhbər", position="Rəhbər", department="İT"),
+            UserProfile(user_id=2, full_name="Proqramçı", position="Mütəxəssis", department="İT"),
+            UserProfile(user_id=3, full_name="Analitik", position="Mütəxəssis", department="Maliyyə"),
+        ])
+        sqlite_db.add_all([
+            EvaluationPeriod(id=1, name="I Rüb", start_date=datetime.date(2025, 1, 1),
+                             end_date=datetime.date(2025, 3, 31)),
+            EvaluationPeriod(id=2, name="II Rüb", start_date=datetime.date(2025, 4, 1),
+                             end_date=datetime.date(2025, 6, 30)),
+        ])
+        leadership = Competency(id=1, name="Liderlik", category="İdarəetmə")
+        communication = Competency(id=2, name="Ünsiyyət", category="Ünsiyyət")
+        quality = Question(id=1, text="Keyfiyyət", category="Nəticə", weight=0.6)
+        quality.competencies.extend([leadership, communication])
+        sqlite_db.add_all([leadership, communication, quality,
+                           Question(id=2, text="Vaxt", category="Nəticə", weight=0.4)])
+        sqlite_db.add_all([
+            Evaluation(id=1, period_id=1, evaluated_user_id=2, evaluator_user_id=1,
+                       status=EvaluationStatus.SELF_EVAL_COMPLETED),
+            Evaluation(id=2, period_id=1, evaluated_user_id=3, evaluator_user_id=1,
+                       status=EvaluationStatus.SELF_EVAL_COMPLETED),
+            Evaluation(id=3, period_id=2, evaluated_user_id=2, evaluator_user_id=1,
+                       status=EvaluationStatus.SELF_EVAL_COMPLETED),
+        ])
+        sqlite_db.add_all([
+            Answer(evaluation_id=1, question_id=1, score=4, author_role="employee"),
+            Answer(evaluation_id=1, question_id=2, score=3, author_role="employee"),
+            Answer(evaluation_id=2, question_id=1, score=2, author_role="employee"),
+            Answer(evaluation_id=3, question_id=2, score=5, author_role="employee"),
+        ])
+        sqlite_db.add(Degree360Session(id=1, name="360 Proqramçı", evaluated_user_id=2, evaluator_user_id=1,
+                                       start_date=datetime.date(2025, 3, 1), end_date=datetime.date(2025, 3, 31)))
+        sqlite_db.add(Degree360Question(id=1, session_id=1, text="Liderlik"))
+        sqlite_db.add_all([
+            Degree360Participant(id=1, session_id=1, evaluator_user_id=1, role=Degree360ParticipantRole.MANAGER),
+            Degree360Participant(id=2, session_id=1, evaluator_user_id=2, role=Degree360ParticipantRole.SELF),
+        ])
+        sqlite_db.commit()
+
+        KpiService.submit_evaluation(1, 1, {1: {"score": 5}, 2: {"score": 4}})
+        Degree360Service.submit_answers_for_360_participant(1, [{"question_id": 1, "score": 3}])
+        Degree360Service.submit_answers_for_360_participant(2, [{"question_id": 1, "score": 5}])
+
+    def test_build_writes_period_partitions(self, seeded_periods):
+        """Each dataset gets one Parquet file per period; reads prune columns and periods."""
+        rows = AnalyticsSnapshotService.build_period_snapshot(1, chunk_size=2)
+
+        # Answers on the question linked to two competencies appear once per competency
+        assert rows == {DATASET_EVALUATION_SCORES: 2, DATASET_ANSWER_FACTS: 8, DATASET_DEGREE360_AGGREGATES: 2}
+        assert os.path.exists(os.path.join(
+            settings.ANALYTICS_SNAPSHOT_DIR, DATASET_ANSWER_FACTS, "period_id=1", "part-0.parquet"
+        ))
+        assert AnalyticsSnapshotService.snapshot_period_ids() == [1]
+
+        facts = AnalyticsSnapshotService.load_dataset(
+            DATASET_ANSWER_FACTS, [1], columns=["period_id", "answer_id", "competency_name", "score"],
+            filters=[("author_role", "==", "manager")]
+        )
+        assert list(facts.columns) == ["period_id", "answer_id", "competency_name", "score"]
+        assert (facts["period_id"] == 1).all()
+        assert sorted(facts["competency_name"].dropna()) == ["Liderlik", "Ünsiyyət"]
+        assert facts["competency_name"].isna().sum() == 1
+
+        scores = AnalyticsSnapshotService.load_dataset(DATASET_EVALUATION_SCORES, [1]).set_index("evaluation_id")
+        assert scores.loc[1, "status"] == EvaluationStatus.FINALIZED.value
+        assert scores.loc[1, "period_name"] == "I Rüb"
+        assert scores.loc[1, "total_score"] == pytest.approx((0.6 * 9 + 0.4 * 7) / 2)
+
+        # Period 2 has no snapshot yet, so callers fall back to live queries
+        assert AnalyticsSnapshotService.load_dataset(DATASET_EVALUATION_SCORES, [1, 2]) is None
+        assert AnalyticsSnapshotService.get_user_performance_data(2) is None
+        with pytest.raises(ValueError):
+            AnalyticsSnapshotService.build_period_snapshot(99)
+
+    def test_only_changed_periods_are_rebuilt(self, seeded_periods):
+        """Finalizing an evaluation marks just its period stale."""
+        assert AnalyticsSnapshotService.stale_period_ids() == [1, 2]
+        assert sorted(AnalyticsSnapshotService.build_stale_snapshots()) == [1, 2]
+        assert AnalyticsSnapshotService.stale_period_ids() == []
+        assert AnalyticsSnapshotService.build_stale_snapshots() == {}
+
+        KpiService.update_evaluation_status(2, EvaluationStatus.FINALIZED)
+        assert AnalyticsSnapshotService.stale_period_ids() == [1]
+
+        # A stale period is not served from the snapshot; the pages fall back to the live query
+        assert AnalyticsSnapshotService.get_user_performance_data(1) is None
+        AnalyticsSnapshotService.build_stale_snapshots()
+        assert [row["full_name"] for row in AnalyticsSnapshotService.get_user_performance_data(1)] == [
+            "Proqramçı", "Analitik"
+        ]
+
+        # Renaming or moving an evaluated employee changes the denormalized columns too
+        UserService.bulk_update_users({3: {"department": "HR"}})
+        assert AnalyticsSnapshotService.stale_period_ids() == [1]
+        AnalyticsSnapshotService.build_stale_snapshots()
+        assert [row["department"] for row in AnalyticsSnapshotService.get_user_performance_data(1)] == ["İT", "HR"]
+
+    def test_finalization_queues_one_snapshot_job(self, seeded_periods):
+        """Finalizing evaluations enqueues a single pending snapshot rebuild, not one per evaluation."""
+        pending = [job for job in JobService.list_jobs() if job.kind == JOB_BUILD_ANALYTICS_SNAPSHOT]
+        assert len(pending) == 1
+
+        assert KpiService.finalize_evaluations([2, 3]) == 2
+        assert [job.id for job in JobService.list_jobs() if job.kind == JOB_BUILD_ANALYTICS_SNAPSHOT] == [pending[0].id]
+
+        JobService.run_pending_jobs()
+        assert AnalyticsSnapshotService.stale_period_ids() == []
+        KpiService.update_evaluation_status(3, EvaluationStatus.SELF_EVAL_COMPLETED)
+        assert len([job for job in JobService.list_jobs() if job.kind == JOB_BUILD_ANALYTICS_SNAPSHOT]) == 2
+
+    def test_trend_falls_back_when_a_finalized_period_is_missing(self, seeded_periods):
+        """A trend read never silently drops finalized periods that have no snapshot yet."""
+        AnalyticsSnapshotService.build_period_snapshot(1)
+        assert AnalyticsSnapshotService.get_user_performance_trend(2) == [
+            dict(row, score=pytest.approx(row["score"])) for row in KpiService.get_user_performance_trend(2)
+        ]
+        assert AnalyticsSnapshotService.get_user_performance_trend(99) == []
+
+        KpiService.update_evaluation_status(3, EvaluationStatus.FINALIZED)
+        assert AnalyticsSnapshotService.get_user_performance_trend(2) is None
+
+        AnalyticsSnapshotService.build_period_snapshot(2)
+        assert len(AnalyticsSnapshotService.get_user_performance_trend(2)) == 2
+
+    def test_snapshot_reads_match_live_queries(self, seeded_periods):
+        """Performance data, trends and 9-box scores read from the snapshot equal the live results."""
+        KpiService.update_evaluation_status(2, EvaluationStatus.FINALIZED)
+        KpiService.update_evaluation_status(3, EvaluationStatus.FINALIZED)
+        AnalyticsSnapshotService.build_stale_snapshots()
+
+        for department in (None, "İT", "Maliyyə"):
+            snapshot = AnalyticsSnapshotService.get_user_performance_data(1, department=department)
+            live = KpiService.get_user_performance_data(1, department=department)
+            assert snapshot == [dict(row, total_score=pytest.approx(row["total_score"])) for row in live]
+
+        live_trend = KpiService.get_user_performance_trend(2)
+        assert AnalyticsSnapshotService.get_user_performance_trend(2) == [
+            dict(row, score=pytest.approx(row["score"])) for row in live_trend
+        ]
+        assert len(live_trend) == 2
+
+        for source in (POTENTIAL_SOURCE_AUTO, POTENTIAL_SOURCE_360, POTENTIAL_SOURCE_MANAGER):
+            pd.testing.assert_frame_equal(
+                TalentGridService.get_snapshot_grid_scores(1, source),
+                TalentGridService.get_grid_scores(1, source)
+            )
+        grid = TalentGridService.build_talent_grid(1, use_snapshot=True)
+        assert grid.employees["user_id"].tolist() == [2]
+
+    def test_job_builds_and_deleted_periods_are_removed(self, seeded_periods, sqlite_db):
+        """The background job refreshes stale periods; snapshots of deleted periods are dropped."""
+        # The fixture's finalization already queued the job
+        job_id = JobService.submit(JOB_BUILD_ANALYTICS_SNAPSHOT, deduplicate=True)
+        JobService.run_pending_jobs()
+        assert sorted(JobService.result(job_id)["periods"]) == ["1", "2"]
+
+        sqlite_db.delete(sqlite_db.get(EvaluationPeriod, 2))
+        sqlite_db.commit()
+        AnalyticsSnapshotService.build_stale_snapshots()
+
+        assert AnalyticsSnapshotService.snapshot_period_ids() == [1]
+        assert not os.path.exists(os.path.join(settings.ANALYTICS_SNAPSHOT_DIR, DATASET_EVALUATION_SCORES,
+                                               "period_id=2"))
@@ -0,0 +1,171 @@
+"""Unit tests for the 9-box talent grid service."""
+
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from models.degree360 import (
+    Degree360Aggregate, Degree360ParticipantRole, Degree360Question, Degree360Session
+)
+from models.kpi import Evaluation, EvaluationPeriod, EvaluationScore, EvaluationStatus
+from models.user import User
+from models.user_profile import UserProfile
+from services.talent_grid_service import (
+    TalentGridService, PERFORMANCE_LABELS, POTENTIAL_LABELS,
+    POTENTIAL_SOURCE_360, POTENTIAL_SOURCE_MANAGER,
+)
+
+
+class TestTalentGridService:
+    """Test cases for the grouped score query and vectorized bucketing."""
+
+    @pytest.fixture
+    def seeded_grid(self, sqlite_db):
+        """Seed finalized KPI scores, manager scores and 360 aggregates for one period."""
+        sqlite_db.add_all([
+            User(id=1, username="manager", password="x", role="user"),
+            User(id=2, username="star", password="x", role="user", manager_id=1),
+            User(id=3, username="steady", password="x", role="user", manager_id=1),
+            User(id=4, username="new", password="x", role="user", manager_id=1),
+            User(id=5, username="former", password="x", role="user", is_active=False),
+        ])
+        sqlite_db.add_all([
+            UserProfile(user_id=2, full_name="Ulduz", position="Mütəxəssis", department="İT"),
+            UserProfile(user_id=3, full_name="Sabit", position="Mütəxəssis", department="İT"),
+        ])
+        sqlite_db.add(EvaluationPeriod(
+            id=1, name="2025 - I Rüblük",
+            start_date=datetime.date(2025, 1, 1), end_date=datetime.date(2025, 3, 31)
+        ))
+        evaluations = [
+            # (id, evaluated, evaluator, status, total, manager)
+            (1, 2, 2, EvaluationStatus.FINALIZED, 4.0, None),
+            (2, 2, 1, EvaluationStatus.FINALIZED, 5.0, 2.0),
+            (3, 3, 1, EvaluationStatus.FINALIZED, 3.0, 3.0),
+            (4, 4, 1, EvaluationStatus.PENDING, 1.0, 1.0),
+            (5, 5, 1, EvaluationStatus.FINALIZED, 5.0, 5.0),
+        ]
+        for evaluation_id, evaluated, evaluator, status, total, manager_score in evaluations:
+            sqlite_db.add(Evaluation(id=evaluation_id, period_id=1, evaluated_user_id=evaluated,
+                                     evaluator_user_id=evaluator, status=status))
+            sqlite_db.add(EvaluationScore(evaluation_id=evaluation_id, period_id=1,
+                                          evaluated_user_id=evaluated, total_score=total,
+                                          manager_score=manager_score))
+
+        sqlite_db.add_all([
+            Degree360Session(id=1, name="360 Ulduz", evaluated_user_id=2, evaluator_user_id=1,
+                             start_date=datetime.date(2025, 2, 1), end_date=datetime.date(2025, 2, 28)),
+            # Outside the period window: ignored
+            Degree360Session(id=2, name="360 Sabit", evaluated_user_id=3, evaluator_user_id=1,
+                             start_date=datetime.date(2024, 1, 1), end_date=datetime.date(2024, 2, 1)),
+        ])
+        sqlite_db.add_all([
+            Degree360Question(id=1, session_id=1, text="Liderlik"),
+            Degree360Question(id=2, session_id=1, text="Köhnə", is_active=False),
+            Degree360Question(id=3, session_id=2, text="Planlama"),
+        ])
+        sqlite_db.add_all([
+            Degree360Aggregate(session_id=1, question_id=1, role=Degree360ParticipantRole.PEER,
+                               score_sum=9.0, score_count=2, score_sumsq=41.0),
+            Degree360Aggregate(session_id=1, question_id=1, role=Degree360ParticipantRole.MANAGER,
+                               score_sum=5.0, score_count=1, score_sumsq=25.0),
+            # Self ratings and inactive questions do not count towards potential
+            Degree360Aggregate(session_id=1, question_id=1, role=Degree360ParticipantRole.SELF,
+                               score_sum=1.0, score_count=1, score_sumsq=1.0),
+            Degree360Aggregate(session_id=1, question_id=2, role=Degree360ParticipantRole.PEER,
+                               score_sum=1.0, score_count=1, score_sumsq=1.0),
+            Degree360Aggregate(session_id=2, question_id=3, role=Degree360ParticipantRole.PEER,
+                               score_sum=1.0, score_count=1, score_sumsq=1.0),
+        ])
+        sqlite_db.commit()
+
+    def test_grid_scores_come_from_real_data(self, seeded_grid):
+        """KPI averages finalized evaluations; potential prefers 360 and falls back to the manager."""
+        scores = TalentGridService.get_grid_scores(1).set_index("user_id")
+
+        assert list(scores.index) == [1, 2, 3, 4]
+        assert scores.loc[2, "kpi_score"] == pytest.approx(4.5)
+        assert scores.loc[2, "potential_score"] == pytest.approx(14.0 / 3)
+        assert scores.loc[3, "kpi_score"] == pytest.approx(3.0)
+        assert scores.loc[3, "potential_score"] == pytest.approx(3.0)
+        assert np.isnan(scores.loc[4, "kpi_score"])
+        assert scores.loc[1, "full_name"] == "Naməlum"
+
+    def test_potential_source_selection(self, seeded_grid):
+        """The 360 and manager sources can be requested explicitly."""
+        by_360 = TalentGridService.get_grid_scores(1, POTENTIAL_SOURCE_360).set_index("user_id")
+        by_manager = TalentGridService.get_grid_scores(1, POTENTIAL_SOURCE_MANAGER).set_index("user_id")
+
+        assert np.isnan(by_360.loc[3, "potential_score"])
+        assert by_manager.loc[2, "potential_score"] == pytest.approx(2.0)
+
+        with pytest.raises(ValueError):
+            TalentGridService.get_grid_scores(1, "random")
+        with pytest.raises(ValueError):
+            TalentGridService.get_grid_scores(99)
+
+    def test_build_talent_grid_cells(self, seeded_grid):
+        """Scored users land in their 3x3 cell; unscored users are counted separately."""
+        grid = TalentGridService.build_talent_grid(1)
+
+        assert list(grid.employees["user_id"]) == [2, 3]
+        assert grid.unscored_count == 2
+        assert grid.members[("Yüksək Potensial", "Yüksək Performans")] == (2,)
+        assert grid.members[("Orta Potensial", "Orta Performans")] == (3,)
+        assert len(grid.members) == 9
+        assert grid.cell_counts.loc["Yüksək Potensial", "Yüksək Performans"] == 1
+        assert grid.cell_counts.to_numpy().sum() == 2
+        assert list(grid.cell_counts.index) == list(POTENTIAL_LABELS[::-1])
+        assert list(grid.cell_counts.columns) == list(PERFORMANCE_LABELS)
+
+        # Configurable thresholds move the same users to other cells
+        strict = TalentGridService.build_talent_grid(
+            1, performance_thresholds=(4.6, 4.9), potential_thresholds=(3.5, 4.8)
+        )
+        assert strict.members[("Orta Potensial", "Aşağı Performans")] == (2,)
+        assert strict.members[("Aşağı Potensial", "Aşağı Performans")] == (3,)
+
+    def test_bucket_scores_boundaries(self):
+        """Both thresholds belong to the middle bucket, matching the original page."""
+        df = pd.DataFrame({
+            "user_id": [1, 2, 3, 4, 5],
+            "full_name": ["A", "B", "C", "D", "E"],
+            "department": [None] * 5,
+            "kpi_score": [2.49, 2.5, 3.0, 3.5, 3.51],
+            "potential_score": [1.0, 2.5, 3.5, 3.6, 5.0],
+        })
+
+        result = TalentGridService.bucket_scores(df, (2.5, 3.5), (2.5, 3.5))
+
+        assert list(result["performance_level"]) == [0, 1, 1, 1, 2]
+        assert list(result["potential_level"]) == [0, 1, 1, 2, 2]
+        assert list(result["box"]) == [1, 5, 5, 8, 9]
+        assert list(result["performance_category"]) == [
+            "Aşağı Performans", "Orta Performans", "Orta Performans", "Orta Performans", "Yüksək Performans"
+        ]
+
+        with pytest.raises(ValueError):
+            TalentGridService.bucket_scores(df, (3.5, 2.5), (2.5, 3.5))
+
+    def test_bucket_scores_large_organization(self):
+        """Bucketing 20k employees is vectorized and every row lands in exactly one cell."""
+        rng = np.random.default_rng(42)
+        size = 20_000
+        df = pd.DataFrame({
+            "user_id": np.arange(1, size + 1),
+            "full_name": "İşçi",
+            "department": "İT",
+            "kpi_score": rng.uniform(1.0, 5.0, size),
+            "potential_score": rng.uniform(1.0, 5.0, size),
+        })
+
+        employees = TalentGridService.bucket_scores(df, (2.5, 3.5), (2.5, 3.5))
+        counts = TalentGridService.cell_counts(employees)
+        members = TalentGridService.cell_members(employees)
+
+        assert counts.to_numpy().sum() == size
+        assert sum(len(user_ids) for user_ids in members.values()) == size
+        high_high = employees[(employees["kpi_score"] > 3.5) & (employees["potential_score"] > 3.5)]
+        assert members[("Yüksək Potensial", "Yüksək Performans")] == tuple(high_high["user_id"])
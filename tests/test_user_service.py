@@ -0,0 +1,173 @@
+"""Unit tests for User service."""
+
+import pytest
+from unittest.mock import patch
+from services.user_service import UserService, UserDirectory
+from models.user import User
+from models.user_profile import UserProfile
+
+
+class TestUserDirectory:
+    """Test cases for the cached user directory."""
+
+    @pytest.fixture
+    def seeded_users(self, sqlite_db):
+        """Seed a manager with one active and one inactive subordinate."""
+        sqlite_db.add_all([
+            User(id=1, username="manager", password="x", role="manager"),
+            User(id=2, username="employee", password="x", role="user", manager_id=1),
+            User(id=3, username="former", password="x", role="user", manager_id=1, is_active=False),
+        ])
+        sqlite_db.add_all([
+            UserProfile(user_id=1, full_name="Rəhbər", position="Rəis"),
+            UserProfile(user_id=2, full_name="İşçi", position="Mütəxəssis", department="İT"),
+        ])
+        sqlite_db.commit()
+        UserService.invalidate_user_directory()
+
+    def test_directory_indexes(self, seeded_users):
+        """Users are resolvable by id, username and full name without extra queries."""
+        directory = UserService.get_user_directory()
+
+        assert isinstance(directory, UserDirectory)
+        assert directory.get(2).username == "employee"
+        assert directory.get_by_username("manager").id == 1
+        assert directory.get_by_full_name("İşçi").id == 2
+        assert directory.full_name(3) == "Naməlum"
+        assert directory.full_name(999) == "Naməlum"
+        assert [u.id for u in directory.subordinates(1)] == [2]
+        assert [u.id for u in UserService.get_all_active_users()] == [1, 2]
+
+    def test_directory_entries_are_immutable_dtos(self, seeded_users):
+        """The shared directory hands out frozen DTOs, not detached ORM users."""
+        import dataclasses
+        from services.dto import UserDTO
+
+        user = UserService.get_user_directory().get(2)
+        assert isinstance(user, UserDTO)
+        assert user.department == "İT"
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            user.full_name = "Dəyişdirilmiş"
+        assert UserService.get_user_directory().full_name(2) == "İşçi"
+
+    def test_directory_is_cached_until_invalidated(self, seeded_users):
+        """The directory is reused until a write bumps its version."""
+        first = UserService.get_user_directory()
+        assert UserService.get_user_directory() is first
+
+        UserService.update_user_profile(2, {"full_name": "Yeni Ad"})
+
+        second = UserService.get_user_directory()
+        assert second is not first
+        assert second.version > first.version
+        assert second.full_name(2) == "Yeni Ad"
+
+    def test_create_user_invalidates_directory(self, seeded_users):
+        """Creating a user through the service makes it visible in the directory."""
+        UserService.get_user_directory()
+
+        with patch("models.user.pwd_context") as mock_pwd_context:
+            mock_pwd_context.hash.return_value = "hashed"
+            user = UserService.create_user("new", "secret", "user", "Yeni İşçi", "Analitik", manager_id=1)
+
+        directory = UserService.get_user_directory()
+        assert directory.get_by_username("new").id == user.id
+        assert directory.full_name(user.id) == "Yeni İşçi"
+
+        with pytest.raises(ValueError):
+            UserService.create_user("new", "secret", "user", "Dublikat", "Analitik")
+
+
+class TestUserAdministration:
+    """Test cases for the paged user grid and diff-only bulk updates."""
+
+    @pytest.fixture
+    def seeded_staff(self, sqlite_db):
+        """Seed 12 users; every user except the last has a profile."""
+        sqlite_db.add(User(id=1, username="boss", password="x", role="admin"))
+        sqlite_db.add(UserProfile(user_id=1, full_name="Böyük Rəis", position="Direktor", department="İdarə"))
+        for user_id in range(2, 13):
+            sqlite_db.add(User(id=user_id, username=f"user{user_id}", password="x", role="user",
+                               manager_id=1, is_active=user_id % 4 != 0))
+            if user_id != 12:
+                sqlite_db.add(UserProfile(user_id=user_id, full_name=f"İşçi {user_id}", position="Mütəxəssis",
+                                          department="İT" if user_id % 2 else "Maliyyə"))
+        sqlite_db.commit()
+
+    def test_users_page_is_keyset_paginated(self, seeded_staff):
+        """Pages follow the id cursor and carry profile and manager names from one joined query."""
+        first = UserService.get_users_page(page_size=5)
+        second = UserService.get_users_page(after_id=first["next_cursor"], page_size=5)
+        third = UserService.get_users_page(after_id=second["next_cursor"], page_size=5)
+
+        assert [u["id"] for u in first["items"]] == [1, 2, 3, 4, 5]
+        assert [u["id"] for u in second["items"]] == [6, 7, 8, 9, 10]
+        assert [u["id"] for u in third["items"]] == [11, 12]
+        assert third["next_cursor"] is None
+        assert first["total"] == 12
+        assert first["items"][1]["manager_name"] == "Böyük Rəis"
+        assert first["items"][0]["manager_name"] is None
+        assert third["items"][1]["full_name"] == ""
+
+    def test_users_page_filters(self, seeded_staff):
+        """Search, role, department and active filters run in SQL and shape the total."""
+        it_active = UserService.get_users_page(department="İT", is_active=True)
+        assert [u["id"] for u in it_active["items"]] == [3, 5, 7, 9, 11]
+        assert it_active["total"] == 5
+
+        assert [u["id"] for u in UserService.get_users_page(search="rəis")["items"]] == [1]
+        assert [u["id"] for u in UserService.get_users_page(search="user1")["items"]] == [10, 11, 12]
+        assert UserService.get_users_page(role="admin")["total"] == 1
+        assert UserService.get_departments() == ["Maliyyə", "İT", "İdarə"]
+
+    def test_get_all_users_with_profiles_single_query(self, seeded_staff):
+        """The legacy listing keeps its shape without per-user profile queries."""
+        users = UserService.get_all_users_with_profiles()
+
+        assert len(users) == 12
+        assert users[1]["full_name"] == "İşçi 2"
+        assert users[11]["position"] == ""
+
+    def test_bulk_update_writes_only_changed_fields(self, seeded_staff, sqlite_db):
+        """Diffs for users and profiles are applied in one transaction, creating missing profiles."""
+        directory = UserService.get_user_directory()
+
+        updated = UserService.bulk_update_users({
+            2: {"full_name": "Yeni Ad", "role": "manager"},
+            3: {"role": "manager"},
+            4: {"is_active": True, "manager_id": 0, "department": ""},
+            12: {"position": "Analitik"},
+            5: {},
+        })
+
+        assert updated == 4
+        sqlite_db.expire_all()
+        assert sqlite_db.get(User, 2).role == "manager"
+        assert sqlite_db.get(User, 3).role == "manager"
+        assert sqlite_db.get(User, 4).is_active is True
+        assert sqlite_db.get(User, 4).manager_id is None
+        profile_2 = sqlite_db.query(UserProfile).filter_by(user_id=2).one()
+        assert profile_2.full_name == "Yeni Ad"
+        assert profile_2.position == "Mütəxəssis"
+        assert sqlite_db.query(UserProfile).filter_by(user_id=4).one().department is None
+        assert sqlite_db.query(UserProfile).filter_by(user_id=12).one().position == "Analitik"
+        assert UserService.get_user_directory() is not directory
+
+    def test_bulk_update_is_all_or_nothing(self, seeded_staff, sqlite_db):
+        """A validation error leaves every row untouched."""
+        with pytest.raises(ValueError):
+            UserService.bulk_update_users({2: {"role": "manager"}, 3: {"username": "boss"}})
+        with pytest.raises(ValueError):
+            UserService.bulk_update_users({2: {"password": "x"}})
+        with pytest.raises(ValueError):
+            UserService.bulk_update_users({2: {"manager_id": 2}})
+        with pytest.raises(ValueError):
+            UserService.bulk_update_users({999: {"role": "user"}})
+
+        sqlite_db.expire_all()
+        assert sqlite_db.get(User, 2).role == "user"
+
+        with pytest.raises(ValueError):
+            UserService.bulk_update_users({2: {"username": "same"}, 3: {"username": "same"}})
+        # Re-saving a user's own username is not a conflict
+        assert UserService.bulk_update_users({2: {"username": "user2"}, 3: {"username": "yeni3"}}) == 2
@@ -5,8 +5,8 @@ from alembic.config import Config
 from alembic import command
 from alembic.script import ScriptDirectory
 from alembic.runtime.migration import MigrationContext
-from sqlalchemy import create_engine, text
-from config import settings
+from sqlalchemy import text
+from database import engine
 
 
 def get_alembic_config():
@@ -25,10 +25,6 @@ def get_alembic_config():
 def get_current_db_revision():
     """Get the current database revision from alembic_version table."""
     try:
-        # Create database engine
-        db_url = settings.get_db_url
-        engine = create_engine(db_url)
-        
         # Connect to database and query alembic_version table
         with engine.connect() as connection:
             # Check if alembic_version table exists
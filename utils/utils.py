@@ -4,6 +4,8 @@ controller = CookieController()
 
 from sqlalchemy import select, insert
 from database import get_db
+from services.sidebar_service import SidebarService
+from services.export_service import ExportService
 
 from data.months_in_azeri import evaluation_types
 
@@ -23,12 +25,12 @@ def check_login():
         st.link_button("Giriş səhifəsi", "/")
         st.stop()
     
-    with get_db() as session:
-        user = session.query(User).where(User.id == st.session_state['user_id'], User.is_active == True).scalar()
-        if not user:
-            st.error("İstifadəçi tapılmadı və ya deaktiv edilib.")
-            st.stop()
-        return user
+    # İstifadəçi qısa müddətli yan panel keşindən götürülür (hər rerun-da sorğu göndərilmir)
+    user = SidebarService.get_sidebar_state(st.session_state['user_id']).user
+    if not user:
+        st.error("İstifadəçi tapılmadı və ya deaktiv edilib.")
+        st.stop()
+    return user
 
 
 def get_subordinates(manager_id):
@@ -38,42 +40,78 @@ def get_subordinates(manager_id):
         return subordinates
 
 
-def check_upcoming_evaluations():
-    """Check for evaluations that are approaching deadlines"""
-    from models.kpi import Evaluation, EvaluationPeriod
-    from datetime import datetime, timedelta
-    
-    with get_db() as session:
-        # Find evaluations that are due in the next 7 days
-        upcoming_evaluations = session.query(Evaluation, EvaluationPeriod, User).join(
-            EvaluationPeriod, Evaluation.period_id == EvaluationPeriod.id
-        ).join(
-            User, Evaluation.evaluated_user_id == User.id
-        ).filter(
-            EvaluationPeriod.end_date >= datetime.now().date(),
-            EvaluationPeriod.end_date <= (datetime.now() + timedelta(days=7)).date(),
-            Evaluation.status == "PENDING"
-        ).all()
-        
-        return upcoming_evaluations
-
-
 def show_notifications():
     """Show notifications to the user"""
-    from models.kpi import Evaluation, EvaluationPeriod
-    from datetime import datetime, timedelta
+    from datetime import datetime
+    
+    if 'user_id' not in st.session_state:
+        return
+    state = SidebarService.get_sidebar_state(st.session_state['user_id'])
     
-    # Check for upcoming evaluations
-    upcoming_evals = check_upcoming_evaluations()
+    if state.unread_count:
+        st.sidebar.info(f"🔔 Oxunmamış bildirişlər: {state.unread_count}")
     
-    if upcoming_evals:
+    # Yaxınlaşan qiymətləndirmələr
+    if state.upcoming_deadlines:
         st.sidebar.warning("⚠️ Yakınlaşan Qiymətləndirmələr")
-        for eval, period, user in upcoming_evals:
-            days_until_due = (period.end_date - datetime.now().date()).days
+        for deadline in state.upcoming_deadlines:
+            days_until_due = (deadline.end_date - datetime.now().date()).days
             if days_until_due == 0:
-                st.sidebar.warning(f"Bugün son tarix: {period.name} qiymətləndirməsi")
+                st.sidebar.warning(f"Bugün son tarix: {deadline.period_name} qiymətləndirməsi")
             else:
-                st.sidebar.warning(f"{days_until_due} gün sonra son tarix: {period.name} qiymətləndirməsi")
+                st.sidebar.warning(f"{days_until_due} gün sonra son tarix: {deadline.period_name} qiymətləndirməsi")
+
+
+def show_job_progress(job_id, poll_seconds: float = 1.0, timeout_seconds: float = None):
+    """
+    Fon işinin gedişatını göstərir. İş bitənə qədər səhifə poll_seconds-dan bir yenilənir;
+    iş bitdikdə onun son vəziyyəti (JobDTO) qaytarılır.
+
+    İş timeout_seconds (verilməzsə JOB_WAIT_TIMEOUT_SECONDS) ərzində bitməzsə və ya
+    JOB_STALE_SECONDS ərzində heç bir işçi onu götürməzsə, avtomatik yenilənmə dayanır:
+    xəbərdarlıq, "yenilə" və "ləğv et" düymələri göstərilir və bitməmiş iş qaytarılır.
+    İş tapılmadıqda None qaytarılır.
+    """
+    import time
+    from datetime import datetime
+    from config import settings
+    from models.job import JOB_FAILED, JOB_PENDING
+    from services.job_service import JobService
+
+    job = JobService.status(job_id)
+    if job is None:
+        st.error("İş tapılmadı.")
+        return None
+
+    if not job.is_finished:
+        default_text = "Növbədədir..." if job.status == JOB_PENDING else "İcra olunur..."
+        st.progress(job.progress, text=job.progress_message or default_text)
+
+        if timeout_seconds is None:
+            timeout_seconds = settings.JOB_WAIT_TIMEOUT_SECONDS
+        age = (datetime.utcnow() - job.created_at).total_seconds() if job.created_at else 0.0
+        no_worker = job.status == JOB_PENDING and age > settings.JOB_STALE_SECONDS
+        if not no_worker and age <= timeout_seconds:
+            time.sleep(poll_seconds)
+            st.rerun()
+
+        if no_worker:
+            st.warning("İşi heç bir işçi prosesi götürməyib. scripts/job_worker.py işləyirmi?")
+        else:
+            st.warning("İş gözləniləndən uzun çəkir. Vəziyyəti əl ilə yeniləyə və ya işi ləğv edə bilərsiniz.")
+        refresh_col, cancel_col = st.columns(2)
+        with refresh_col:
+            if st.button("Vəziyyəti yenilə", key=f"job_{job_id}_refresh"):
+                st.rerun()
+        with cancel_col:
+            if st.button("İşi ləğv et", key=f"job_{job_id}_cancel"):
+                JobService.cancel(job_id)
+                st.rerun()
+        return job
+
+    if job.status == JOB_FAILED:
+        st.error(f"Əməliyyat uğursuz oldu: {job.error}")
+    return job
 
 
 def download_guide_doc_file():
@@ -179,9 +217,7 @@ def popup_successful_operation():
 
 def to_excel(df: pd.DataFrame):
     output = io.BytesIO()
-    writer = pd.ExcelWriter(output, engine='xlsxwriter')
-    df.to_excel(writer, index=False, sheet_name='Performance_Hesabat')
-    writer.close()
+    ExportService.write_xlsx(output, [ExportService.dataframe_table('Performance_Hesabat', df)])
     processed_data = output.getvalue()
     return processed_data
 